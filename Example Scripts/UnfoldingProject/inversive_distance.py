@@ -117,6 +117,7 @@ from koebe.geometries.orientedProjective2 import *
 from koebe.algorithms.incrementalConvexHull import incrConvexHull, orientationPointE3, randomConvexHullE3
 from koebe.algorithms.hypPacker import *
 from koebe.algorithms.tutteEmbeddings import tutteEmbeddingE2
+from koebe.algorithms.overlap import overlappingPairs
 
 from coin_unfolding_modular import (
     generate_coin_polygon_orick,
@@ -472,18 +473,7 @@ def _profile_line(profile: dict, mode: str):
 
 def find_overlapping_pairs(unfolding: DCEL, tol: float = 1e-10):
     """Return list of overlapping circle pairs (i, j) in the unfolded plane."""
-    overlaps = []
-    for i in range(len(unfolding.verts) - 1):
-        for j in range(i + 1, len(unfolding.verts)):
-            vi = unfolding.verts[i]
-            vj = unfolding.verts[j]
-            if vi.data is None or vj.data is None:
-                continue
-            distance = vi.data.center.distTo(vj.data.center)
-            sum_radii = vi.data.radius + vj.data.radius
-            if sum_radii - tol > distance:
-                overlaps.append((i, j))
-    return overlaps
+    return overlappingPairs(unfolding, tol=tol)
 
 
 def save_overlapping_dcel(
@@ -14,6 +14,23 @@ The main function for computing the CVT is weightedCVT, which takes three parame
 the initial point sites, the density grid, and the number of iterations of Lloyd's 
 algorithm to run (default is 50). 
 
+weightedCVT has two engines for the centroids of each Lloyd iteration. The default,
+engine="secord", clips the Voronoi cells and integrates over them with the scanline
+method of [Secord 02]; it is the reference implementation. engine="raster" instead
+labels every pixel with its nearest site in one KD-tree query (see rasterLabels) and
+sums the density and its moments over the labels with np.bincount (see
+rasterCentroids). It does no per-cell Python work, so it is much faster for many
+sites. The raster engine labels and weights every pixel rho[x][y] at its centre 
+(x, y). The scanline integrals of the secord engine count the columns x whose x - 0.5 
+lies in the cell (the crossings are rounded by intCoords) but weight them by x - 1 
+(see wcvt_xnumerator), so their centroids lie about half a pixel left of the raster 
+ones; otherwise the engines agree up to the rasterization of the cell boundaries.
+
+lloydIterations runs the same iterations as a generator, yielding the sites, the CVT
+energy and the largest displacement after each one. It can stop early once the sites
+settle (tol), and has a local mode (local_threshold) that only recomputes the cells
+near sites that are still moving. weightedCVT takes the same options.
+
 Here is an example of running the result using a grayscale image (cauchy.jpg) as the input. 
 
 
@@ -74,26 +91,94 @@ References:
         the docstring of voronoi_polygons for the link. 
 """
 
-from collections import defaultdict
-from scipy.spatial import Voronoi
+from collections import defaultdict, namedtuple
+from scipy.spatial import Voronoi, cKDTree
 from shapely.geometry import Polygon
 import numpy as np
 
-def weightedCVT(pts, rho, num_iterations = 50):
+LloydStep = namedtuple("LloydStep", ["iteration", "sites", "energy", "max_displacement", "active"])
+LloydStep.__doc__ = """One iteration of lloydIterations.
+
+    iteration: The number of the iteration, starting at 1.
+    sites: The sites after the iteration, as an N x 2 matrix.
+    energy: The CVT energy (the integral of rho times the squared distance to the 
+        nearest site) of the sites the iteration started from. None for the secord 
+        engine, which does not compute it.
+    max_displacement: The largest distance a site moved in the iteration.
+    active: A boolean mask of the sites whose cells were recomputed.
+"""
+
+def weightedCVT(pts, rho, num_iterations = 50, engine = "secord", tol = None, local_threshold = None):
     """Computes a weighted centroidal voronoi diagram of a set of points with a given 
     density function. 
     
     Args:
-        pts: A set of initial voronoi point sites. 
+        pts: A set of initial voronoi point sites. To continue an earlier run (a warm 
+            start), pass the sites it returned. 
         rho: A numpy array indexed by [x][y] for the density at point (x, y). Note
             that rho[x][y] can be 0 but should not be negative. If a region has all
             zero density it's centroid is calculated as the average of its neighbors.
         num_iterations: OPTIONAL Change the number of iterations of Lloyd's algorithm.
             Default is 50. 
+        engine: OPTIONAL "secord" (the default) or "raster", see the module docstring.
+        tol: OPTIONAL Stop early once no site moves more than tol in an iteration.
+        local_threshold: OPTIONAL Run local Lloyd iterations, see lloydIterations.
     Returns:
         The final location of the sites as an N x 2 matrix where N is the number of input
         points. 
     """
+    current_sites = pts
+    for step in lloydIterations(pts, rho, num_iterations, engine = engine, tol = tol, 
+                                local_threshold = local_threshold):
+        current_sites = step.sites
+    return current_sites
+
+def lloydIterations(pts, rho, num_iterations = 50, engine = "secord", tol = None, 
+                    local_threshold = None, labels = None):
+    """Runs Lloyd's algorithm for the weighted CVT, yielding a LloydStep after each 
+    iteration so that the caller can watch the energy and displacement, draw the 
+    intermediate sites, or stop whenever it likes. 
+    
+    In local mode (local_threshold given) only the cells of sites that moved more than 
+    local_threshold in the previous iteration, and of their Voronoi neighbours, are 
+    recomputed; all other sites stay put. As the sites settle, fewer cells are active 
+    and the iterations get cheaper. With the raster engine only the pixels of active 
+    cells are relabeled, so a site cannot take over pixels of inactive cells that are 
+    not its neighbours; the threshold should be small compared to the cell size. 
+    
+    Args:
+        pts: The initial sites (e.g. the sites of an earlier run, for a warm start). 
+        rho: A numpy array indexed by [x][y] for the density at point (x, y). 
+        num_iterations: OPTIONAL The maximum number of iterations. Default is 50.
+        engine: OPTIONAL "secord" (the default) or "raster", see the module docstring.
+        tol: OPTIONAL Stop after the first iteration in which no site moves more than tol.
+        local_threshold: OPTIONAL Run local Lloyd iterations with this threshold. The 
+            iterations also stop once no cell is active. 
+        labels: OPTIONAL For the raster engine, the pixel labels (see rasterLabels) of 
+            the sites pts if already known, e.g. from the last step of an earlier run. 
+    Yields:
+        A LloydStep per iteration. 
+    """
+    if engine == "raster":
+        steps = _rasterLloydSteps(pts, rho, labels, local_threshold)
+    elif engine == "secord":
+        steps = _secordLloydSteps(pts, rho, local_threshold)
+    else:
+        raise ValueError("Unknown CVT engine %r" % (engine,))
+    
+    for iteration in range(1, num_iterations + 1):
+        step = next(steps)
+        yield step._replace(iteration = iteration)
+        if tol is not None and step.max_displacement < tol:
+            return
+        if local_threshold is not None and step.max_displacement <= local_threshold:
+            return
+
+def _displacements(old_sites, new_sites):
+    return np.sqrt(np.sum((new_sites - old_sites) ** 2, axis = 1))
+
+def _secordLloydSteps(pts, rho, local_threshold):
+    """The Lloyd iterations of the secord engine (see lloydIterations)."""
     w, h = rho.shape
     
     diameter = max(w, h) * 1.414214
@@ -105,19 +190,178 @@ def weightedCVT(pts, rho, num_iterations = 50):
     
     boundary_polygon = Polygon(np.array([[0,0],[w,0],[w,h],[0, h]]))
 
-    current_sites = pts
+    current_sites = np.asarray(pts)
+    active = np.ones(len(current_sites), dtype = bool)
     
-    # Lloyd's algorithm 
-    for _ in range(num_iterations):
-        polys = list(voronoi_polygons(Voronoi(current_sites), diameter))
-        polygons = [Polygon(p).intersection(boundary_polygon) for p in polys]
-        centroids = []
-        for p in polygons:
-            c = wcvt_centroid(intCoords(list(p.exterior.coords)[:-1]), P, Q)
-            centroids.append(c)
-        current_sites = np.array(centroids)
+    while True:
+        voronoi = Voronoi(current_sites)
+        centroids = np.array(current_sites, dtype = float)
+        for i, p in enumerate(voronoi_polygons(voronoi, diameter)):
+            if active[i]:
+                polygon = Polygon(p).intersection(boundary_polygon)
+                centroids[i] = wcvt_centroid(intCoords(list(polygon.exterior.coords)[:-1]), P, Q)
+        moved = _displacements(current_sites, centroids)
+        yield LloydStep(0, centroids, None, float(moved.max(initial = 0.0)), active)
+        
+        current_sites = centroids
+        if local_threshold is not None:
+            moved = moved > local_threshold
+            p, q = voronoi.ridge_points.T
+            active = moved.copy()
+            active[p[moved[q]]] = True
+            active[q[moved[p]]] = True
+
+def _rasterLloydSteps(pts, rho, labels, local_threshold):
+    """The Lloyd iterations of the raster engine (see lloydIterations)."""
+    w, h = rho.shape
+    moments = densityMoments(rho)
+    current_sites = np.asarray(pts, dtype = float)
+    n = len(current_sites)
+    active = np.ones(n, dtype = bool)
+    relabel = None
     
-    return current_sites
+    while True:
+        if labels is None:
+            labels = rasterLabels(current_sites, w, h)
+        elif relabel is not None:
+            # Only the pixels of active cells can change hands
+            labels = labels.copy()
+            pixels = np.nonzero(relabel[labels.ravel()])[0]
+            labels.ravel()[pixels] = _nearestSites(cKDTree(current_sites), pixels, h)
+        flat_labels = labels.ravel()
+        energy = cvtEnergy(current_sites, labels, moments)
+        
+        if active.all():
+            centroids = _regionCentroids(current_sites, flat_labels, moments, h)
+        else:
+            # The pixels of the active cells, which all lie in the relabeled pixels
+            pixels = pixels[active[flat_labels[pixels]]]
+            centroids = current_sites.copy()
+            centroids[active] = _regionCentroids(current_sites, flat_labels[pixels], 
+                                                 [m[pixels] for m in moments], h, pixels)[active]
+        moved = _displacements(current_sites, centroids)
+        yield LloydStep(0, centroids, energy, float(moved.max(initial = 0.0)), active)
+        
+        current_sites = centroids
+        if local_threshold is None:
+            labels = None
+        else:
+            moved = moved > local_threshold
+            active = _withNeighbours(labels, moved)
+            relabel = active
+            if active.all():
+                labels, relabel = None, None
+
+def _withNeighbours(labels, mask):
+    """Extends a mask of sites by the sites whose regions in the pixel labels touch
+    the regions of the masked sites."""
+    result = mask.copy()
+    for a, b in ((labels[:-1, :], labels[1:, :]), (labels[:, :-1], labels[:, 1:])):
+        result[a[mask[b]]] = True
+        result[b[mask[a]]] = True
+    return result
+
+def _pixelPoints(pixels, h):
+    """The x and y coordinates of the flattened pixel indices pixels of a grid of 
+    height h."""
+    return (pixels // h).astype(float), (pixels % h).astype(float)
+
+def _nearestSites(tree, pixels, h):
+    """Queries the nearest sites to the flattened pixel indices pixels of a grid of 
+    height h."""
+    return tree.query(np.column_stack(_pixelPoints(pixels, h)))[1]
+
+def rasterLabels(sites, w, h, chunk_size = 1 << 20):
+    """Labels every pixel (x, y), 0 <= x < w and 0 <= y < h, with the index of the 
+    site nearest to it, i.e. rasterizes the Voronoi diagram of the sites. 
+    
+    Args:
+        sites: An N x 2 array of sites.
+        w: The width of the grid.
+        h: The height of the grid.
+        chunk_size: OPTIONAL The number of pixels queried at a time, which bounds the 
+            memory used.
+    Returns:
+        A w x h integer array of site indices, indexed by [x][y] like rho. 
+    """
+    tree = cKDTree(np.asarray(sites, dtype = float))
+    labels = np.empty(w * h, dtype = np.int64)
+    for start in range(0, w * h, chunk_size):
+        pixels = np.arange(start, min(start + chunk_size, w * h))
+        labels[pixels] = _nearestSites(tree, pixels, h)
+    return labels.reshape(w, h)
+
+def densityMoments(rho):
+    """The flattened density rho and its moments x rho, y rho and (x^2 + y^2) rho, the 
+    bincount weights used by rasterCentroids and cvtEnergy. 
+    """
+    w, h = rho.shape
+    rho = np.asarray(rho, dtype = float).ravel()
+    xs, ys = _pixelPoints(np.arange(w * h), h)
+    return rho, xs * rho, ys * rho, (xs * xs + ys * ys) * rho
+
+def cvtEnergy(sites, labels, moments):
+    """The CVT energy, the sum over the pixels of rho times the squared distance to 
+    the site they are labeled with.
+    
+    Args:
+        sites: An N x 2 array of sites.
+        labels: The pixel labels, see rasterLabels.
+        moments: densityMoments(rho).
+    """
+    sites = np.asarray(sites, dtype = float)
+    n = len(sites)
+    mass, xmass, ymass, sqmass = (np.bincount(labels.ravel(), weights = m, minlength = n) 
+                                  for m in moments)
+    x, y = sites[:, 0], sites[:, 1]
+    return float(np.sum(sqmass - 2 * (x * xmass + y * ymass) + (x * x + y * y) * mass))
+
+def rasterCentroids(sites, rho, labels = None, moments = None):
+    """Computes the weighted centroids of the Voronoi regions of the sites over the 
+    pixel grid of rho. 
+    
+    A region with zero total density gets the unweighted centroid of its pixels, and a 
+    site that is nearest to no pixel is left where it is. 
+    
+    Args:
+        sites: An N x 2 array of sites.
+        rho: A numpy array indexed by [x][y] for the density at point (x, y). 
+        labels: OPTIONAL The pixel labels from rasterLabels, if already computed.
+        moments: OPTIONAL densityMoments(rho), if already computed. 
+    Returns:
+        The centroids as an N x 2 matrix. 
+    """
+    sites = np.asarray(sites, dtype = float)
+    w, h = rho.shape
+    if labels is None:
+        labels = rasterLabels(sites, w, h)
+    if moments is None:
+        moments = densityMoments(rho)
+    return _regionCentroids(sites, labels.ravel(), moments, h)
+
+def _regionCentroids(sites, labels, moments, h, pixels = None):
+    """The centroids of rasterCentroids from flattened labels, which are the labels of 
+    the pixels with flattened indices pixels (all pixels if None), and the matching 
+    moments."""
+    n = len(sites)
+    mass, xmass, ymass = (np.bincount(labels, weights = m, minlength = n) for m in moments[:3])
+    
+    centroids = sites.copy()
+    weighted = mass > 0
+    centroids[weighted, 0] = xmass[weighted] / mass[weighted]
+    centroids[weighted, 1] = ymass[weighted] / mass[weighted]
+    
+    # Regions of zero density: the average of their pixels
+    empty = ~weighted
+    if np.any(empty):
+        if pixels is None:
+            pixels = np.arange(len(labels))
+        xs, ys = _pixelPoints(pixels, h)
+        count = np.bincount(labels, minlength = n)
+        fallback = empty & (count > 0)
+        centroids[fallback, 0] = np.bincount(labels, weights = xs, minlength = n)[fallback] / count[fallback]
+        centroids[fallback, 1] = np.bincount(labels, weights = ys, minlength = n)[fallback] / count[fallback]
+    return centroids
 
 def worldToImgPixelCoords(world_x, 
                           world_y, 
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from .cvt import weightedCVT, lloydIterations
+
+class TestWeightedCVT(unittest.TestCase):
+
+    def setUp(self):
+        xs, ys = np.meshgrid(np.arange(30), np.arange(20), indexing = "ij")
+        self.rho = 1.0 + (xs * ys % 7) / 8.0
+        self.pts = np.array([[3, 4], [25, 3], [14, 10], [6, 16], [22, 15], [12, 2], [27, 18]])
+
+    def test_secordMatchesOriginalLoop(self):
+        # The output of the original Lloyd loop of weightedCVT, before lloydIterations
+        expected = [[3.089385474860335, 5.3486033519553065], [22.82625786163522, 5.020440251572327],
+                    [12.05691056910569, 10.83739837398374], [4.758022549869905, 15.699045967042498],
+                    [17.427400468384075, 15.874707259953162], [11.998786407766989, 3.3191747572815533],
+                    [25.04433497536946, 15.004926108374384]]
+        self.assertEqual(weightedCVT(self.pts, self.rho, 3).tolist(), expected)
+
+    def test_lloydIterations(self):
+        steps = list(lloydIterations(self.pts, self.rho, 3))
+        self.assertEqual([step.iteration for step in steps], [1, 2, 3])
+        self.assertTrue(np.array_equal(steps[-1].sites, weightedCVT(self.pts, self.rho, 3)))
+
+class TestRasterLloyd(unittest.TestCase):
+
+    def setUp(self):
+        xs, ys = np.meshgrid(np.arange(120), np.arange(80), indexing = "ij")
+        self.rho = 1.0 + 0.5 * np.sin(xs / 10.0) * np.cos(ys / 7.0)
+        self.pts = np.random.default_rng(1).uniform(0, [120, 80], size = (200, 2))
+
+    def test_energyDecreases(self):
+        energies = [step.energy for step in lloydIterations(self.pts, self.rho, 30, engine = "raster")]
+        self.assertTrue(all(b <= a + 1e-9 * a for a, b in zip(energies, energies[1:])))
+
+    def test_tol(self):
+        steps = list(lloydIterations(self.pts, self.rho, 200, engine = "raster", tol = 0.05))
+        self.assertLess(len(steps), 200)
+        self.assertLess(steps[-1].max_displacement, 0.05)
+        self.assertTrue(all(step.max_displacement >= 0.05 for step in steps[:-1]))
+
+    def test_localShrinksActiveSet(self):
+        steps = list(lloydIterations(self.pts, self.rho, 200, engine = "raster", local_threshold = 0.05))
+        self.assertLess(len(steps), 200)
+        self.assertTrue(steps[0].active.all())
+        self.assertLess(steps[-1].active.sum(), len(self.pts) // 2)
+
+    def test_warmStart(self):
+        steps = list(lloydIterations(self.pts, self.rho, 10, engine = "raster"))
+        warm = weightedCVT(steps[4].sites, self.rho, 5, engine = "raster")
+        self.assertTrue(np.array_equal(warm, steps[-1].sites))
+
+class TestEnginesAgree(unittest.TestCase):
+
+    def test_rasterMatchesSecord(self):
+        # The raster centroids lie half a pixel right of the secord ones (see the
+        # module docstring), up to the rasterization of the cell boundaries
+        xs, ys = np.meshgrid(np.arange(60), np.arange(40), indexing = "ij")
+        rho = 1.0 + 0.5 * np.sin(xs / 5.0) * np.cos(ys / 4.0)
+        pts = np.random.default_rng(2).uniform(0, [60, 40], size = (12, 2))
+        secord = next(lloydIterations(pts, rho, 1)).sites
+        raster = next(lloydIterations(pts, rho, 1, engine = "raster")).sites
+        offsets = raster - secord - [0.5, 0.0]
+        self.assertLess(np.abs(offsets).max(), 1.0)
+        self.assertLess(np.abs(offsets.mean(axis = 0)).max(), 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,7 @@
+import gc
+
+import numpy as np
+
 def delaunay(points):
     from koebe.datastructures.dcel import DCEL, Vertex, Dart, Edge, Face
     from scipy.spatial import Delaunay
@@ -74,4 +78,204 @@ def delaunay(points):
     for dart in boundaryDarts:
         dart.twin.makeNext(bdryOriginToDart[dart.origin])
     
-    return triDcel
\ No newline at end of file
+    return triDcel
+
+#
+# Regular (weighted) Delaunay triangulations of disks
+#
+# The regular triangulation of circles in the plane (the dual of their
+# power diagram, here also the inversive-distance Delaunay triangulation)
+# is the projection of the lower convex hull of the lifted points
+# (x, y, x^2 + y^2 - r^2). On the sphere, the convex hull of caps is the
+# convex hull of their polar points (the dual points of the DiskS2 planes,
+# as in incrementalConvexHull.orientationDiskS2). Both hulls are computed by
+# Qhull through scipy.spatial.ConvexHull and returned as DCELs with the
+# disks as vertex data, ready to pack. convexHullS2 is the same hull for
+# points on the sphere (their spherical Delaunay triangulation).
+#
+# Disks that are redundant (their lifted or polar point is inside the hull)
+# are not vertices of the triangulation. The Qhull result is kept as
+# dcel.hull, and dcel.diskIndices[k] is the index in the input of the disk
+# of dcel.verts[k].
+#
+
+def _diskDcel(disks, triangles, closed):
+    """Builds a DCEL from a (k, 3) array of triangles, given by indices into
+    disks and oriented counterclockwise. Only the disks used by triangles
+    become vertices. If closed is False the boundary darts are joined into
+    an outer face."""
+    from koebe.datastructures.dcel import DCEL, Vertex, Dart, Face
+
+    n = len(disks)
+    triangles = np.asarray(triangles, dtype = np.int64)
+    used = np.unique(triangles)
+    origins = triangles.ravel()
+    dests = triangles[:, [1, 2, 0]].ravel()
+    # Pair each dart i -> j with the dart j -> i, if there is one
+    keys = origins * n + dests
+    order = np.argsort(keys)
+    slots = np.minimum(np.searchsorted(keys[order], dests * n + origins), len(keys) - 1)
+    twins = np.where(keys[order][slots] == dests * n + origins, order[slots], -1)
+    boundary = np.nonzero(twins < 0)[0]
+    if closed and len(boundary) > 0:
+        raise ValueError("The hull is not a closed surface")
+
+    gcWasEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        dcel = DCEL()
+        vertOf = [None] * n
+        for i in used.tolist():
+            vertOf[i] = Vertex(dcel, data = disks[i])
+
+        darts = dcel.darts
+        for i, j, k in triangles.tolist():
+            face = Face(dcel)
+            dartij = Dart(dcel, origin = vertOf[i], face = face)
+            dartjk = Dart(dcel, origin = vertOf[j], face = face, prev = dartij)
+            Dart(dcel, origin = vertOf[k], face = face, prev = dartjk, next = dartij)
+
+        for a, b in zip(range(len(twins)), twins.tolist()):
+            if a < b:
+                darts[a].makeTwin(darts[b])
+                darts[a].createEdge()
+
+        if len(boundary) > 0:
+            dcel.outerFace = Face(dcel)
+            outerFrom = dict()
+            for a in boundary.tolist():
+                j = int(dests[a])
+                twin = Dart(dcel, origin = vertOf[j], face = dcel.outerFace)
+                darts[a].makeTwin(twin)
+                darts[a].createEdge()
+                outerFrom[j] = twin
+            for a in boundary.tolist():
+                darts[a].twin.makeNext(outerFrom[int(origins[a])])
+    finally:
+        if gcWasEnabled:
+            gc.enable()
+
+    dcel.diskIndices = used.tolist()
+    return dcel
+
+def _liftedCircles(disks):
+    """The lifted points (x, y, x^2 + y^2 - r^2) of CircleE2s or DiskOP2s."""
+    from koebe.geometries.euclidean2 import CircleE2
+    from koebe.geometries.orientedProjective2 import DiskOP2
+
+    lifted = np.empty((len(disks), 3))
+    for k, disk in enumerate(disks):
+        if isinstance(disk, CircleE2):
+            x, y, r = disk.center.x, disk.center.y, disk.radius
+            lifted[k] = (x, y, x * x + y * y - r * r)
+        elif isinstance(disk, DiskOP2):
+            if not disk.a > 0:
+                raise ValueError("regularDelaunay needs bounded disks (a > 0), got %r" % (disk,))
+            # The center is (-b, -c) / 2a and x^2 + y^2 - r^2 = d / a
+            lifted[k] = (-disk.b / (2 * disk.a), -disk.c / (2 * disk.a), disk.d / disk.a)
+        else:
+            raise TypeError("regularDelaunay needs CircleE2 or DiskOP2 disks, got %r" % (disk,))
+    return lifted
+
+def regularDelaunay(disks):
+    """The regular (power or inversive-distance Delaunay) triangulation of
+    circles in the plane.
+
+    Args:
+        disks: A list of CircleE2 or DiskOP2 (with a > 0). At least three of
+            the centers must not be collinear.
+
+    Returns:
+        A DCEL with the disks as vertex data, counterclockwise triangular
+        faces and an outer face bounding the convex hull of the centers.
+        If there are only three disks or the lifted points lie in a plane
+        (e.g. equal disks centered on a circle), every disk is a vertex
+        and dcel.hull is the Delaunay triangulation of the centers instead.
+    """
+    from scipy.spatial import ConvexHull, Delaunay, QhullError
+
+    disks = list(disks)
+    lifted = _liftedCircles(disks)
+    xy = lifted[:, 0:2]
+    try:
+        hull = ConvexHull(lifted)
+    except QhullError:
+        # A flat lifted set has no lower hull, but then every triangulation
+        # of the centers is regular
+        hull = Delaunay(xy)
+        triangles = hull.simplices.copy()
+    else:
+        # The lower facets; vertical facets (over the hull boundary) are skipped
+        lower = hull.equations[:, 2] < -1e-12
+        triangles = hull.simplices[lower]
+    a, b, c = xy[triangles[:, 0]], xy[triangles[:, 1]], xy[triangles[:, 2]]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    triangles[area < 0] = triangles[area < 0][:, ::-1]
+
+    dcel = _diskDcel(disks, triangles, closed = False)
+    dcel.hull = hull
+    return dcel
+
+def diskConvexHullS2(disks):
+    """The convex hull of caps on the sphere, i.e. the regular triangulation
+    of the caps (compare incrConvexHull(disks, orientationDiskS2)).
+
+    Args:
+        disks: A list of DiskS2, each smaller than a hemisphere (d < 0), with
+            polar points spanning space.
+
+    Returns:
+        A DCEL with the disks as vertex data and triangular faces oriented
+        counterclockwise seen from outside.
+    """
+    from scipy.spatial import ConvexHull
+
+    disks = list(disks)
+    coeffs = np.array([tuple(disk) for disk in disks], dtype = np.float64).reshape(-1, 4)
+    if np.any(coeffs[:, 3] >= 0):
+        raise ValueError("diskConvexHullS2 needs caps smaller than a hemisphere (d < 0)")
+    # The dual point (-a, -b, -c, d) in Euclidean coordinates
+    polar = -coeffs[:, 0:3] / coeffs[:, 3:4]
+    hull = ConvexHull(polar)
+
+    dcel = _diskDcel(disks, _outwardTriangles(hull, polar), closed = True)
+    dcel.hull = hull
+    return dcel
+
+def convexHullS2(points):
+    """The convex hull of points on the sphere, i.e. their spherical Delaunay
+    triangulation.
+
+    Args:
+        points: A list of PointS2 (or PointE3) spanning space, or an (n, 3)
+            array, whose rows become PointS2s.
+
+    Returns:
+        A DCEL with the points as vertex data and triangular faces oriented
+        counterclockwise seen from outside. As for the disks, dcel.hull is the
+        Qhull result and dcel.diskIndices[k] the index of the point of
+        dcel.verts[k].
+    """
+    from scipy.spatial import ConvexHull
+    from koebe.geometries.spherical2 import PointS2
+
+    if isinstance(points, np.ndarray):
+        coords = np.asarray(points, dtype = np.float64).reshape(-1, 3)
+        points = [PointS2(*row) for row in coords.tolist()]
+    else:
+        points = list(points)
+        coords = np.array([(p.x, p.y, p.z) for p in points], dtype = np.float64).reshape(-1, 3)
+    hull = ConvexHull(coords)
+
+    dcel = _diskDcel(points, _outwardTriangles(hull, coords), closed = True)
+    dcel.hull = hull
+    return dcel
+
+def _outwardTriangles(hull, coords):
+    """The facets of a 3D ConvexHull as triangles oriented counterclockwise
+    seen from outside."""
+    triangles = hull.simplices.copy()
+    a, b, c = coords[triangles[:, 0]], coords[triangles[:, 1]], coords[triangles[:, 2]]
+    outward = np.einsum("ij,ij->i", np.cross(b - a, c - a), hull.equations[:, 0:3])
+    triangles[outward < 0] = triangles[outward < 0][:, ::-1]
+    return triangles
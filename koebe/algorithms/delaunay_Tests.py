@@ -0,0 +1,104 @@
+import unittest
+
+import math
+
+import numpy as np
+
+from .delaunay import delaunay, regularDelaunay, diskConvexHullS2, convexHullS2
+from ..geometries.euclidean2 import PointE2, CircleE2
+from ..geometries.spherical2 import DiskS2
+
+def triangles(dcel, index):
+    """The inner faces of dcel as sets of the indices index(v.data) of their vertices."""
+    return {frozenset(index(d.origin.data) for d in f.darts()) for f in dcel.faces if f is not dcel.outerFace}
+
+def cap(x, y, z, angle):
+    """The cap of the given angular radius about the direction (x, y, z)."""
+    norm = math.sqrt(x * x + y * y + z * z)
+    return DiskS2(x / norm, y / norm, z / norm, -math.cos(angle))
+
+class TestRegularDelaunay(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.points = [PointE2(x, y) for x, y in rng.uniform(0, 10, size = (60, 2)).tolist()]
+
+    def test_equalRadiiIsDelaunay(self):
+        disks = [CircleE2(p, 0.3) for p in self.points]
+        regular = regularDelaunay(disks)
+        expected = triangles(delaunay(self.points), self.points.index)
+        self.assertEqual(triangles(regular, lambda disk: self.points.index(disk.center)), expected)
+        self.assertEqual(regular.diskIndices, list(range(len(disks))))
+
+    def test_redundantDiskDropped(self):
+        # A small disk next to the center of a large one is inside its power cell
+        disks = [CircleE2(p, 0.3) for p in self.points]
+        disks[10] = CircleE2(self.points[10], 2.0)
+        tiny = CircleE2(PointE2(self.points[10].x + 0.1, self.points[10].y), 0.01)
+        regular = regularDelaunay(disks + [tiny])
+        self.assertNotIn(len(disks), regular.diskIndices)
+        self.assertNotIn(tiny, [v.data for v in regular.verts])
+        self.assertIn(10, regular.diskIndices)
+
+    def test_counterclockwise(self):
+        regular = regularDelaunay([CircleE2(p, 0.1 + 0.05 * (k % 5)) for k, p in enumerate(self.points)])
+        for f in regular.faces:
+            if f is not regular.outerFace:
+                a, b, c = (d.origin.data.center for d in f.darts())
+                self.assertGreater((b.x - a.x) * (c.y - a.y) - (b.y - a.y) * (c.x - a.x), 0)
+
+    def assertTriangulates(self, disks, faceCount):
+        regular = regularDelaunay(disks)
+        faces = [f for f in regular.faces if f is not regular.outerFace]
+        self.assertEqual(len(faces), faceCount)
+        self.assertEqual(regular.diskIndices, list(range(len(disks))))
+        self.assertEqual(len(regular.verts) - len(regular.edges) + len(faces), 1)
+        for f in faces:
+            a, b, c = (d.origin.data.center for d in f.darts())
+            self.assertGreater((b.x - a.x) * (c.y - a.y) - (b.y - a.y) * (c.x - a.x), 0)
+
+    def test_threeDisks(self):
+        self.assertTriangulates([CircleE2(PointE2(0, 0), 0.2), CircleE2(PointE2(2, 0), 0.5), 
+                                 CircleE2(PointE2(1, 1), 0.3)], 1)
+
+    def test_flatLift(self):
+        # Equal disks on a circle lift to points in a plane
+        self.assertTriangulates([CircleE2(PointE2(x, y), 0.3) for x, y in ((0, 0), (1, 0), (1, 1), (0, 1))], 2)
+        self.assertTriangulates([CircleE2(PointE2(math.cos(t), math.sin(t)), 0.1) 
+                                 for t in np.linspace(0, 2 * math.pi, 7)[:-1].tolist()], 4)
+
+class TestConvexHullS2(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(6)
+        directions = rng.normal(size = (50, 3))
+        self.caps = [cap(x, y, z, 0.1 + 0.1 * (k % 3)) for k, (x, y, z) in enumerate(directions.tolist())]
+
+    def assertOutward(self, dcel, position):
+        faces = [f for f in dcel.faces if f is not dcel.outerFace]
+        self.assertEqual(len(dcel.verts) - len(dcel.edges) + len(faces), 2)
+        for f in faces:
+            a, b, c = (np.array(position(d.origin.data)) for d in f.darts())
+            # The hull contains the origin, so an outward normal points away from it
+            self.assertGreater(np.dot(np.cross(b - a, c - a), a), 0)
+
+    def test_diskHullOutward(self):
+        self.assertOutward(diskConvexHullS2(self.caps), lambda disk: (-disk.a / disk.d, -disk.b / disk.d, -disk.c / disk.d))
+
+    def test_pointHullOutward(self):
+        points = np.array([(disk.a, disk.b, disk.c) for disk in self.caps])
+        self.assertOutward(convexHullS2(points), lambda p: (p.x, p.y, p.z))
+
+    def test_redundantCapDropped(self):
+        # A cap inside a larger cap of the hull, about the same direction
+        indices = diskConvexHullS2(self.caps).diskIndices
+        outer = self.caps[indices[0]]
+        caps = self.caps + [cap(outer.a, outer.b, outer.c, 0.05)]
+        self.assertEqual(diskConvexHullS2(caps).diskIndices, indices)
+
+    def test_hemisphereRejected(self):
+        with self.assertRaises(ValueError):
+            diskConvexHullS2(self.caps + [DiskS2(0, 0, 1, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -285,7 +285,8 @@ def maximalPacking(diskDcel: DCEL,
                    num_passes: int = 1000, 
                    tolerance: float = 3e-10, 
                    centerDartIdx: int = -1, 
-                   placeCircles: bool = True) -> (DCEL, int):
+                   placeCircles: bool = True, 
+                   initialRadii: Optional[list] = None) -> (DCEL, int):
     """Computes a hyperbolic maximal packing of the given DCEL. 
     
     This function assumes that the DCEL is a triangulated disk with the boundary given
@@ -296,6 +297,13 @@ def maximalPacking(diskDcel: DCEL,
             incident to the outerFace. 
         numPasses: maximum number of iterations to perform. Default is 1000.
         tolerance: 
+        initialRadii: OPTIONAL The x-radii to start the interior circles from, one per 
+            vertex of diskDcel (the entries of boundary vertices are ignored). A good
+            guess, such as a packing of a coarser complex, saves iterations. Default
+            is None, starting every interior circle at 0.5. repack stops on an 
+            average of errors taken as it goes, which goes stale while the radii 
+            still move a lot, so a warm start repacks again until its first, fresh,
+            average is within the tolerance. 
     Returns:
         A tuple (dcel, loopCount) where dcel is a new DCEL structure where each vertex 
         stores a list [z, r] as its .data object where z is a complex specifying the 
@@ -320,11 +328,19 @@ def maximalPacking(diskDcel: DCEL,
     for v in dcel.verts:
         v.data = [ExtendedComplex.ZERO, 0.5]
         v.aim = TWO_PI
+    if initialRadii is not None:
+        for v, x in zip(dcel.verts, initialRadii):
+            v.data[1] = x
     for b in bdryVerts:
         b.data = [ExtendedComplex.ZERO, -5]
         b.aim = -1.0
     
-    repack_iterations = repack(dcel, num_passes, tolerance)
+    _, passes = repack(dcel, num_passes, tolerance)
+    if initialRadii is not None:
+        more = passes
+        while 0 < more and passes < num_passes:
+            _, more = repack(dcel, num_passes - passes, tolerance)
+            passes += more
     
     if placeCircles:
         _place_circles(dcel, centerDartIdx)
@@ -335,7 +351,7 @@ def maximalPacking(diskDcel: DCEL,
             if data:
                 v.data = CircleH2(PointH2(data[0]), data[1])
                 
-    return dcel, repack_iterations
+    return dcel, passes
 
 def _set_center(v: Vertex, z: ExtendedComplex) -> None:
     """Sets the center data of vertex v.
@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from .delaunay import regularDelaunay
+from .hypPacker import _angleSumFor, maximalPacking
+from ..datastructures.dcel import DCEL
+from ..geometries.euclidean2 import CircleE2, PointE2
+
+def freshError(packing):
+    """The average angle sum error of the interior vertices of an unplaced packing."""
+    interior = [v for v in packing.verts if v.aim > 0]
+    return sum(abs(_angleSumFor(v) - v.aim) for v in interior) / len(interior)
+
+class TestMaximalPacking(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        grid = np.array([(x, y) for x in range(8) for y in range(8)], dtype = float)
+        points = (grid + rng.uniform(-0.2, 0.2, grid.shape)).tolist()
+        self.mesh = regularDelaunay([CircleE2(PointE2(x, y), 0.1) for x, y in points])
+
+    def test_warmStartReachesTolerance(self):
+        cold, _ = maximalPacking(self.mesh, num_passes = 2000, tolerance = 1e-12, placeCircles = False)
+        radii = [v.data[1] for v in cold.verts]
+        # Start every radius far from the packing's
+        rng = np.random.default_rng(4)
+        start = [x * rng.uniform(0.5, 1.5) for x in radii]
+        warm, passes = maximalPacking(self.mesh, tolerance = 1e-9, placeCircles = False, initialRadii = start)
+        self.assertLess(passes, 1000)
+        self.assertLessEqual(freshError(warm), 1e-9)
+        interior = [k for k, v in enumerate(warm.verts) if v.aim > 0]
+        self.assertLess(max(abs(warm.verts[k].data[1] - radii[k]) for k in interior), 1e-6)
+
+    def test_passCount(self):
+        packing, passes = maximalPacking(self.mesh, num_passes = 5, placeCircles = False)
+        self.assertIsInstance(packing, DCEL)
+        self.assertEqual(passes, 5)
+
+if __name__ == '__main__':
+    unittest.main()
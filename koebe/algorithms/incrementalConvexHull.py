@@ -1,8 +1,9 @@
 from ..datastructures.dcel import DCEL, Vertex, Dart, Face, Edge
-from ..geometries.commonOps import determinant4
+from ..geometries.predicates import orient3d, det4Sign
 from ..geometries.euclidean3 import PointE3
 
 import math
+from fractions import Fraction
 from random import uniform
 
 #
@@ -11,9 +12,12 @@ from random import uniform
 # considered inside the convex hull if it has positive orientation with respect
 # to each triangle of teh hull. 
 #
-# This code currently assumes no four points are collinear (i.e. for no four
-# points) does orientation(p1, p2, p3, p4) return 0. 
-# TODO Remove the need for this assumption
+# The built in orientation functions below use the exact predicates of 
+# koebe.geometries.predicates, so degenerate input (four coplanar points) 
+# is handled consistently: a point is only inserted if it is strictly 
+# outside the current hull, and the initial tetrahedron is chosen to be 
+# non-degenerate. If a custom orientation function is inexact, the
+# result is only as reliable as it is. 
 #
 # Parameters:
 # * points: PointT - The list of points in some 3D point type
@@ -26,11 +30,65 @@ def incrConvexHull(points, orientation):
     elif len(points) == 3:
         return incrConvexHullOfThreePoints(points[0], points[1], points[2])
     else:
+        points = initialTetrahedronFirst(points, orientation)
         ch = incrConvexHullOfFourPoints(points[0], points[1], points[2], points[3], orientation)
         for point in points[4:]:
             addPoint(ch, point, orientation)
         return ch
 
+# Reorders points so that the first four have non-zero orientation (the 
+# order of the remaining points is kept). Raises a ValueError if all the 
+# points are coplanar. 
+#
+# For the built in orientation functions this is a single pass over the 
+# homogeneous coordinates of the points, keeping each point that is not 
+# spanned by those kept so far: first a point distinct from points[0], then
+# one off the line through them, then one off their plane. A custom 
+# orientation function only tells whether four points are coplanar, so for 
+# it the quadruples containing points[0] are tried in turn. 
+def initialTetrahedronFirst(points, orientation):
+    n = len(points)
+    coords = _homogeneousCoords.get(orientation)
+    if coords is None:
+        first = _firstTetrahedronBySearch(points, orientation)
+    else:
+        first, basis = [], []
+        for idx in range(n):
+            if _extendBasis(basis, coords(points[idx])):
+                first.append(idx)
+                if len(first) == 4:
+                    break
+        if len(first) < 4:
+            first = None
+    if first is None:
+        raise ValueError("All points are coplanar, so the convex hull is degenerate.")
+    return ([points[idx] for idx in first] 
+            + [points[idx] for idx in range(n) if not idx in first])
+
+def _firstTetrahedronBySearch(points, orientation):
+    n = len(points)
+    for j in range(1, n):
+        for k in range(j + 1, n):
+            for l in range(k + 1, n):
+                if orientation(points[0], points[j], points[k], points[l]) != 0:
+                    return [0, j, k, l]
+    return None
+
+# Adds the homogeneous coordinate vector h to basis, a list of (pivot, row)
+# pairs in row echelon form, and returns True, unless h is spanned by the 
+# basis. The reduction is exact, with fractions.Fraction.
+def _extendBasis(basis, h):
+    h = [Fraction(x) for x in h]
+    for pivot, row in basis:
+        if h[pivot] != 0:
+            f = h[pivot]
+            h = [a - f * b for a, b in zip(h, row)]
+    for pivot, x in enumerate(h):
+        if x != 0:
+            basis.append((pivot, [a / x for a in h]))
+            return True
+    return False
+
 #### SOME CONVEX HULL GENERATORS
 
 def randomConvexHullE3(numPoints):
@@ -261,15 +319,16 @@ def incrConvexHullOfThreePoints(p1, p2, p3):
 
 ### SOME BUILT IN ORIENTATION FUNCTIONS
 
+# These return the exact sign (-1, 0 or 1) of the orientation determinant
 def orientationPointE3(p1, p2, p3, p4):
-    return determinant4(
-            p1.x, p1.y, p1.z, 1.0,
-            p2.x, p2.y, p2.z, 1.0,
-            p3.x, p3.y, p3.z, 1.0,
-            p4.x, p4.y, p4.z, 1.0
+    return orient3d(
+            p1.x, p1.y, p1.z,
+            p2.x, p2.y, p2.z,
+            p3.x, p3.y, p3.z,
+            p4.x, p4.y, p4.z
     )
 def orientationPointOP3(p1, p2, p3, p4):
-    return determinant4(
+    return det4Sign(
             p1.hx, p1.hy, p1.hz, p1.hw,
             p2.hx, p2.hy, p2.hz, p2.hw,
             p3.hx, p3.hy, p3.hz, p3.hw,
@@ -278,3 +337,11 @@ def orientationPointOP3(p1, p2, p3, p4):
 
 def orientationDiskS2(d1, d2, d3, d4):
         return orientationPointOP3(d1.dualPointOP3, d2.dualPointOP3, d3.dualPointOP3, d4.dualPointOP3)
+
+# The homogeneous coordinates whose 4x4 determinant each of the built in 
+# orientation functions takes the sign of
+_homogeneousCoords = {
+    orientationPointE3: lambda p: (p.x, p.y, p.z, 1.0),
+    orientationPointOP3: lambda p: (p.hx, p.hy, p.hz, p.hw),
+    orientationDiskS2: lambda d: _homogeneousCoords[orientationPointOP3](d.dualPointOP3),
+}
@@ -1,9 +1,33 @@
+#
+# Inversive Voronoi diagrams of circle packings on the sphere
+#
+# Each edge of a packing contributes one arc of the diagram, lying on the
+# dual of the bisector of the edge's two disks and ending at the generator
+# points of the coaxial families formed with the bisectors to its two wing
+# disks (see computeVoronoiArc).
+#
+# computeVoronoiArc builds a dozen geometry objects per edge. The batch
+# functions below do the same computation for all the edges at once, on an
+# (n, 4) array of disk coefficients and an (m, 4) array of disk indices,
+# and return the arcs as arrays:
+#
+#   disks, quads = voronoiQuads(packing)
+#   sources, targets, arcDisks = computeVoronoiArcs(disks, quads)
+#
+# inversiveVoronoi(packing) returns the same arcs as CircleArcS2 objects.
+#
+
+import numpy as np
+
 from koebe.geometries.spherical2 import *
 from koebe.geometries.commonOps import *
 
+# The wing disk used for darts on the outer face
+OUTER_WING_DISK = DiskS2(0, 0, -1, 0)
+
 def wingDiskOf(dart):
     if dart.dcel.outerFace == dart.face:
-        return DiskS2(0, 0, -1, 0)
+        return OUTER_WING_DISK
     else:
         return dart.prev.origin.data
 
@@ -52,5 +76,130 @@ def computeVoronoiArcForEdge(edge):
     disk4 = wingDiskOf(dart.twin)
     return computeVoronoiArc(disk1, disk2, disk3, disk4)
 
+def voronoiQuads(packing):
+    """Returns the disks of packing as an (n + 1, 4) array, whose last row is
+    OUTER_WING_DISK, and an (m, 4) integer array holding, for each edge, the
+    rows of the disks passed to computeVoronoiArc by computeVoronoiArcForEdge
+    (origin, destination and the wings of the edge's dart and its twin).
+    """
+    packing.markIndices()
+    n = len(packing.verts)
+    disks = np.array([tuple(v.data) for v in packing.verts] + [tuple(OUTER_WING_DISK)],
+                     dtype = np.float64)
+    outerFace = packing.outerFace
+    def wing(dart):
+        return n if dart.face == outerFace else dart.prev.origin.idx
+    quads = np.array([(e.aDart.origin.idx, e.aDart.twin.origin.idx, wing(e.aDart), wing(e.aDart.twin))
+                      for e in packing.edges], dtype = np.int64).reshape(-1, 4)
+    return disks, quads
+
+def _bisectorDuals(d1, d2):
+    """The duals of the bisectors d1.bisectorWith(d2), as (4, m) arrays."""
+    minNorm1 = np.sqrt(np.abs(inner_product31(*d1, *d1)))
+    minNorm2 = np.sqrt(np.abs(inner_product31(*d2, *d2)))
+    return np.array([d1[0] * minNorm2 - d2[0] * minNorm1,
+                     d1[1] * minNorm2 - d2[1] * minNorm1,
+                     d1[2] * minNorm2 - d2[2] * minNorm1,
+                     d1[3] * minNorm2 - d2[3] * minNorm1])
+
+def _sphereIntersections(p01, p02, p03, p12, p13, p23):
+    """Vectorized LineOP3.getIntersectionWithUnit2Sphere. Returns the number
+    of intersections (0, 1 or 2) and the first and second intersection
+    points as (m, 3) arrays."""
+    v = np.array([-p03, -p13, -p23])
+    m = np.array([-p12,  p02, -p01])
+    ax, ay, az = np.abs(v)
+    useX = (ax >= ay) & (ax >= az)
+    useY = ~useX & (ay >= ax) & (ay >= az)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        p = np.where(useX, [np.zeros_like(ax),  m[2] / v[0], -m[1] / v[0]],
+            np.where(useY, [-m[2] / v[1], np.zeros_like(ax),  m[0] / v[1]],
+                           [ m[1] / v[2], -m[0] / v[2], np.zeros_like(ax)]))
+        pv = np.sum(p * v, axis = 0)
+        vv = np.sum(v * v, axis = 0)
+        disc = 4 * pv * pv - 4.0 * (np.sum(p * p, axis = 0) - 1) * vv
+        rad = np.sqrt(np.maximum(disc, 0.0))
+        tangent = (disc >= 0) & (np.abs(rad) < 1e-8)
+        count = np.where(disc < 0, 0, np.where(tangent, 1, 2))
+        t1 = np.where(tangent, -pv / vv, (-2 * pv + rad) / (2 * vv))
+        t2 = (-2 * pv - rad) / (2 * vv)
+    return count, (p + t1 * v).T, (p + t2 * v).T
+
+def _generatorPoints(source, target):
+    """Vectorized CoaxialFamilyS2(source, target).generatorPoints() for
+    disks given as (4, m) arrays."""
+    a1, b1, c1, d1 = source
+    a2, b2, c2, d2 = target
+    # The line through the planes of the disks, used for elliptic families
+    count, u1, u2 = _sphereIntersections(
+        +determinant2(c1, d1, c2, d2), -determinant2(b1, d1, b2, d2),
+        +determinant2(b1, c1, b2, c2), +determinant2(a1, d1, a2, d2),
+        -determinant2(a1, c1, a2, c2), +determinant2(a1, b1, a2, b2))
+    # The line through the dual points (-a, -b, -c, d), for the others
+    pCount, pU1, pU2 = _sphereIntersections(
+        determinant2(a1, b1, a2, b2), determinant2(a1, c1, a2, c2),
+        -determinant2(a1, d1, a2, d2), determinant2(b1, c1, b2, c2),
+        -determinant2(b1, d1, b2, d2), -determinant2(c1, d1, c2, d2))
+    elliptic = count == 2
+    return (np.where(elliptic, count, pCount),
+            np.where(elliptic[:, None], u1, pU1),
+            np.where(elliptic[:, None], u2, pU2))
+
+def _join(d1, d2, d3):
+    """Vectorized join (CPlaneS2.throughThreeDiskS2) of (4, m) disk arrays."""
+    return np.array([+determinant3(d1[1], d1[2], d1[3], d2[1], d2[2], d2[3], d3[1], d3[2], d3[3]),
+                     -determinant3(d1[0], d1[2], d1[3], d2[0], d2[2], d2[3], d3[0], d3[2], d3[3]),
+                     +determinant3(d1[0], d1[1], d1[3], d2[0], d2[1], d2[3], d3[0], d3[1], d3[3]),
+                     -determinant3(d1[0], d1[1], d1[2], d2[0], d2[1], d2[2], d3[0], d3[1], d3[2])])
+
+def _pickGeneratorPoint(count, u1, u2, ortho):
+    """Picks the generator point as computeVoronoiArc does: the first one if
+    it is the only one or lies on the c-plane ortho, otherwise the second.
+    Rows without generator points are NaN."""
+    dot = inner_product4(*ortho, *u1.T, 1)
+    first = (count == 1) | (np.abs(dot) < 1e-8)
+    pts = np.where(first[:, None], u1, u2)
+    pts[count == 0] = np.nan
+    return pts
+
+def computeVoronoiArcs(disks, quads):
+    """Batch computeVoronoiArc.
+
+    Args:
+        disks: An (n, 4) array of DiskS2 coefficients (a, b, c, d).
+        quads: An (m, 4) integer array of rows of disks, the arguments
+            d1, d2, d3, d4 of computeVoronoiArc for each arc.
+
+    Returns:
+        The arcs as arrays: the (m, 3) source and target points and the
+        (m, 4) coefficients of the disks the arcs lie on. The endpoints of
+        arcs whose coaxial family has no generator points are NaN.
+    """
+    disks = np.asarray(disks, dtype = np.float64).reshape(-1, 4)
+    quads = np.asarray(quads, dtype = np.int64).reshape(-1, 4)
+    d1, d2, d3, d4 = (disks[quads[:, k]].T for k in range(4))
+
+    dual12 = _bisectorDuals(d1, d2)
+    dual13 = _bisectorDuals(d1, d3)
+    dual14 = _bisectorDuals(d1, d4)
+
+    sources = _pickGeneratorPoint(*_generatorPoints(dual12, dual13), _join(d1, d2, d3))
+    targets = _pickGeneratorPoint(*_generatorPoints(dual12, dual14), _join(d1, d4, d2))
+    return sources, targets, dual12.T.copy()
+
+def toCircleArcS2s(sources, targets, arcDisks):
+    """Materializes arcs returned by computeVoronoiArcs as CircleArcS2s."""
+    if np.isnan(sources).any() or np.isnan(targets).any():
+        raise ValueError("Some Voronoi arcs have no endpoints")
+    return [CircleArcS2(PointS2(*source), PointS2(*target), DiskS2(*disk))
+            for source, target, disk in zip(sources.tolist(), targets.tolist(), arcDisks.tolist())]
+
+def inversiveVoronoiArrays(packing):
+    """Returns the arcs of the inversive Voronoi diagram of packing, one per
+    edge, as the arrays of computeVoronoiArcs."""
+    return computeVoronoiArcs(*voronoiQuads(packing))
+
 def inversiveVoronoi(packing):
-    return [computeVoronoiArcForEdge(e) for e in packing.edges]
\ No newline at end of file
+    """Returns the arcs of the inversive Voronoi diagram of packing, one per
+    edge, as CircleArcS2s (the same arcs as computeVoronoiArcForEdge)."""
+    return toCircleArcS2s(*inversiveVoronoiArrays(packing))
\ No newline at end of file
@@ -0,0 +1,38 @@
+import unittest
+
+import random
+
+import numpy as np
+
+from .incrementalConvexHull import randomConvexHullE3WithHighDegreeVertex
+from .hypPacker import maximalPacking
+from .inversiveVoronoi import computeVoronoiArcForEdge, inversiveVoronoi, inversiveVoronoiArrays
+from ..geometries.orientedProjective2 import DiskOP2
+
+class TestInversiveVoronoi(unittest.TestCase):
+
+    def setUp(self):
+        # A packing on the sphere, made as in the Bubble Generator notebook
+        random.seed(7)
+        mesh = randomConvexHullE3WithHighDegreeVertex(30, 8)
+        mesh.outerFace = mesh.verts[-1].remove()
+        packing, _ = maximalPacking(mesh, num_passes = 1000)
+        self.packing = packing.duplicate(
+            vdata_transform = lambda vData : DiskOP2.fromCircleE2(vData.toPoincareCircleE2()).toDiskS2())
+
+    def test_arraysMatchPerArc(self):
+        sources, targets, arcDisks = inversiveVoronoiArrays(self.packing)
+        expected = [computeVoronoiArcForEdge(e) for e in self.packing.edges]
+        self.assertEqual(len(sources), len(expected))
+        self.assertTrue(np.allclose(sources, [tuple(arc.source) for arc in expected], atol = 1e-12))
+        self.assertTrue(np.allclose(targets, [tuple(arc.target) for arc in expected], atol = 1e-12))
+        self.assertTrue(np.allclose(arcDisks, [tuple(arc.disk) for arc in expected], atol = 1e-12))
+
+    def test_inversiveVoronoi(self):
+        arcs = inversiveVoronoi(self.packing)
+        self.assertEqual(len(arcs), len(self.packing.edges))
+        arc, expected = arcs[0], computeVoronoiArcForEdge(self.packing.edges[0])
+        self.assertTrue(np.allclose(tuple(arc.source) + tuple(arc.target), tuple(expected.source) + tuple(expected.target)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#
+# Overlap detection for circle packings
+#
+# Finds all pairs of circles (or spherical caps) that overlap, i.e. whose
+# centers are closer than the sum of their radii minus a tolerance. Comparing
+# every pair costs O(n^2); here the candidates come from a broad phase of
+# uniform grids and only those are tested exactly, with NumPy, in a narrow
+# phase.
+#
+# The broad phase groups the circles into levels by radius (the radii within
+# a level are within a factor of two of each other) and puts the circles of
+# each level into a uniform grid whose cells are as wide as the largest
+# circle of the level. A circle is then only compared with the circles in
+# the 3 x 3 (3 x 3 x 3 on the sphere) block of cells around it in the grids
+# of its own and larger levels. For packings, where circles of a level do not
+# pile up, this takes near-linear time even when the radii vary over many
+# orders of magnitude.
+#
+# Use should be:
+#
+#   from koebe.algorithms.overlap import overlappingPairs
+#
+#   pairs = overlappingPairs(packing, excludeAdjacent = True)
+#
+# where the vertex data of packing is CircleE2 or DiskS2.
+#
+
+import numpy as np
+
+from ..geometries.euclidean2 import CircleE2
+from ..geometries.spherical2 import DiskS2
+
+# Cell coordinates are hashed to int64 keys (with wraparound), so a grid
+# costs memory only for its occupied cells. Two cells sharing a key merely
+# add candidates, which the narrow phase rejects.
+_HASH = np.array([73856093, 19349663, 83492791], dtype = np.int64)
+
+def _cellKeys(cells):
+    """Hashes (n, k) integer cell coordinates to (n,) keys."""
+    with np.errstate(over = "ignore"):
+        return np.sum(cells * _HASH[:cells.shape[1]], axis = 1)
+
+def _expandRanges(starts, counts):
+    """Concatenates the integer ranges [start, start + count)."""
+    total = counts.sum()
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total) - offsets + np.repeat(starts, counts)
+
+def candidatePairs(centers, reach):
+    """The broad phase: returns index pairs (i, j), i < j, as an (m, 2)
+    array, that include every pair whose centers are closer than
+    reach[i] + reach[j].
+
+    Args:
+        centers: An (n, k) array of points (k is 2 or 3).
+        reach: An (n,) array of non-negative radii.
+    """
+    centers = np.asarray(centers, dtype = np.float64)
+    reach = np.asarray(reach, dtype = np.float64)
+    n, k = centers.shape
+    if n < 2:
+        return np.empty((0, 2), dtype = np.int64)
+
+    # Level L holds the circles with reach in [2^L, 2^(L + 1)) times the
+    # smallest positive reach; zero reach circles go in the lowest level.
+    positive = reach[reach > 0]
+    base = positive.min() if len(positive) > 0 else 1.0
+    levels = np.floor(np.log2(np.maximum(reach, base) / base)).astype(np.int64)
+
+    offsets = np.stack(np.meshgrid(*[np.arange(-1, 2)] * k, indexing = "ij"), axis = -1).reshape(-1, k)
+    firsts, seconds = [], []
+    for level in np.unique(levels):
+        members = np.nonzero(levels == level)[0]
+        # Cells are twice the largest reach in the level, and no circle of
+        # this or a lower level has a larger reach, so a pair that can
+        # overlap lies in neighbouring cells.
+        size = 2.0 * max(reach[members].max(), base)
+        cells = np.floor(centers[members] / size).astype(np.int64)
+        keys = _cellKeys(cells)
+        order = np.argsort(keys, kind = "stable")
+        cellKeys, cellStarts, cellCounts = np.unique(keys[order], return_index = True, return_counts = True)
+
+        queries = np.nonzero(levels <= level)[0]
+        queryCells = np.floor(centers[queries] / size).astype(np.int64)
+        for offset in offsets:
+            queryKeys = _cellKeys(queryCells + offset)
+            slots = np.minimum(np.searchsorted(cellKeys, queryKeys), len(cellKeys) - 1)
+            found = cellKeys[slots] == queryKeys
+            starts = cellStarts[slots]
+            counts = np.where(found, cellCounts[slots], 0)
+            firsts.append(np.repeat(queries, counts))
+            seconds.append(members[order[_expandRanges(starts, counts)]])
+
+    i = np.concatenate(firsts)
+    j = np.concatenate(seconds)
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    keep = i < j
+    pairKeys = np.sort(i[keep] * n + j[keep])
+    first = np.ones(len(pairKeys), dtype = bool)
+    first[1:] = pairKeys[1:] != pairKeys[:-1]
+    pairKeys = pairKeys[first]
+    return np.column_stack((pairKeys // n, pairKeys % n))
+
+def circleOverlaps(centers, radii, tol = 1e-10):
+    """Returns the pairs (i, j), i < j, of circles in the plane with
+    radii[i] + radii[j] - tol > |centers[i] - centers[j]|, as an (m, 2)
+    array in lexicographic order. A negative tol also reports circles that
+    are within |tol| of being tangent.
+
+    Args:
+        centers: An (n, 2) array of circle centers.
+        radii: An (n,) array of radii.
+        tol: The tolerance.
+    """
+    centers = np.asarray(centers, dtype = np.float64).reshape(-1, 2)
+    radii = np.asarray(radii, dtype = np.float64)
+    pairs = candidatePairs(centers, radii + max(-tol, 0.0) / 2.0)
+    i, j = pairs.T
+    dist = np.linalg.norm(centers[i] - centers[j], axis = 1)
+    return pairs[radii[i] + radii[j] - tol > dist]
+
+def capOverlaps(directions, angularRadii, tol = 1e-10):
+    """Returns the pairs (i, j), i < j, of spherical caps whose centers are
+    less than angularRadii[i] + angularRadii[j] - tol apart on the sphere,
+    as an (m, 2) array in lexicographic order.
+
+    Args:
+        directions: An (n, 3) array of unit vectors, the cap centers.
+        angularRadii: An (n,) array of spherical radii in [0, pi].
+        tol: The tolerance, in radians.
+    """
+    directions = np.asarray(directions, dtype = np.float64).reshape(-1, 3)
+    angularRadii = np.asarray(angularRadii, dtype = np.float64)
+    # The chord spanned by an angle is at most the angle, and the chord of a
+    # sum of angles at most the sum of the chords, so balls of chordal radius
+    # find every candidate.
+    chords = 2.0 * np.sin(np.clip(angularRadii, 0.0, np.pi) / 2.0)
+    pairs = candidatePairs(directions, chords + max(-tol, 0.0) / 2.0)
+    i, j = pairs.T
+    angle = np.arccos(np.clip(np.sum(directions[i] * directions[j], axis = 1), -1.0, 1.0))
+    return pairs[angularRadii[i] + angularRadii[j] - tol > angle]
+
+def _diskS2Caps(disks):
+    """The center directions and spherical radii of DiskS2 caps
+    a x + b y + c z + d >= 0 (see DiskS2.withCenterAndRadiusS2)."""
+    abc = np.array([(disk.a, disk.b, disk.c) for disk in disks], dtype = np.float64).reshape(-1, 3)
+    d = np.array([disk.d for disk in disks], dtype = np.float64)
+    norm = np.linalg.norm(abc, axis = 1)
+    return abc / norm[:, None], np.arccos(np.clip(-d / norm, -1.0, 1.0))
+
+def overlappingPairs(dcel, tol = 1e-10, excludeAdjacent = False):
+    """Returns the list of pairs (i, j), i < j, of vertex indices of dcel
+    whose circles overlap by more than tol, in lexicographic order.
+
+    The vertex data must all be CircleE2 or all be DiskS2 (vertices with
+    None data are skipped). For DiskS2 data the overlap is measured on the
+    sphere, in radians.
+
+    Args:
+        dcel: The DCEL, e.g. a circle packing or an unfolding of one.
+        tol: Pairs must overlap by more than tol to be reported. A
+            negative value also reports pairs within |tol| of tangency.
+        excludeAdjacent: If True, pairs of vertices joined by an edge
+            (which are tangent in a packing) are not reported.
+    """
+    present = np.array([i for i, v in enumerate(dcel.verts) if v.data is not None], dtype = np.int64)
+    data = [dcel.verts[i].data for i in present]
+    if len(data) < 2:
+        return []
+    if all(isinstance(x, CircleE2) for x in data):
+        centers = np.array([(c.center.x, c.center.y) for c in data], dtype = np.float64)
+        radii = np.array([c.radius for c in data], dtype = np.float64)
+        pairs = circleOverlaps(centers, radii, tol)
+    elif all(isinstance(x, DiskS2) for x in data):
+        pairs = capOverlaps(*_diskS2Caps(data), tol)
+    else:
+        raise TypeError("overlappingPairs needs vertex data that is all CircleE2 or all DiskS2")
+    pairs = present[pairs]
+
+    if excludeAdjacent and len(pairs) > 0:
+        n = len(dcel.verts)
+        dcel.markIndices()
+        edges = np.array([(e.i, e.j) for e in dcel.edges], dtype = np.int64).reshape(-1, 2)
+        edgeKeys = np.minimum(edges[:, 0], edges[:, 1]) * n + np.maximum(edges[:, 0], edges[:, 1])
+        pairs = pairs[~np.isin(pairs[:, 0] * n + pairs[:, 1], edgeKeys)]
+
+    return [(int(i), int(j)) for i, j in pairs]
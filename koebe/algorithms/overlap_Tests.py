@@ -0,0 +1,76 @@
+import unittest
+
+import math
+
+import numpy as np
+
+from .delaunay import delaunay
+from .overlap import candidatePairs, capOverlaps, circleOverlaps, overlappingPairs
+from ..geometries.euclidean2 import PointE2, CircleE2
+
+def bruteCircleOverlaps(centers, radii, tol):
+    n = len(centers)
+    return [(i, j) for i in range(n) for j in range(i + 1, n)
+            if radii[i] + radii[j] - tol > np.linalg.norm(centers[i] - centers[j])]
+
+def bruteCapOverlaps(directions, radii, tol):
+    n = len(directions)
+    return [(i, j) for i in range(n) for j in range(i + 1, n)
+            if radii[i] + radii[j] - tol > math.acos(max(-1.0, min(1.0, float(np.dot(directions[i], directions[j])))))]
+
+def hexCenters(rows, cols):
+    """The centers of a hexagonal packing of circles of radius 1 / 2."""
+    return np.array([(c + 0.5 * (r % 2), r * math.sqrt(3) / 2) for r in range(rows) for c in range(cols)])
+
+class TestOverlap(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.centers = rng.uniform(0, 10, size = (400, 2))
+        # Radii over four orders of magnitude, so that the grid has many levels
+        self.radii = 10.0 ** rng.uniform(-3, 0, size = 400)
+
+    def test_randomCircles(self):
+        for tol in (1e-10, 0.05, -0.05):
+            pairs = circleOverlaps(self.centers, self.radii, tol)
+            self.assertEqual([tuple(p) for p in pairs.tolist()], bruteCircleOverlaps(self.centers, self.radii, tol))
+
+    def test_candidatesIncludeOverlaps(self):
+        candidates = {tuple(p) for p in candidatePairs(self.centers, self.radii).tolist()}
+        self.assertTrue(set(bruteCircleOverlaps(self.centers, self.radii, 0.0)) <= candidates)
+
+    def test_tangentCircles(self):
+        centers = hexCenters(12, 15)
+        radii = np.full(len(centers), 0.5)
+        self.assertEqual(circleOverlaps(centers, radii).tolist(), [])
+        tangent = circleOverlaps(centers, radii, -1e-9)
+        self.assertEqual([tuple(p) for p in tangent.tolist()], bruteCircleOverlaps(centers, radii, -1e-9))
+        # Interior circles touch six others
+        self.assertEqual(len(tangent), 3 * 12 * 15 - 2 * 15 - 2 * 12 + 1)
+
+    def test_randomCaps(self):
+        rng = np.random.default_rng(2)
+        directions = rng.normal(size = (300, 3))
+        directions /= np.linalg.norm(directions, axis = 1)[:, None]
+        radii = 10.0 ** rng.uniform(-3, -0.5, size = 300)
+        for tol in (1e-10, -0.02):
+            pairs = capOverlaps(directions, radii, tol)
+            self.assertEqual([tuple(p) for p in pairs.tolist()], bruteCapOverlaps(directions, radii, tol))
+
+    def test_overlappingPairs(self):
+        centers = hexCenters(6, 7)
+        dcel = delaunay([PointE2(x, y) for x, y in centers.tolist()])
+        for v in dcel.verts:
+            v.data = CircleE2(v.data, 0.5)
+        dcel.verts[0].data = CircleE2(dcel.verts[0].data.center, 0.7)
+        self.assertEqual(overlappingPairs(dcel), [(0, 1), (0, 7)])
+        # Every pair of tangent circles is a Delaunay edge
+        tangent = overlappingPairs(dcel, tol = -1e-9)
+        radii = np.array([v.data.radius for v in dcel.verts])
+        self.assertEqual(tangent, bruteCircleOverlaps(centers, radii, -1e-9))
+        dcel.markIndices()
+        self.assertTrue(set(tangent) <= {(min(e.i, e.j), max(e.i, e.j)) for e in dcel.edges})
+        self.assertEqual(overlappingPairs(dcel, tol = -1e-9, excludeAdjacent = True), [])
+
+if __name__ == '__main__':
+    unittest.main()
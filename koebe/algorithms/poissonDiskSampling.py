@@ -1,6 +1,55 @@
 from typing import List
 
+#
+# Poisson disk sampling of the unit square and of surfaces
+#
+# The slow* functions are simple dart throwing: a random candidate is kept if it
+# is farther than the radius from every sample so far, and the sampling stops after
+# stop_count candidates in a row were rejected. Each test compares against all the
+# samples, so they take O(n^2) time.
+#
+# The fast versions below get the same kind of samplings in near linear time:
+#
+# * uniformDartThrowing uses a background grid of cells of width radius / sqrt(2),
+#   as in [Bridson 07], so that every cell holds at most one sample and a candidate
+#   only needs to be compared with the samples of the 5 x 5 cells around it. Darts
+#   are thrown into all the empty cells of a phase at once (cells three apart can
+#   not conflict), and the cells that are still not covered by a disk are split
+#   into quarters and sampled again, as in [Ebeida et al. 11], until nothing is
+#   left uncovered, so the sampling is maximal and no stop_count is needed.
+#
+# * adaptiveDartThrowing throws candidates in batches and finds the conflicts
+#   with the multi-resolution grids of koebe.algorithms.overlap. Resolving the
+#   conflicts within a batch in order gives exactly the samples that throwing the
+#   same candidates one at a time would, including the stop_count rule.
+#
+# * ambientSurfaceSampling and ambientBoundarySampling are the same batched dart
+#   throwing on triangulated surfaces in space. The samples are kept in a hash
+#   grid keyed by cell, and the faces and points of the candidates are drawn with
+#   NumPy. Optionally the distances are estimated along the surface, with the
+#   normals as in [Bowers et al. 10].
+#
+# All of them take a seed (anything numpy.random.default_rng accepts) for
+# repeatable samplings.
+#
+# References:
+#
+#   * [Bridson 07] Bridson, R. "Fast Poisson disk sampling in arbitrary dimensions."
+#       SIGGRAPH sketches, 2007.
+#   * [Ebeida et al. 11] Ebeida, M. S., Patney, A., Mitchell, S. A., Davidson, A.,
+#       Knupp, P. M. and Owens, J. D. "Efficient maximal Poisson-disk sampling."
+#       ACM Transactions on Graphics 30 (4), 2011.
+#   * [Bowers et al. 10] Bowers, J., Wang, R., Wei, L.-Y. and Maletz, D. "Parallel
+#       Poisson disk sampling with spectrum analysis on surfaces." ACM Transactions
+#       on Graphics 29 (6), 2010.
+#
+
 from .sampling import *
+from .overlap import candidatePairs
+from .samplingArrays import CumulativeTable, barycentricWeights, segmentSamples, triangleAreas, triangleMesh
+from ..geometries.geometryArrays import PointE3Array
+
+import numpy as np
 
 import random
 import math
@@ -10,9 +59,9 @@ def _distSq(x1, y1, x2, y2):
     dy = y2 - y1
     return dx * dx + dy * dy
 
-def slowAdaptiveDartThrowing(radius_function, stop_count: int = 100, initial_samples = []):
+def slowAdaptiveDartThrowing(radius_function, stop_count: int = 100, initial_samples = None):
     
-    samples = initial_samples
+    samples = [] if initial_samples is None else initial_samples
     
     fail_count = 0
     while fail_count < stop_count: 
@@ -55,9 +104,9 @@ def slowAdaptiveDartThrowingWithBoundary(radius_function, stop_count: int = 100)
     
     return slowAdaptiveDartThrowing(radius_function, stop_count, samples)
 
-def slowUniformDartThrowing(radius: float, stop_count: int = 500, initial_samples = []):
+def slowUniformDartThrowing(radius: float, stop_count: int = 500, initial_samples = None):
     
-    samples = initial_samples
+    samples = [] if initial_samples is None else initial_samples
     radiusSq = radius * radius
     
     fail_count = 0
@@ -98,10 +147,254 @@ def slowUniformDartThrowingWithBoundary(radius: float, stop_count: int = 500):
     
     return slowUniformDartThrowing(radius, stop_count, samples)
 
+def _boundaryPoints(t):
+    """Maps t in [0, 4) to the boundary of the unit square, as the slow*WithBoundary
+    functions do."""
+    x = np.select([t <= 1.0, t <= 2.0, t <= 3.0], [t, 1.0, 3.0 - t], 0.0)
+    y = np.select([t <= 1.0, t <= 2.0, t <= 3.0], [0.0, t - 1.0, 1.0], 4.0 - t)
+    return x, y
+
+def _evalRadii(radius_function, xs, ys):
+    """Evaluates radius_function at many points, in one call if it accepts arrays."""
+    try:
+        radii = np.asarray(radius_function(xs, ys), dtype = float)
+        if radii.shape == xs.shape:
+            return radii
+    except Exception:
+        pass
+    return np.array([radius_function(x, y) for x, y in zip(xs.tolist(), ys.tolist())], dtype = float)
+
+def _greedyAccept(count, first, second):
+    """Accepts candidates 0, ..., count - 1 in order, rejecting each candidate that
+    conflicts with an earlier accepted one. The conflicts are the pairs
+    first[k] < second[k]. Returns the mask of accepted candidates."""
+    UNDECIDED, ACCEPTED, REJECTED = 0, 1, 2
+    state = np.zeros(count, dtype = np.int8)
+    while len(first) > 0:
+        # A candidate is accepted once all its earlier conflicts are rejected
+        blocked = np.zeros(count, dtype = bool)
+        blocked[second[state[first] == UNDECIDED]] = True
+        state[(state == UNDECIDED) & ~blocked] = ACCEPTED
+        state[second[state[first] == ACCEPTED]] = REJECTED
+        live = (state[first] != REJECTED) & (state[second] == UNDECIDED)
+        first, second = first[live], second[live]
+    state[state == UNDECIDED] = ACCEPTED
+    return state == ACCEPTED
+
+def _applyStopRule(accepted, fail_count, stop_count):
+    """Applies the stop_count rule to a batch of candidates thrown after fail_count
+    rejections in a row, accepted masking the ones that passed. Returns the indices
+    of the candidates kept, the number of rejections in a row after them and whether
+    the sampling stops."""
+    acceptedAt = np.concatenate(([-1], np.nonzero(accepted)[0], [len(accepted)]))
+    gaps = np.diff(acceptedAt) - 1
+    gaps[0] += fail_count
+    stop = np.nonzero(gaps >= stop_count)[0]
+    if len(stop) > 0:
+        return acceptedAt[1:stop[0] + 1], 0, True
+    return acceptedAt[1:-1], int(gaps[-1]), False
+
+def _batchCount(batch_size, n):
+    """The number of candidates to throw next, with n samples so far: batch_size, or
+    n if that is larger, but at most 4 n + 1024. The candidates of a batch are paired
+    with each other before any of them become samples, so the first batches of a
+    sampling with few samples are kept small. Throwing a batch in parts accepts the
+    same candidates."""
+    return min(max(batch_size, n), 4 * n + 1024, 1 << 20)
+
+def _batchDartThrowing(throw, stop_count, xs, ys, rs, rng, batch_size = 4096):
+    """Dart throwing with the stop_count rule of the slow* functions, in batches.
+    
+    throw(rng, n) returns n candidates (x, y, r) as arrays. A candidate is rejected
+    if it is at distance at most max(r, sr) of an earlier sample (x, sr)."""
+    xs, ys, rs = list(xs), list(ys), list(rs)
+    fail_count = 0
+    while True:
+        n = len(xs)
+        cx, cy, cr = throw(rng, _batchCount(batch_size, n))
+        m = len(cx)
+        allX = np.concatenate((np.asarray(xs, dtype = float), cx))
+        allY = np.concatenate((np.asarray(ys, dtype = float), cy))
+        allR = np.concatenate((np.asarray(rs, dtype = float), cr))
+        pairs = candidatePairs(np.column_stack((allX, allY)), allR)
+        i, j = pairs[:, 0], pairs[:, 1]
+        rad = np.maximum(allR[i], allR[j])
+        conflict = (allX[i] - allX[j]) ** 2 + (allY[i] - allY[j]) ** 2 <= rad * rad
+        i, j = i[conflict & (j >= n)], j[conflict & (j >= n)]
+        
+        # Candidates too close to a sample, then conflicts among the candidates
+        ok = np.ones(m, dtype = bool)
+        ok[j[i < n] - n] = False
+        among = (i >= n) & ok[np.maximum(i - n, 0)] & ok[j - n]
+        accepted = np.zeros(m, dtype = bool)
+        accepted[ok] = _greedyAccept(m, i[among] - n, j[among] - n)[ok]
+        
+        keep, fail_count, done = _applyStopRule(accepted, fail_count, stop_count)
+        xs += cx[keep].tolist(); ys += cy[keep].tolist(); rs += cr[keep].tolist()
+        if done:
+            return xs, ys, rs
+
+def adaptiveDartThrowing(radius_function, stop_count: int = 100, initial_samples = None, seed = None):
+    """Fast slowAdaptiveDartThrowing: adaptive Poisson disk sampling of the unit square.
+    
+    A candidate (x, y) with radius r = radius_function(x, y) is rejected if some sample
+    (sx, sy, sr) is within max(r, sr) of it, and the sampling stops after stop_count
+    rejections in a row. 
+    
+    Args:
+        radius_function: (x, y) -> float. The positive sampling radius. It is called
+            with arrays of coordinates if it supports them. 
+        stop_count: The number of rejections in a row after which to stop. 
+        initial_samples: OPTIONAL A list of samples (x, y, r) to start from. 
+        seed: OPTIONAL A seed for numpy.random.default_rng. 
+    
+    Returns:
+        The list of samples (x, y, r), starting with the initial samples. 
+    """
+    rng = np.random.default_rng(seed)
+    samples = [] if initial_samples is None else initial_samples
+    
+    def throw(rng, n):
+        cx, cy = rng.random(n), rng.random(n)
+        return cx, cy, _evalRadii(radius_function, cx, cy)
+    
+    xs, ys, rs = _batchDartThrowing(throw, stop_count, 
+                                    [s[0] for s in samples], [s[1] for s in samples], [s[2] for s in samples], 
+                                    rng)
+    return list(zip(xs, ys, rs))
+
+def adaptiveDartThrowingWithBoundary(radius_function, stop_count: int = 100, seed = None):
+    """Fast slowAdaptiveDartThrowingWithBoundary: samples the boundary of the unit
+    square first and then its interior (see adaptiveDartThrowing)."""
+    rng = np.random.default_rng(seed)
+    
+    def throw(rng, n):
+        cx, cy = _boundaryPoints(rng.random(n) * 4)
+        return cx, cy, _evalRadii(radius_function, cx, cy)
+    
+    boundary = list(zip(*_batchDartThrowing(throw, stop_count, [], [], [], rng)))
+    return adaptiveDartThrowing(radius_function, stop_count, boundary, rng)
+
+def uniformDartThrowing(radius: float, initial_samples = None, seed = None, rounds: int = 4, max_level: int = 24):
+    """Fast slowUniformDartThrowing: a maximal Poisson disk sampling of the unit
+    square, in which every two samples are farther than radius apart and every point
+    of the square is within radius of a sample. 
+    
+    Args:
+        radius: The sampling radius. 
+        initial_samples: OPTIONAL A list of samples (x, y) to start from, farther 
+            than radius apart. 
+        seed: OPTIONAL A seed for numpy.random.default_rng. 
+        rounds: OPTIONAL The number of darts thrown at each uncovered cell before the 
+            cells are split. 
+        max_level: OPTIONAL The number of times cells are split at most. 
+    
+    Returns:
+        The list of samples (x, y), starting with the initial samples. 
+    """
+    rng = np.random.default_rng(seed)
+    samples = [] if initial_samples is None else initial_samples
+    radiusSq = radius * radius
+    
+    size = radius / math.sqrt(2)
+    n = int(math.ceil(1.0 / size))
+    # Sample indices by cell, with a margin of two empty cells on every side
+    grid = np.full((n + 4, n + 4), -1, dtype = np.int64)
+    xs = np.empty(len(samples) + n * n)
+    ys = np.empty(len(samples) + n * n)
+    count = 0
+    for x, y in samples:
+        i, j = int(x // size) + 2, int(y // size) + 2
+        if grid[i, j] >= 0:
+            raise ValueError("The initial samples must be farther than radius apart")
+        grid[i, j] = count
+        xs[count], ys[count] = x, y
+        count += 1
+    
+    # The cells whose samples can be within radius of a point of a cell (the corner
+    # cells of the 5 x 5 block only touch it at a distance of exactly radius)
+    offsets = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if abs(dx) + abs(dy) < 4]
+    
+    def anyNeighbour(pi, pj, test):
+        """Masks the grid cells (pi, pj) with a sample k in a nearby cell for which
+        test(k, mask) holds, mask selecting the cells tested."""
+        result = np.zeros(len(pi), dtype = bool)
+        for dx, dy in offsets:
+            nbrs = grid[pi + 2 + dx, pj + 2 + dy]
+            near = np.nonzero((nbrs >= 0) & ~result)[0]
+            if len(near) > 0:
+                result[near[test(nbrs[near], near)]] = True
+        return result
+    
+    def uncovered(ci, cj, level):
+        """Masks the cells at level that meet the square and are not inside a disk."""
+        cellSize = size / (1 << level)
+        x0, y0 = ci * cellSize, cj * cellSize
+        def inside(k, near):
+            dx = np.maximum(np.abs(xs[k] - x0[near]), np.abs(xs[k] - x0[near] - cellSize))
+            dy = np.maximum(np.abs(ys[k] - y0[near]), np.abs(ys[k] - y0[near] - cellSize))
+            return dx * dx + dy * dy <= radiusSq
+        return (x0 < 1.0) & (y0 < 1.0) & ~anyNeighbour(ci >> level, cj >> level, inside)
+    
+    ci, cj = np.nonzero(grid[2:n + 2, 2:n + 2] < 0)
+    level = 0
+    while len(ci) > 0 and level <= max_level:
+        cellSize = size / (1 << level)
+        for _ in range(rounds):
+            if len(ci) == 0:
+                break
+            # One dart per grid cell, into a random one of its uncovered subcells
+            pi, pj = ci >> level, cj >> level
+            order = rng.permutation(len(ci))
+            _, firsts = np.unique((pi * n + pj)[order], return_index = True)
+            darts = order[firsts]
+            dx, dy = rng.random(len(darts)), rng.random(len(darts))
+            for phase in range(9):
+                sel = ((pi[darts] % 3) == phase // 3) & ((pj[darts] % 3) == phase % 3)
+                d = darts[sel]
+                if len(d) == 0:
+                    continue
+                x = (ci[d] + dx[sel]) * cellSize
+                y = (cj[d] + dy[sel]) * cellSize
+                def conflict(k, near):
+                    ddx, ddy = xs[k] - x[near], ys[k] - y[near]
+                    return ddx * ddx + ddy * ddy <= radiusSq
+                ok = (x < 1.0) & (y < 1.0) & ~anyNeighbour(pi[d], pj[d], conflict)
+                k = int(ok.sum())
+                xs[count:count + k], ys[count:count + k] = x[ok], y[ok]
+                grid[pi[d][ok] + 2, pj[d][ok] + 2] = np.arange(count, count + k)
+                count += k
+            # Cells whose grid cell got a sample are covered by it
+            keep = grid[pi + 2, pj + 2] < 0
+            ci, cj = ci[keep], cj[keep]
+        # Split the cells that are still uncovered into quarters
+        keep = uncovered(ci, cj, level)
+        ci, cj = ci[keep], cj[keep]
+        level += 1
+        ci = (2 * np.repeat(ci, 4) + np.tile([0, 1, 0, 1], len(ci)))
+        cj = (2 * np.repeat(cj, 4) + np.tile([0, 0, 1, 1], len(cj)))
+        keep = uncovered(ci, cj, level)
+        ci, cj = ci[keep], cj[keep]
+    
+    return list(zip(xs[:count].tolist(), ys[:count].tolist()))
+
+def uniformDartThrowingWithBoundary(radius: float, stop_count: int = 500, seed = None):
+    """Fast slowUniformDartThrowingWithBoundary: samples the boundary of the unit
+    square by dart throwing with the stop_count rule and then fills the interior 
+    with uniformDartThrowing."""
+    rng = np.random.default_rng(seed)
+    
+    def throw(rng, n):
+        cx, cy = _boundaryPoints(rng.random(n) * 4)
+        return cx, cy, np.full(n, float(radius))
+    
+    xs, ys, _ = _batchDartThrowing(throw, stop_count, [], [], [], rng)
+    return uniformDartThrowing(radius, list(zip(xs, ys)), rng)
+
 def slowAmbientSurfaceSampling(dcel, 
                                radius: float = None, 
                                stop_count: int = 500, 
-                               initial_samples = [],
+                               initial_samples = None,
                                reject_function = None, 
                                face_weight_function = faceAreaE3, 
                                face_sampling_function = uniformTriangleSampleE3):
@@ -147,7 +440,7 @@ def slowAmbientSurfaceSampling(dcel,
     if reject_function == None:
         reject_function = defaultReject
     
-    samples = initial_samples
+    samples = [] if initial_samples is None else initial_samples
     
     fail_count = 0
     while fail_count < stop_count:
@@ -199,4 +492,267 @@ def slowAmbientBoundarySampling(face,
         else:
             fail_count = 0
             samples.append(s)
-    return samples
\ No newline at end of file
+    return samples
+
+
+class _CellTable:
+    """An open addressing hash table from int64 keys to int64 values (-1 when
+    absent) with vectorized lookups and assignments."""
+    
+    _EMPTY = np.iinfo(np.int64).min
+    
+    def __init__(self, capacity: int = 1 << 12):
+        self.keys = np.full(capacity, self._EMPTY, dtype = np.int64)
+        self.values = np.full(capacity, -1, dtype = np.int64)
+        self.count = 0
+    
+    def _slots(self, keys):
+        """The slots holding keys, or the empty slots ending their probe sequences."""
+        mask = len(self.keys) - 1
+        with np.errstate(over = "ignore"):
+            hashed = keys * np.int64(-7046029254386353131) # Fibonacci hashing
+        slots = (hashed.view(np.uint64) >> np.uint64(64 - mask.bit_length())).astype(np.int64)
+        todo = np.arange(len(keys))
+        while len(todo) > 0:
+            found = self.keys[slots[todo]]
+            todo = todo[(found != keys[todo]) & (found != self._EMPTY)]
+            slots[todo] = (slots[todo] + 1) & mask
+        return slots
+    
+    def get(self, keys):
+        slots = self._slots(keys)
+        return np.where(self.keys[slots] == keys, self.values[slots], -1)
+    
+    def set(self, keys, values):
+        """Sets the values of keys, which must be distinct."""
+        capacity = len(self.keys)
+        while 2 * (self.count + len(keys)) > capacity:
+            capacity *= 2
+        if capacity > len(self.keys):
+            present = self.keys != self._EMPTY
+            oldKeys, oldValues = self.keys[present], self.values[present]
+            self.__init__(capacity)
+            self.set(oldKeys, oldValues)
+        
+        slots = self._slots(keys)
+        found = self.keys[slots] == keys
+        self.values[slots[found]] = values[found]
+        todo = np.nonzero(~found)[0]
+        while len(todo) > 0:
+            # Claim the empty slots; of several keys claiming one slot, one wins
+            s = slots[todo]
+            free = self.keys[s] == self._EMPTY
+            self.keys[s[free]] = keys[todo[free]]
+            won = self.keys[s] == keys[todo]
+            self.values[s[won]] = values[todo[won]]
+            self.count += int(won.sum())
+            todo = todo[~won]
+            slots[todo] = (slots[todo] + 1) & (len(self.keys) - 1)
+
+def _geodesicEstimate(p, q, pn, qn):
+    """Estimates the geodesic distances between the points p and q of a surface with
+    unit normals pn and qn (rows of (n, 3) arrays) from the turning of the normals
+    along the chords, as in [Bowers et al. 10]. It is exact on spheres, and rows with
+    a zero normal get the chord length."""
+    v = q - p
+    chord = np.sqrt(np.einsum("ij,ij->i", v, v))
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        c = np.clip(0.5 * np.einsum("ij,ij->i", qn - pn, v) / chord, -1.0, 1.0)
+        scale = np.where(np.abs(c) > 1e-8, np.arcsin(c) / c, 1.0)
+    known = np.any(pn != 0, axis = 1) & np.any(qn != 0, axis = 1)
+    return np.where(known & (chord > 0), chord * scale, chord)
+
+def _hashDartThrowing(throw, bounds, stop_count, radius, points, normals, rng, geodesic, batch_size):
+    """Dart throwing in space with the stop_count rule of the slow* functions, in
+    batches. 
+    
+    throw(rng, n) returns n candidate points and their unit normals as (n, 3) arrays,
+    the points within bounds, an (m, 3) array of points.
+    A candidate is rejected if it is closer than radius to an earlier sample, in
+    space or, if geodesic is True, along the surface (estimated with
+    _geodesicEstimate, which is never less than the distance in space). The samples
+    are kept in a hash grid of cells of width radius with a linked list of samples
+    per cell, so a candidate is only compared with the samples of the 3 x 3 x 3 
+    cells around it. 
+    
+    Returns the (n, 3) array of samples, starting with points.
+    """
+    points = np.asarray(points, dtype = float).reshape(-1, 3)
+    normals = np.asarray(normals, dtype = float).reshape(-1, 3)
+    n = len(points)
+    
+    # Cell keys are exact (not hashed) indices into a box around everything, with 
+    # one cell of margin on each side for the neighbouring cells
+    both = np.concatenate((points, np.asarray(bounds, dtype = float).reshape(-1, 3)))
+    lo = both.min(axis = 0) - radius
+    dims = np.floor((both.max(axis = 0) - lo) / radius).astype(np.int64) + 3
+    strides = np.array([1, dims[0], dims[0] * dims[1]], dtype = np.int64)
+    def cellKeys(p):
+        return np.floor((p - lo) / radius).astype(np.int64) @ strides
+    offsets = sorted(((dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)),
+                     key = lambda d: d[0] * d[0] + d[1] * d[1] + d[2] * d[2])
+    offsetKeys = [int(np.dot(d, strides)) for d in offsets]
+    
+    capacity = max(2 * n, batch_size)
+    xyz = np.empty((capacity, 3)); xyz[:n] = points
+    nrm = np.zeros((capacity, 3)); nrm[:n] = normals
+    nextInCell = np.empty(capacity, dtype = np.int64)
+    table = _CellTable()
+    
+    def closer(i, j, pi, pj, ni, nj):
+        """Masks the pairs of points that conflict."""
+        if geodesic:
+            return _geodesicEstimate(pi, pj, ni, nj) < radius
+        d = pj - pi
+        return np.einsum("ij,ij->i", d, d) < radius * radius
+    
+    def insert(new):
+        """Adds the samples with indices new to the cells, heading their lists."""
+        keys = cellKeys(xyz[new])
+        order = np.argsort(keys, kind = "stable")
+        new, keys = new[order], keys[order]
+        firsts = np.ones(len(keys), dtype = bool)
+        firsts[1:] = keys[1:] != keys[:-1]
+        lasts = np.roll(firsts, -1)
+        nextInCell[new[:-1]] = new[1:]
+        nextInCell[new[lasts]] = table.get(keys[lasts])
+        table.set(keys[firsts], new[firsts])
+    
+    if n > 0:
+        insert(np.arange(n))
+    
+    fail_count = 0
+    while True:
+        m = _batchCount(batch_size, n)
+        cp, cn = throw(rng, m)
+        
+        # Candidates too close to a sample. The cells are tested nearest first, and
+        # a candidate drops out at its first conflict.
+        ok = np.ones(m, dtype = bool)
+        keys = cellKeys(cp)
+        for offsetKey in offsetKeys:
+            live = np.nonzero(ok)[0]
+            sample = table.get(keys[live] + offsetKey)
+            while True:
+                has = sample >= 0
+                live, sample = live[has], sample[has]
+                if len(live) == 0:
+                    break
+                hit = closer(live, sample, cp[live], xyz[sample], cn[live], nrm[sample])
+                ok[live[hit]] = False
+                live, sample = live[~hit], nextInCell[sample[~hit]]
+        
+        # Conflicts among the candidates still in the running
+        live = np.nonzero(ok)[0]
+        pairs = live[candidatePairs(cp[live], np.full(len(live), 0.5 * radius))]
+        i, j = pairs[:, 0], pairs[:, 1]
+        hit = closer(i, j, cp[i], cp[j], cn[i], cn[j])
+        accepted = np.zeros(m, dtype = bool)
+        accepted[ok] = _greedyAccept(m, i[hit], j[hit])[ok]
+        
+        keep, fail_count, done = _applyStopRule(accepted, fail_count, stop_count)
+        if n + len(keep) > capacity:
+            capacity = max(2 * capacity, n + len(keep))
+            xyz = np.resize(xyz, (capacity, 3))
+            nrm = np.resize(nrm, (capacity, 3))
+            nextInCell = np.resize(nextInCell, capacity)
+        xyz[n:n + len(keep)] = cp[keep]
+        nrm[n:n + len(keep)] = cn[keep]
+        insert(np.arange(n, n + len(keep)))
+        n += len(keep)
+        if done:
+            return xyz[:n].copy()
+
+def ambientSurfaceSamplingArray(dcel, 
+                                radius: float, 
+                                stop_count: int = 500, 
+                                initial_samples = None, 
+                                geodesic: bool = False, 
+                                seed = None, 
+                                batch_size: int = 1 << 16):
+    """Fast slowAmbientSurfaceSampling with the default weight and sampling 
+    functions: Poisson disk sampling of a triangulated DCEL with PointE3 vertex data.
+    
+    Candidates are drawn in batches, the faces with probability proportional to 
+    their area and the points uniformly in the faces. A candidate is rejected if it
+    is closer than radius to a sample, and the sampling stops after stop_count 
+    rejections in a row. The candidates are tested against the samples in a spatial
+    hash grid and against each other in order, so the result is what testing them
+    one at a time would give. 
+    
+    Args:
+        dcel: A triangulated surface. 
+        radius: The sampling radius. 
+        stop_count: The number of rejections in a row after which to stop. 
+        initial_samples: OPTIONAL PointE3 samples to start from, e.g. a sampling of
+            the boundary (see ambientBoundarySampling). 
+        geodesic: OPTIONAL If True, the distance between two points is the 
+            estimated distance along the surface (from the smooth vertex normals, 
+            see _geodesicEstimate), so that samples on nearby sheets of the surface
+            do not reject each other. The initial samples use the distance in 
+            space. 
+        seed: OPTIONAL A seed for numpy.random.default_rng. 
+        batch_size: OPTIONAL The number of candidates drawn at once (see _batchCount). 
+    
+    Returns:
+        A PointE3Array of the samples, starting with the initial samples. 
+    """
+    rng = np.random.default_rng(seed)
+    vertices, triangles, _ = triangleMesh(dcel)
+    faceTable = CumulativeTable(triangleAreas(vertices, triangles))
+    
+    vertexNormals = np.zeros_like(vertices)
+    if geodesic:
+        p0, p1, p2 = vertices[triangles[:, 0]], vertices[triangles[:, 1]], vertices[triangles[:, 2]]
+        cross = np.cross(p1 - p0, p2 - p0)
+        for k in range(3):
+            np.add.at(vertexNormals, triangles[:, k], cross)
+        lengths = np.linalg.norm(vertexNormals, axis = 1)
+        vertexNormals /= np.where(lengths > 0, lengths, 1.0)[:, None]
+    
+    def throw(rng, n):
+        tri = triangles[faceTable.draw(n, rng)]
+        weights = barycentricWeights(n, rng)
+        points = np.einsum("ij,ijk->ik", weights, vertices[tri])
+        normals = np.einsum("ij,ijk->ik", weights, vertexNormals[tri])
+        if geodesic:
+            lengths = np.linalg.norm(normals, axis = 1)
+            normals /= np.where(lengths > 0, lengths, 1.0)[:, None]
+        return points, normals
+    
+    initial = [] if initial_samples is None else [tuple(p) for p in initial_samples]
+    points = _hashDartThrowing(throw, vertices, stop_count, radius, initial, np.zeros((len(initial), 3)), 
+                               rng, geodesic, batch_size)
+    return PointE3Array(points)
+
+def ambientSurfaceSampling(dcel, 
+                           radius: float, 
+                           stop_count: int = 500, 
+                           initial_samples = None, 
+                           geodesic: bool = False, 
+                           seed = None):
+    """The samples of ambientSurfaceSamplingArray as a list of PointE3."""
+    return ambientSurfaceSamplingArray(dcel, radius, stop_count, initial_samples, geodesic, seed).toList()
+
+def ambientBoundarySampling(face, 
+                            radius: float, 
+                            stop_count: int = 500, 
+                            seed = None, 
+                            batch_size: int = 4096):
+    """Fast slowAmbientBoundarySampling with the default weight and sampling 
+    functions: Poisson disk sampling of the boundary of a face with PointE3 vertex 
+    data, choosing the darts with probability proportional to their length.
+    
+    Returns:
+        A list of PointE3 samples. 
+    """
+    darts = face.darts()
+    origins = np.array([tuple(d.origin.data) for d in darts], dtype = float).reshape(-1, 3)
+    dests = np.array([tuple(d.dest.data) for d in darts], dtype = float).reshape(-1, 3)
+    dartTable = CumulativeTable(np.linalg.norm(dests - origins, axis = 1))
+    
+    def throw(rng, n):
+        return segmentSamples(origins, dests, n, rng, dartTable)[0], np.zeros((n, 3))
+    
+    points = _hashDartThrowing(throw, origins, stop_count, radius, [], [], np.random.default_rng(seed), False, batch_size)
+    return [PointE3(*p) for p in points.tolist()]
@@ -0,0 +1,227 @@
+import unittest
+
+import random
+
+import numpy as np
+from scipy.spatial import ConvexHull, cKDTree
+
+from ..geometries.euclidean3 import PointE3
+from .delaunay import _diskDcel, convexHullS2
+from .poissonDiskSampling import (_batchDartThrowing, _hashDartThrowing, adaptiveDartThrowing, 
+                                  ambientBoundarySampling, ambientSurfaceSamplingArray, 
+                                  slowAdaptiveDartThrowing, slowUniformDartThrowing, uniformDartThrowing, 
+                                  uniformDartThrowingWithBoundary)
+from .samplingArrays import triangleMesh, triangleSamples
+from .surfaceCVT import fibonacciSphere
+
+class Stream:
+    """A throw function handing out a fixed sequence of candidates."""
+    
+    def __init__(self, *columns):
+        self.columns = columns
+        self.used = 0
+    
+    def __call__(self, rng, n):
+        start, self.used = self.used, self.used + n
+        return tuple(column[start:self.used] for column in self.columns)
+
+def sequentialDartThrowing(candidates, stop_count, conflict):
+    """Throws the candidates one at a time, as the slow* functions do."""
+    samples = []
+    fail_count = 0
+    for c in candidates:
+        if fail_count >= stop_count:
+            break
+        if any(conflict(c, s) for s in samples):
+            fail_count += 1
+        else:
+            fail_count = 0
+            samples.append(c)
+    return samples
+
+class TestUnitSquare(unittest.TestCase):
+    
+    def assertSeparated(self, points, radii):
+        points = np.asarray(points, dtype = float)
+        radii = np.broadcast_to(np.asarray(radii, dtype = float), (len(points),))
+        for i, j in cKDTree(points).query_pairs(float(radii.max())):
+            self.assertGreater(np.linalg.norm(points[i] - points[j]), max(radii[i], radii[j]))
+    
+    def test_uniformMaximal(self):
+        radius = 0.03
+        samples = uniformDartThrowing(radius, seed = 1)
+        self.assertSeparated(samples, radius)
+        # No point of the square is farther than radius from a sample
+        xs, ys = np.meshgrid(np.linspace(0, 1, 301), np.linspace(0, 1, 301))
+        grid = np.column_stack((xs.ravel(), ys.ravel()))
+        distances, _ = cKDTree(samples).query(grid)
+        self.assertLessEqual(distances.max(), radius)
+    
+    def test_uniformWithBoundary(self):
+        radius = 0.05
+        samples = uniformDartThrowingWithBoundary(radius, seed = 2)
+        self.assertSeparated(samples, radius)
+        onBoundary = [s for s in samples if min(s[0], s[1], 1 - s[0], 1 - s[1]) == 0]
+        self.assertGreater(len(onBoundary), 4 / (2 * radius))
+    
+    def test_batchMatchesSequential(self):
+        rng = np.random.default_rng(3)
+        x, y = rng.random(200000), rng.random(200000)
+        r = 0.02 + 0.04 * x
+        xs, ys, rs = _batchDartThrowing(Stream(x, y, r), 50, [], [], [], None, batch_size = 64)
+        
+        def conflict(c, s):
+            rad = max(c[2], s[2])
+            return (c[0] - s[0]) ** 2 + (c[1] - s[1]) ** 2 <= rad * rad
+        expected = sequentialDartThrowing(zip(x.tolist(), y.tolist(), r.tolist()), 50, conflict)
+        self.assertEqual(list(zip(xs, ys, rs)), expected)
+    
+    def test_adaptive(self):
+        radius = lambda x, y: 0.02 + 0.03 * x
+        initial = [(0.5, 0.5, 0.1)]
+        samples = adaptiveDartThrowing(radius, 100, initial, seed = 4)
+        self.assertEqual(samples[0], initial[0])
+        self.assertSeparated([s[:2] for s in samples], [s[2] for s in samples])
+    
+    def test_initialSamplesDefault(self):
+        # The default used to be a shared list, which collected the samples of
+        # every call. Passing a list still extends it in place.
+        random.seed(5)
+        first = slowUniformDartThrowing(0.2, 50)
+        second = slowUniformDartThrowing(0.2, 50)
+        self.assertIsNot(first, second)
+        self.assertSeparated(second, 0.2)
+        initial = [(0.5, 0.5)]
+        self.assertIs(slowUniformDartThrowing(0.2, 50, initial), initial)
+        self.assertEqual(initial[0], (0.5, 0.5))
+        self.assertIsNot(slowAdaptiveDartThrowing(lambda x, y: 0.2, 50), slowAdaptiveDartThrowing(lambda x, y: 0.2, 50))
+        self.assertEqual(adaptiveDartThrowing(lambda x, y: 0.2, 50, seed = 6), 
+                         adaptiveDartThrowing(lambda x, y: 0.2, 50, [], seed = 6))
+
+class TestSurfaceSampling(unittest.TestCase):
+    
+    def setUp(self):
+        points = np.random.default_rng(7).normal(size = (40, 3))
+        self.hull = convexHullS2(points / np.linalg.norm(points, axis = 1)[:, None])
+    
+    def test_hashMatchesSequential(self):
+        rng = np.random.default_rng(8)
+        points = rng.random((100000, 3))
+        corners = np.array([[0.0, 0, 0], [1, 1, 1]])
+        stream = Stream(points, np.zeros_like(points))
+        samples = _hashDartThrowing(stream, corners, 40, 0.15, [], [], None, False, 64)
+        
+        def conflict(c, s):
+            return np.sum((c - s) ** 2) < 0.15 * 0.15
+        expected = sequentialDartThrowing(points, 40, conflict)
+        self.assertTrue(np.array_equal(samples, np.array(expected)))
+    
+    def test_separatedAndCovering(self):
+        radius = 0.1
+        samples = np.array(ambientSurfaceSamplingArray(self.hull, radius, seed = 9).data)
+        pairs = cKDTree(samples).query_pairs(radius)
+        self.assertEqual(len(pairs), 0)
+        # Almost no point of the surface is farther than radius from a sample, and
+        # no gap could hold a disk of radius radius
+        vertices, triangles, _ = triangleMesh(self.hull)
+        points, _ = triangleSamples(vertices, triangles, 20000, np.random.default_rng(10))
+        distances, _ = cKDTree(samples).query(points)
+        self.assertLess(np.mean(distances > radius), 0.02)
+        self.assertLess(distances.max(), 2 * radius)
+    
+    def test_largeRadius(self):
+        # A few samples; the first batch used to hold 2^16 candidates, nearly all
+        # conflicting with each other
+        samples = ambientSurfaceSamplingArray(self.hull, 1.0, seed = 13)
+        self.assertEqual(len(cKDTree(samples.data).query_pairs(1.0)), 0)
+    
+    def test_initialSamples(self):
+        first = ambientSurfaceSamplingArray(self.hull, 0.2, seed = 11)
+        again = ambientSurfaceSamplingArray(self.hull, 0.2, initial_samples = [], seed = 11)
+        self.assertTrue(np.array_equal(first.data, again.data))
+        initial = first.toList()[:5]
+        samples = ambientSurfaceSamplingArray(self.hull, 0.2, initial_samples = initial, seed = 12).toList()
+        self.assertEqual(samples[:5], initial)
+
+def shell(n, inner):
+    """The unit sphere and the sphere of radius inner, as hulls of n Fibonacci 
+    points facing away from the space between them, in one DCEL."""
+    points = fibonacciSphere(n)
+    triangles = ConvexHull(points).simplices
+    a, b, c = (points[triangles[:, k]] for k in range(3))
+    flip = np.einsum("ij,ij->i", np.cross(b - a, c - a), a) < 0
+    triangles[flip] = triangles[flip][:, [0, 2, 1]]
+    vertices = [PointE3(*p) for p in points.tolist()] + [PointE3(*p) for p in (inner * points).tolist()]
+    return _diskDcel(vertices, np.concatenate((triangles, n + triangles[:, [0, 2, 1]])), True)
+
+class TestGeodesicSampling(unittest.TestCase):
+    
+    def setUp(self):
+        # Two sheets 0.1 apart, closer than the sampling radius in space but 
+        # (along the surface) not connected at all
+        self.radius = 0.12
+        self.dcel = shell(2000, 0.9)
+    
+    def sheets(self, samples):
+        outer = np.linalg.norm(samples, axis = 1) > 0.95
+        return samples[outer], samples[~outer]
+    
+    def test_planeMatchesAmbient(self):
+        # On a flat mesh the estimate is the distance in space
+        vertices = [PointE3(x, y, 0.0) for x, y in ((0, 0), (1, 0), (1, 1), (0, 1))]
+        square = _diskDcel(vertices, [(0, 1, 2), (0, 2, 3)], False)
+        ambient = ambientSurfaceSamplingArray(square, 0.1, seed = 3)
+        geodesic = ambientSurfaceSamplingArray(square, 0.1, geodesic = True, seed = 3)
+        self.assertTrue(np.array_equal(ambient.data, geodesic.data))
+    
+    def test_sheetsSeparatedAndCovered(self):
+        samples = np.array(ambientSurfaceSamplingArray(self.dcel, self.radius, geodesic = True, seed = 4).data)
+        vertices, triangles, _ = triangleMesh(self.dcel)
+        points, _ = triangleSamples(vertices, triangles, 40000, np.random.default_rng(5))
+        for sheet, surface in zip(self.sheets(samples), self.sheets(points)):
+            # Along a sheet the estimate is about the distance in space
+            self.assertEqual(len(cKDTree(sheet).query_pairs(0.98 * self.radius)), 0)
+            distances, _ = cKDTree(sheet).query(surface)
+            self.assertLess(np.mean(distances > self.radius), 0.02)
+            self.assertLess(distances.max(), 2 * self.radius)
+        
+        # The sheets do not reject each other
+        outer, inner = self.sheets(samples)
+        self.assertGreater(sum(map(len, cKDTree(outer).query_ball_tree(cKDTree(inner), self.radius))), 0)
+    
+    def test_ambientSheetsRejectEachOther(self):
+        samples = np.array(ambientSurfaceSamplingArray(self.dcel, self.radius, seed = 4).data)
+        self.assertEqual(len(cKDTree(samples).query_pairs(self.radius)), 0)
+
+class TestBoundarySampling(unittest.TestCase):
+    
+    def test_squareBoundary(self):
+        radius = 0.05
+        vertices = [PointE3(x, y, 0.0) for x, y in ((0, 0), (1, 0), (1, 1), (0, 1))]
+        square = _diskDcel(vertices, [(0, 1, 2), (0, 2, 3)], False)
+        samples = np.array([tuple(p) for p in ambientBoundarySampling(square.outerFace, radius, seed = 6)])
+        
+        # On the boundary, separated and covering it
+        self.assertTrue(np.allclose(samples[:, 2], 0.0))
+        sides = np.column_stack((samples[:, :2], 1 - samples[:, :2]))
+        self.assertTrue(np.allclose(np.abs(sides).min(axis = 1), 0.0))
+        self.assertEqual(len(cKDTree(samples).query_pairs(radius)), 0)
+        t = np.random.default_rng(7).random(20000) * 4
+        side, s = np.floor(t).astype(int), t % 1
+        corners = np.array([[0.0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 0]])
+        points = corners[side] + s[:, None] * (corners[side + 1] - corners[side])
+        distances, _ = cKDTree(samples).query(points)
+        self.assertLess(np.mean(distances > radius), 0.02)
+        self.assertLess(distances.max(), 2 * radius)
+    
+    def test_initialBoundarySamples(self):
+        # A boundary sampling is a valid start for sampling the surface
+        vertices = [PointE3(x, y, 0.0) for x, y in ((0, 0), (1, 0), (1, 1), (0, 1))]
+        square = _diskDcel(vertices, [(0, 1, 2), (0, 2, 3)], False)
+        boundary = ambientBoundarySampling(square.outerFace, 0.1, seed = 8)
+        samples = ambientSurfaceSamplingArray(square, 0.1, initial_samples = boundary, seed = 9)
+        self.assertEqual(samples.toList()[:len(boundary)], boundary)
+        self.assertEqual(len(cKDTree(samples.data).query_pairs(0.1)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
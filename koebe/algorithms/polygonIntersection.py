@@ -0,0 +1,165 @@
+#
+# Segment and polygon intersection
+#
+# SegmentE2.intersects and PolygonE2.intersects compare every pair of
+# segments. The functions here work on NumPy arrays of segments instead: the
+# candidate pairs come from the grid broad phase of koebe.algorithms.overlap
+# (each segment is bounded by the circle about its midpoint through its
+# endpoints), and the candidates are checked with the exact orientation
+# predicates of koebe.geometries.predicates, all at once.
+#
+# As in SegmentE2.intersects, two segments intersect only if they cross
+# properly, i.e. each one has the endpoints of the other strictly on opposite
+# sides. Segments that merely touch, share an endpoint or overlap collinearly
+# do not count, so the faces of an unfolding that share edges or vertices
+# are not reported as overlapping.
+#
+# Use should be:
+#
+#   from koebe.algorithms.polygonIntersection import intersectingPolygonPairs
+#
+#   overlaps = intersectingPolygonPairs(unfoldedFacePolygons)
+#
+
+import numpy as np
+
+from ..geometries.predicates import orient2dArray
+from .overlap import candidatePairs
+
+def polygonSegments(polygon):
+    """Returns the boundary segments of a PolygonE2 as an (n, 4) array of
+    rows (sourceX, sourceY, targetX, targetY), in the order of
+    PolygonE2.segments."""
+    xy = np.array([(v.x, v.y) for v in polygon.vertices], dtype = np.float64).reshape(-1, 2)
+    return np.column_stack((np.roll(xy, 1, axis = 0), xy))
+
+def _crossing(a, b):
+    """Tests the segment rows a[k] and b[k] for proper crossings."""
+    ax, ay, bx, by = a.T
+    cx, cy, dx, dy = b.T
+    return ((orient2dArray(ax, ay, bx, by, cx, cy) * orient2dArray(ax, ay, bx, by, dx, dy) < 0)
+            & (orient2dArray(cx, cy, dx, dy, ax, ay) * orient2dArray(cx, cy, dx, dy, bx, by) < 0))
+
+def _boundingCircles(segments):
+    centers = 0.5 * (segments[:, 0:2] + segments[:, 2:4])
+    reach = 0.5 * np.hypot(segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1])
+    return centers, reach
+
+def segmentCrossings(segments):
+    """Returns all pairs (i, j), i < j, of properly crossing segments as an
+    (m, 2) array in lexicographic order.
+
+    Args:
+        segments: An (n, 4) array of segments (sourceX, sourceY, targetX, targetY).
+    """
+    segments = np.asarray(segments, dtype = np.float64).reshape(-1, 4)
+    pairs = candidatePairs(*_boundingCircles(segments))
+    if len(pairs) == 0:
+        return pairs
+    return pairs[_crossing(segments[pairs[:, 0]], segments[pairs[:, 1]])]
+
+def segmentsCross(segments, otherSegments):
+    """Tests whether any segment of one array properly crosses any segment of
+    another (see segmentCrossings)."""
+    segments = np.asarray(segments, dtype = np.float64).reshape(-1, 4)
+    otherSegments = np.asarray(otherSegments, dtype = np.float64).reshape(-1, 4)
+    n = len(segments)
+    both = np.concatenate((segments, otherSegments))
+    pairs = candidatePairs(*_boundingCircles(both))
+    pairs = pairs[(pairs[:, 0] < n) & (pairs[:, 1] >= n)]
+    return bool(np.any(_crossing(both[pairs[:, 0]], both[pairs[:, 1]])))
+
+def polygonSelfIntersections(polygon):
+    """Returns the pairs (i, j) of crossing boundary segments of a PolygonE2
+    (indices as in PolygonE2.segments). A simple polygon has none."""
+    return [(int(i), int(j)) for i, j in segmentCrossings(polygonSegments(polygon))]
+
+def intersectingPolygonPairs(polygons):
+    """Returns the pairs (i, j), i < j, of polygons in the list whose
+    boundaries cross, in lexicographic order. This is PolygonE2.intersects
+    for all pairs at once, e.g. to find the overlapping faces of an
+    unfolding.
+
+    Args:
+        polygons: A list of PolygonE2.
+    """
+    if len(polygons) < 2:
+        return []
+    segments = [polygonSegments(polygon) for polygon in polygons]
+    owners = np.repeat(np.arange(len(polygons)), [len(s) for s in segments])
+    crossings = segmentCrossings(np.concatenate(segments))
+    first, second = owners[crossings[:, 0]], owners[crossings[:, 1]]
+    keep = first != second
+    n = len(polygons)
+    keys = np.unique(np.minimum(first, second)[keep] * n + np.maximum(first, second)[keep])
+    return [(int(k // n), int(k % n)) for k in keys]
+
+def _slabEdges(ymin, ymax, y0, height, slabCount):
+    """Buckets edges by the horizontal slabs [y0 + k height, y0 + (k + 1) height)
+    their y ranges meet. Returns the edge indices sorted by slab and the
+    start of each slab's run."""
+    first = np.clip(np.floor((ymin - y0) / height).astype(np.int64), 0, slabCount - 1)
+    last = np.clip(np.floor((ymax - y0) / height).astype(np.int64), 0, slabCount - 1)
+    spans = last - first + 1
+    edges = np.repeat(np.arange(len(ymin)), spans)
+    slabs = np.repeat(first - np.cumsum(spans) + spans, spans) + np.arange(spans.sum())
+    order = np.argsort(slabs, kind = "stable")
+    starts = np.searchsorted(slabs[order], np.arange(slabCount + 1))
+    return edges[order], starts
+
+def windingNumbers(polygon, points, chunkSize = 1 << 22):
+    """Vectorized PolygonE2.windingNumber for many query points.
+
+    The edges are bucketed into horizontal slabs, so each point is only
+    tested against the edges whose y range meets its slab.
+
+    Args:
+        polygon: A PolygonE2.
+        points: An (n, 2) array of query points.
+        chunkSize: The number of (point, edge) pairs tested per NumPy
+            pass, which bounds the memory used.
+
+    Returns:
+        An (n,) integer array of winding numbers.
+    """
+    points = np.asarray(points, dtype = np.float64).reshape(-1, 2)
+    segments = polygonSegments(polygon)
+    wn = np.zeros(len(points), dtype = np.int64)
+    if len(segments) == 0 or len(points) == 0:
+        return wn
+    sx, sy, tx, ty = segments.T
+    ymin, ymax = np.minimum(sy, ty), np.maximum(sy, ty)
+    y0, y1 = ymin.min(), ymax.max()
+
+    # Only points with y0 <= y < y1 can be crossed
+    inside = np.nonzero((points[:, 1] >= y0) & (points[:, 1] < y1))[0]
+    if len(inside) == 0:
+        return wn
+    # Choose the slab height so that the edges are bucketed about four
+    # times each in total.
+    totalSpan = (ymax - ymin).sum()
+    slabCount = int(np.clip(3 * len(segments) * (y1 - y0) / max(totalSpan, 1e-300), 1, 4 * len(segments)))
+    height = (y1 - y0) / slabCount
+    slabEdges, slabStarts = _slabEdges(ymin, ymax, y0, height, slabCount)
+
+    pointSlabs = np.clip(np.floor((points[inside, 1] - y0) / height).astype(np.int64), 0, slabCount - 1)
+    counts = slabStarts[pointSlabs + 1] - slabStarts[pointSlabs]
+    ends = np.cumsum(counts)
+    begin = 0
+    while begin < len(inside):
+        # Take as many points as fit in a chunk (at least one)
+        end = max(begin + 1, int(np.searchsorted(ends, (ends[begin - 1] if begin > 0 else 0) + chunkSize, side = "right")))
+        chunkCounts = counts[begin:end]
+        qIdx = np.repeat(inside[begin:end], chunkCounts)
+        offsets = np.arange(chunkCounts.sum()) - np.repeat(np.cumsum(chunkCounts) - chunkCounts, chunkCounts)
+        sIdx = slabEdges[np.repeat(slabStarts[pointSlabs[begin:end]], chunkCounts) + offsets]
+        px, py = points[qIdx, 0], points[qIdx, 1]
+        up = (sy[sIdx] <= py) & (ty[sIdx] > py)
+        down = (ty[sIdx] <= py) & (sy[sIdx] > py)
+        crossing = np.nonzero(up | down)[0]
+        qIdx, sIdx, up = qIdx[crossing], sIdx[crossing], up[crossing]
+        turns = orient2dArray(sx[sIdx], sy[sIdx], tx[sIdx], ty[sIdx], px[crossing], py[crossing])
+        delta = (up & (turns > 0)).astype(np.int64) - (~up & (turns < 0)).astype(np.int64)
+        wn += np.bincount(qIdx, weights = delta, minlength = len(points)).astype(np.int64)
+        begin = end
+    return wn
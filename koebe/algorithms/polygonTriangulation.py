@@ -1,97 +1,126 @@
 """
 
-An implementation of O(n^2) ear clipping. 
+Polygon triangulation.
 
-WIP: An implementation of O(n log n) polygon triangulation using the monotone polygon subdivision algorithm. 
+An implementation of O(n^2) ear clipping, and of O(n log n) polygon
+triangulation using the monotone polygon subdivision algorithm: a plane
+sweep adds diagonals that split the polygon into y-monotone pieces, each
+of which is then triangulated in linear time.
 
-References; 
+Both work on an interior face of a DCEL whose vertex data are PointE2 and
+whose darts run counterclockwise, such as the interior face of
+PolygonE2.toDCEL(), and add the triangulating edges to that DCEL:
+
+    poly = PolygonE2(points).toDCEL()
+    triangulateByMonotonePartition(poly.faces[1])
+
+References;
     de Berg, M., Cheong, O., van Kreveld, M., and Overmars, M.
     Computational Geometry Algorithms and Applications, 3rd ed.
     Springer-Verlag Berlin Heidelberg, 2008.
+
+    Pugh, W. Skip lists: a probabilistic alternative to balanced trees.
+    Communications of the ACM 33(6), 1990.
 """
 
 from koebe.datastructures.dcel import *
-from koebe.geometries.euclidean2 import PointE2, SegmentE2, PolygonE2
-from koebe.geometries.commonOps import orientation2, Orientation
+from koebe.geometries.euclidean2 import PointE2
+from koebe.geometries.predicates import orient2d, orient2dArray
 
-from typing import List
+import numpy as np
+
+import gc
+import random
+from enum import Enum
+from functools import cmp_to_key
+from typing import List, Tuple
 
 
 def leftHandTurn(p1: PointE2, p2: PointE2, p3: PointE2) -> bool:
-    return (orientation2(p1.x, p1.y, p2.x, p2.y, p3.x, p3.y) 
-            == Orientation.POSITIVE)
+    # Exact, so collinear points are never a left hand turn
+    return orient2d(p1.x, p1.y, p2.x, p2.y, p3.x, p3.y) > 0
 
 def triangulateByEarClipping(dcelFace: Face):
-    
+
     dcel  = dcelFace.dcel
     darts = dcelFace.darts()
     n     = len(darts)
-    
+
     def definingPoints(dart: Dart) -> Tuple[PointE2]:
         return dart.prev.origin.data, dart.origin.data, dart.dest.data
-    
-    def triContains(dart: Dart, vert: Vertex) -> bool: 
+
+    def triContains(dart: Dart, vert: Vertex) -> bool:
+        # Closed, so that a reflex vertex on the diagonal blocks the ear
+        if vert in (dart.prev.origin, dart.origin, dart.dest):
+            return False
         p1, p2, p3 = definingPoints(dart)
         p          = vert.data
-        return (    leftHandTurn(p1, p2, p) 
-                and leftHandTurn(p2, p3, p)
-                and leftHandTurn(p3, p1, p))
-    
+        return (    not leftHandTurn(p2, p1, p)
+                and not leftHandTurn(p3, p2, p)
+                and not leftHandTurn(p1, p3, p))
+
     def isConvex(dart: Dart) -> bool:
         return leftHandTurn(*definingPoints(dart))
-    
+
     def isReflex(dart: Dart) -> bool:
         return not leftHandTurn(*definingPoints(dart))
-    
+
     #convex = set([dart for dart in darts if isConvex(dart)])
     reflex = set([dart for dart in darts if isReflex(dart)])
-    
+
     def isEar(dart: Dart) -> bool:
         if isReflex(dart):
             return False
         isAnEar = True
         for r in reflex:
-            if triContains(dart, r):
+            if triContains(dart, r.origin):
                 isAnEar = False
                 break
         return isAnEar
-    
+
     ears = set([dart for dart in darts if isEar(dart)])
-    
+
+    def reclassify(dart: Dart):
+        reflex.discard(dart)
+        ears.discard(dart)
+        if isReflex(dart):
+            reflex.add(dart)
+        elif isEar(dart):
+            ears.add(dart)
+
     for _ in range(n-3):
         anEar = ears.pop()
-        
-        newFace  = Face(dcel, aDart = anEar)
+
+        newFace  = Face(dcel, aDart = anEar, data = dcelFace.data)
         newEdge  = Edge(dcel)
-        newDart1 = Dart(dcel, 
-                        edge = newEdge, 
-                        origin = anEar.dest, 
+        newDart1 = Dart(dcel,
+                        edge = newEdge,
+                        origin = anEar.dest,
                         face = newFace)
-        newDart2 = Dart(dcel, 
+        newDart2 = Dart(dcel,
                         edge = newEdge,
-                        origin = anEar.prev.origin
+                        origin = anEar.prev.origin,
                         face = dcelFace)
         newDart1.makeTwin(newDart2)
         newDart2.makeNext(anEar.next)
         newDart2.makePrev(anEar.prev.prev)
         newDart1.makeNext(anEar.prev)
         newDart1.makePrev(anEar)
-        
-        if anEar.prev in reflex: reflex.remove(anEar.prev)
-        elif anEar.prev in ears: ears.remove(anEar.prev)
-        
-        if isReflex(newDart2): reflex.add(newDart2)
-        elif isEar(newDart2): ears.add(newDart2)
-        
-        if isConvex(newDart2.next):
-            if newDart2.next in reflex:
-                reflex.remove(newDart2.next)
-            if newDart2.next not in ears and isEar(newDart2.next):
-                ears.add(newDart2.next)
-        
-    
-from enum import Enum
-from heapq import *
+        anEar.face = newFace
+        anEar.prev.face = newFace
+        dcelFace.aDart = newDart2
+
+        # The dart of the previous vertex was replaced by newDart2. Both
+        # neighbors of the ear are classified again, in either direction.
+        reflex.discard(anEar.prev)
+        ears.discard(anEar.prev)
+        reclassify(newDart2)
+        reclassify(newDart2.next)
+
+#### MONOTONE SUBDIVISION
+
+# The sweep runs from top to bottom. Points are ordered lexicographically
+# by (-y, x), so that no two distinct points are at the same height.
 
 def below(p: PointE2, q: PointE2) -> bool:
     return p.y < q.y or (p.y == q.y and p.x > q.x)
@@ -105,55 +134,449 @@ class VertexType(Enum):
     REGULAR = 2
     SPLIT = 3
     MERGE = 4
-    
+
 def vType(d: Dart) -> VertexType:
-    if below(d.pred.data, d.origin.data) and below(d.dest.data, d.origin.data): 
-        if leftHandTurn(d.pred.data, d.origin.data, d.dest.data):
-            return VertexType.START
-        else:
-            return VertexType.SPLIT
-    elif above(d.pred.data, d.origin.data) and above(d.dest.data, d.origin.data):
-        if leftHandTurn(d.pred.data, d.origin.data, d.dest.data):
-            return VertexType.END
-        else:
-            return VertexType.SPLIT
+    """The type of the vertex d.origin of a counterclockwise face."""
+    prev, curr, next = d.pred.data, d.origin.data, d.dest.data
+    if below(prev, curr) and below(next, curr):
+        return VertexType.START if leftHandTurn(prev, curr, next) else VertexType.SPLIT
+    elif above(prev, curr) and above(next, curr):
+        return VertexType.END if leftHandTurn(prev, curr, next) else VertexType.MERGE
     else:
         return VertexType.REGULAR
-    
-def handleStartVertex(d, T, helper):
-    helper[d] = d
-
-def handleEndVertex(d, T, helper):
-    if vType(helper[d]) == VertexType.MERGE:
-        # Then insert a diagonal between d.origin and helper[d].origin
-        pass
-    # delete d from T
-
-
-def makeMonotone(poly: DCEL):
-    
-    Q = [] # The vertex priority queue
-    helper = {}
-    
-    for d in poly.faces[1].darts():
-        # Heap is ordered on max y-coordinate (min x-coordinate to break ties.)
-        heappush(Q, (-d.origin.data.y, d.origin.data.x, d)) 
-    
-    T = BST()
-    
-    while Q: # While Q is not empty.
-        _, _, d = heappop(Q)
-        vt = vType(d)
-        if vt == VertexType.START:
-            handleStartVertex(d, T, helper)
-        elif vt == VertexType.END:
-            handleEndVertex(d, T, helper)
-        elif vt == VertexType.REGULAR:
-            handleRegularVertex(d, T, helper)
-        elif vt == VertexType.SPLIT:
-            handleSplitVertex(d, T, helper)
+
+_VERTEX_TYPES = list(VertexType)
+
+def _vertexTypes(x, y, order):
+    """The VertexType of every vertex of the counterclockwise polygon with
+    coordinate arrays x, y, where order[i] is the rank of vertex i in the
+    sweep."""
+    n = len(x)
+    prev, next = np.roll(np.arange(n), 1), np.roll(np.arange(n), -1)
+    prevBelow, nextBelow = order[prev] > order, order[next] > order
+    convex = orient2dArray(x[prev], y[prev], x, y, x[next], y[next]) > 0
+    codes = np.full(n, VertexType.REGULAR.value)
+    codes[prevBelow & nextBelow] = VertexType.SPLIT.value
+    codes[prevBelow & nextBelow & convex] = VertexType.START.value
+    codes[~prevBelow & ~nextBelow] = VertexType.MERGE.value
+    codes[~prevBelow & ~nextBelow & convex] = VertexType.END.value
+    return [_VERTEX_TYPES[c] for c in codes.tolist()]
+
+def _sweepOrder(x, y):
+    """The vertex indices sorted from top to bottom, and the rank of each."""
+    sweep = np.lexsort((x, -y))
+    order = np.empty(len(x), dtype = np.int64)
+    order[sweep] = np.arange(len(x))
+    return sweep, order
+
+class _SweepStatus:
+    """The sweep status of makeMonotone: polygon edges ordered by where they
+    meet the sweep line at height y, in a skip list [Pugh 90].
+
+    A node is a list [edge, nexts, prevs, lowX, lowY, slope] with its
+    successors and predecessors on each of its levels and the edge's line
+    (see __init__). Every edge keeps its node (see nodes), so it is removed
+    or replaced without a search, which rounding of the sweep line
+    intersections could misdirect. Searches and inserts take O(log n)
+    expected time.
+    """
+
+    MAX_LEVEL = 16
+
+    def __init__(self, lowX, lowY, slope):
+        # Edge e meets the sweep line at lowX[e] + (y - lowY[e]) * slope[e]
+        self.lowX, self.lowY, self.slope = lowX, lowY, slope
+        self.y = 0.0
+        self.head = [None, [None] * self.MAX_LEVEL, None, 0.0, 0.0, 0.0]
+        self.level = 1
+        self.nodes = {}
+        self.random = random.Random(0)
+
+    def _last(self, x, preds = None):
+        """The last node whose edge meets the sweep line at or left of x (or
+        the head), recording the last such node of each level in preds."""
+        y = self.y
+        node = self.head
+        for level in range(self.level - 1, -1, -1):
+            nxt = node[1][level]
+            while nxt is not None:
+                if x < nxt[3] + (y - nxt[4]) * nxt[5]:
+                    break
+                node, nxt = nxt, nxt[1][level]
+            if preds is not None:
+                preds[level] = node
+        return node
+
+    def insert(self, e, x):
+        """Inserts edge e, meeting the sweep line at x, after the edges that
+        meet it at or left of x."""
+        # A node reaches each next level with probability 1 / 4
+        bits = self.random.getrandbits(2 * self.MAX_LEVEL - 1) | (1 << (2 * self.MAX_LEVEL - 1))
+        height = ((bits & -bits).bit_length() + 1) // 2
+        preds = [self.head] * max(height, self.level)
+        self._last(x, preds)
+        self.level = max(self.level, height)
+        node = [e, [None] * height, preds[:height], self.lowX[e], self.lowY[e], self.slope[e]]
+        for level, pred in enumerate(node[2]):
+            nxt = pred[1][level]
+            node[1][level] = nxt
+            pred[1][level] = node
+            if nxt is not None:
+                nxt[2][level] = node
+        self.nodes[e] = node
+
+    def remove(self, e):
+        node = self.nodes.pop(e)
+        for level, (pred, nxt) in enumerate(zip(node[2], node[1])):
+            pred[1][level] = nxt
+            if nxt is not None:
+                nxt[2][level] = pred
+
+    def replace(self, e, f):
+        """Puts edge f in the place of edge e."""
+        node = self.nodes.pop(e)
+        node[0], node[3], node[4], node[5] = f, self.lowX[f], self.lowY[f], self.slope[f]
+        self.nodes[f] = node
+
+    def leftOf(self, x):
+        """The last edge that meets the sweep line at or left of x."""
+        node = self._last(x)
+        if node is self.head:
+            # Inside a simple polygon there is always an edge to the left
+            raise ValueError("The polygon is not simple")
+        return node[0]
+
+def makeMonotone(xs: List[float], ys: List[float]) -> List[Tuple[int, int]]:
+    """Computes diagonals that split a simple polygon into y-monotone pieces.
+
+    The sweep status holds the polygon edges that have the interior of the
+    polygon directly to their right, in left to right order along the sweep
+    line (see _SweepStatus). As edges never cross, the order stays valid
+    as the sweep moves down.
+
+    Args:
+        xs, ys: The vertex coordinates of the polygon in counterclockwise order.
+
+    Returns:
+        The diagonals as pairs of vertex indices. Edge i of the polygon runs
+        from vertex i to vertex i + 1.
+    """
+    n = len(xs)
+    x, y = np.asarray(xs, dtype = np.float64), np.asarray(ys, dtype = np.float64)
+    sweep, order = _sweepOrder(x, y)
+    types = _vertexTypes(x, y, order)
+    isMerge = [t is VertexType.MERGE for t in types]
+
+    # Status edges are stored by index. The slope is anchored at the lower
+    # endpoint, so an edge meets the sweep line exactly at that endpoint.
+    # The sweep passes a horizontal edge from left to right (the order of
+    # points at one height), so it is keyed by its left end, which is at or
+    # left of any vertex that touches it.
+    idx = np.arange(n)
+    next = np.roll(idx, -1)
+    lo = np.where(order > order[next], idx, next)
+    hi = np.where(order > order[next], next, idx)
+    dy = y[hi] - y[lo]
+    slope = np.where(dy != 0, (x[hi] - x[lo]) / np.where(dy != 0, dy, 1.0), 0.0).tolist()
+    sweep, order = sweep.tolist(), order.tolist()
+
+    status = _SweepStatus(np.where(dy != 0, x[lo], x[hi]).tolist(), y[lo].tolist(), slope)
+    insert, remove, leftOf = status.insert, status.remove, status.leftOf
+    helper = [0] * n
+    diagonals = []
+
+    def connectToHelperIfMerge(i, e):
+        if isMerge[helper[e]]:
+            diagonals.append((i, helper[e]))
+
+    for i in sweep:
+        x = xs[i]
+        status.y = ys[i]
+        prevEdge = i - 1 if i > 0 else n - 1
+        vt = types[i]
+        if vt is VertexType.START:
+            insert(i, x)
+            helper[i] = i
+        elif vt is VertexType.END:
+            connectToHelperIfMerge(i, prevEdge)
+            remove(prevEdge)
+        elif vt is VertexType.SPLIT:
+            e = leftOf(x)
+            diagonals.append((i, helper[e]))
+            helper[e] = i
+            insert(i, x)
+            helper[i] = i
+        elif vt is VertexType.MERGE:
+            connectToHelperIfMerge(i, prevEdge)
+            remove(prevEdge)
+            e = leftOf(x)
+            connectToHelperIfMerge(i, e)
+            helper[e] = i
+        elif order[prevEdge] < order[i]: # REGULAR, interior to the right
+            connectToHelperIfMerge(i, prevEdge)
+            # Edge i continues edge i - 1 below the sweep line, so it takes
+            # its place in the status.
+            status.replace(prevEdge, i)
+            helper[i] = i
+        else: # REGULAR, interior to the left
+            e = leftOf(x)
+            connectToHelperIfMerge(i, e)
+            helper[e] = i
+
+    return diagonals
+
+def _angularComparator(xs, ys, v):
+    """Compares the neighbors a and b of vertex v by the angle of the
+    directions v -> a and v -> b from the positive x axis, in [0, 2 pi).
+    The directions are split into the upper and lower half planes and then
+    compared with orient2d, so the order is exact. Neighbors in the same
+    direction, which only a polygon that is not simple has, compare equal."""
+    def lower(w):
+        dx, dy = xs[w] - xs[v], ys[w] - ys[v]
+        return dy < 0 or (dy == 0 and dx < 0)
+
+    def compare(a, b):
+        if lower(a) != lower(b):
+            return 1 if lower(a) else -1
+        turn = orient2d(xs[v], ys[v], xs[a], ys[a], xs[b], ys[b])
+        return -1 if turn > 0 else (1 if turn < 0 else 0)
+    return compare
+
+def _monotonePieces(xs, ys, diagonals):
+    """Splits the polygon along the diagonals, returning the vertex indices
+    of each piece in counterclockwise order."""
+    n = len(xs)
+    if len(diagonals) == 0:
+        return [list(range(n))]
+
+    # Around vertices with diagonals, the neighbors in counterclockwise order
+    around = {}
+    for a, b in diagonals:
+        around.setdefault(a, []).append(b)
+        around.setdefault(b, []).append(a)
+    for v, nbrs in around.items():
+        nbrs.extend(((v + 1) % n, v - 1 if v > 0 else n - 1))
+        nbrs.sort(key = cmp_to_key(_angularComparator(xs, ys, v)))
+
+    def nextVertex(u, v):
+        # Coming from u, the face continues along the edge clockwise after v -> u
+        nbrs = around.get(v)
+        if nbrs is None:
+            return (v + 1) % n
+        return nbrs[nbrs.index(u) - 1]
+
+    # Every piece has a diagonal on its boundary, so tracing the face to the
+    # left of each diagonal finds them all. Polygon edge u -> u + 1 is
+    # marked in edgeDone[u] and diagonals in diagonalsDone.
+    edgeDone = [False] * n
+    diagonalsDone = set()
+
+    def done(u, v):
+        return edgeDone[u] if v == (u + 1) % n else (u, v) in diagonalsDone
+
+    starts = diagonals + [(b, a) for a, b in diagonals]
+    pieces = []
+    for u, v in starts:
+        if done(u, v):
+            continue
+        piece = []
+        while not done(u, v):
+            if v == (u + 1) % n:
+                edgeDone[u] = True
+            else:
+                diagonalsDone.add((u, v))
+            piece.append(u)
+            u, v = v, nextVertex(u, v)
+        pieces.append(piece)
+    return pieces
+
+def triangulateMonotonePolygon(xs, ys, piece: List[int]) -> List[Tuple[int, int, int]]:
+    """Triangulates a y-monotone polygon in linear time.
+
+    Args:
+        xs, ys: The vertex coordinates.
+        piece: The indices of the polygon's vertices in counterclockwise order.
+
+    Returns:
+        The triangles as triples of vertex indices.
+    """
+    m = len(piece)
+    if m == 3:
+        return [tuple(piece)]
+
+    key = lambda i: (-ys[i], xs[i])
+    topAt = min(range(m), key = lambda k: key(piece[k]))
+    botAt = max(range(m), key = lambda k: key(piece[k]))
+
+    # Counterclockwise from the top vertex runs down the left chain
+    onLeft = {}
+    k = topAt
+    while k != botAt:
+        onLeft[piece[k]] = True
+        k = (k + 1) % m
+    while k != topAt:
+        onLeft[piece[k]] = False
+        k = (k + 1) % m
+
+    # Both chains are already sorted, so this sort is a linear time merge
+    u = sorted(piece, key = key)
+
+    def reflexOrFlat(uj, last, s):
+        if onLeft[uj]:
+            return orient2d(xs[s], ys[s], xs[last], ys[last], xs[uj], ys[uj]) <= 0
+        return orient2d(xs[uj], ys[uj], xs[last], ys[last], xs[s], ys[s]) <= 0
+
+    triangles = []
+    stack = [u[0], u[1]]
+    for j in range(2, m - 1):
+        uj = u[j]
+        if onLeft[uj] != onLeft[stack[-1]]:
+            while len(stack) > 1:
+                s = stack.pop()
+                triangles.append((uj, s, stack[-1]))
+            stack = [u[j - 1], uj]
         else:
-            handleMergeVertex(d, T, helper)
+            last = stack.pop()
+            while stack and not reflexOrFlat(uj, last, stack[-1]):
+                triangles.append((uj, last, stack[-1]))
+                last = stack.pop()
+            stack.append(last)
+            stack.append(uj)
+    uj = u[m - 1]
+    while len(stack) > 1:
+        s = stack.pop()
+        triangles.append((uj, s, stack[-1]))
+    return triangles
+
+def _flipFlatTriangles(xs, ys, triangles):
+    """Removes zero area triangles, which the monotone triangulation can
+    produce along runs of collinear vertices, by flipping their long side.
+    The triangles are made counterclockwise."""
+    def orient(t):
+        a, b, c = t
+        return orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c])
+
+    tri = np.array(triangles, dtype = np.int64).reshape(-1, 3)
+    x, y = np.asarray(xs, dtype = np.float64), np.asarray(ys, dtype = np.float64)
+    signs = orient2dArray(x[tri[:, 0]], y[tri[:, 0]], x[tri[:, 1]], y[tri[:, 1]], x[tri[:, 2]], y[tri[:, 2]])
+    cw = signs < 0
+    tri[cw] = tri[cw][:, [0, 2, 1]]
+    triangles = [tuple(t) for t in tri.tolist()]
+    flat = np.nonzero(signs == 0)[0].tolist()
+    if not flat:
+        return triangles
+
+    # The triangle to the left of each directed edge
+    owner = {}
+    for k, (a, b, c) in enumerate(triangles):
+        owner[(a, b)], owner[(b, c)], owner[(c, a)] = k, k, k
 
+    def between(a, b, c): # b strictly inside segment ac, given collinear
+        return min(xs[a], xs[c]) <= xs[b] <= max(xs[a], xs[c]) and \
+               min(ys[a], ys[c]) <= ys[b] <= max(ys[a], ys[c]) and \
+               (xs[b], ys[b]) != (xs[a], ys[a]) and (xs[b], ys[b]) != (xs[c], ys[c])
+
+    progress = True
+    while flat and progress:
+        progress = False
+        remaining = []
+        for k in flat:
+            t = triangles[k]
+            if orient(t) != 0:
+                continue
+            # Rotate so that t = (a, b, c) with b on the long side ac
+            for r in range(3):
+                a, b, c = t[r], t[(r + 1) % 3], t[(r + 2) % 3]
+                if between(a, b, c):
+                    break
+            other = owner.get((a, c))
+            if other is None:
+                remaining.append(k)
+                continue
+            d = [v for v in triangles[other] if v != a and v != c][0]
+            t1, t2 = (a, b, d), (b, c, d)
+            if orient(t1) <= 0 or orient(t2) <= 0:
+                remaining.append(k)
+                continue
+            for s in (triangles[k], triangles[other]):
+                for e in ((s[0], s[1]), (s[1], s[2]), (s[2], s[0])):
+                    del owner[e]
+            triangles[k], triangles[other] = t1, t2
+            for idx, s in ((k, t1), (other, t2)):
+                for e in ((s[0], s[1]), (s[1], s[2]), (s[2], s[0])):
+                    owner[e] = idx
+            progress = True
+        flat = remaining
+    return triangles
+
+def monotoneTriangulation(xs: List[float], ys: List[float]) -> List[Tuple[int, int, int]]:
+    """Triangulates a simple polygon in O(n log n) time.
+
+    Args:
+        xs, ys: The vertex coordinates of the polygon in counterclockwise order.
+
+    Returns:
+        n - 2 counterclockwise triangles as triples of vertex indices.
+
+    Raises:
+        ValueError: If the polygon is not simple and the diagonals do not
+            split it into pieces.
+    """
+    n = len(xs)
+    if n < 3:
+        return []
+    pieces = _monotonePieces(xs, ys, makeMonotone(xs, ys))
+    # When a vertex touches another edge, a diagonal can run along that
+    # edge, and the pieces no longer partition the polygon
+    if any(len(piece) < 3 for piece in pieces) or sum(len(piece) - 2 for piece in pieces) != n - 2:
+        raise ValueError("The polygon is not simple")
+    triangles = []
+    for piece in pieces:
+        triangles.extend(triangulateMonotonePolygon(xs, ys, piece))
+    return _flipFlatTriangles(xs, ys, triangles)
+
+def triangulateByMonotonePartition(dcelFace: Face):
+    """Triangulates a counterclockwise face of a DCEL with PointE2 vertex
+    data in O(n log n) time, adding the diagonals to the DCEL. The first
+    triangle reuses dcelFace; the others are new faces with its data.
+    Raises a ValueError, leaving the DCEL unchanged, if the face is not a
+    simple polygon (see monotoneTriangulation).
+    """
+    dcel  = dcelFace.dcel
+    darts = dcelFace.darts()
+    n     = len(darts)
+    if n <= 3:
+        return
+    xs = [d.origin.data.x for d in darts]
+    ys = [d.origin.data.y for d in darts]
 
-        
\ No newline at end of file
+    # The sweep and the new darts, edges and faces allocate many small
+    # objects, and the cyclic garbage collector would repeatedly rescan the
+    # (large) DCEL while they are created.
+    gcWasEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        pending = {} # Diagonal darts waiting for their twins
+        for k, (a, b, c) in enumerate(monotoneTriangulation(xs, ys)):
+            face = dcelFace if k == 0 else dcel.Face(dcel, data = dcelFace.data)
+            triDarts = []
+            for x, y in ((a, b), (b, c), (c, a)):
+                if y == x + 1 or y == 0 and x == n - 1:
+                    d = darts[x]
+                    d.face = face
+                else:
+                    twin = pending.pop((y, x), None)
+                    d = dcel.Dart(dcel, origin = darts[x].origin, face = face, twin = twin)
+                    if twin is None:
+                        d.edge = dcel.Edge(dcel, aDart = d)
+                        pending[(x, y)] = d
+                    else:
+                        d.edge = twin.edge
+                triDarts.append(d)
+            d0, d1, d2 = triDarts
+            d0.next, d1.next, d2.next = d1, d2, d0
+            d0.prev, d1.prev, d2.prev = d2, d0, d1
+            face.aDart = d0
+    finally:
+        if gcWasEnabled:
+            gc.enable()
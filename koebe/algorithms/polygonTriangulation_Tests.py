@@ -0,0 +1,134 @@
+import unittest
+
+import math
+import random
+from ..geometries.euclidean2 import PointE2, PolygonE2
+from .polygonTriangulation import (_SweepStatus, monotoneTriangulation, triangulateByMonotonePartition, 
+                                   triangulateByEarClipping)
+
+class TestMonotoneTriangulation(unittest.TestCase):
+
+    def triangulate(self, points):
+        dcel = PolygonE2([PointE2(x, y) for x, y in points]).toDCEL()
+        triangulateByMonotonePartition(dcel.faces[1])
+        return [[d.origin.data for d in f.darts()] for f in dcel.faces if f is not dcel.outerFace]
+
+    def area(self, points):
+        return 0.5 * sum(points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1] for i in range(len(points)))
+
+    def assertTriangulates(self, points):
+        triangles = self.triangulate(points)
+        self.assertEqual(len(triangles), len(points) - 2)
+        self.assertTrue(all(len(t) == 3 for t in triangles))
+        areas = [self.area([(p.x, p.y) for p in t]) for t in triangles]
+        self.assertTrue(all(a >= 0 for a in areas))
+        self.assertAlmostEqual(sum(areas), self.area(points))
+
+    def test_convex(self):
+        self.assertTriangulates([(math.cos(2 * math.pi * k / 12), math.sin(2 * math.pi * k / 12)) for k in range(12)])
+
+    def test_nonConvex(self):
+        # A comb with teeth pointing up and down, so the sweep meets split
+        # and merge vertices
+        comb = [(0, 0), (1, -2), (2, 0), (3, -2), (4, 0), (4, 3), (3, 1), (2, 3), (1, 1), (0, 3)]
+        self.assertTriangulates(comb)
+        star = [((1 + k % 2) * math.cos(math.pi * k / 7), (1 + k % 2) * math.sin(math.pi * k / 7)) for k in range(14)]
+        self.assertTriangulates(star)
+
+    def test_collinear(self):
+        # Several vertices along each side of a square
+        square = ([(k, 0) for k in range(4)] + [(4, k) for k in range(4)]
+                  + [(4 - k, 4) for k in range(4)] + [(0, 4 - k) for k in range(4)])
+        self.assertTriangulates(square)
+
+    def test_duplicateX(self):
+        # Columns of vertices sharing x coordinates, some also sharing y
+        self.assertTriangulates([(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (2, 2), (2, 3), (0, 3), (0, 2), (0, 1)])
+        self.assertTriangulates([(0, 0), (1, 1), (2, 0), (2, 2), (1, 3), (0, 2)])
+
+    def test_vertexTouchingEdge(self):
+        # A notch whose tip touches the bottom edge, and a tooth whose tip
+        # touches the right edge. One of the triangles is flat.
+        self.assertTriangulates([(0, 0), (4, 0), (4, 3), (2, 0), (0, 3)])
+        self.assertTriangulates([(0, 0), (4, 0), (4, 4), (0, 4), (0, 3), (4, 2), (0, 1)])
+
+class TestEarClipping(TestMonotoneTriangulation):
+
+    def triangulate(self, points):
+        dcel = PolygonE2([PointE2(x, y) for x, y in points]).toDCEL()
+        triangulateByEarClipping(dcel.faces[1])
+        return [[d.origin.data for d in f.darts()] for f in dcel.faces if f is not dcel.outerFace]
+
+    def test_vertexOnDiagonal(self):
+        # Clipping the corner at (2, 0) or (0, 2) would run a diagonal
+        # through the reflex vertex (1, 1). The ears are taken from a set,
+        # so try several orders.
+        for _ in range(20):
+            self.assertTriangulates([(0, 0), (2, 0), (2, 2), (1, 1), (0, 2)])
+
+    def test_stars(self):
+        for n in range(5, 40, 3):
+            radii = [1 + (k * 7919 % 13) / 13 for k in range(n)]
+            self.assertTriangulates([(r * math.cos(2 * math.pi * k / n), r * math.sin(2 * math.pi * k / n))
+                                     for k, r in enumerate(radii)])
+
+class TestSweepStatus(unittest.TestCase):
+
+    def test_matchesSortedList(self):
+        # Vertical edges at random x, inserted, replaced and removed at random
+        rng = random.Random(3)
+        lowX = [rng.random() for _ in range(2000)]
+        status = _SweepStatus(lowX, [0.0] * 2000, [0.0] * 2000)
+        expected = []
+        for e in range(1000):
+            status.insert(e, lowX[e])
+            expected.append(e)
+            if e % 3 == 0:
+                gone = expected.pop(rng.randrange(len(expected)))
+                status.remove(gone)
+            if e % 5 == 0 and expected:
+                k = rng.randrange(len(expected))
+                lowX[1000 + e] = lowX[expected[k]]
+                status.replace(expected[k], 1000 + e)
+                expected[k] = 1000 + e
+        expected.sort(key = lambda e: lowX[e])
+        for _ in range(200):
+            x = rng.random()
+            left = [e for e in expected if lowX[e] <= x]
+            if left:
+                self.assertEqual(status.leftOf(x), left[-1])
+            else:
+                self.assertRaises(ValueError, status.leftOf, x)
+
+    def test_longComb(self):
+        # Teeth of random heights, so that hundreds of edges are in the
+        # status at once, in random order
+        rng = random.Random(4)
+        points = [(0.0, 0.0), (4.0 * 300, 0.0)]
+        for j in reversed(range(300)):
+            h = 2 + rng.random()
+            points += [(4 * j + 3, 1 + 0.1 * rng.random()), (4 * j + 2, h), (4 * j + 1, h + 0.01), 
+                       (4 * j, 1 + 0.1 * rng.random())]
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        triangles = monotoneTriangulation(xs, ys)
+        self.assertEqual(len(triangles), len(points) - 2)
+        area = lambda t: 0.5 * sum(xs[t[i - 1]] * ys[t[i]] - xs[t[i]] * ys[t[i - 1]] for i in range(len(t)))
+        self.assertTrue(all(area(t) > 0 for t in triangles))
+        self.assertAlmostEqual(sum(area(t) for t in triangles), area(range(len(points))))
+
+class TestNotSimple(unittest.TestCase):
+
+    def test_rejected(self):
+        # The vertex (3, 4) touches the edge from (3, 5) to (3, 3), and the
+        # sweep adds the diagonal from (3, 4) to (3, 5) along that edge
+        points = [(3, 4), (5, 2), (3, 5), (3, 3), (4, 1)]
+        with self.assertRaises(ValueError):
+            monotoneTriangulation([x for x, _ in points], [y for _, y in points])
+        dcel = PolygonE2([PointE2(x, y) for x, y in points]).toDCEL()
+        with self.assertRaises(ValueError):
+            triangulateByMonotonePartition(dcel.faces[1])
+        self.assertEqual(len(dcel.faces), 2)
+        self.assertEqual(len(dcel.faces[1].darts()), 5)
+
+if __name__ == '__main__':
+    unittest.main()
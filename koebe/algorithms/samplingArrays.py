@@ -0,0 +1,259 @@
+#
+# Vectorized random sampling
+#
+# The functions of koebe.algorithms.sampling draw one sample at a time, with
+# random.random() and a binary search in Python per sample. The versions here
+# build a table once per distribution and then draw any number of indices
+# with a few NumPy calls, and they return arrays: indices as int64 arrays and
+# points as (n, 3) float arrays (with the index of the triangle or segment each
+# point was drawn from).
+#
+# A distribution over indices is given by non-negative weights. AliasTable
+# (Walker's alias method, built as in [Vose 91]) draws an index with two
+# random numbers and no search; CumulativeTable searches the cumulative sums
+# and is cheaper to build, so it suits distributions that are only drawn from
+# a few times.
+#
+# Every function takes an rng, a numpy.random.Generator (or anything
+# numpy.random.default_rng accepts, such as a seed), so samplings can be
+# repeated.
+#
+# Use should be:
+#
+#   from koebe.algorithms.samplingArrays import surfaceSamples
+#
+#   points, faceIdx = surfaceSamples(dcel, 100000, rng = np.random.default_rng(1))
+#
+# References:
+#
+#   * [Vose 91] Vose, M. D. "A linear algorithm for generating random numbers with
+#       a given distribution." IEEE Transactions on Software Engineering 17 (9), 1991.
+#
+
+import numpy as np
+
+from ..geometries.euclidean3 import PointE3
+from ..geometries.geometryArrays import PointE3Array
+
+def _weightsArray(weights):
+    weights = np.asarray(weights, dtype = float).ravel()
+    if len(weights) == 0 or np.any(weights < 0) or not np.isfinite(weights.sum()) or weights.sum() <= 0:
+        raise ValueError("The weights must be non-negative and finite with a positive sum")
+    return weights
+
+class CumulativeTable:
+    """Draws index i with probability weights[i] / sum(weights) by searching the
+    cumulative sums of the weights."""
+
+    def __init__(self, weights):
+        self.cumulative = np.cumsum(_weightsArray(weights))
+
+    def __len__(self):
+        return len(self.cumulative)
+
+    def draw(self, n: int, rng = None):
+        """Returns an (n,) array of indices."""
+        rng = np.random.default_rng(rng)
+        idx = np.searchsorted(self.cumulative, rng.random(n) * self.cumulative[-1], side = "right")
+        return np.minimum(idx, len(self.cumulative) - 1)
+
+class AliasTable:
+    """Draws index i with probability weights[i] / sum(weights) by Walker's alias
+    method: column k of the table is index k with probability prob[k] and
+    alias[k] otherwise, so a draw picks a column and a side of it.
+
+    Attributes:
+        prob: The (n,) array of probabilities of the columns' own indices.
+        alias: The (n,) array of the other index of each column.
+    """
+
+    def __init__(self, weights):
+        weights = _weightsArray(weights)
+        n = len(weights)
+        q = weights * (n / weights.sum())
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+
+        small, large = np.nonzero(q < 1.0)[0], np.nonzero(q >= 1.0)[0]
+        # Pair the small and large columns in bulk while that pairs many, as in
+        # [Vose 91]: the small column is filled up from the large one, which may
+        # become small in turn.
+        while min(len(small), len(large)) >= 1024:
+            k = min(len(small), len(large))
+            s, l = small[:k], large[:k]
+            self.prob[s] = q[s]
+            self.alias[s] = l
+            q[l] -= 1.0 - q[s]
+            stillLarge = q[l] >= 1.0
+            small = np.concatenate((small[k:], l[~stillLarge]))
+            large = np.concatenate((l[stillLarge], large[k:]))
+        # and the rest one at a time
+        small, large = small.tolist(), large.tolist()
+        prob, alias, q = self.prob, self.alias, q.tolist()
+        while small and large:
+            s, l = small.pop(), large[-1]
+            prob[s] = q[s]
+            alias[s] = l
+            q[l] -= 1.0 - q[s]
+            if q[l] < 1.0:
+                small.append(large.pop())
+        # Whatever is left over is full up to rounding
+
+    def __len__(self):
+        return len(self.prob)
+
+    def draw(self, n: int, rng = None):
+        """Returns an (n,) array of indices."""
+        rng = np.random.default_rng(rng)
+        columns = rng.integers(0, len(self.prob), n)
+        return np.where(rng.random(n) < self.prob[columns], columns, self.alias[columns])
+
+def weightedIndexSamples(rho, n: int, rng = None):
+    """Vectorized weightedIndexSampling1D: returns an (n,) array of indices into rho,
+    index i drawn with probability rho[i] / sum(rho)."""
+    return AliasTable(rho).draw(n, rng)
+
+def _flatten2D(rho):
+    """The entries of a (possibly ragged) 2D list as a flat array, and the flat
+    index of the start of each row."""
+    try:
+        rho = np.asarray(rho, dtype = float)
+    except ValueError:
+        pass
+    if isinstance(rho, np.ndarray) and rho.ndim == 2:
+        return rho.ravel(), np.arange(rho.shape[0] + 1) * rho.shape[1]
+    rows = [np.asarray(row, dtype = float).ravel() for row in rho]
+    starts = np.concatenate(([0], np.cumsum([len(row) for row in rows])))
+    return np.concatenate(rows), starts
+
+def weightedIndexSamples2D(rho, n: int, rng = None):
+    """Vectorized weightedIndexSampling2D: returns an (n, 2) array of index pairs
+    (i, j) into the 2D list (or array) rho, drawn with probability proportional to
+    rho[i][j]. The rows of rho may have different lengths."""
+    flat, starts = _flatten2D(rho)
+    idx = AliasTable(flat).draw(n, rng)
+    i = np.searchsorted(starts, idx, side = "right") - 1
+    return np.column_stack((i, idx - starts[i]))
+
+def weightedSubgridSamples2D(rho, n: int, rng = None):
+    """Vectorized weightedSubgridSampling2D: draws grid cells (i, j) as
+    weightedIndexSamples2D does and a uniform point (i + s, j + t) in each. Returns
+    an (n, 2) array of points."""
+    rng = np.random.default_rng(rng)
+    cells = weightedIndexSamples2D(rho, n, rng)
+    return cells + rng.random((n, 2))
+
+def barycentricWeights(n: int, rng = None):
+    """Returns an (n, 3) array of barycentric coordinates of points uniform in a
+    triangle, as uniformTriangleSampleE3 draws them."""
+    rng = np.random.default_rng(rng)
+    sqrtR1, r2 = np.sqrt(rng.random(n)), rng.random(n)
+    return np.column_stack((1 - sqrtR1, sqrtR1 * (1 - r2), sqrtR1 * r2))
+
+def triangleAreas(vertices, triangles):
+    """The areas of the triangles, an (m, 3) array of indices into the (n, 3)
+    array of vertices."""
+    p0, p1, p2 = vertices[triangles[:, 0]], vertices[triangles[:, 1]], vertices[triangles[:, 2]]
+    return 0.5 * np.linalg.norm(np.cross(p1 - p0, p2 - p0), axis = 1)
+
+def triangleSamples(vertices, triangles, n: int, rng = None, table = None):
+    """Draws n points uniformly from a triangle mesh: the triangles with probability
+    proportional to their area and the points uniformly in them.
+
+    Args:
+        vertices: An (k, 3) array of vertex coordinates.
+        triangles: An (m, 3) array of vertex indices.
+        n: The number of samples.
+        rng: OPTIONAL A numpy.random.Generator.
+        table: OPTIONAL An AliasTable or CumulativeTable for choosing the triangles,
+            built once and passed to repeated calls (default: by area).
+
+    Returns:
+        The (n, 3) array of points and the (n,) array of their triangle indices.
+    """
+    rng = np.random.default_rng(rng)
+    vertices = np.asarray(vertices, dtype = float)
+    triangles = np.asarray(triangles, dtype = np.int64).reshape(-1, 3)
+    if table is None:
+        table = AliasTable(triangleAreas(vertices, triangles))
+    idx = table.draw(n, rng)
+    weights = barycentricWeights(n, rng)
+    corners = vertices[triangles[idx]]
+    return np.einsum("ij,ijk->ik", weights, corners), idx
+
+def segmentSamples(sources, targets, n: int, rng = None, table = None):
+    """Draws n points uniformly from a set of segments: the segments with
+    probability proportional to their length and the points uniformly on them.
+
+    Args:
+        sources: An (m, d) array of segment starts.
+        targets: An (m, d) array of segment ends.
+        n: The number of samples.
+        rng: OPTIONAL A numpy.random.Generator.
+        table: OPTIONAL An AliasTable or CumulativeTable for choosing the segments
+            (default: by length).
+
+    Returns:
+        The (n, d) array of points and the (n,) array of their segment indices.
+    """
+    rng = np.random.default_rng(rng)
+    sources = np.asarray(sources, dtype = float)
+    targets = np.asarray(targets, dtype = float)
+    if table is None:
+        table = AliasTable(np.linalg.norm(targets - sources, axis = 1))
+    idx = table.draw(n, rng)
+    t = rng.random(n)[:, None]
+    return t * sources[idx] + (1 - t) * targets[idx], idx
+
+def triangleMesh(dcel):
+    """The inner faces of a triangulated DCEL with PointE3 vertex data as arrays.
+
+    Returns:
+        The (n, 3) array of vertex coordinates, the (m, 3) array of the vertex
+        indices of the faces and the list of the m faces.
+    """
+    dcel.markIndices()
+    vertices = PointE3Array.fromVertices(dcel).data
+    faces = [f for f in dcel.faces if f is not dcel.outerFace]
+    triangles = np.array([[v.idx for v in f.vertices()] for f in faces], dtype = np.int64).reshape(-1, 3)
+    return vertices, triangles, faces
+
+def surfaceSamples(dcel, n: int, rng = None, asObjects: bool = False):
+    """Vectorized surfaceSampling with the default weight and sampling functions.
+
+    Args:
+        dcel: A triangulated surface with PointE3 vertex data.
+        n: The number of samples.
+        rng: OPTIONAL A numpy.random.Generator.
+        asObjects: OPTIONAL If True, return a list of (PointE3, Face) pairs.
+
+    Returns:
+        The (n, 3) array of points and the (n,) array of the indices of their faces
+        in the list of inner faces (see triangleMesh), or the list of pairs.
+    """
+    vertices, triangles, faces = triangleMesh(dcel)
+    points, idx = triangleSamples(vertices, triangles, n, rng)
+    if asObjects:
+        return [(PointE3(*p), faces[i]) for p, i in zip(points.tolist(), idx.tolist())]
+    return points, idx
+
+def boundarySamples(face, n: int, rng = None, asObjects: bool = False):
+    """Vectorized boundarySampling with the default weight and sampling functions.
+
+    Args:
+        face: A face with PointE3 vertex data.
+        n: The number of samples.
+        rng: OPTIONAL A numpy.random.Generator.
+        asObjects: OPTIONAL If True, return a list of (PointE3, Dart) pairs.
+
+    Returns:
+        The (n, 3) array of points and the (n,) array of the indices of their darts
+        in face.darts(), or the list of pairs.
+    """
+    darts = face.darts()
+    sources = np.array([tuple(d.origin.data) for d in darts], dtype = float).reshape(-1, 3)
+    targets = np.array([tuple(d.dest.data) for d in darts], dtype = float).reshape(-1, 3)
+    points, idx = segmentSamples(sources, targets, n, rng)
+    if asObjects:
+        return [(PointE3(*p), darts[i]) for p, i in zip(points.tolist(), idx.tolist())]
+    return points, idx
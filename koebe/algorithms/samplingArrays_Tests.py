@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from scipy.stats import chisquare
+
+from .samplingArrays import (AliasTable, CumulativeTable, segmentSamples, triangleAreas, triangleSamples,
+                             weightedIndexSamples2D)
+
+class TestTables(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.small = np.array([3.0, 0.0, 1.0, 0.5, 2.5, 0.0, 7.0])
+        # Large enough for the bulk pairing of AliasTable
+        self.large = rng.random(5000) ** 3
+
+    def assertDraws(self, table, weights, n = 400000):
+        counts = np.bincount(table.draw(n, np.random.default_rng(2)), minlength = len(weights))
+        self.assertTrue(np.all(counts[weights == 0] == 0))
+        expected = n * weights / weights.sum()
+        used = weights > 0
+        self.assertGreater(chisquare(counts[used], expected[used]).pvalue, 0.001)
+
+    def test_aliasColumns(self):
+        # Summing the two sides of every column gives the weights back
+        for weights in (self.small, self.large):
+            table = AliasTable(weights)
+            n = len(weights)
+            mass = np.bincount(table.alias, weights = 1.0 - table.prob, minlength = n) + table.prob
+            self.assertTrue(np.allclose(mass / n, weights / weights.sum(), atol = 1e-12))
+
+    def test_aliasDraws(self):
+        for weights in (self.small, self.large):
+            self.assertDraws(AliasTable(weights), weights)
+
+    def test_cumulativeDraws(self):
+        for weights in (self.small, self.large):
+            self.assertDraws(CumulativeTable(weights), weights)
+
+    def test_badWeights(self):
+        for weights in ([], [0.0, 0.0], [1.0, -1.0], [1.0, np.inf]):
+            with self.assertRaises(ValueError):
+                AliasTable(weights)
+            with self.assertRaises(ValueError):
+                CumulativeTable(weights)
+
+    def test_ragged2D(self):
+        rho = [[1.0, 2.0], [0.0], [3.0, 0.0, 4.0]]
+        pairs = weightedIndexSamples2D(rho, 100000, 3)
+        self.assertTrue(all(rho[i][j] > 0 for i, j in set(map(tuple, pairs.tolist()))))
+        self.assertAlmostEqual(np.mean(pairs[:, 0] == 2), 0.7, delta = 0.01)
+
+class TestGeometricSamples(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.vertices = rng.normal(size = (30, 3))
+        self.triangles = np.array([rng.choice(30, 3, replace = False) for _ in range(20)])
+
+    def test_triangleSamplesInside(self):
+        points, idx = triangleSamples(self.vertices, self.triangles, 20000, 5)
+        a, b, c = (self.vertices[self.triangles[idx, k]] for k in range(3))
+        # Solve for the barycentric coordinates by least squares in the plane
+        e1, e2, d = b - a, c - a, points - a
+        d11, d12, d22 = np.einsum("ij,ij->i", e1, e1), np.einsum("ij,ij->i", e1, e2), np.einsum("ij,ij->i", e2, e2)
+        d1, d2 = np.einsum("ij,ij->i", d, e1), np.einsum("ij,ij->i", d, e2)
+        det = d11 * d22 - d12 * d12
+        v, w = (d22 * d1 - d12 * d2) / det, (d11 * d2 - d12 * d1) / det
+        self.assertTrue(np.all((v >= -1e-9) & (w >= -1e-9) & (v + w <= 1 + 1e-9)))
+        self.assertTrue(np.allclose(a + v[:, None] * e1 + w[:, None] * e2, points))
+
+    def test_triangleSamplesByArea(self):
+        n = 200000
+        _, idx = triangleSamples(self.vertices, self.triangles, n, 6)
+        areas = triangleAreas(self.vertices, self.triangles)
+        self.assertGreater(chisquare(np.bincount(idx, minlength = len(areas)), n * areas / areas.sum()).pvalue, 0.001)
+
+    def test_segmentSamples(self):
+        sources, targets = self.vertices[:10], self.vertices[10:20]
+        points, idx = segmentSamples(sources, targets, 5000, 7)
+        along = points - sources[idx]
+        direction = targets[idx] - sources[idx]
+        t = np.einsum("ij,ij->i", along, direction) / np.einsum("ij,ij->i", direction, direction)
+        self.assertTrue(np.all((t >= 0) & (t <= 1)))
+        self.assertTrue(np.allclose(sources[idx] + t[:, None] * direction, points))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,375 @@
+"""Centroidal Voronoi tessellations on the sphere and on triangulated surfaces
+
+weightedCVT (see koebe.algorithms.cvt) computes CVTs on a pixel grid in the plane.
+The functions here run Lloyd's algorithm for sites on the unit sphere and on triangle
+meshes. The Voronoi cells are taken on the surface and each centroid is moved back onto
+it, which gives the constrained CVT of [Du, Gunzburger, Ju 03].
+
+sphericalCVT has two engines. The default, engine="voronoi", uses the exact spherical
+Voronoi regions (scipy.spatial.SphericalVoronoi). It computes their centroids for
+uniform density in closed form, edge by edge over all regions at once. engine="samples"
+is used whenever a density rho is given. It covers the sphere with a fixed set of
+quasi-uniform (Fibonacci) sample points and labels each one with its nearest site in a
+KD-tree query. The centroids are then sums over the labels with np.bincount, as the
+raster engine of weightedCVT does over pixels.
+
+surfaceCVT works like the samples engine on a triangulated DCEL (or the arrays of
+samplingArrays.triangleMesh) with a density per face:
+
+    * The samples are drawn with probability proportional to area times density (see
+      samplingArrays.triangleSamples).
+    * Each sample is labeled with its nearest site in space, which gives the restricted
+      Voronoi diagram of [Yan et al. 09].
+    * Each centroid moves to the closest point of the mesh.
+
+The sample sets are fixed for a run, so the iterations converge to the CVT of the
+samples. Its accuracy is set by num_samples, which defaults to 256 per site.
+
+Lloyd's algorithm only slowly moves sites between regions of different density. So
+random initial sites (an integer pts) are drawn with density proportional to the
+square root of the density, the density of the sites of a CVT on a surface [Du,
+Gunzburger, Ju 03].
+
+sphericalLloydIterations and surfaceLloydIterations run the iterations as generators.
+They yield a LloydStep after each iteration, as lloydIterations does. The sites are
+N x 3 arrays. The energy is None for the voronoi engine.
+
+Example:
+
+    from koebe.algorithms.surfaceCVT import sphericalCVT, surfaceCVT
+
+    sites = sphericalCVT(500, rng = 1)                  # A PointS2Array
+    hull = sphericalCVT(500, rng = 1, asHull = True)    # A DCEL with PointS2 vertices
+
+    # 1000 sites on a triangulated surface with PointE3 vertex data, twice as dense
+    # on the faces whose first vertex has z > 0
+    density = [2.0 if f.vertices()[0].data.z > 0 else 1.0 for f in mesh.faces if f is not mesh.outerFace]
+    points, faceIdx = surfaceCVT(mesh, 1000, density = density, rng = 1)
+
+References:
+
+    * [Du, Gunzburger, Ju 03] Du, Q., Gunzburger, M. D., and Ju, L. "Constrained centroidal
+        Voronoi tessellations for surfaces." SIAM Journal on Scientific Computing 24 (5),
+        pp. 1488-1506, 2003.
+    * [Yan et al. 09] Yan, D.-M., Levy, B., Liu, Y., Sun, F., and Wang, W. "Isotropic
+        remeshing with fast and exact computation of restricted Voronoi diagram."
+        Computer Graphics Forum 28 (5), pp. 1445-1454, 2009.
+"""
+
+import math
+
+from scipy.spatial import SphericalVoronoi, cKDTree
+import numpy as np
+
+from .cvt import LloydStep, _displacements
+from .delaunay import convexHullS2
+from .samplingArrays import AliasTable, triangleAreas, triangleMesh, triangleSamples
+from ..geometries.geometryArrays import GeometryArray, PointE3Array, PointS2Array
+
+def _pointRows(pts):
+    """Points given as a GeometryArray, a list of point objects or an array, as an
+    N x 3 float array."""
+    if isinstance(pts, GeometryArray):
+        return np.array(pts.data, dtype = float)
+    if not isinstance(pts, np.ndarray):
+        pts = list(pts)
+        if len(pts) > 0 and hasattr(pts[0], "x"):
+            return np.array([(p.x, p.y, p.z) for p in pts], dtype = float)
+    return np.array(pts, dtype = float).reshape(-1, 3)
+
+def _normalized(points):
+    return points / np.linalg.norm(points, axis = 1)[:, None]
+
+#
+# The sphere
+#
+
+def sphericalCVT(pts, num_iterations = 50, engine = None, rho = None, tol = None,
+                 num_samples = None, rng = None, asHull = False):
+    """Computes a centroidal Voronoi tessellation of the unit sphere.
+
+    Args:
+        pts: The initial sites, as a PointS2Array, a list of PointS2 or an N x 3 array
+            (the rows are normalized). An integer N instead draws N random sites (see
+            the module docstring).
+        num_iterations: OPTIONAL The maximum number of iterations. Default is 50.
+        engine: OPTIONAL "voronoi" or "samples", see the module docstring. The default
+            is "voronoi", or "samples" if rho is given (the voronoi engine does not
+            take a density).
+        rho: OPTIONAL The density, a function taking a k x 3 array of points on the
+            sphere to the k densities at them. Default is uniform density.
+        tol: OPTIONAL Stop after the first iteration in which no site moves more than tol.
+        num_samples: OPTIONAL The number of samples of the samples engine.
+        rng: OPTIONAL A numpy.random.Generator (or a seed) for the random sites.
+        asHull: OPTIONAL If True, return the convex hull of the sites instead (see
+            delaunay.convexHullS2).
+    Returns:
+        The sites as a PointS2Array, or their convex hull as a DCEL with PointS2 vertex
+        data.
+    """
+    sites, steps = _sphericalLloydSteps(pts, engine, rho, num_samples, rng)
+    for step in _iterations(steps, num_iterations, tol):
+        sites = step.sites
+    if asHull:
+        return convexHullS2(sites)
+    return PointS2Array(sites)
+
+def sphericalLloydIterations(pts, num_iterations = 50, engine = None, rho = None, tol = None,
+                             num_samples = None, rng = None):
+    """Runs Lloyd's algorithm on the unit sphere, yielding a LloydStep after each
+    iteration. The arguments are those of sphericalCVT.
+    """
+    _, steps = _sphericalLloydSteps(pts, engine, rho, num_samples, rng)
+    return _iterations(steps, num_iterations, tol)
+
+def _iterations(steps, num_iterations, tol):
+    """Numbers the steps and stops them as lloydIterations does."""
+    for iteration in range(1, num_iterations + 1):
+        step = next(steps)
+        yield step._replace(iteration = iteration)
+        if tol is not None and step.max_displacement < tol:
+            return
+
+def _sphericalLloydSteps(pts, engine, rho, num_samples, rng):
+    """The initial sites and the Lloyd iterations of sphericalCVT."""
+    if engine is None:
+        engine = "voronoi" if rho is None else "samples"
+    if engine == "voronoi":
+        if rho is not None:
+            raise ValueError("The voronoi engine only computes CVTs of uniform density")
+        sites = _initialSitesS2(pts, rng)
+        return sites, _voronoiLloydStepsS2(sites)
+    elif engine == "samples":
+        count = pts if isinstance(pts, (int, np.integer)) else len(_pointRows(pts))
+        samples = fibonacciSphere(256 * count if num_samples is None else num_samples)
+        weights = np.full(len(samples), 4 * math.pi / len(samples))
+        if rho is not None:
+            weights *= np.asarray(rho(samples), dtype = float).reshape(len(samples))
+        if rho is not None and isinstance(pts, (int, np.integer)):
+            sites = samples[np.random.default_rng(rng).choice(len(samples), pts, replace = False, 
+                                                              p = _siteDensity(1.0, weights))]
+        else:
+            sites = _initialSitesS2(pts, rng)
+        return sites, _sampleLloydSteps(sites, samples, weights, _normalized)
+    else:
+        raise ValueError("Unknown CVT engine %r" % (engine,))
+
+def _initialSitesS2(pts, rng):
+    if isinstance(pts, (int, np.integer)):
+        return _normalized(np.random.default_rng(rng).normal(size = (pts, 3)))
+    return _normalized(_pointRows(pts))
+
+def _siteDensity(areas, density):
+    """The probabilities of drawing the initial sites from pieces of a surface with the
+    given areas and densities: proportional to area times the square root of density."""
+    mass = areas * np.sqrt(density)
+    return mass / mass.sum()
+
+def fibonacciSphere(n):
+    """n quasi-uniform points on the unit sphere, on the Fibonacci spiral, as an n x 3
+    array. Each point stands for an area of 4 pi / n."""
+    k = np.arange(n, dtype = float) + 0.5
+    z = 1 - 2 * k / n
+    r = np.sqrt(np.maximum(0.0, 1 - z * z))
+    phi = k * (math.pi * (3 - math.sqrt(5)))
+    return np.column_stack((r * np.cos(phi), r * np.sin(phi), z))
+
+def sphericalCentroids(sites):
+    """The centroids of the spherical Voronoi regions of the sites, for uniform density,
+    projected onto the sphere.
+
+    The integral of the position over a spherical polygon is half the sum, over its
+    edges, of the arc length times the unit normal of the edge's great circle. So the
+    centroid direction is a sum over the edges of all regions at once.
+
+    Args:
+        sites: An N x 3 array of distinct points on the unit sphere.
+    Returns:
+        The centroids as an N x 3 array.
+    """
+    sites = np.asarray(sites, dtype = float)
+    voronoi = SphericalVoronoi(sites, radius = 1.0, center = np.zeros(3))
+    voronoi.sort_vertices_of_regions()
+
+    # The edges (a, b) of all regions, in order around each one
+    lengths = np.array([len(region) for region in voronoi.regions], dtype = np.int64)
+    corners = np.concatenate([np.asarray(region, dtype = np.int64) for region in voronoi.regions])
+    starts = np.cumsum(lengths) - lengths
+    following = np.arange(1, len(corners) + 1)
+    following[starts + lengths - 1] = starts
+    a = voronoi.vertices[corners]
+    b = voronoi.vertices[corners[following]]
+
+    normals = np.cross(a, b)
+    sines = np.linalg.norm(normals, axis = 1)
+    arcs = np.arctan2(sines, np.einsum("ij,ij->i", a, b))
+    scale = np.divide(arcs, sines, out = np.zeros_like(arcs), where = sines > 0)
+    region = np.repeat(np.arange(len(sites)), lengths)
+    integral = np.column_stack([np.bincount(region, weights = normals[:, k] * scale, minlength = len(sites))
+                                for k in range(3)])
+    # The sorted corners run around their site in either direction. The sum is for
+    # counterclockwise regions (seen from outside), which turn positively about
+    # their site.
+    turning = np.bincount(region, weights = np.einsum("ij,ij->i", normals, sites[region]), minlength = len(sites))
+    return _normalized(integral * np.where(turning > 0, 1.0, -1.0)[:, None])
+
+def _voronoiLloydStepsS2(sites):
+    """The Lloyd iterations of the voronoi engine (see sphericalLloydIterations)."""
+    active = np.ones(len(sites), dtype = bool)
+    while True:
+        centroids = sphericalCentroids(sites)
+        moved = _displacements(sites, centroids)
+        yield LloydStep(0, centroids, None, float(moved.max(initial = 0.0)), active)
+        sites = centroids
+
+def _sampleLloydSteps(sites, samples, weights, project):
+    """Lloyd iterations over a fixed weighted sample set. Each sample is labeled with
+    its nearest site, the weighted mean of each site's samples is moved onto the
+    surface by project, and sites with no samples stay put."""
+    n = len(sites)
+    active = np.ones(n, dtype = bool)
+    while True:
+        distances, labels = cKDTree(sites).query(samples)
+        energy = float(np.sum(weights * distances * distances))
+        mass = np.bincount(labels, weights = weights, minlength = n)
+        count = np.bincount(labels, minlength = n)
+        weighted = mass > 0
+        # Regions of zero density: the average of their samples
+        fallback = ~weighted & (count > 0)
+        means = np.empty((n, 3))
+        for k in range(3):
+            means[:, k] = np.bincount(labels, weights = weights * samples[:, k], minlength = n)
+            if np.any(fallback):
+                means[fallback, k] = np.bincount(labels, weights = samples[:, k], minlength = n)[fallback]
+        moving = weighted | fallback
+        centroids = sites.copy()
+        centroids[moving] = project(means[moving] / np.where(weighted, mass, count)[moving, None])
+        moved = _displacements(sites, centroids)
+        yield LloydStep(0, centroids, energy, float(moved.max(initial = 0.0)), active)
+        sites = centroids
+
+#
+# Triangulated surfaces
+#
+
+def surfaceCVT(mesh, pts, density = None, num_iterations = 50, tol = None,
+               num_samples = None, rng = None):
+    """Computes a centroidal Voronoi tessellation of a triangulated surface.
+
+    Args:
+        mesh: A triangulated DCEL with PointE3 vertex data, or the pair (vertices,
+            triangles) of a k x 3 array of coordinates and an m x 3 array of indices.
+        pts: The initial sites, as a PointE3Array, a list of PointE3 or an N x 3 array
+            (they are moved to the closest points of the mesh). An integer N instead
+            draws N random sites (see the module docstring).
+        density: OPTIONAL The m non-negative densities of the inner faces (in the
+            order of samplingArrays.triangleMesh). Default is uniform density.
+        num_iterations: OPTIONAL The maximum number of iterations. Default is 50.
+        tol: OPTIONAL Stop after the first iteration in which no site moves more than tol.
+        num_samples: OPTIONAL The number of samples. Default is 256 per site.
+        rng: OPTIONAL A numpy.random.Generator (or a seed) for the samples.
+    Returns:
+        The sites as a PointE3Array and the (N,) array of the indices of their faces.
+    """
+    surface = _Surface(mesh, density, rng)
+    sites = surface.setUp(pts, num_samples)
+    for step in _surfaceLloydIterations(surface, sites, num_iterations, tol):
+        sites = step.sites
+    sites, faceIdx = surface.closestPoints(sites)
+    return PointE3Array(sites), faceIdx
+
+def surfaceLloydIterations(mesh, pts, density = None, num_iterations = 50, tol = None,
+                           num_samples = None, rng = None):
+    """Runs Lloyd's algorithm on a triangulated surface, yielding a LloydStep after
+    each iteration. The arguments are those of surfaceCVT.
+    """
+    surface = _Surface(mesh, density, rng)
+    sites = surface.setUp(pts, num_samples)
+    return _surfaceLloydIterations(surface, sites, num_iterations, tol)
+
+def _surfaceLloydIterations(surface, sites, num_iterations, tol):
+    weights = np.full(len(surface.samples), surface.mass / len(surface.samples))
+    steps = _sampleLloydSteps(sites, surface.samples, weights, lambda points: surface.closestPoints(points)[0])
+    return _iterations(steps, num_iterations, tol)
+
+class _Surface:
+    """A triangle mesh with a density per triangle and the samples drawn with it, and
+    a KD-tree of the triangle centroids for finding closest points on the mesh."""
+
+    # The closest point is searched for on the triangles with this many centroids
+    # nearest to the point
+    CANDIDATES = 8
+
+    def __init__(self, mesh, density, rng):
+        if isinstance(mesh, tuple):
+            vertices, triangles = mesh
+        else:
+            vertices, triangles, _ = triangleMesh(mesh)
+        self.vertices = np.asarray(vertices, dtype = float)
+        self.triangles = np.asarray(triangles, dtype = np.int64).reshape(-1, 3)
+        if density is None:
+            self.density = np.ones(len(self.triangles))
+        else:
+            self.density = np.asarray(density, dtype = float).ravel()
+            if len(self.density) != len(self.triangles):
+                raise ValueError("There must be one density per triangle")
+        weights = triangleAreas(self.vertices, self.triangles) * self.density
+        self.table = AliasTable(weights)
+        self.mass = float(weights.sum())
+        self.rng = np.random.default_rng(rng)
+        self.tree = cKDTree(self.vertices[self.triangles].mean(axis = 1))
+
+    def setUp(self, pts, num_samples):
+        """Draws the samples (256 per site by default) and returns the initial sites:
+        pts moved onto the mesh, or pts random sites if pts is an integer."""
+        if isinstance(pts, (int, np.integer)):
+            count, pts = pts, None
+        else:
+            pts = _pointRows(pts)
+            count = len(pts)
+        if num_samples is None:
+            num_samples = 256 * count
+        self.samples, _ = triangleSamples(self.vertices, self.triangles, num_samples, self.rng, self.table)
+        if pts is None:
+            table = AliasTable(_siteDensity(triangleAreas(self.vertices, self.triangles), self.density))
+            return triangleSamples(self.vertices, self.triangles, count, self.rng, table)[0]
+        return self.closestPoints(pts)[0]
+
+    def closestPoints(self, points):
+        """The closest points on the mesh to the points, searched for on the triangles
+        with the nearest centroids, and the indices of their triangles."""
+        k = min(self.CANDIDATES, self.tree.n)
+        _, nearest = self.tree.query(points, k = k)
+        faces = np.asarray(nearest).reshape(len(points), k)
+        corners = self.vertices[self.triangles[faces.ravel()]]
+        repeated = np.repeat(points, k, axis = 0)
+        candidates = closestPointsOnTriangles(repeated, corners[:, 0], corners[:, 1], corners[:, 2])
+        distSq = np.sum((candidates - repeated) ** 2, axis = 1).reshape(len(points), k)
+        best = np.argmin(distSq, axis = 1)
+        rows = np.arange(len(points))
+        return candidates.reshape(len(points), k, 3)[rows, best], faces[rows, best]
+
+def closestPointsOnTriangles(p, a, b, c):
+    """The closest points to the points p on the triangles (a, b, c), all N x 3 arrays:
+    the projection onto the plane of the triangle if it lies inside, otherwise the
+    closest point on an edge."""
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        normal = np.cross(b - a, c - a)
+        normSq = np.einsum("ij,ij->i", normal, normal)
+        q = p - (np.einsum("ij,ij->i", p - a, normal) / normSq)[:, None] * normal
+        u = np.einsum("ij,ij->i", np.cross(q - a, c - a), normal) / normSq
+        v = np.einsum("ij,ij->i", np.cross(b - a, q - a), normal) / normSq
+        inside = (u >= 0) & (v >= 0) & (u + v <= 1)
+
+        best = q.copy()
+        bestDistSq = np.full(len(p), np.inf)
+        for start, end in ((a, b), (b, c), (c, a)):
+            edge = end - start
+            lengthSq = np.einsum("ij,ij->i", edge, edge)
+            t = np.clip(np.einsum("ij,ij->i", p - start, edge) / np.where(lengthSq > 0, lengthSq, 1.0), 0.0, 1.0)
+            onEdge = start + t[:, None] * edge
+            distSq = np.einsum("ij,ij->i", p - onEdge, p - onEdge)
+            closer = ~inside & (distSq < bestDistSq)
+            best[closer] = onEdge[closer]
+            bestDistSq[closer] = distSq[closer]
+    return best
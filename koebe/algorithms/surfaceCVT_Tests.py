@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .surfaceCVT import (closestPointsOnTriangles, fibonacciSphere, sphericalCentroids, sphericalCVT,
+                         sphericalLloydIterations, surfaceCVT, surfaceLloydIterations)
+
+def _cube():
+    """The unit cube [0, 1]^3 as 8 vertices and 12 triangles."""
+    vertices = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype = float)
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    triangles = np.array([t for a, b, c, d in quads for t in ((a, b, c), (a, c, d))])
+    return vertices, triangles
+
+class TestSphericalCVT(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        sites = rng.normal(size = (40, 3))
+        self.sites = sites / np.linalg.norm(sites, axis = 1)[:, None]
+
+    def test_sphericalCentroidsMatchQuadrature(self):
+        samples = fibonacciSphere(400000)
+        labels = cKDTree(self.sites).query(samples)[1]
+        means = np.column_stack([np.bincount(labels, weights = samples[:, k], minlength = len(self.sites))
+                                 for k in range(3)])
+        expected = means / np.linalg.norm(means, axis = 1)[:, None]
+        self.assertLess(np.abs(sphericalCentroids(self.sites) - expected).max(), 2e-3)
+
+    def test_voronoiConverges(self):
+        steps = list(sphericalLloydIterations(self.sites, 400, tol = 1e-5))
+        self.assertLess(len(steps), 400)
+        self.assertLess(steps[-1].max_displacement, 1e-5)
+        self.assertTrue(np.allclose(np.linalg.norm(steps[-1].sites, axis = 1), 1.0))
+
+    def test_samplesEnergyDecreases(self):
+        energies = [step.energy for step in sphericalLloydIterations(self.sites, 20, engine = "samples")]
+        self.assertTrue(all(b <= a + 1e-12 for a, b in zip(energies, energies[1:])))
+
+    def test_densitySplit(self):
+        # The sites of a CVT are spread with density proportional to the square root of
+        # rho, so the hemisphere of density 4 holds 2 / 3 of them.
+        rho = lambda points: np.where(points[:, 2] > 0, 4.0, 1.0)
+        sites = sphericalCVT(300, 30, rho = rho, rng = 1)
+        north = np.mean(np.array(sites.data)[:, 2] > 0)
+        self.assertAlmostEqual(north, 2 / 3, delta = 0.05)
+
+    def test_asHullEulerCharacteristic(self):
+        hull = sphericalCVT(100, 10, rng = 1, asHull = True)
+        faces = [f for f in hull.faces if f is not hull.outerFace]
+        self.assertEqual(len(hull.verts), 100)
+        self.assertEqual(len(faces), 196)
+        self.assertEqual(len(hull.edges), 294)
+        self.assertEqual(len(hull.verts) - len(hull.edges) + len(faces), 2)
+
+    def test_voronoiRejectsDensity(self):
+        with self.assertRaises(ValueError):
+            sphericalCVT(10, engine = "voronoi", rho = lambda points: np.ones(len(points)))
+
+class TestSurfaceCVT(unittest.TestCase):
+
+    def test_closestPointsOnTriangles(self):
+        a, b, c = np.array([0.0, 0, 0]), np.array([2.0, 0, 0]), np.array([0.0, 2, 0])
+        points = np.array([[0.5, 0.5, 3.0],      # Above the inside
+                           [1.0, -1.0, 1.0],     # Beside the edge ab
+                           [2.0, 2.0, 0.0],      # Beside the edge bc
+                           [-1.0, -1.0, -2.0],   # Beyond the vertex a
+                           [3.0, -0.5, 0.0]])    # Beyond the vertex b
+        expected = np.array([[0.5, 0.5, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0],
+                             [0.0, 0.0, 0.0], [2.0, 0.0, 0.0]])
+        n = len(points)
+        closest = closestPointsOnTriangles(points, np.tile(a, (n, 1)), np.tile(b, (n, 1)), np.tile(c, (n, 1)))
+        self.assertTrue(np.allclose(closest, expected))
+
+    def test_sitesOnCube(self):
+        points, faceIdx = surfaceCVT(_cube(), 60, num_iterations = 10, rng = 1)
+        sites = np.array(points.data)
+        # Every site has a coordinate that is exactly 0 or 1 and lies in the cube
+        self.assertTrue(np.all(np.any((sites == 0.0) | (sites == 1.0), axis = 1)))
+        self.assertTrue(np.all((sites >= 0.0) & (sites <= 1.0)))
+        self.assertEqual(len(faceIdx), 60)
+
+    def test_energyDecreases(self):
+        energies = [step.energy for step in surfaceLloydIterations(_cube(), 60, num_iterations = 20, rng = 1)]
+        self.assertTrue(all(b <= a + 1e-12 for a, b in zip(energies, energies[1:])))
+
+    def test_densityLength(self):
+        with self.assertRaises(ValueError):
+            surfaceCVT(_cube(), 10, density = np.ones(5))
+
+if __name__ == '__main__':
+    unittest.main()
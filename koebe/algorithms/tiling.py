@@ -1,20 +1,74 @@
 from koebe.datastructures.dcel import *
 
+import math
+
+import numpy as np
+
 from koebe.graphics.euclidean2viewer import UnitScaleE2Sketch, PoincareDiskViewer, E2Viewer, makeStyle
 
+def _objectList(name):
+    """A Tiling attribute holding its objects, which makes them on first use."""
+    attr = "_" + name
+    def get(self):
+        if self.objectsPending:
+            self.makeObjects()
+        return getattr(self, attr)
+    def set(self, value):
+        setattr(self, attr, value)
+    return property(get, set)
+
 class Tiling(DCEL):
+    """A DCEL of the levels of a subdivision tiling. 
+    
+    A Tiling made by TilingRules (see TilingArrays.toTiling) is a view of its
+    TilingArrays: its vertices, darts, edges and faces, of every level, are 
+    made from the arrays when any of them is first used. Until then 
+    objectsPending is True, and tilingPass and the circle packing work on the 
+    arrays alone. 
+    """
+    
+    verts      = _objectList("verts")
+    darts      = _objectList("darts")
+    edges      = _objectList("edges")
+    faces      = _objectList("faces")
+    outerFace  = _objectList("outerFace")
+    dartLevels = _objectList("dartLevels")
+    edgeLevels = _objectList("edgeLevels")
+    faceLevels = _objectList("faceLevels")
     
     def __init__(self, outerFaceData = None):
+        self.objectsPending = False
         super().__init__(outerFaceData)
 
         self.dartLevels = []
         self.edgeLevels = []
         self.faceLevels = []
         self.subdivisionLevel = 1
+        self.tilingArrays = None # Set by TilingArrays.toTiling
         
         self.Vertex = TilingVertex
         self.Dart   = TilingDart
         self.Face   = Tile
+    
+    def makeObjects(self):
+        """Makes the objects of a Tiling made from TilingArrays, levels 1 to 
+        subdivisionLevel (done when they are first used)."""
+        import gc
+        
+        if not self.objectsPending:
+            return
+        self.objectsPending = False
+        level = self.subdivisionLevel
+        self.subdivisionLevel = 1
+        gcWasEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            _addInitialLevel(self, self.tilingArrays)
+            for k in range(2, level + 1):
+                _addArrayLevel(self, self.tilingArrays, k)
+        finally:
+            if gcWasEnabled:
+                gc.enable()
 
     def addLevel(self):
         old_darts, old_edges, old_faces = self.darts, self.edges, self.faces
@@ -70,18 +124,25 @@ class TilingRules:
         return self.prototiles[tileType]
     
     def createInitialTile(self, tileType):
-        prototile = self.getPrototile(tileType)
-        tiling    = Tiling.generateCycle(vdata = prototile.tileVerts)
-        if prototile.tileData != []:
-            for i in range(len(tiling.verts)):
-                tiling.verts[i].point = prototile.tileData[i]
-        tiling.faces[-1].tileType = tileType
-        return tiling
+        """Returns the Tiling of one tile of the given type."""
+        return TilingArrays(self, tileType).toTiling()
     
     def generateTiling(self, initialTileType, depth = 1):
-        tiling = self.createInitialTile(initialTileType)
-        for _ in range(depth): tilingPass(tiling, self)
-        return tiling
+        """Returns the Tiling of depth subdivisions of the initial tile, a view
+        of generateTilingArrays whose objects are made when first used (see 
+        TilingArrays.toTiling)."""
+        return self.generateTilingArrays(initialTileType, depth).toTiling()
+    
+    def generateTilingArrays(self, initialTileType, depth = 1):
+        """generateTiling with array-backed topology, see TilingArrays."""
+        tilingArrays = TilingArrays(self, initialTileType)
+        for _ in range(depth): arrayTilingPass(tilingArrays)
+        return tilingArrays
+    
+    def generateLazyTiling(self, initialTileType, maxCachedTiles = 100000):
+        """Returns a LazyTiling of the initial tile, which subdivides only the
+        tiles that are asked for."""
+        return LazyTiling(self, initialTileType, maxCachedTiles)
 
 def midp(dart):
     from koebe.geometries.euclidean2 import PointE2
@@ -115,7 +176,16 @@ class Prototile:
         self.parentDartOf = dict()
         self.newVertRules = list()
         self.newVertFnHandler = None
+        self.newVertFnArrays  = False
         self.subtiles     = list()
+        self._template    = None
+    
+    def template(self):
+        """Returns the PrototileTemplate of this prototile, compiling it on first 
+        use (and again after the rules change)."""
+        if self._template is None:
+            self._template = PrototileTemplate(self)
+        return self._template
     
     def addSplitEdgeRule(self, edge, newverts, fn = None):
         """
@@ -131,6 +201,7 @@ class Prototile:
         if edge[0] in self.splitRules:
             raise PrototileFormationError("There appear to be two splits beginning with the same vertex. This probably means you either attempted to split the same edge twice, or did not orient your edges consistently.")
         self.splitRules[edge[0]] = (edge, newverts)
+        self._template = None
         if fn != None:
             self.splitFn[edge[0]] = fn
         splitEdge = [edge[0]] + list(newverts) + [edge[1]]
@@ -164,11 +235,23 @@ class Prototile:
             fn: (Face) -> None
         """
         self.newVertRules.append(vertName)
+        self._template = None
 #         if fn != None:
 #             self.newVertFn[vertName] = fn
     
-    def setNewVertexHandlerFn(self, fn):
+    def setNewVertexHandlerFn(self, fn, arrays = False):
+        """
+        Args:
+            fn: (Dict[str, Vertex]) -> None, given the vertices of a tile by name,
+                that sets the .point of its new vertices. 
+            arrays: If True, fn is instead given a dict from each vertex name to
+                an (m, d) array of the coordinates of that vertex in m tiles (NaN 
+                where it has no point), and sets the arrays of the new vertices 
+                in the dict. arrayTilingPass then places the new vertices of all
+                the tiles of a type with one call. 
+        """
         self.newVertFnHandler = fn
+        self.newVertFnArrays = arrays
     
     def addNewVertexRules(self, vertNames):
         for vertName in vertNames:
@@ -181,27 +264,112 @@ class Prototile:
                 + f" vertices, but the given vertex set was {subtileVerts} with {len(subtileVerts)} vertices."
             )
         self.subtiles.append((subtileType, subtileVerts))
+        self._template = None
     
 class PrototileFormationError(Exception):
     pass
 
-def originNameToDartDict(tilingRules, tile):
+def _newVertexHandler(prototile, vertNamed):
+    """Runs the new vertex handler of prototile on the vertices of one tile, by 
+    name, with an array-valued handler given one row per vertex."""
+    fn = prototile.newVertFnHandler
+    if not prototile.newVertFnArrays:
+        fn(vertNamed)
+        return
+    points = [getattr(v, "point", None) for v in vertNamed.values()]
+    placed = [p for p in points if p is not None]
+    if placed == []:
+        return
+    pointClass, unplaced = type(placed[0]), (math.nan,) * len(tuple(placed[0]))
+    coordinates = dict((name, np.array([unplaced if p is None else tuple(p)], dtype = float))
+                       for name, p in zip(vertNamed, points))
+    fn(coordinates)
+    for name, v in vertNamed.items():
+        row = np.asarray(coordinates[name], dtype = float).reshape(-1)
+        if name not in prototile.tileVerts and not np.isnan(row).any():
+            v.point = pointClass(*row.tolist())
+
+class PrototileTemplate:
+    """A Prototile's subdivision rule compiled to index lists, so that a tile is
+    subdivided without looking anything up by name. 
     
-    prototile = tilingRules.getPrototile(tile.tileType)
-    theDarts  = tile.darts()
+    The local vertices are numbered with the corners first (in the order of 
+    tileVerts), then the new vertices of each edge (edge i runs from corner i to 
+    corner i + 1), then the other new vertices. The local darts are numbered 
+    subtile by subtile, each subtile's darts starting at its first vertex. 
     
-    if len(theDarts) != len(prototile.tileVerts):
-        raise PrototileFormationError(
-                f"Prototile vertex count ({len(theDarts)}) does not match tile"
-                + f" vertex count for tile type {tile.tileType}."
-        )
+    Attributes:
+        tileType: The prototile's type. 
+        cornerCount: The number of corners. 
+        vertexNames: The names of the local vertices. 
+        splitVertices: For each edge, the list of its new local vertices in order. 
+        newVertices: The list of the other new local vertices. 
+        dartOrigin, dartNext, dartFace: The origin, next dart and subtile of each 
+            local dart. 
+        dartTwin: The local dart with the reversed name of each local dart, or -1.
+        pairedDarts: The local darts d with d < dartTwin[d], one of each pair. 
+        dartNames: The (origin name, dest name) of each local dart. 
+        edgeDarts: For each edge, the list of the local darts that run along it 
+            from corner i to corner i + 1, the slots stitched to the neighbouring 
+            tile. 
+        onEdge: Whether each local dart runs along an edge of the tile. 
+        subtileTypes, subtileNames: The type and vertex names of each subtile. 
+        subtileFirstDart: The first local dart of each subtile. 
+    """
     
-    return dict([(prototile.tileVerts[i], theDarts[i]) for i in range(len(theDarts))])
-
-def subdivideTile(tilingRules, tiling, tile):
-    prototile = tilingRules.getPrototile(tile)
-    tile.subtiles = [Tile(tiling, prototile.subtiles[i][0]) for i in range(len(prototile.subtiles))]
-    dartFrom = originNameToDartDict(tilingRules, tile)
+    def __init__(self, prototile):
+        tileType = prototile.tileType
+        names = list(prototile.tileVerts)
+        k = len(names)
+        self.tileType = tileType
+        self.cornerCount = k
+        self.vertexNames = list(names)
+        self.splitVertices = []
+        for i in range(k):
+            _, newverts = prototile.splitRules.get(names[i], (None, ()))
+            first = len(self.vertexNames)
+            self.vertexNames += list(newverts)
+            self.splitVertices.append(list(range(first, len(self.vertexNames))))
+        first = len(self.vertexNames)
+        self.vertexNames += list(prototile.newVertRules)
+        self.newVertices = list(range(first, len(self.vertexNames)))
+        local = dict([(self.vertexNames[i], i) for i in range(len(self.vertexNames))])
+        if len(local) != len(self.vertexNames):
+            raise PrototileFormationError(f"The vertex names of a {tileType} prototile and its new vertices are not distinct.")
+        
+        self.dartOrigin, self.dartNext, self.dartFace, self.dartNames = [], [], [], []
+        self.subtileTypes, self.subtileNames, self.subtileFirstDart = [], [], []
+        dartNamed = {}
+        for subtileType, subtileVertNames in prototile.subtiles:
+            first = len(self.dartOrigin)
+            self.subtileTypes.append(subtileType)
+            self.subtileNames.append(subtileVertNames)
+            self.subtileFirstDart.append(first)
+            for i in range(len(subtileVertNames)):
+                name = (subtileVertNames[i], subtileVertNames[(i + 1) % len(subtileVertNames)])
+                if name[0] not in local:
+                    raise PrototileFormationError(f"The subtile vertex {name[0]} of a {tileType} prototile is not one of its vertices.")
+                dartNamed[name] = len(self.dartOrigin)
+                self.dartOrigin.append(local[name[0]])
+                self.dartNext.append(first + (i + 1) % len(subtileVertNames))
+                self.dartFace.append(len(self.subtileTypes) - 1)
+                self.dartNames.append(name)
+        self.dartTwin = [dartNamed.get((dest, origin), -1) for origin, dest in self.dartNames]
+        self.pairedDarts = [d for d in range(len(self.dartTwin)) if d < self.dartTwin[d]]
+        
+        self.edgeDarts = []
+        self.onEdge = [False] * len(self.dartOrigin)
+        for i in range(k):
+            chain = [names[i]] + [self.vertexNames[v] for v in self.splitVertices[i]] + [names[(i + 1) % k]]
+            darts = [dartNamed.get((chain[j], chain[j + 1]), -1) for j in range(len(chain) - 1)]
+            if -1 in darts:
+                raise PrototileFormationError(f"The subtiles of a {tileType} prototile do not cover its edge ({chain[0]},{chain[-1]}).")
+            self.edgeDarts.append(darts)
+            for d in darts:
+                self.onEdge[d] = True
+        for d in range(len(self.dartOrigin)):
+            if not self.onEdge[d] and self.dartTwin[d] == -1:
+                raise PrototileFormationError(f"The dart {self.dartNames[d]} of a {tileType} prototile's subtiles is neither on its boundary nor matched by a reversed dart.")
 
 def starTriangulateAllFaces(tiling):
     for face in tuple(tiling.faces):
@@ -209,6 +377,32 @@ def starTriangulateAllFaces(tiling):
             face.starTriangulate()
 
 def tilingPass(tiling, tilingRules):
+    """Subdivides every tile of a Tiling in place. 
+    
+    A Tiling made by TilingRules keeps its TilingArrays, which arrayTilingPass 
+    subdivides. If the Tiling's objects have been made, those of the new level 
+    are then made from the arrays; otherwise they stay pending (see Tiling). 
+    Only a Tiling made otherwise, or one whose vertices, darts, edges or faces 
+    have changed since, is subdivided by the object pass (_subdivideObjects), 
+    which makes the same objects. 
+    """
+    tilingArrays = tiling.tilingArrays
+    if (tilingArrays is not None and tilingArrays.tilingRules is tilingRules 
+            and tilingArrays.describes(tiling)):
+        if tiling.objectsPending:
+            arrayTilingPass(tilingArrays)
+            tiling.subdivisionLevel = tilingArrays.level
+            return
+        tilingArrays.setPoints(tiling.verts)
+        arrayTilingPass(tilingArrays)
+        _addArrayLevel(tiling, tilingArrays, tilingArrays.level)
+    else:
+        tiling.makeObjects()
+        tiling.tilingArrays = None
+        _subdivideObjects(tiling, tilingRules)
+
+def _subdivideObjects(tiling, tilingRules):
+    """The subdivision pass of tilingPass for Tilings without TilingArrays."""
     
     #####
     # Subdivide a tile: 
@@ -217,12 +411,18 @@ def tilingPass(tiling, tilingRules):
     def subdivideTile(tiling, tile, tilingRules):
 
         prototile = tilingRules.getPrototile(tile.tileType) # Grab this tile's subdivision rules
+        template  = prototile.template()                      # compiled to index lists
 
         # Keep track of a few of the original items before we start the subdivision procedure
         originalDarts = tile.darts()
+        if len(originalDarts) != template.cornerCount:
+            raise PrototileFormationError(
+                    f"Prototile vertex count ({len(originalDarts)}) does not match tile"
+                    + f" vertex count for tile type {tile.tileType}."
+            )
 
-        originalDartFrom  = originNameToDartDict(tilingRules, tile) 
-        vertNamed = dict([(vName, originalDartFrom[vName].origin) for vName in prototile.tileVerts])
+        # The vertices by local index (see PrototileTemplate)
+        verts = [dart.origin for dart in originalDarts] + [None] * (len(template.vertexNames) - template.cornerCount)
 
         #####
         # 1. Create the new vertices. 
@@ -231,84 +431,61 @@ def tilingPass(tiling, tilingRules):
         # Create the new vertices required by each dart split:
         for i in range(len(originalDarts)):
             dart = originalDarts[i]
-            splitRule = prototile.splitRules[prototile.tileVerts[i]] if prototile.tileVerts[i] in prototile.splitRules else (prototile.tileVerts[i], ())
+            splitVerts = template.splitVertices[i]
             
             if dart.splitVertices == []:
-                for vName in splitRule[1]:
-                    vert = TilingVertex(tiling)
-                    vertNamed[vName] = vert
-                    dart.splitVertices.append(vert)
+                for vIdx in splitVerts:
+                    verts[vIdx] = TilingVertex(tiling)
+                    dart.splitVertices.append(verts[vIdx])
                 if prototile.tileVerts[i] in prototile.splitFn:
                     fn = prototile.splitFn[prototile.tileVerts[i]]
                     fn(dart)
                 dart.twin.splitVertices = list(reversed(dart.splitVertices))
             else:
-                for vIdx in range(len(splitRule[1])):
-                    vert = dart.splitVertices[vIdx]
-                    vName = splitRule[1][vIdx]
-                    vertNamed[vName] = vert
+                for j in range(len(splitVerts)):
+                    verts[splitVerts[j]] = dart.splitVertices[j]
 
         # Create the other new vertices
-        for vName in prototile.newVertRules:
-            vertNamed[vName] = TilingVertex(tiling)
+        for vIdx in template.newVertices:
+            verts[vIdx] = TilingVertex(tiling)
             
         if prototile.newVertFnHandler:
-            fn = prototile.newVertFnHandler
-            fn(vertNamed)
+            _newVertexHandler(prototile, dict(zip(template.vertexNames, verts)))
         
 
         #####
         # 2. Create the new darts and tiles.  
         #####
 
-        dartNamed = {}
-        nameOfDart = {}
-        newDarts = []
-
         # Each tile is now split into subtiles and darts are created to surround each tile: 
-        for subtileType, subtileVertNames in prototile.subtiles:
+        subtiles = []
+        for subtileType, subtileVertNames in zip(template.subtileTypes, template.subtileNames):
             subtile = Tile(tiling, subtileType)
             subtile.name = subtileVertNames
             tile.subtiles.append(subtile)
             subtile.parent = tile
-            subtileDarts = [tiling.Dart(dcel = tiling, origin = vertNamed[vName], face=subtile) 
-                            for vName in subtileVertNames]
-            
-            for i in range(len(subtileVertNames)):
-                subtileDarts[i].name = subtileVertNames[i]
-                subtileDarts[i].parent = None
-
-            newDarts += subtileDarts
-            subtile.aDart = subtileDarts[0]
-            for i in range(len(subtileDarts)):
-                subtileDarts[i-1].makeNext(subtileDarts[i]) # Stitches up the darts to be formed correctly.
-
-            namesToDarts = [((subtileVertNames[i-1], subtileVertNames[i]), subtileDarts[i-1])
-                             for i in range(len(subtileDarts))]
-            
-            dartNamed.update(namesToDarts)
-            nameOfDart.update([(dart, name) for name, dart in namesToDarts])
+            subtiles.append(subtile)
+        
+        newDarts = [tiling.Dart(dcel = tiling, origin = verts[template.dartOrigin[i]], face = subtiles[template.dartFace[i]])
+                    for i in range(len(template.dartOrigin))]
+        for i in range(len(newDarts)):
+            newDarts[i].name = template.dartNames[i][0]
+            newDarts[i].parent = None
+            newDarts[i].makeNext(newDarts[template.dartNext[i]]) # Stitches up the darts to be formed correctly.
+        for j in range(len(subtiles)):
+            subtiles[j].aDart = newDarts[template.subtileFirstDart[j]]
 
         # Set the twin pointers for the internally created darts. 
-        for i in range(len(newDarts)):
-            origin, dest = nameOfDart[newDarts[i]]
-            dart1 = dartNamed[(origin, dest)]
-            if (dest, origin) in dartNamed and dart1.edge == None:
-                dart2 = dartNamed[(dest, origin)]
-                dart1.makeTwin(dart2)
-                edge = tiling.Edge(tiling, dart1)
-                dart1.edge = dart2.edge = edge
+        for i in template.pairedDarts:
+            dart1, dart2 = newDarts[i], newDarts[template.dartTwin[i]]
+            dart1.makeTwin(dart2)
+            edge = tiling.Edge(tiling, dart1)
+            dart1.edge = dart2.edge = edge
 
         # For each original dart, set its children list: 
-        nameOfOriginalDart = dict([(originalDarts[i-1], (prototile.tileVerts[i-1], prototile.tileVerts[i])) 
-                              for i in range(len(originalDarts))])
-        
-        for originalDart in originalDarts:
-            name = nameOfOriginalDart[originalDart]
-            originalDart.subdarts = [dartNamed[childName] 
-                                     for childName in (prototile.childDartsOf[name] 
-                                                       if name in prototile.childDartsOf 
-                                                       else [name])]
+        for i in range(len(originalDarts)):
+            originalDart = originalDarts[i]
+            originalDart.subdarts = [newDarts[j] for j in template.edgeDarts[i]]
             for subdart in originalDart.subdarts:
                 subdart.parent = originalDart
     #####
@@ -367,6 +544,653 @@ def tilingPass(tiling, tilingRules):
     
     for dart in tiling.darts:
         dart.origin.aDart = dart
+
+
+#####
+# Array-backed subdivision
+#
+# A TilingArrays holds a tiling as flat arrays: the darts (origin vertex, next
+# dart, twin dart and tile of each), the tiles (type and first dart of each, 
+# and the parent of each in the level before) and the vertex positions, for 
+# every level. arrayTilingPass subdivides it with the compiled 
+# PrototileTemplates: all the tiles of one type are stamped out at once by 
+# offsetting the template's index lists, and the subtiles of neighbouring tiles
+# are stitched together by pairing the template's edge slots in reverse. 
+# Nothing is looked up by name, and no Python objects are made per tile, so a 
+# pass over a million tiles takes seconds and each tile takes a few hundred 
+# bytes. 
+#
+# The vertices, darts, edges and tiles are numbered as the object pass of 
+# tilingPass makes them, and each pass also records which darts of the new 
+# level run along each dart of the old one. generateTiling is 
+# generateTilingArrays followed by toTiling(), which returns a Tiling that is a
+# view of the arrays: its objects (the DCEL used by the viewers) are made from
+# the arrays, with the same links as the object pass, only when they are first
+# used, and they take a few kilobytes per tile. Until then tilingPass only runs 
+# arrayTilingPass, and the circle packing (tilingLevel) reads each level from 
+# the arrays, so packing a tiling does not make its objects. Once they are 
+# made, tilingPass makes those of each new level from the arrays. The object 
+# pass is left for Tilings made otherwise. 
+#
+# The split functions and new vertex handlers only run when the tiling has 
+# geometry (the initial prototile has points). The midp splits are computed on 
+# the coordinates of all the edges of a type at once, and so are the new 
+# vertices of prototiles with array-valued handlers (see 
+# Prototile.setNewVertexHandlerFn). Other split functions and handlers are 
+# called edge by edge and tile by tile on stand-ins for the vertices and darts,
+# as in a LazyTiling, and the points they set are stored as coordinates. 
+#####
+
+class TilingArrays:
+    """A subdivision tiling as arrays. 
+    
+    The darts of the outer face have face -1. The darts of each tile run from 
+    faceDart in the order of its prototile's tileVerts. The vertices are 
+    numbered level by level, so the vertices of a level are the first ones. 
+    
+    Attributes:
+        tilingRules: The TilingRules. 
+        tileTypes: The tile types, indexed by the entries of faceType. 
+        vertexCount: The number of vertices. 
+        dartOrigin, dartNext, dartTwin, dartFace: The origin vertex, next dart, 
+            twin dart and face of each dart. 
+        edgeDart: The first dart (aDart) of each edge. 
+        faceType: The type index of each face. 
+        faceDart: The first dart of each face. 
+        faceParents: For each pass, the array of the parent face (in the 
+            previous level) of each face. 
+        subdartLevels: For each pass, the pair (start, subdarts) of arrays: the 
+            darts of the next level along dart d are subdarts[start[d]:start[d + 1]].
+        dartLevels: The (dartOrigin, dartNext, dartTwin, dartFace) of the 
+            previous levels. 
+        edgeDartLevels, faceTypeLevels, faceDartLevels, vertexCountLevels: The 
+            edgeDart, faceType, faceDart and vertexCount of the previous levels. 
+        points: The (vertexCount, d) array of the vertex coordinates, or None 
+            without geometry. 
+        pointClass: The class of the prototile's points (such as PointE2), made
+            from the coordinates as pointClass(*row). 
+    """
+    
+    def __init__(self, tilingRules, initialTileType):
+        self.tilingRules = tilingRules
+        self.tileTypes = list(tilingRules.prototiles)
+        prototile = tilingRules.getPrototile(initialTileType)
+        k = len(prototile.tileVerts)
+        
+        # The tile's darts 0, ..., k - 1 and the outer face's darts k, ..., 2k - 1,
+        # numbered as in generateCycle
+        self.vertexCount = k
+        inner = np.arange(k)
+        self.dartOrigin = np.concatenate((inner, (k - inner) % k))
+        self.dartNext = np.concatenate(((inner + 1) % k, k + (inner + 1) % k))
+        self.dartTwin = np.concatenate((2 * k - 1 - inner, k - 1 - inner))
+        self.dartFace = np.concatenate((np.zeros(k, dtype = np.int64), np.full(k, -1)))
+        self.edgeDart = inner
+        self.faceType = np.array([self.tileTypes.index(initialTileType)])
+        self.faceDart = np.array([0])
+        self.faceParents = []
+        self.subdartLevels = []
+        self.dartLevels = []
+        self.edgeDartLevels = []
+        self.faceTypeLevels = []
+        self.faceDartLevels = []
+        self.vertexCountLevels = []
+        if prototile.tileData != []:
+            self.pointClass = type(prototile.tileData[0])
+            self.points = np.array([tuple(p) for p in prototile.tileData], dtype = float)
+        else:
+            self.pointClass = None
+            self.points = None
+    
+    @property
+    def faceCount(self):
+        return len(self.faceType)
+    
+    @property
+    def level(self):
+        """The subdivision level, 1 for the initial tile."""
+        return len(self.faceParents) + 1
+    
+    def point(self, v):
+        """The point of vertex v, or None if it has none."""
+        if self.points is None or np.isnan(self.points[v, 0]):
+            return None
+        return self.pointClass(*self.points[v].tolist())
+    
+    def levelArrays(self, level):
+        """Returns (vertexCount, dartOrigin, dartNext, dartTwin, dartFace, 
+        edgeDart, faceType, faceDart) for a level, from 1 to self.level."""
+        if level == self.level:
+            return (self.vertexCount, self.dartOrigin, self.dartNext, self.dartTwin, self.dartFace, 
+                    self.edgeDart, self.faceType, self.faceDart)
+        k = level - 1
+        return ((self.vertexCountLevels[k],) + self.dartLevels[k] 
+                + (self.edgeDartLevels[k], self.faceTypeLevels[k], self.faceDartLevels[k]))
+    
+    def describes(self, tiling):
+        """Whether tiling has the level, vertex, dart, edge and face counts of 
+        the arrays (as it does unless it was changed after toTiling)."""
+        if tiling.objectsPending:
+            return tiling.tilingArrays is self and tiling.subdivisionLevel == self.level
+        return (tiling.subdivisionLevel == self.level 
+                and len(tiling.verts) == self.vertexCount
+                and len(tiling.darts) == len(self.dartOrigin)
+                and len(tiling.edges) == len(self.edgeDart)
+                and len(tiling.faces) == self.faceCount + 1)
+    
+    def setPoints(self, verts):
+        """Copies the points of the vertices verts (numbered as the arrays) into
+        the coordinates, so that a pass starts from any points moved since."""
+        if self.points is None:
+            return
+        unplaced = (math.nan,) * self.points.shape[1]
+        self.points = np.array([tuple(v.point) if hasattr(v, "point") else unplaced for v in verts], 
+                               dtype = float).reshape(-1, self.points.shape[1])
+    
+    def toTiling(self):
+        """Returns the Tiling of all the levels, a view of the arrays whose 
+        objects are made when first used (see Tiling), with the objects and 
+        links of the object pass of tilingPass, numbered as the arrays. The 
+        Tiling keeps the arrays (as tiling.tilingArrays) for tilingPass."""
+        tiling = Tiling()
+        tiling.tilingArrays = self
+        tiling.subdivisionLevel = self.level
+        tiling.objectsPending = True
+        return tiling
+
+def _ranges(starts, counts, step = 1):
+    """The concatenation of the ranges starts[i], starts[i] + step, ... of 
+    counts[i] entries each."""
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + step * offsets
+
+def _addInitialLevel(tiling, tilingArrays):
+    """Makes the objects of the initial tile of tilingArrays in an empty tiling, 
+    as Tiling.generateCycle does."""
+    ta = tilingArrays
+    tileType = ta.tileTypes[ta.levelArrays(1)[6][0]]
+    names = ta.tilingRules.getPrototile(tileType).tileVerts
+    n = len(names)
+    verts = [TilingVertex(tiling, data = name) for name in names]
+    tiling.outerFace = Tile(tiling)
+    tile = Tile(tiling, tileType)
+    inner = [tiling.Dart(dcel = tiling, origin = v, face = tile) for v in verts]
+    for i in range(n):
+        inner[i - 1].makeNext(inner[i])
+    outer = [tiling.Dart(dcel = tiling, origin = verts[(n - i) % n], face = tiling.outerFace) for i in range(n)]
+    for i in range(n):
+        outer[i - 1].makeNext(outer[i])
+    for i in range(n):
+        inner[i].makeTwin(outer[n - i - 1])
+    tile.aDart = inner[0]
+    tiling.outerFace.aDart = outer[0]
+    for dart in inner:
+        dart.createEdge()
+    for v, vertex in enumerate(verts):
+        p = ta.point(v)
+        if p is not None:
+            vertex.point = p
+
+def _addArrayLevel(tiling, tilingArrays, level):
+    """Makes the objects of a level of tilingArrays, level - 1 being the last 
+    level of tiling, and adds them to tiling as the object pass would."""
+    ta = tilingArrays
+    vertexCount, origin, nxt, twin, face, edgeDart, faceType, faceDart = ta.levelArrays(level)
+    parentTypes = ta.levelArrays(level - 1)[6].tolist()
+    parents = ta.faceParents[level - 2]
+    start, subdarts = ta.subdartLevels[level - 2]
+    templates = [ta.tilingRules.getPrototile(t).template() for t in ta.tileTypes]
+    
+    oldDarts, oldEdges, oldFaces = tiling.addLevel()
+    oldOuterFace = oldFaces[0]
+    
+    for v in range(len(tiling.verts), vertexCount):
+        vertex = TilingVertex(tiling)
+        p = ta.point(v)
+        if p is not None:
+            vertex.point = p
+    verts = tiling.verts
+    
+    # The tiles, each the subtile of its parent numbered from the parent's first
+    firstSubtile = np.searchsorted(parents, np.arange(len(oldFaces) - 1)).tolist()
+    for f, (t, p) in enumerate(zip(faceType.tolist(), parents.tolist())):
+        tile = Tile(tiling, ta.tileTypes[t])
+        tile.name = templates[parentTypes[p]].subtileNames[f - firstSubtile[p]]
+        tile.parent = oldFaces[p + 1]
+        tile.parent.subtiles.append(tile)
+    faces = tiling.faces # The outer face first
+    
+    darts = [tiling.Dart(dcel = tiling) for _ in range(len(origin))]
+    for dart, o, n, t, f in zip(darts, origin.tolist(), nxt.tolist(), twin.tolist(), face.tolist()):
+        dart.origin = verts[o]
+        dart.face = faces[f + 1]
+        dart.makeNext(darts[n])
+        dart.twin = darts[t]
+    
+    # The darts of the tiles are named by their parent's template
+    inner = np.nonzero(face >= 0)[0]
+    innerParents = parents[face[inner]]
+    blockStart = faceDart[np.array(firstSubtile, dtype = np.int64)[innerParents]]
+    for d, p, i in zip(inner.tolist(), innerParents.tolist(), (inner - blockStart).tolist()):
+        darts[d].name = templates[parentTypes[p]].dartNames[i][0]
+        darts[d].parent = None
+    
+    subdarts = subdarts.tolist()
+    start = start.tolist()
+    for d, oldDart in enumerate(oldDarts):
+        oldDart.subdarts = [darts[c] for c in subdarts[start[d]:start[d + 1]]]
+        oldDart.splitVertices = [subdart.origin for subdart in oldDart.subdarts[1:]]
+        if oldDart.face is not oldOuterFace:
+            for subdart in oldDart.subdarts:
+                subdart.parent = oldDart
+    
+    # Each dart's edge is the last one made for it or its twin
+    for d in edgeDart.tolist():
+        tiling.Edge(tiling, darts[d])
+    edgeOf = np.full(len(darts), -1, dtype = np.int64)
+    np.maximum.at(edgeOf, edgeDart, np.arange(len(edgeDart)))
+    np.maximum.at(edgeOf, twin[edgeDart], np.arange(len(edgeDart)))
+    edges = tiling.edges
+    for dart, e in zip(darts, edgeOf.tolist()):
+        dart.edge = edges[e]
+    
+    for tile, d in zip(faces[1:], faceDart.tolist()):
+        tile.aDart = darts[d]
+    tiling.outerFace.aDart = darts[int(np.argmax(face < 0))]
+    lastOut = np.full(vertexCount, -1, dtype = np.int64)
+    np.maximum.at(lastOut, origin, np.arange(len(origin)))
+    for vertex, d in zip(verts, lastOut.tolist()):
+        vertex.aDart = darts[d]
+
+def arrayTilingPass(tilingArrays):
+    """Subdivides every tile of a TilingArrays (see the notes above)."""
+    ta = tilingArrays
+    rules = ta.tilingRules
+    ta.tileTypes += [t for t in rules.prototiles if t not in ta.tileTypes]
+    templates = [rules.getPrototile(t).template() for t in ta.tileTypes]
+    typeIndex = dict([(ta.tileTypes[i], i) for i in range(len(ta.tileTypes))])
+    nD, nF = len(ta.dartOrigin), len(ta.faceType)
+    origin, nxt, twin, face = ta.dartOrigin, ta.dartNext, ta.dartTwin, ta.dartFace
+    
+    # The darts of each tile in prototile order, by type
+    groups = []
+    for t, template in enumerate(templates):
+        faces = np.nonzero(ta.faceType == t)[0]
+        if len(faces) == 0:
+            continue
+        parentDarts = np.empty((len(faces), template.cornerCount), dtype = np.int64)
+        d = ta.faceDart[faces]
+        for i in range(template.cornerCount):
+            parentDarts[:, i] = d
+            d = nxt[d]
+        if np.any(d != ta.faceDart[faces]):
+            raise PrototileFormationError(f"A tile of type {ta.tileTypes[t]} does not have {template.cornerCount} vertices.")
+        groups.append((template, faces, parentDarts))
+    
+    # The number of new vertices on each dart's edge, from either side
+    splitCount = np.full(nD, -1, dtype = np.int64)
+    for template, faces, parentDarts in groups:
+        for i in range(template.cornerCount):
+            splitCount[parentDarts[:, i]] = len(template.splitVertices[i])
+    outer = face < 0
+    splitCount[outer] = splitCount[twin[outer]]
+    bad = np.nonzero(splitCount != splitCount[twin])[0]
+    if len(bad) > 0:
+        d = int(bad[0])
+        raise PrototileFormationError(f"An edge of a {ta.tileTypes[ta.faceType[face[d]]]} prototile is matched with an edge of a {ta.tileTypes[ta.faceType[face[twin[d]]]]} prototile at level {len(ta.faceParents) + 1}, but these do not split consistently.")
+    
+    # New vertex ids in the order tilingPass makes the vertices: tile by tile, 
+    # those of each edge when the first of its tiles is reached (numbered along
+    # that tile's dart, the edge's owner), then those inside the tile
+    corner = np.zeros(nD, dtype = np.int64)
+    for template, faces, parentDarts in groups:
+        corner[parentDarts] = np.arange(template.cornerCount)
+    K = max(template.cornerCount for template, _, _ in groups)
+    key = np.where(outer, np.iinfo(np.int64).max, face * K + corner)
+    owner = key < key[twin]
+    vertexSlots = np.zeros((nF, K + 1), dtype = np.int64)
+    vertexSlots[face[owner], corner[owner]] = splitCount[owner]
+    vertexSlots[:, K] = np.array([len(template.newVertices) for template in templates])[ta.faceType]
+    base = ta.vertexCount + (np.cumsum(vertexSlots) - vertexSlots.ravel()).reshape(nF, K + 1)
+    edgeBase = np.zeros(nD, dtype = np.int64)
+    edgeBase[owner] = base[face[owner], corner[owner]]
+    edgeBase[twin[owner]] = edgeBase[owner]
+    vertexCount = ta.vertexCount + int(vertexSlots.sum())
+    
+    # New face ids in parent order, new dart ids in blocks by parent, then the
+    # outer face's darts
+    subtileCounts = np.array([len(template.subtileTypes) for template in templates])[ta.faceType]
+    faceBase = np.cumsum(subtileCounts) - subtileCounts
+    newFaceCount = int(subtileCounts.sum())
+    newFaceType = np.empty(newFaceCount, dtype = np.int64)
+    newFaceDart = np.empty(newFaceCount, dtype = np.int64)
+    newFaceParent = np.repeat(np.arange(nF), subtileCounts)
+    
+    # Each parent dart's child darts along its edge, at childStart[d] + r
+    childCount = splitCount + 1
+    childStart = np.cumsum(childCount) - childCount
+    childDarts = np.empty(int(childCount.sum()), dtype = np.int64)
+    
+    tileDartCounts = np.array([len(template.dartOrigin) for template in templates])[ta.faceType]
+    tileDartBase = np.cumsum(tileDartCounts) - tileDartCounts
+    innerDartCount = int(tileDartCounts.sum())
+    outerDarts = np.nonzero(outer)[0]
+    dartTotal = innerDartCount + int(childCount[outerDarts].sum())
+    newOrigin = np.empty(dartTotal, dtype = np.int64)
+    newNext = np.empty(dartTotal, dtype = np.int64)
+    newTwin = np.full(dartTotal, -1, dtype = np.int64)
+    newFace = np.empty(dartTotal, dtype = np.int64)
+    
+    localVertexIds = []
+    for template, faces, parentDarts in groups:
+        m, D = len(faces), len(template.dartOrigin)
+        # The ids of the local vertices of every tile of the type
+        ids = np.empty((m, len(template.vertexNames)), dtype = np.int64)
+        ids[:, :template.cornerCount] = origin[parentDarts]
+        for i in range(template.cornerCount):
+            d = parentDarts[:, i]
+            s = len(template.splitVertices[i])
+            forward = owner[d][:, None]
+            r = np.arange(s)
+            ids[:, template.splitVertices[i]] = edgeBase[d][:, None] + np.where(forward, r, s - 1 - r)
+        ids[:, template.newVertices] = base[faces, K][:, None] + np.arange(len(template.newVertices))
+        localVertexIds.append(ids)
+        
+        block = tileDartBase[faces][:, None]
+        darts = block + np.arange(D)
+        localTwin = np.array([-1 if onEdge else j for j, onEdge in zip(template.dartTwin, template.onEdge)])
+        newOrigin[darts] = ids[:, template.dartOrigin]
+        newNext[darts] = block + template.dartNext
+        newTwin[darts] = np.where(localTwin >= 0, block + localTwin, -1)
+        newFace[darts] = faceBase[faces][:, None] + template.dartFace
+        
+        subtileFaces = faceBase[faces][:, None] + np.arange(len(template.subtileTypes))
+        newFaceType[subtileFaces] = [typeIndex[t] for t in template.subtileTypes]
+        newFaceDart[subtileFaces] = block + template.subtileFirstDart
+        for i in range(template.cornerCount):
+            slots = childStart[parentDarts[:, i]][:, None] + np.arange(len(template.edgeDarts[i]))
+            childDarts[slots] = block + template.edgeDarts[i]
+    dartBase = innerDartCount
+    
+    # The outer face's darts are split to match
+    counts = childCount[outerDarts]
+    outerChildren = np.repeat(childStart[outerDarts] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    childDarts[outerChildren] = np.arange(dartBase, dartTotal)
+    
+    # Stitch child r of each parent dart to child L - 1 - r of its twin
+    childParent = np.repeat(np.arange(nD), childCount)
+    r = np.arange(len(childDarts)) - childStart[childParent]
+    partner = childStart[twin[childParent]] + childCount[childParent] - 1 - r
+    newTwin[childDarts] = childDarts[partner]
+    
+    # The outer darts start where their twins end and run along the old outer face
+    outerNew = childDarts[outerChildren]
+    newOrigin[outerNew] = newOrigin[newNext[newTwin[outerNew]]]
+    newFace[outerNew] = -1
+    outerOwner, outerR = childParent[outerChildren], r[outerChildren]
+    last = outerR == childCount[outerOwner] - 1
+    newNext[outerNew] = np.where(last, childDarts[childStart[nxt[outerOwner]]], childDarts[np.minimum(outerChildren + 1, len(childDarts) - 1)])
+    
+    # The edges in the order tilingPass makes them: those of the paired darts of
+    # each tile (a pair on the tile's boundary too, whose darts the stitching 
+    # then gives another edge), then those along the old inner edges in order, 
+    # then those along the old outer face
+    pairCounts = np.array([len(template.pairedDarts) for template in templates])[ta.faceType]
+    pairBase = np.cumsum(pairCounts) - pairCounts
+    pairEdges = np.empty(int(pairCounts.sum()), dtype = np.int64)
+    for template, faces, parentDarts in groups:
+        pairEdges[pairBase[faces][:, None] + np.arange(len(template.pairedDarts))] = (
+            tileDartBase[faces][:, None] + np.array(template.pairedDarts, dtype = np.int64))
+    inner = ta.edgeDart[(face[ta.edgeDart] >= 0) & (face[twin[ta.edgeDart]] >= 0)]
+    innerEdges = childDarts[_ranges(childStart[inner], childCount[inner])]
+    outerTwins = twin[outerDarts]
+    outerEdges = childDarts[_ranges(childStart[outerTwins] + childCount[outerTwins] - 1, childCount[outerTwins], -1)]
+    newEdgeDart = np.concatenate((pairEdges, innerEdges, outerEdges))
+    
+    # Geometry: the new vertices of each edge are placed by the tile that owns 
+    # it, as in tilingPass, then those inside the tiles
+    if ta.points is not None:
+        coordinates = np.full((vertexCount, ta.points.shape[1]), math.nan)
+        coordinates[:ta.vertexCount] = ta.points
+        def pointOf(v):
+            return None if np.isnan(coordinates[v, 0]) else ta.pointClass(*coordinates[v].tolist())
+        for template, faces, parentDarts in groups:
+            prototile = rules.getPrototile(template.tileType)
+            for i in range(template.cornerCount):
+                fn = prototile.splitFn.get(template.vertexNames[i])
+                d = parentDarts[:, i]
+                d = d[owner[d]]
+                if fn is None or len(d) == 0:
+                    continue
+                if fn is midp:
+                    coordinates[edgeBase[d]] = (coordinates[origin[d]] + coordinates[origin[nxt[d]]]) / 2
+                    continue
+                names = [template.vertexNames[v] for v in template.splitVertices[i]]
+                for o, t, b in zip(origin[d].tolist(), origin[nxt[d]].tolist(), edgeBase[d].tolist()):
+                    dart = _LazyDart(_LazyVertex(template.vertexNames[i], pointOf(o)), 
+                                     _LazyVertex(None, pointOf(t)))
+                    dart.splitVertices = [_LazyVertex(name) for name in names]
+                    fn(dart)
+                    for j, v in enumerate(dart.splitVertices):
+                        if v.point is not None:
+                            coordinates[b + j] = tuple(v.point)
+        for (template, faces, parentDarts), ids in zip(groups, localVertexIds):
+            prototile = rules.getPrototile(template.tileType)
+            fn = prototile.newVertFnHandler
+            if fn is None:
+                continue
+            newNames = list(enumerate(template.vertexNames))[template.cornerCount:]
+            if prototile.newVertFnArrays:
+                named = dict((name, coordinates[ids[:, j]]) for j, name in enumerate(template.vertexNames))
+                fn(named)
+                for j, name in newNames:
+                    coordinates[ids[:, j]] = named[name]
+                continue
+            for tileIds in ids.tolist():
+                stand = dict((name, _LazyVertex(name, pointOf(v))) for name, v in zip(template.vertexNames, tileIds))
+                fn(stand)
+                for j, name in newNames:
+                    if stand[name].point is not None:
+                        coordinates[tileIds[j]] = tuple(stand[name].point)
+        # Vertices that no function placed keep NaN coordinates (and no point)
+        ta.points = coordinates
+    
+    ta.vertexCountLevels.append(ta.vertexCount)
+    ta.dartLevels.append((ta.dartOrigin, ta.dartNext, ta.dartTwin, ta.dartFace))
+    ta.edgeDartLevels.append(ta.edgeDart)
+    ta.faceTypeLevels.append(ta.faceType)
+    ta.faceDartLevels.append(ta.faceDart)
+    ta.faceParents.append(newFaceParent)
+    ta.subdartLevels.append((np.append(childStart, len(childDarts)), childDarts))
+    ta.vertexCount = vertexCount
+    ta.dartOrigin, ta.dartNext, ta.dartTwin, ta.dartFace = newOrigin, newNext, newTwin, newFace
+    ta.edgeDart = newEdgeDart
+    ta.faceType, ta.faceDart = newFaceType, newFaceDart
+
+#####
+# Lazy subdivision
+#
+# generateTiling subdivides every tile at every level and keeps all the levels, 
+# so its size grows exponentially with the depth. A LazyTiling instead keeps the
+# hierarchy of tiles as a tree whose nodes (LazyTile objects) are subdivided 
+# only when a query reaches them: tiles(depth, region, predicate) walks down 
+# from the initial tile through the tiles that meet the region (and satisfy the
+# predicate), so only the ancestors of the tiles near the region of interest 
+# are ever subdivided. 
+#
+# The subdivided tiles are kept in a least recently used cache. When it holds 
+# more than maxCachedTiles tiles, the subtiles of the tiles that were used 
+# longest ago are dropped; they are recomputed (as new LazyTile objects) if a 
+# later query needs them again. Parents are always used after their subtiles, 
+# so a tile is dropped only after everything below it. 
+#
+# The tiles are not stitched together into a DCEL. Each tile computes the new 
+# vertices of its own edges, with the split functions and new vertex handlers 
+# of its prototile applied to stand-ins for the vertices and darts (with .point
+# and .splitVertices attributes), so split functions should only depend on the 
+# endpoints of the edge, as midp does. 
+#####
+
+class _LazyVertex:
+    def __init__(self, name, point = None):
+        self.data = name
+        self.point = point
+
+class _LazyDart:
+    def __init__(self, origin, dest):
+        self.origin = origin
+        self.dest = dest
+        self.splitVertices = []
+
+class LazyTile:
+    """A tile of a LazyTiling. 
+    
+    Attributes:
+        tileType: The type of the prototile. 
+        points: The points of the vertices, in the order of the prototile's
+            vertex names (None for tilings without geometry). 
+        parent: The tile this one is a subtile of (None for the initial tile). 
+        depth: The number of subdivisions that produced this tile. 
+        name: The vertex names of the tile in its parent's subdivision rule. 
+    """
+    
+    __slots__ = ("tileType", "points", "parent", "depth", "name", "subtiles")
+    
+    def __init__(self, tileType, points, parent = None, name = None):
+        self.tileType = tileType
+        self.points = points
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.name = name
+        self.subtiles = None # Filled in by LazyTiling.subtilesOf
+    
+    def boundingBox(self):
+        """Returns (minx, miny, maxx, maxy) for the points of the tile. Raises a 
+        ValueError if a vertex of the tile has no point."""
+        if any(p is None for p in self.points):
+            raise ValueError(f"A {self.tileType} tile at depth {self.depth} has vertices without points, "
+                             + "so it has no bounding box; the prototiles need geometry to query a region.")
+        xs = [p.x for p in self.points]
+        ys = [p.y for p in self.points]
+        return min(xs), min(ys), max(xs), max(ys)
+    
+    def polygon(self):
+        from koebe.geometries.euclidean2 import PolygonE2
+        return PolygonE2(list(self.points))
+    
+    def ancestors(self):
+        """Returns the list of the tiles containing this one, parent first."""
+        result = []
+        tile = self.parent
+        while tile is not None:
+            result.append(tile)
+            tile = tile.parent
+        return result
+
+class LazyTiling:
+    """A subdivision tiling whose tiles are only subdivided on demand (see the 
+    notes above). 
+    
+    Use should be:
+    
+        lazy = rules.generateLazyTiling("chair")
+        tiles = lazy.tiles(12, region = (0.5, 0.5, 0.6, 0.6))
+    
+    Attributes:
+        tilingRules: The TilingRules. 
+        root: The initial LazyTile. 
+        maxCachedTiles: The number of subdivided tiles to keep. 
+    """
+    
+    def __init__(self, tilingRules, initialTileType, maxCachedTiles = 100000):
+        from collections import OrderedDict
+        prototile = tilingRules.getPrototile(initialTileType)
+        points = (list(prototile.tileData) if prototile.tileData != [] 
+                  else [None] * len(prototile.tileVerts))
+        self.tilingRules = tilingRules
+        self.root = LazyTile(initialTileType, points)
+        self.maxCachedTiles = maxCachedTiles
+        self._subdivided = OrderedDict() # Subdivided tiles, least recently used first
+    
+    def __len__(self):
+        """The number of subdivided tiles in the cache."""
+        return len(self._subdivided)
+    
+    def subtilesOf(self, tile):
+        """Returns the subtiles of tile, subdividing it if it is not cached."""
+        if tile.subtiles is None:
+            tile.subtiles = self._subdivide(tile)
+        self._subdivided[tile] = None
+        self._subdivided.move_to_end(tile)
+        return tile.subtiles
+    
+    def _subdivide(self, tile):
+        prototile = self.tilingRules.getPrototile(tile.tileType)
+        template = prototile.template()
+        k = template.cornerCount
+        verts = ([_LazyVertex(name, p) for name, p in zip(template.vertexNames, tile.points)] 
+                 + [_LazyVertex(name) for name in template.vertexNames[k:]])
+        
+        # The new vertices on the edges, then the other new vertices
+        for i in range(k):
+            fn = prototile.splitFn.get(template.vertexNames[i])
+            if fn is not None:
+                dart = _LazyDart(verts[i], verts[(i + 1) % k])
+                dart.splitVertices = [verts[v] for v in template.splitVertices[i]]
+                fn(dart)
+        if prototile.newVertFnHandler:
+            _newVertexHandler(prototile, dict(zip(template.vertexNames, verts)))
+        
+        return [LazyTile(subtileType, [verts[template.dartOrigin[d]].point for d in range(first, first + len(names))], 
+                         tile, names)
+                for subtileType, names, first in zip(template.subtileTypes, template.subtileNames, template.subtileFirstDart)]
+    
+    def tiles(self, depth, region = None, predicate = None):
+        """Returns the tiles at the given depth that meet region and satisfy 
+        predicate, as do all their ancestors. Only those ancestors are 
+        subdivided. 
+        
+        Args:
+            depth: The number of subdivisions. 
+            region: OPTIONAL (minx, miny, maxx, maxy). Tiles whose bounding box 
+                misses it are skipped, along with everything inside them. The 
+                tiles need points for this (a ValueError is raised otherwise). 
+            predicate: OPTIONAL (LazyTile) -> bool. Tiles for which it is false are
+                skipped, along with everything inside them. 
+        
+        Returns:
+            The list of LazyTile objects, in the order of the subdivision rules. 
+        """
+        def wanted(tile):
+            if region is not None:
+                minx, miny, maxx, maxy = tile.boundingBox()
+                if maxx < region[0] or minx > region[2] or maxy < region[1] or miny > region[3]:
+                    return False
+            return predicate is None or predicate(tile)
+        
+        result = []
+        def collect(tile):
+            if not wanted(tile):
+                return
+            if tile.depth == depth:
+                result.append(tile)
+                return
+            for subtile in self.subtilesOf(tile):
+                collect(subtile)
+            # Used after its subtiles, so it outlives them in the cache
+            self._subdivided.move_to_end(tile)
+        
+        collect(self.root)
+        self.trim()
+        return result
+    
+    def trim(self, maxCachedTiles = None):
+        """Drops the subtiles of the least recently used tiles until at most 
+        maxCachedTiles (default self.maxCachedTiles) subdivided tiles are left."""
+        limit = self.maxCachedTiles if maxCachedTiles is None else maxCachedTiles
+        while len(self._subdivided) > limit:
+            tile, _ = self._subdivided.popitem(last = False)
+            tile.subtiles = None
         
 def TilingViewer(packing, showCirclePacking = True, showTriangulation = True, size=(600,600)):
     import random
@@ -418,22 +1242,44 @@ def TilingViewer(packing, showCirclePacking = True, showTriangulation = True, si
     return viewer
 
 
-def generateCirclePackingLayout(tiling, centerDartIdx = -1):
+def generateCirclePackingLayout(tiling, centerDartIdx = -1, hierarchical = False, num_passes = 1000, 
+                                tolerance = None):
+    """Circle packs the star triangulation of the tiling's tiles (see 
+    TilingPackings for hierarchical = True, which packs the levels coarse to 
+    fine and keeps them on the tiling for the next call). 
+    
+    By default the packing from scratch uses maximalPacking's tolerance, 3e-10.
+    It is below the error at which repack stops adjusting a vertex 
+    (hypPacker.OKERR), so all num_passes passes run. The hierarchical mode 
+    defaults to OKERR, which its warm-started levels reach early. Pass the same
+    tolerance to compare the two. 
+    """
+    if hierarchical:
+        if tolerance is None:
+            from koebe.algorithms.hypPacker import OKERR
+            tolerance = OKERR
+        packings = getattr(tiling, "packings", None)
+        if (packings is None or (packings.centerDartIdx, packings.num_passes, packings.tolerance) 
+                                != (centerDartIdx, num_passes, tolerance)):
+            tiling.packings = TilingPackings(tiling, centerDartIdx = centerDartIdx, num_passes = num_passes, 
+                                             tolerance = tolerance)
+        return tiling.packings.layout()
+
     # To circle pack we will have to triangulate each face, which adds
     # a new vertex for each face. We store the current vertex count
     # so we can distinguish between these new vertices and the originals
     # by index (index >= tile_vertex_count will be a triangulation
     # vertex)
-    tile_vertex_count = len(tiling.verts)
-    original_tiling = tiling
-    duplicate_tiling = tiling.duplicate()
+    duplicate_tiling = tilingLevel(tiling, tiling.subdivisionLevel)
+    tile_vertex_count = len(duplicate_tiling.verts)
     starTriangulateAllFaces(duplicate_tiling)
 
     # Do the hyperbolic maximal circle packing
     from koebe.algorithms.hypPacker import maximalPacking
     packing, _ = maximalPacking(
         duplicate_tiling, 
-        num_passes=1000,
+        num_passes=num_passes,
+        tolerance=3e-10 if tolerance is None else tolerance,
         centerDartIdx=centerDartIdx
     )
 
@@ -445,6 +1291,271 @@ def generateCirclePackingLayout(tiling, centerDartIdx = -1):
     
     return packing, duplicate_tiling
 
+#####
+# Hierarchical circle packing
+#
+# generateCirclePackingLayout packs the last level of a tiling from scratch, 
+# with every circle starting at the same radius. A TilingPackings packs the 
+# levels coarse to fine instead, and starts the circles of each level from the
+# packing of the level before: 
+#
+#   * a vertex that already existed keeps its circle's Euclidean center, 
+#   * a new vertex starts among the face circles (of the star triangulation) 
+#     of its tiles' parents, and a new face circle among its tile's vertices, 
+#   * the new centers are smoothed towards their neighbors' (along the 
+#     boundary for boundary vertices), 
+#   * and the radii are those that make the circles about these centers as 
+#     nearly tangent as they can be (exactly the packing's radii, were the 
+#     centers a packing's). 
+#
+# The repacking then starts from a much smaller error. The packing of each 
+# level is kept, so stepping between depths, or packing again after another 
+# tilingPass, only packs the levels that are new. 
+#####
+
+def tilingLevel(tiling, level):
+    """Copies one level of a tiling, as a Tiling with that level only. 
+    
+    Args:
+        tiling: A Tiling. 
+        level: The level, from 1 (the initial tile) to tiling.subdivisionLevel. 
+    
+    Returns:
+        A Tiling whose vertices are the vertices of tiling with v.level <= level,
+        in order and with the same data, and whose faces are the tiles of the 
+        level (with their tileType), outer face first. 
+    """
+    if not 1 <= level <= tiling.subdivisionLevel:
+        raise ValueError(f"The tiling has no level {level}")
+    tilingArrays = tiling.tilingArrays
+    if tilingArrays is not None and tilingArrays.describes(tiling):
+        return _arrayTilingLevel(tilingArrays, level)
+    if level == tiling.subdivisionLevel:
+        darts, edges, faces, outerFace = tiling.darts, tiling.edges, tiling.faces, tiling.outerFace
+    else:
+        darts, edges, faces = tiling.dartLevels[level - 1], tiling.edgeLevels[level - 1], tiling.faceLevels[level - 1]
+        outerFace = faces[0]
+    
+    copy = Tiling()
+    o2n = dict()
+    for v in tiling.verts:
+        if v.level <= level:
+            o2n[v] = copy.Vertex(copy, data = v.data)
+            o2n[v].level = v.level
+    for d in darts:
+        o2n[d] = copy.Dart(copy, data = d.data)
+    for e in edges:
+        o2n[e] = copy.Edge(copy, data = e.data)
+    for f in faces:
+        o2n[f] = copy.Face(copy, tileType = f.tileType, data = f.data)
+    
+    for d in darts:
+        newDart = o2n[d]
+        newDart.edge, newDart.origin, newDart.face = o2n[d.edge], o2n[d.origin], o2n[d.face]
+        newDart.prev, newDart.next, newDart.twin = o2n[d.prev], o2n[d.next], o2n[d.twin]
+        newDart.origin.aDart = newDart
+    for e in edges:
+        o2n[e].aDart = o2n[e.aDart]
+    for f in faces:
+        o2n[f].aDart = o2n[f.aDart]
+    copy.outerFace = o2n[outerFace]
+    return copy
+
+def _arrayTilingLevel(tilingArrays, level):
+    """tilingLevel made from the arrays, without the tiling's objects."""
+    ta = tilingArrays
+    vertexCount, origin, nxt, twin, face, edgeDart, faceType, faceDart = ta.levelArrays(level)
+    names = ta.tilingRules.getPrototile(ta.tileTypes[ta.levelArrays(1)[6][0]]).tileVerts
+    levelOf = np.searchsorted(np.array(ta.vertexCountLevels + [ta.vertexCount]), np.arange(vertexCount), side = "right") + 1
+    
+    copy = Tiling()
+    verts = [copy.Vertex(copy, data = names[v] if v < len(names) else None) for v in range(vertexCount)]
+    for vertex, k in zip(verts, levelOf.tolist()):
+        vertex.level = k
+    darts = [copy.Dart(copy) for _ in range(len(origin))]
+    edges = [copy.Edge(copy, aDart = darts[d]) for d in edgeDart.tolist()]
+    faces = [copy.Face(copy)] + [copy.Face(copy, tileType = ta.tileTypes[t]) for t in faceType.tolist()]
+    
+    # Each dart's edge is the last one made for it or its twin, as in _addArrayLevel
+    edgeOf = np.full(len(darts), -1, dtype = np.int64)
+    np.maximum.at(edgeOf, edgeDart, np.arange(len(edgeDart)))
+    np.maximum.at(edgeOf, twin[edgeDart], np.arange(len(edgeDart)))
+    for dart, o, n, t, f, e in zip(darts, origin.tolist(), nxt.tolist(), twin.tolist(), face.tolist(), edgeOf.tolist()):
+        dart.origin, dart.face, dart.twin, dart.edge = verts[o], faces[f + 1], darts[t], edges[e]
+        dart.makeNext(darts[n])
+        dart.origin.aDart = dart
+    for tile, d in zip(faces[1:], faceDart.tolist()):
+        tile.aDart = darts[d]
+    copy.outerFace = faces[0]
+    copy.outerFace.aDart = darts[int(np.argmax(face < 0))]
+    return copy
+
+def _tileParents(tiling, level):
+    """The index of the parent (in level - 1) of each inner tile of a level."""
+    tilingArrays = tiling.tilingArrays
+    if tilingArrays is not None and tilingArrays.describes(tiling):
+        return tilingArrays.faceParents[level - 2]
+    parentIdx = dict((tile, i) for i, tile in enumerate(_levelTiles(tiling, level - 1)))
+    return np.array([parentIdx[tile.parent] for tile in _levelTiles(tiling, level)], dtype = np.int64)
+
+def _levelTiles(tiling, level):
+    """The inner tiles of a level, in order."""
+    if level == tiling.subdivisionLevel:
+        return [f for f in tiling.faces if f is not tiling.outerFace]
+    return tiling.faceLevels[level - 1][1:]
+
+class TilingPackings:
+    """Hierarchical circle packings of the levels of a tiling (see the notes 
+    above). 
+    
+    Use should be:
+    
+        packings = TilingPackings(tiling)
+        packing, triangulation = packings.layout()      # the last level
+        packing, triangulation = packings.layout(3)     # level 3, already packed
+    
+    Attributes:
+        tiling: The Tiling. 
+        centerDartIdx: The dart placed at the origin in every level's layout 
+            (see maximalPacking). 
+        num_passes: The maximum number of repacking passes per level. 
+        tolerance: The average angle sum error to repack each level to, 
+            hypPacker.OKERR (1e-9) by default (see generateCirclePackingLayout). 
+        passes: The number of repacking passes each packed level took, by level. 
+    """
+    
+    def __init__(self, tiling, centerDartIdx = -1, num_passes = 1000, tolerance = 1e-9):
+        self.tiling = tiling
+        self.centerDartIdx = centerDartIdx
+        self.num_passes = num_passes
+        self.tolerance = tolerance
+        self.passes = dict()
+        self._layouts = dict()
+        self._circles = dict()   # level -> (Euclidean centers of the circles, number of tile vertices)
+    
+    def layout(self, level = None):
+        """Returns the pair (packing, triangulation) of generateCirclePackingLayout 
+        for a level (default: the last), packing it and the levels below it 
+        that are not packed yet."""
+        if level is None:
+            level = self.tiling.subdivisionLevel
+        if not 1 <= level <= self.tiling.subdivisionLevel:
+            raise ValueError(f"The tiling has no level {level}")
+        for k in range(1, level + 1):
+            if k not in self._layouts:
+                self._pack(k, k - 1 if k > 1 else None)
+        return self._layouts[level]
+    
+    def _pack(self, level, coarser):
+        from koebe.algorithms.hypPacker import maximalPacking, hyperbolic_circle_to_euclidean
+        
+        triangulation = tilingLevel(self.tiling, level)
+        tileVertexCount = len(triangulation.verts)
+        triangulation.markIndices()
+        tileVerts = [[v.idx for v in tile.vertices()] for tile in triangulation.faces[1:]]
+        starTriangulateAllFaces(triangulation)
+        
+        edges = _edgeArrays(triangulation)
+        initialRadii = (None if coarser is None 
+                        else self._initialRadii(coarser, tileVerts, _tileParents(self.tiling, level), tileVertexCount, edges))
+        
+        packing, self.passes[level] = maximalPacking(
+            triangulation, 
+            num_passes = self.num_passes, 
+            tolerance = self.tolerance, 
+            centerDartIdx = self.centerDartIdx, 
+            initialRadii = initialRadii
+        )
+        for vIdx in range(len(packing.verts)):
+            packing.verts[vIdx].is_tile_vertex = vIdx < tileVertexCount
+        self._layouts[level] = (packing, triangulation)
+        
+        # The Euclidean circles, to start the finer levels from
+        centers = np.zeros(len(packing.verts), dtype = complex)
+        for vIdx, v in enumerate(packing.verts):
+            if v.data is not None:
+                center, _ = hyperbolic_circle_to_euclidean(v.data.center.coord, v.data.xRadius)
+                centers[vIdx] = center.toComplex()
+        self._circles[level] = (centers, tileVertexCount)
+    
+    def _initialRadii(self, coarser, tileVerts, parents, n, edges, smoothingPasses = 40):
+        """The x-radii to start the packing of a level from, estimated from the
+        packing of the level coarser below it (see the notes above), given the 
+        vertices of each tile, the parent of each tile, and the number n of 
+        tile vertices."""
+        centers, oldCount = self._circles[coarser]
+        
+        # The vertices of each tile and the face circle of its parent (the face 
+        # circles follow the tile vertices, in the order of the tiles)
+        sizes = np.array([len(vs) for vs in tileVerts])
+        verts = np.concatenate([np.array(vs, dtype = np.int64) for vs in tileVerts])
+        faceCircles = np.repeat(oldCount + np.asarray(parents, dtype = np.int64), sizes)
+        
+        # Old vertices keep their centers, new ones start at the average of their
+        # tiles' ancestors' face circles, and each tile's face circle among its vertices
+        count = np.bincount(verts, minlength = n)
+        c = (np.bincount(verts, weights = centers[faceCircles].real, minlength = n) 
+             + 1j * np.bincount(verts, weights = centers[faceCircles].imag, minlength = n)) / count
+        c[:oldCount] = centers[:oldCount]
+        tileOf = np.repeat(np.arange(len(tileVerts)), sizes)
+        c = np.concatenate((c, (np.bincount(tileOf, weights = c[verts].real) + 1j * np.bincount(tileOf, weights = c[verts].imag)) / sizes))
+        
+        # Then the new centers are smoothed towards the averages of their neighbors
+        # in the triangulation, those on the boundary along the boundary only, with 
+        # the old ones held in place
+        i, j, onBoundary, alongBoundary = edges
+        keep = ~onBoundary[i] | alongBoundary
+        si, sj = i[keep], j[keep]
+        degree = np.bincount(si, minlength = len(c))
+        for _ in range(smoothingPasses):
+            smoothed = (np.bincount(si, weights = c[sj].real, minlength = len(c)) 
+                        + 1j * np.bincount(si, weights = c[sj].imag, minlength = len(c))) / degree
+            c[oldCount:] = smoothed[oldCount:]
+        
+        # and the radii that make the circles about them tangent as nearly as can be
+        r = _tangentRadii(c, edges)
+        
+        # The x-radii of the Euclidean circles (see euclidean_circle_to_hyperbolic)
+        a = np.minimum(np.abs(c), 1.0 - 1e-9)
+        r = np.clip(r, 1e-12, 0.9 * (1.0 - a))
+        return (4.0 * r / ((1.0 + r) ** 2 - a * a)).tolist()
+
+def _edgeArrays(triangulation):
+    """Both directions (i, j) of the edges of a triangulated disk as index 
+    arrays, which vertices are on the boundary and which directions run along it."""
+    triangulation.markIndices()
+    outer = triangulation.outerFace
+    i = np.array([e.i for e in triangulation.edges] + [e.j for e in triangulation.edges], dtype = np.int64)
+    j = np.concatenate((i[len(i) // 2:], i[:len(i) // 2]))
+    onBoundary = np.zeros(len(triangulation.verts), dtype = bool)
+    onBoundary[[v.idx for v in outer.vertices()]] = True
+    alongBoundary = np.array([e.aDart.face is outer or e.aDart.twin.face is outer for e in triangulation.edges] * 2, dtype = bool)
+    return i, j, onBoundary, alongBoundary
+
+def _tangentRadii(centers, edges, iterations = 100):
+    """The Euclidean radii r minimizing the sum of (r[i] + r[j] - |centers[i] - centers[j]|)^2 
+    over the edges, by conjugate gradients. These are the radii of the packing if
+    the centers are those of one."""
+    i, j, _, _ = edges
+    n = len(centers)
+    def apply(r):       # the normal equations' matrix: degree plus adjacency
+        return np.bincount(i, weights = r[i] + r[j], minlength = n)
+    b = np.bincount(i, weights = np.abs(centers[i] - centers[j]), minlength = n)
+    degree = np.bincount(i, minlength = n)
+    r = 0.5 * b / degree
+    residual = b - apply(r)
+    direction = residual.copy()
+    rr = residual @ residual
+    for _ in range(iterations):
+        if rr <= 1e-30 * (b @ b):
+            break
+        Ad = apply(direction)
+        step = rr / (direction @ Ad)
+        r += step * direction
+        residual -= step * Ad
+        rr, rrOld = residual @ residual, rr
+        direction = residual + (rr / rrOld) * direction
+    return r
 
 def random_fill(tile):
     import random
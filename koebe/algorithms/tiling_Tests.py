@@ -0,0 +1,335 @@
+import unittest
+
+import numpy as np
+
+from .tiling import Tiling, TilingRules, tilingPass, tilingLevel, _subdivideObjects, midp, generateCirclePackingLayout
+from koebe.geometries.euclidean2 import PointE2
+
+# The rule sets of the Tiling Examples notebook
+
+def chairRules():
+    rules = TilingRules()
+    chair = rules.createPrototile("chair", [("A", PointE2(0, 0)), ("B", PointE2(1, 0)), ("C", PointE2(2, 0)),
+                                            ("D", PointE2(2, 1)), ("E", PointE2(1, 1)), ("F", PointE2(1, 2)),
+                                            ("G", PointE2(0, 2)), ("H", PointE2(0, 1))])
+    def chair_newverts(vDict):
+        a, h, A = vDict["a"].point, vDict["h"].point, vDict["A"].point
+        e0, e1 = a - A, h - A
+        vDict["i"].point = A + 3 * e0 + e1
+        vDict["j"].point = A + 2 * e0 + e1
+        vDict["k"].point = A + e0 + e1
+        vDict["l"].point = A + e0 + 2 * e1
+        vDict["m"].point = A + e0 + 3 * e1
+    chair.addSplitEdgeRules([((u, v), (s), midp) for u, v, s in zip("ABCDEFGH", "BCDEFGHA", "abcdefgh")])
+    chair.addNewVertexRules(("i", "j", "k", "l", "m"))
+    chair.setNewVertexHandlerFn(chair_newverts)
+    chair.addSubtile("chair", ("A", "a", "B", "j", "k", "l", "H", "h"))
+    chair.addSubtile("chair", ("G", "g", "H", "l", "m", "e", "F", "f"))
+    chair.addSubtile("chair", ("k", "j", "i", "d", "E", "e", "m", "l"))
+    chair.addSubtile("chair", ("C", "c", "D", "d", "i", "j", "B", "b"))
+    return rules, "chair"
+
+def chairArrayRules():
+    """chairRules with the new vertices placed by an array-valued handler."""
+    rules, tileType = chairRules()
+    def chair_newverts(coordinates):
+        A = coordinates["A"]
+        e0, e1 = coordinates["a"] - A, coordinates["h"] - A
+        coordinates["i"] = A + 3 * e0 + e1
+        coordinates["j"] = A + 2 * e0 + e1
+        coordinates["k"] = A + e0 + e1
+        coordinates["l"] = A + e0 + 2 * e1
+        coordinates["m"] = A + e0 + 3 * e1
+    rules.getPrototile(tileType).setNewVertexHandlerFn(chair_newverts, arrays = True)
+    return rules, tileType
+
+def pentRules():
+    rules = TilingRules()
+    pent = rules.createPrototile("pent", tuple("ABCDE"))
+    pent.addSplitEdgeRules(((("A", "B"), ("a", "b")), (("B", "C"), ("c", "d")), (("C", "D"), ("e", "f")),
+                            (("D", "E"), ("g", "h")), (("E", "A"), ("i", "j"))))
+    pent.addNewVertexRules(("k"))
+    for subtile in ("Aabkj", "Bcdkb", "Cefkd", "Dghkf", "Eijkh"):
+        pent.addSubtile("pent", tuple(subtile))
+    return rules, "pent"
+
+def hexRules():
+    rules = TilingRules()
+    names = ["A_A", "B", "C", "D", "E", "F"]
+    hex = rules.createPrototile("hex", names)
+    hex.addSplitEdgeRules([((names[i], names[(i + 1) % 6]), [f"{'abcdef'[i]}{j}" for j in (1, 2, 3)]) for i in range(6)])
+    hex.addNewVertexRules(("x"))
+    for i in range(6):
+        hex.addSubtile("hex", (names[i], f"{'abcdef'[i]}1", f"{'abcdef'[i]}2", f"{'abcdef'[i]}3", "x", f"{'abcdef'[i - 1]}3"))
+    return rules, "hex"
+
+def ntileRules(N = 9):
+    rules = TilingRules()
+    ntile = rules.createPrototile("ntile", [f"V{i}" for i in range(N)])
+    ntile.addSplitEdgeRules([((f"V{i}", f"V{(i + 1) % N}"), [f"v{i}_{j}" for j in range(1, N - 2)]) for i in range(N)])
+    ntile.addNewVertexRules(("x"))
+    for i in range(N):
+        ntile.addSubtile("ntile", [f"V{i}"] + [f"v{i}_{j}" for j in range(1, N - 2)] + ["x", f"v{(i + N - 1) % N}_{N - 3}"])
+    return rules, "ntile"
+
+def multiRules():
+    rules = TilingRules()
+    t0 = rules.createPrototile("t0", tuple("AB"))
+    t1 = rules.createPrototile("t1", tuple("ABC"))
+    t2 = rules.createPrototile("t2", tuple("ABCDEF"))
+    t3 = rules.createPrototile("t3", tuple("ABCD"))
+    t1.addSplitEdgeRules(((("A", "B"), ("a1", "a2")), (("B", "C"), ("b")), (("C", "A"), ("c"))))
+    t2.addSplitEdgeRules(((("A", "B"), ("a1", "a2")), (("B", "C"), ("b1", "b2")), (("C", "D"), ("c1", "c2")),
+                          (("D", "E"), ["d1"]), (("E", "F"), ("e1", "e2")), (("F", "A"), ["f1"])))
+    t3.addSplitEdgeRules(((("A", "B"), ["a1", "a2"]), (("B", "C"), ["b1"]), (("C", "D"), ["c1", "c2"]), (("D", "A"), ["d1"])))
+    t0.addNewVertexRules(("x"))
+    t2.addNewVertexRules(("x", "y"))
+    t3.addNewVertexRules(("x", "y"))
+    t0.addSubtile("t1", ("A", "B", "x"))
+    t0.addSubtile("t1", ("B", "A", "x"))
+    t1.addSubtile("t1", ("c", "b", "C"))
+    t1.addSubtile("t2", ("A", "a1", "a2", "B", "b", "c"))
+    for subtile in (("f1", "x", "e2", "F"), ("x", "y", "e1", "e2"), ("y", "d1", "E", "e1")):
+        t2.addSubtile("t3", subtile)
+    for subtile in (("A", "a1", "a2", "B", "x", "f1"), ("B", "b1", "b2", "C", "y", "x"), ("C", "c1", "c2", "D", "d1", "y")):
+        t2.addSubtile("t2", subtile)
+    for subtile in (("A", "a1", "x", "d1"), ("a1", "a2", "y", "x"), ("a2", "B", "b1", "y"),
+                    ("y", "b1", "C", "c1"), ("x", "y", "c1", "c2"), ("d1", "x", "c2", "D")):
+        t3.addSubtile("t3", subtile)
+    return rules, "t0"
+
+# The rule sets, the depth each is tested to, and the (vertex, dart, face)
+# counts of its levels, as the original tilingPass made them
+RULE_SETS = [
+    (chairRules, 4, [(8, 16, 2), (21, 48, 5), (65, 160, 17), (225, 576, 65), (833, 2176, 257)]),
+    (pentRules, 3, [(5, 10, 2), (16, 40, 6), (61, 170, 26), (256, 760, 126)]),
+    (hexRules, 3, [(6, 12, 2), (25, 60, 7), (121, 312, 37), (625, 1680, 217)]),
+    (ntileRules, 2, [(9, 18, 2), (64, 144, 10), (505, 1170, 82)]),
+    (multiRules, 6, [(2, 4, 2), (3, 8, 3), (9, 24, 5), (33, 96, 17), (141, 456, 89), (681, 2400, 521), (3597, 13416, 3113)]),
+]
+
+def objectTiling(rules, tileType, depth):
+    """The Tiling made by the object pass alone."""
+    tiling = rules.createInitialTile(tileType)
+    for _ in range(depth):
+        _subdivideObjects(tiling, rules)
+    return tiling
+
+def levels(tiling):
+    return (list(zip(tiling.dartLevels, tiling.edgeLevels, tiling.faceLevels))
+            + [(tiling.darts, tiling.edges, tiling.faces)])
+
+def structure(tiling):
+    """Every object of every level of a Tiling, with its links as indices."""
+    ABSENT = "absent"
+    levelList = levels(tiling)
+    vIdx = dict((v, i) for i, v in enumerate(tiling.verts))
+    dIdx = [dict((d, i) for i, d in enumerate(darts)) for darts, _, _ in levelList] + [{}]
+    eIdx = [dict((e, i) for i, e in enumerate(edges)) for _, edges, _ in levelList]
+    fIdx = [dict((f, i) for i, f in enumerate(faces)) for _, _, faces in levelList] + [{}]
+    def index(obj, idx):
+        return obj if obj is None or obj == ABSENT else idx[obj]
+    result = []
+    for k, (darts, edges, faces) in enumerate(levelList):
+        result.append([(vIdx[d.origin], dIdx[k][d.next], dIdx[k][d.prev], dIdx[k][d.twin], fIdx[k][d.face],
+                        eIdx[k][d.edge], getattr(d, "name", ABSENT), index(getattr(d, "parent", ABSENT), dIdx[k - 1]),
+                        [dIdx[k + 1][s] for s in d.subdarts],
+                        [vIdx[v] for v in d.splitVertices] if hasattr(d, "splitVertices") else ABSENT)
+                       for d in darts])
+        result.append([dIdx[k][e.aDart] for e in edges])
+        result.append([(dIdx[k][f.aDart], f.tileType, getattr(f, "name", ABSENT),
+                        index(getattr(f, "parent", ABSENT), fIdx[k - 1]), [fIdx[k + 1][s] for s in f.subtiles])
+                       for f in faces])
+    result.append(fIdx[len(levelList) - 1][tiling.outerFace])
+    result.append([(v.level, v.data, tuple(v.point) if hasattr(v, "point") else ABSENT, dIdx[len(levelList) - 1][v.aDart])
+                   for v in tiling.verts])
+    return result
+
+class TestTilingPass(unittest.TestCase):
+
+    def test_levelCounts(self):
+        for makeRules, depth, counts in RULE_SETS:
+            rules, tileType = makeRules()
+            tiling = rules.generateTiling(tileType, depth)
+            self.assertEqual([(sum(v.level <= k + 1 for v in tiling.verts), len(darts), len(faces))
+                              for k, (darts, _, faces) in enumerate(levels(tiling))], counts, tileType)
+
+    def test_arraysNumberTheTiling(self):
+        for makeRules, depth, _ in RULE_SETS:
+            rules, tileType = makeRules()
+            tilingArrays = rules.generateTilingArrays(tileType, depth)
+            tiling = objectTiling(rules, tileType, depth)
+            for k, (darts, edges, faces) in enumerate(levels(tiling)):
+                vertexCount, origin, nxt, twin, face, edgeDart, faceType, faceDart = tilingArrays.levelArrays(k + 1)
+                vIdx = dict((v, i) for i, v in enumerate(tiling.verts))
+                dIdx = dict((d, i) for i, d in enumerate(darts))
+                fIdx = dict((f, i - 1) for i, f in enumerate(faces))
+                self.assertEqual(vertexCount, sum(v.level <= k + 1 for v in tiling.verts))
+                self.assertEqual(origin.tolist(), [vIdx[d.origin] for d in darts])
+                self.assertEqual(nxt.tolist(), [dIdx[d.next] for d in darts])
+                self.assertEqual(twin.tolist(), [dIdx[d.twin] for d in darts])
+                self.assertEqual(face.tolist(), [fIdx[d.face] for d in darts])
+                self.assertEqual(edgeDart.tolist(), [dIdx[e.aDart] for e in edges])
+                self.assertEqual([tilingArrays.tileTypes[t] for t in faceType], [f.tileType for f in faces[1:]])
+                self.assertEqual(faceDart.tolist(), [dIdx[f.aDart] for f in faces[1:]])
+                if k > 0:
+                    parents = dict((f, i) for i, f in enumerate(tiling.faceLevels[k - 1][1:]))
+                    self.assertEqual(tilingArrays.faceParents[k - 1].tolist(), [parents[f.parent] for f in faces[1:]])
+            if tilingArrays.points is not None:
+                self.assertTrue(np.array_equal(tilingArrays.points, [tuple(v.point) for v in tiling.verts]))
+
+    def test_toTilingMatchesObjectPass(self):
+        for makeRules, depth, _ in RULE_SETS:
+            rules, tileType = makeRules()
+            expected = structure(objectTiling(rules, tileType, depth))
+            self.assertEqual(structure(rules.generateTilingArrays(tileType, depth).toTiling()), expected, tileType)
+
+            # A pass in place on a Tiling made from the arrays
+            tiling = rules.generateTiling(tileType, depth - 1)
+            tilingPass(tiling, rules)
+            self.assertIsNotNone(tiling.tilingArrays)
+            self.assertEqual(structure(tiling), expected, tileType)
+
+    def test_otherTilingsUseObjectPass(self):
+        rules, tileType = pentRules()
+        tiling = Tiling.generateCycle(vdata = list("ABCDE"))
+        tiling.faces[-1].tileType = tileType
+        tilingPass(tiling, rules)
+        tilingPass(tiling, rules)
+        self.assertIsNone(tiling.tilingArrays)
+        self.assertEqual(structure(tiling), structure(objectTiling(rules, tileType, 2)))
+
+    def test_movedPoints(self):
+        rules, tileType = chairRules()
+        tiling, expected = rules.generateTiling(tileType, 1), objectTiling(rules, tileType, 1)
+        for t in (tiling, expected):
+            t.verts[0].point = PointE2(-1, -1)
+        tilingPass(tiling, rules)
+        _subdivideObjects(expected, rules)
+        self.assertIsNotNone(tiling.tilingArrays)
+        self.assertEqual(structure(tiling), structure(expected))
+
+    def test_objectsMadeOnFirstUse(self):
+        rules, tileType = chairRules()
+        tiling = rules.generateTiling(tileType, 2)
+        self.assertTrue(tiling.objectsPending)
+        tilingPass(tiling, rules)
+        self.assertTrue(tiling.objectsPending)
+        self.assertEqual(tiling.subdivisionLevel, 4)
+        self.assertEqual(structure(tiling), structure(objectTiling(rules, tileType, 3)))
+        self.assertFalse(tiling.objectsPending)
+
+    def test_levelsFromArrays(self):
+        for makeRules, depth, _ in RULE_SETS:
+            rules, tileType = makeRules()
+            tiling = rules.generateTiling(tileType, depth)
+            expected = objectTiling(rules, tileType, depth)
+            for level in range(1, depth + 2):
+                self.assertEqual(structure(tilingLevel(tiling, level)), structure(tilingLevel(expected, level)), tileType)
+            self.assertTrue(tiling.objectsPending)
+
+    def test_arrayHandler(self):
+        rules, tileType = chairRules()
+        expected = rules.generateTilingArrays(tileType, 4).points
+        arrayRules, _ = chairArrayRules()
+        self.assertTrue(np.array_equal(arrayRules.generateTilingArrays(tileType, 4).points, expected))
+        tiling = objectTiling(arrayRules, tileType, 4)
+        self.assertTrue(np.array_equal([tuple(v.point) for v in tiling.verts], expected))
+        lazy = arrayRules.generateLazyTiling(tileType).tiles(4)
+        self.assertEqual(sorted(tuple(tuple(p) for p in tile.points) for tile in lazy),
+                         sorted(tuple(tuple(v.point) for v in face.vertices()) for face in tiling.faces[1:]))
+
+    def test_customSplitFunction(self):
+        # Split functions other than midp are called edge by edge
+        rules, tileType = chairRules()
+        expected = rules.generateTilingArrays(tileType, 3).points
+        chair = rules.getPrototile(tileType)
+        calls = []
+        def split(dart):
+            calls.append(dart)
+            return midp(dart)
+        for name in chair.splitFn:
+            chair.splitFn[name] = split
+        self.assertTrue(np.array_equal(rules.generateTilingArrays(tileType, 3).points, expected))
+        # Once per edge of each level
+        self.assertEqual(len(calls), sum(darts // 2 for _, darts, _ in RULE_SETS[0][2][:3]))
+
+class TestLazyTiling(unittest.TestCase):
+
+    def points(self, tiles):
+        return sorted(tuple((p.x, p.y) for p in tile.points) for tile in tiles)
+
+    def test_matchesGenerateTiling(self):
+        rules, tileType = chairRules()
+        tiles = rules.generateLazyTiling(tileType).tiles(4)
+        tiling = rules.generateTiling(tileType, 4)
+        self.assertEqual(self.points(tiles), sorted(tuple((v.point.x, v.point.y) for v in face.vertices())
+                                                    for face in tiling.faces[1:]))
+        self.assertTrue(all(tile.depth == 4 for tile in tiles))
+
+    def test_pointQuery(self):
+        rules, tileType = chairRules()
+        lazy = rules.generateLazyTiling(tileType)
+        tiles = lazy.tiles(18, region = (0.3, 0.7, 0.3, 0.7))
+        self.assertTrue(len(tiles) > 0)
+        for tile in tiles:
+            minx, miny, maxx, maxy = tile.boundingBox()
+            self.assertTrue(tile.depth == 18 and minx <= 0.3 <= maxx and miny <= 0.7 <= maxy)
+        # Only the ancestors of the tiles near the point are subdivided, out of 
+        # the 4^18 tiles of the whole level
+        self.assertLess(len(lazy), 50)
+
+    def test_leastRecentlyUsed(self):
+        rules, tileType = chairRules()
+        lazy = rules.generateLazyTiling(tileType, maxCachedTiles = 50)
+        first = lazy.tiles(4)
+        self.assertEqual(len(lazy), 50)
+        second = lazy.tiles(4)
+        self.assertEqual(len(lazy), 50)
+        self.assertEqual(self.points(first), self.points(second))
+        # The dropped tiles are made again
+        self.assertTrue(any(a is not b for a, b in zip(first, second)))
+
+    def test_regionWithoutGeometry(self):
+        rules, tileType = pentRules()
+        lazy = rules.generateLazyTiling(tileType)
+        self.assertEqual(len(lazy.tiles(2)), 25)
+        with self.assertRaises(ValueError):
+            lazy.tiles(2, region = (0, 0, 1, 1))
+
+class TestTilingPackings(unittest.TestCase):
+
+    def centers(self, packing):
+        return np.array([v.data.center.coord for v in packing.verts])
+
+    def test_matchesColdPacking(self):
+        rules, tileType = pentRules()
+        tiling = rules.generateTiling(tileType, 2)
+        # A packing from scratch run well past the hierarchical tolerance
+        cold, _ = generateCirclePackingLayout(tiling, num_passes = 3000, tolerance = 1e-12)
+        hierarchical, _ = generateCirclePackingLayout(tiling, hierarchical = True)
+        # Both read the levels from the arrays
+        self.assertTrue(tiling.objectsPending)
+        self.assertEqual(len(cold.verts), len(hierarchical.verts))
+        self.assertLess(np.abs(self.centers(cold) - self.centers(hierarchical)).max(), 1e-6)
+
+    def test_cachedLayouts(self):
+        rules, tileType = pentRules()
+        tiling = rules.generateTiling(tileType, 2)
+        layout = generateCirclePackingLayout(tiling, hierarchical = True, tolerance = 1e-9)
+        passes = dict(tiling.packings.passes)
+        self.assertEqual(sorted(passes), [1, 2, 3])
+        self.assertIs(generateCirclePackingLayout(tiling, hierarchical = True, tolerance = 1e-9), layout)
+        self.assertIs(tiling.packings.layout(2), tiling.packings.layout(2))
+        self.assertEqual(tiling.packings.passes, passes)
+
+    def test_defaultToleranceReached(self):
+        # Below hypPacker.OKERR every level would run all passes
+        rules, tileType = pentRules()
+        tiling = rules.generateTiling(tileType, 2)
+        generateCirclePackingLayout(tiling, hierarchical = True)
+        self.assertEqual(tiling.packings.tolerance, 1e-9)
+        self.assertTrue(all(passes < 1000 for passes in tiling.packings.passes.values()))
+
+if __name__ == '__main__':
+    unittest.main()
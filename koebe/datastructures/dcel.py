@@ -1,5 +1,7 @@
 # Doubly-connected edge list data structure
 
+from array import array
+
 class DCEL:
     
     def __init__(self, outerFaceData = None):
@@ -13,49 +15,46 @@ class DCEL:
         self.Dart   = Dart
         self.Face   = Face
         
+        # Per-vertex data stored column-wise (see setVertexColumn)
+        self.vertexColumns = {}
+        
         self.outerFace = (None if outerFaceData == None 
                                else self.Face(self, data = outerFaceData))
 
     def __reduce__(self):
-        """Serialize by converting circular object references to indices."""
-        # Build index maps
-        self.markIndices()
-        # vert_to_idx = {v: i for i, v in enumerate(self.verts)}
-        # dart_to_idx = {d: i for i, d in enumerate(self.darts)}
-        # edge_to_idx = {e: i for i, e in enumerate(self.edges)}
-        # face_to_idx = {f: i for i, f in enumerate(self.faces)}
+        """Serialize by converting circular object references to indices.
         
-        # Serialize vertex data with aDart as index
-        vert_data = [(v.aDart.idx, v.data) for v in self.verts]
+        The pointers are stored as flat integer arrays (-1 for None), and each
+        data column (the vertex, dart, edge and face data) that holds a single
+        geometry type is packed into one float array (see
+        koebe.geometries.geometryArrays.packObjects).
+        """
+        from ..geometries.geometryArrays import packObjects
         
-        # Serialize dart data with all pointers as indices
-        dart_data = []
-        for d in self.darts:
-            dart_data.append({
-                'edge': d.edge.idx,
-                'origin': d.origin.idx,
-                'face': d.face.idx,
-                'prev': d.prev.idx,
-                'next': d.next.idx,
-                'twin': d.twin.idx,
-                'data': d.data
-            })
+        self.markIndices()
         
-        # Serialize edge data with aDart as index
-        edge_data = [(e.aDart.idx, e.data) for e in self.edges]
+        def _idx(x):
+            return -1 if x is None else x.idx
         
-        # Serialize face data with aDart as index
-        face_data = [(f.aDart.idx, f.data) for f in self.faces]
+        # 32-bit indices unless the DCEL is too large for them
+        code = 'i' if max(len(self.verts), len(self.darts), len(self.faces)) < 2**31 else 'q'
         
-        # Serialize outer face reference as index
-        outer_face_idx = self.outerFace.idx if self.outerFace is not None else None
+        dart_links = array(code)
+        for d in self.darts:
+            dart_links.extend((_idx(d.edge), _idx(d.origin), _idx(d.face), 
+                               _idx(d.prev), _idx(d.next), _idx(d.twin)))
         
         state = {
-            'vert_data': vert_data,
-            'dart_data': dart_data,
-            'edge_data': edge_data,
-            'face_data': face_data,
-            'outer_face_idx': outer_face_idx
+            'vert_darts': array(code, [_idx(v.aDart) for v in self.verts]),
+            'dart_links': dart_links,
+            'edge_darts': array(code, [_idx(e.aDart) for e in self.edges]),
+            'face_darts': array(code, [_idx(f.aDart) for f in self.faces]),
+            'vert_values': packObjects([v.data for v in self.verts]),
+            'dart_values': packObjects([d.data for d in self.darts]),
+            'edge_values': packObjects([e.data for e in self.edges]),
+            'face_values': packObjects([f.data for f in self.faces]),
+            'outer_face_idx': _idx(self.outerFace),
+            'vertex_columns': self.vertexColumns
         }
         
         return (_restore_dcel, (state,))
@@ -73,6 +72,24 @@ class DCEL:
         for fIdx in range(len(self.faces)):
             self.faces[fIdx].idx = fIdx
     
+    def setVertexColumn(self, name, column):
+        """Attaches column as vertex data under name without copying it. 
+        
+        column is any sequence indexed like self.verts, typically one of the
+        arrays in koebe.geometries.geometryArrays, so v.column(name) is 
+        column[v.idx]. The vertices are re-indexed here; adding or removing
+        vertices afterwards invalidates the column, and duplicate() does not 
+        carry columns over. 
+        """
+        if len(column) != len(self.verts):
+            raise ValueError(f"Column has length {len(column)} but the DCEL has {len(self.verts)} vertices.")
+        for vIdx in range(len(self.verts)):
+            self.verts[vIdx].idx = vIdx
+        self.vertexColumns[name] = column
+    
+    def vertexColumn(self, name):
+        return self.vertexColumns[name]
+    
     def eulerCharacteristic(self):
         return len(self.verts) - (len(self.darts) / 2) + len(self.faces)
 
@@ -307,6 +324,10 @@ class Vertex:
     def neighbors(self):
         return [dart.origin for dart in self.inDarts()]
     
+    # The entry of the vertex column name for this vertex (see DCEL.setVertexColumn)
+    def column(self, name):
+        return self.dcel.vertexColumns[name][self.idx]
+    
     def faces(self):
         return [dart.face for dart in self.outDarts()]
     
@@ -570,6 +591,44 @@ class Face:
 # Pickle restoration helper functions
 def _restore_dcel(state):
     """Restore a DCEL from pickle, reconstructing from indices."""
+    if 'vert_data' in state:
+        return _restore_dcel_dicts(state)
+    
+    dcel = _empty_dcel(state)
+    
+    for vert_idx, data in enumerate(state['vert_values']):
+        Vertex(dcel, aDart=None, data=data).idx = vert_idx
+    for data in state['dart_values']:
+        Dart(dcel, edge=None, origin=None, face=None, 
+             prev=None, next=None, twin=None, data=data)
+    for data in state['edge_values']:
+        Edge(dcel, aDart=None, data=data)
+    for data in state['face_values']:
+        Face(dcel, aDart=None, data=data)
+    
+    verts, darts, edges, faces = dcel.verts, dcel.darts, dcel.edges, dcel.faces
+    for v, i in zip(verts, state['vert_darts']):
+        v.aDart = darts[i] if i >= 0 else None
+    links = state['dart_links']
+    for k, d in enumerate(darts):
+        e, o, f, p, n, t = links[6*k:6*k + 6]
+        d.edge   = edges[e] if e >= 0 else None
+        d.origin = verts[o] if o >= 0 else None
+        d.face   = faces[f] if f >= 0 else None
+        d.prev   = darts[p] if p >= 0 else None
+        d.next   = darts[n] if n >= 0 else None
+        d.twin   = darts[t] if t >= 0 else None
+    for e, i in zip(edges, state['edge_darts']):
+        e.aDart = darts[i] if i >= 0 else None
+    for f, i in zip(faces, state['face_darts']):
+        f.aDart = darts[i] if i >= 0 else None
+    
+    outer_face_idx = state['outer_face_idx']
+    dcel.outerFace = faces[outer_face_idx] if outer_face_idx >= 0 else None
+    
+    return dcel
+
+def _empty_dcel(state):
     dcel = DCEL.__new__(DCEL)
     
     # Initialize the lists and class references
@@ -581,6 +640,12 @@ def _restore_dcel(state):
     dcel.Edge = Edge
     dcel.Dart = Dart
     dcel.Face = Face
+    dcel.vertexColumns = state.get('vertex_columns', {})
+    return dcel
+
+def _restore_dcel_dicts(state):
+    """Restore a DCEL pickled in the older format, with one dict per dart."""
+    dcel = _empty_dcel(state)
     
     # Extract data
     vert_data = state['vert_data']
@@ -590,8 +655,9 @@ def _restore_dcel(state):
     outer_face_idx = state['outer_face_idx']
     
     # Create all vertex objects (aDart will be set after darts are created)
-    for aDart_idx, data in vert_data:
+    for vert_idx, (aDart_idx, data) in enumerate(vert_data):
         v = Vertex(dcel, aDart=None, data=data)
+        v.idx = vert_idx
     
     # Create all dart objects (pointers will be set next)
     for dd in dart_data:
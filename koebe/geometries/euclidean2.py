@@ -42,6 +42,9 @@ class PointE2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y))
     
     @classmethod
     def fromPolarCoordinates(cls, r, theta):
@@ -145,6 +148,9 @@ class VectorE2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y))
     
     def __add__(self, other):
         return VectorE2(self.x + other.x, 
@@ -232,6 +238,9 @@ class SegmentE2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target))
     
     @property
     def lengthSq(self):
@@ -330,6 +339,9 @@ class CircleE2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.center, self.radius))
         
     def inversiveDistTo(self, other: "CircleE2") -> float: 
         dSq = self.center.distSqTo(other.center)
@@ -415,6 +427,9 @@ class PolygonE2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.vertices,))
     
     def segments(self):
         return [SegmentE2(self.vertices[i-1], self.vertices[i]) 
@@ -475,25 +490,36 @@ class PolygonE2:
         return self.vertices[idx % self.vertexCount]
     
     def windingNumber(self, p: PointE2) -> int:
+        from .predicates import orient2d
         wn = 0
-        
-        def upwardCrossing(seg):
-            return seg.source.y <= p.y and seg.target.y > p.y
-        
-        def downwardCrossing(seg):
-            return seg.target.y <= p.y and seg.source.y > p.y
-        
-        for seg in self.segments():
-            if upwardCrossing(seg) and seg.orientationTo(p) > 0:
-                wn += 1
-            elif downwardCrossing(seg) and seg.orientationTo(p) < 0:
-                wn -= 1
-                
+        n = len(self.vertices)
+        for i in range(n):
+            src, trg = self.vertices[i - 1], self.vertices[i]
+            if src.y <= p.y and trg.y > p.y:
+                if orient2d(src.x, src.y, trg.x, trg.y, p.x, p.y) > 0:
+                    wn += 1
+            elif trg.y <= p.y and src.y > p.y:
+                if orient2d(src.x, src.y, trg.x, trg.y, p.x, p.y) < 0:
+                    wn -= 1
         return wn
     
     def contains(self, p: PointE2) -> bool:
         return self.windingNumber(p) != 0
     
+    def containsPoints(self, points):
+        """Tests many points for containment in one NumPy pass.
+        
+        Args:
+            points: An (n, 2) array of query points (or a list of PointE2).
+        
+        Returns:
+            An (n,) boolean array, True where the point is contained.
+        """
+        from koebe.algorithms.polygonIntersection import windingNumbers
+        if len(points) > 0 and isinstance(points[0], PointE2):
+            points = [(p.x, p.y) for p in points]
+        return windingNumbers(self, points) != 0
+    
     def toDCEL(self) -> DCEL:
         
         poly = self.ccwOrientation()
@@ -538,20 +564,27 @@ class PolygonE2:
             True if the two polygons intersect.
             False otherwise.
         """
-        if self.boundingBox[0].x > other.boundingBox[1].x or \
-           self.boundingBox[1].x < other.boundingBox[0].x or \
-           self.boundingBox[0].y > other.boundingBox[1].y or \
-           self.boundingBox[1].y < other.boundingBox[0].y:
+        (minX, minY), (maxX, maxY) = self.boundingBox
+        (otherMinX, otherMinY), (otherMaxX, otherMaxY) = other.boundingBox
+        if minX > otherMaxX or maxX < otherMinX or minY > otherMaxY or maxY < otherMinY:
             return False
 
-        for seg in self.segments():
-            for otherSeg in other.segments():
-                if seg.intersects(otherSeg):
+        # Small polygons are cheaper to test pair by pair than with NumPy
+        if self.vertexCount * other.vertexCount > 64:
+            from koebe.algorithms.polygonIntersection import polygonSegments, segmentsCross
+            return segmentsCross(polygonSegments(self), polygonSegments(other))
+
+        # The same exact proper crossing test as segmentsCross
+        from .predicates import orient2d
+        for k in range(other.vertexCount):
+            c, d = other.vertices[k - 1], other.vertices[k]
+            for j in range(self.vertexCount):
+                a, b = self.vertices[j - 1], self.vertices[j]
+                if (orient2d(a.x, a.y, b.x, b.y, c.x, c.y) * orient2d(a.x, a.y, b.x, b.y, d.x, d.y) < 0 and
+                    orient2d(c.x, c.y, d.x, d.y, a.x, a.y) * orient2d(c.x, c.y, d.x, d.y, b.x, b.y) < 0):
                     return True
         return False
-    
 
-                
 # END PolygonE2
 
 @dataclass(frozen=True)
@@ -569,6 +602,9 @@ class LineE2:
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
 
+    def __reduce__(self):
+        return (self.__class__, (self.p1, self.p2))
+
     def intersectWithLineE2(self, line2):
         from koebe.geometries.orientedProjective2 import PointOP2, LineOP2
         l1 = LineOP2.lineThrough(
@@ -1,7 +1,10 @@
 import unittest
 
 import math
-from .euclidean2 import PointE2, VectorE2
+import pickle
+import random
+from .euclidean2 import PointE2, VectorE2, CircleE2, PolygonE2, SegmentE2
+from ..algorithms.polygonIntersection import intersectingPolygonPairs, polygonSegments, polygonSelfIntersections, segmentsCross
 
 class TestPointE2(unittest.TestCase):
 
@@ -99,6 +102,74 @@ class TestVectorE2(unittest.TestCase):
         self.assertTrue(abs(v1.angleFromXAxis() - math.pi / 4.0) < 1e-8)
         v2 = VectorE2(-1, -1)
         self.assertTrue(abs(v2.angleFromXAxis() - math.pi * 5.0 / 4.0) < 1e-8)
-        
+
+class TestPolygonE2(unittest.TestCase):
+
+    def square(self, x, y, size = 1.0):
+        return PolygonE2([PointE2(x, y), PointE2(x + size, y), PointE2(x + size, y + size), PointE2(x, y + size)])
+
+    def circle(self, n):
+        return PolygonE2([PointE2(math.cos(2 * math.pi * k / n), math.sin(2 * math.pi * k / n)) for k in range(n)])
+
+    def test_containsPoints(self):
+        poly = self.circle(50)
+        points = [PointE2(0.1 * i - 1.05, 0.37 * j - 1.1) for i in range(22) for j in range(7)]
+        inside = poly.containsPoints(points)
+        self.assertEqual(list(inside), [poly.contains(p) for p in points])
+        self.assertEqual(list(poly.containsPoints([(0.0, 0.0), (2.0, 0.0)])), [True, False])
+
+    def test_intersects(self):
+        self.assertTrue(self.square(0, 0).intersects(self.square(0.5, 0.5)))
+        self.assertFalse(self.square(0, 0).intersects(self.square(2, 2)))
+        # Large polygons take the vectorized path
+        self.assertTrue(self.circle(40).intersects(PolygonE2([PointE2(x + 0.9, y) for x, y in self.circle(40).vertices])))
+        self.assertFalse(self.circle(40).intersects(PolygonE2([PointE2(x + 2.5, y) for x, y in self.circle(40).vertices])))
+
+    def test_intersectsExact(self):
+        # Triangles with a vertex within rounding of the other's edge, where the
+        # float orientation of SegmentE2.intersects can get the side wrong. Both
+        # paths of intersects must agree with the exact segmentsCross.
+        rng = random.Random(1)
+        disagreements = 0
+        for _ in range(300):
+            a = PointE2(rng.uniform(0, 1), rng.uniform(0, 1))
+            b = PointE2(a.x + rng.uniform(10, 20), a.y + rng.uniform(10, 20))
+            t = rng.uniform(0.2, 0.8)
+            c = PointE2(a.x + t * (b.x - a.x), a.y + t * (b.y - a.y))
+            d = PointE2(c.x + rng.uniform(-1, 1), c.y + rng.uniform(-1, 1))
+            p, q = PolygonE2([a, b, PointE2(b.x, a.y)]), PolygonE2([c, d, PointE2(d.x + 1, d.y - 2)])
+            expected = segmentsCross(polygonSegments(p), polygonSegments(q))
+            self.assertEqual(p.intersects(q), expected)
+            disagreements += SegmentE2(a, b).intersects(SegmentE2(c, d)) != expected
+        self.assertGreater(disagreements, 0)
+
+    def test_intersectingPolygonPairs(self):
+        # Squares sharing edges do not overlap; the shifted one does
+        squares = [self.square(0, 0), self.square(1, 0), self.square(0.5, 0.5), self.square(5, 5)]
+        self.assertEqual(intersectingPolygonPairs(squares), [(0, 2), (1, 2)])
+        star = PolygonE2([PointE2(math.cos(4 * math.pi * k / 5), math.sin(4 * math.pi * k / 5)) for k in range(5)])
+        self.assertEqual(len(polygonSelfIntersections(star)), 5)
+        self.assertEqual(polygonSelfIntersections(self.circle(12)), [])
+
+class TestPickling(unittest.TestCase):
+
+    def test_roundTrip(self):
+        for obj in (PointE2(1.5, 2), CircleE2(PointE2(1.0, -2.0), 0.5),
+                    PolygonE2([PointE2(0, 0), PointE2(1, 0), PointE2(0, 1)])):
+            self.assertEqual(pickle.loads(pickle.dumps(obj)), obj)
+
+    def test_compact(self):
+        # The reduced form is the class and the constructor arguments
+        circle = CircleE2(PointE2(1.5, -2.0), 0.25)
+        self.assertEqual(circle.__reduce__(), (CircleE2, (circle.center, 0.25)))
+
+    def test_loadsOldPickles(self):
+        # Pickled with the default reduction, storing the slots in a dict
+        old = (b'\x80\x02ckoebe.geometries.euclidean2\nCircleE2\nq\x00)\x81q\x01}q\x02(X\x06\x00\x00\x00centerq\x03'
+               b'ckoebe.geometries.euclidean2\nPointE2\nq\x04)\x81q\x05}q\x06(X\x01\x00\x00\x00xq\x07G?\xf8'
+               b'\x00\x00\x00\x00\x00\x00X\x01\x00\x00\x00yq\x08G\xc0\x00\x00\x00\x00\x00\x00\x00ubX\x06'
+               b'\x00\x00\x00radiusq\tG?\xd0\x00\x00\x00\x00\x00\x00ub.')
+        self.assertEqual(pickle.loads(old), CircleE2(PointE2(1.5, -2.0), 0.25))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
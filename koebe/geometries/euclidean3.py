@@ -9,6 +9,7 @@ from dataclasses import dataclass
 
 from .commonOps import *
 from .orientedProjective3 import PointOP3
+from .lazy import lazyproperty
 from enum import Enum
 
 @dataclass(frozen=True)
@@ -30,6 +31,9 @@ class PointE3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y, self.z))
         
     @classmethod
     def fromPointE3(cls, p):
@@ -91,6 +95,9 @@ class SegmentE3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target))
     
     @property
     def lengthSq(self):
@@ -128,6 +135,9 @@ class VectorE3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y, self.z))
         
     @classmethod
     def fromVectorE3(cls, v):
@@ -188,7 +198,8 @@ class VectorE3:
 @dataclass(frozen=True)
 class DirectionE3:
     
-    __slots__ = ["vec"]
+    # _memo holds the normalized vector v (see lazy.py)
+    __slots__ = ["vec", "_memo"]
     vec: VectorE3
         
     def __iter__(self):
@@ -198,17 +209,20 @@ class DirectionE3:
         yield _v.z
     
     def __getstate__(self):
-        return {slot: getattr(self, slot) for slot in self.__slots__}
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_memo'}
     
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.vec,))
     
     @classmethod
     def fromDirectionE3(cls,d):
         return cls(d.vec)
     
-    @property
+    @lazyproperty
     def v(self):
         norm = self.vec.norm()
         if norm == 0: 
@@ -265,6 +279,9 @@ class PlaneE3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.N, self.d))
     
     @classmethod
     def fromPlaneE3(cls, p):
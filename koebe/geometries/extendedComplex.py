@@ -54,6 +54,9 @@ class ExtendedComplex:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.z, self.w))
     
     @property
     def real(self):
@@ -237,6 +240,9 @@ class Mobius:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c, self.d))
         
     @classmethod
     def transformToZeroOneInfinity(cls, z1: ExtendedComplex, z2: ExtendedComplex, z3: ExtendedComplex) -> "Mobius":
@@ -253,7 +259,7 @@ class Mobius:
     
     def applyToPointS2(self, p: "spherical2.PointS2") -> "spherical2.PointS2":
         z = p.sgProjectToExtendedComplex() # Stereographically project to extended complex
-        return spherical2.PointS2.sgProjectFromExtendedComplex(self.apply(z))
+        return koebe.geometries.spherical2.PointS2.sgProjectFromExtendedComplex(self.apply(z))
     
     @property
     def det(self):
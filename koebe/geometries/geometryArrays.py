@@ -0,0 +1,466 @@
+#
+# NumPy backed collections of geometric primitives
+#
+# Each array type stores n objects of one geometry class as the rows of an
+# (n, k) float64 matrix, one column per coordinate. The hot methods of the
+# scalar classes have vectorized versions here that take either a single
+# scalar object (which is broadcast against every row) or another array of
+# the same length, so transforming a whole packing costs a handful of NumPy
+# operations instead of one Python object per disk.
+#
+# Iterating an array or indexing it with an integer yields the existing
+# scalar objects (PointE2, DiskS2, ...), and fromObjects goes the other way,
+# so the arrays can be dropped into code written against the scalar classes.
+#
+# packObjects is the bulk encoder used for pickling: a list holding a single
+# geometry type is stored as one array (a single float64 buffer in the
+# pickle) instead of one pickled object per entry, and unpackObjects turns
+# it back into the list.
+#
+
+import math
+
+import numpy as np
+
+from .euclidean2 import PointE2, CircleE2
+from .euclidean3 import PointE3
+from .orientedProjective2 import DiskOP2
+from .spherical2 import PointS2, DiskS2
+from .hyperbolic2 import PointH2, CircleH2
+
+# np.float64 subclasses float, so it round trips through an array as well
+_FLOAT_TYPES = (float, np.float64)
+
+def _column(idx, doc):
+    """A property returning a view of one column of an array."""
+    def _get(self):
+        return self.data[:, idx]
+    return property(_get, doc = doc)
+
+class GeometryArray:
+    """Base class of the geometry arrays.
+
+    Subclasses set scalarType and fields, and override _toRow/_fromRow when
+    the scalar class does not iterate over (or construct from) its fields in
+    order.
+
+    Attributes:
+        data: The (n, len(fields)) float64 array holding the objects. Column
+            properties, slices and boolean masks return views of it, not copies.
+    """
+
+    scalarType = None
+    fields = ()
+
+    def __init__(self, data):
+        data = np.asarray(data, dtype = np.float64)
+        if data.size == 0:
+            data = data.reshape(0, len(self.fields))
+        if data.ndim != 2 or data.shape[1] != len(self.fields):
+            raise ValueError("%s data must have shape (n, %d), got %s"
+                             % (type(self).__name__, len(self.fields), data.shape))
+        self.data = data
+
+    @classmethod
+    def fromObjects(cls, objs):
+        """Builds an array from an iterable of scalar objects."""
+        return cls([cls._toRow(obj) for obj in objs])
+
+    @classmethod
+    def fromColumns(cls, *columns):
+        """Builds an array from one sequence per field."""
+        return cls(np.column_stack([np.asarray(col, dtype = np.float64) for col in columns]))
+
+    @classmethod
+    def fromVertices(cls, dcel):
+        """Builds an array from the data of the vertices of a DCEL."""
+        return cls.fromObjects(v.data for v in dcel.verts)
+
+    @classmethod
+    def _toRow(cls, obj):
+        return tuple(obj)
+
+    @classmethod
+    def _fromRow(cls, row):
+        return cls.scalarType(*row)
+
+    @classmethod
+    def _exactRow(cls, obj):
+        """Returns the row of obj if _fromRow rebuilds obj from it exactly
+        (all of its coordinates are floats), otherwise None."""
+        row = cls._toRow(obj)
+        for x in row:
+            if type(x) not in _FLOAT_TYPES:
+                return None
+        return row
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __iter__(self):
+        for row in self.data.tolist():
+            yield self._fromRow(row)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)):
+            return self._fromRow(self.data[idx].tolist())
+        return type(self)(self.data[idx])
+
+    def __repr__(self):
+        return "%s(%d)" % (type(self).__name__, len(self))
+
+    def __reduce__(self):
+        return (self.__class__, (self.data,))
+
+    def toList(self):
+        """Returns the objects as a list of scalar objects."""
+        return list(self)
+
+    def copy(self):
+        return type(self)(self.data.copy())
+
+    def attachToVertices(self, dcel, name):
+        """Attaches this array as the vertex data column name of dcel without
+        copying it, so that dcel.verts[i].column(name) is self[i]. See
+        DCEL.setVertexColumn.
+        """
+        dcel.setVertexColumn(name, self)
+
+    @classmethod
+    def _cols(cls, other):
+        """Returns the coefficient columns of other, a scalar object or an
+        array of this type, in a form that broadcasts against our columns."""
+        if isinstance(other, GeometryArray):
+            return tuple(other.data.T)
+        return cls._toRow(other)
+
+# END GeometryArray
+
+class PointE2Array(GeometryArray):
+
+    scalarType = PointE2
+    fields = ("x", "y")
+
+    x = _column(0, "The x-coordinates of the points.")
+    y = _column(1, "The y-coordinates of the points.")
+
+    def distSqTo(self, p):
+        """Returns the squared distances to a PointE2 or to the points of
+        another PointE2Array.
+        """
+        px, py = self._cols(p)
+        dx = px - self.x
+        dy = py - self.y
+        return dx * dx + dy * dy
+
+    def distTo(self, p):
+        return np.sqrt(self.distSqTo(p))
+
+    def sgProjectToPointS2(self):
+        """Vectorized PointS2.sgProjectFromPointE2."""
+        x, y = self.x, self.y
+        normSq = x * x + y * y
+        fact = 1.0 / (1 + normSq)
+        return PointS2Array(np.column_stack((2.0 * x * fact, 2.0 * y * fact, (1 - normSq) * fact)))
+
+# END PointE2Array
+
+class PointE3Array(GeometryArray):
+
+    scalarType = PointE3
+    fields = ("x", "y", "z")
+
+    x = _column(0, "The x-coordinates of the points.")
+    y = _column(1, "The y-coordinates of the points.")
+    z = _column(2, "The z-coordinates of the points.")
+
+    def distSqTo(self, p):
+        px, py, pz = self._cols(p)
+        dx = px - self.x
+        dy = py - self.y
+        dz = pz - self.z
+        return dx * dx + dy * dy + dz * dz
+
+    def distTo(self, p):
+        return np.sqrt(self.distSqTo(p))
+
+# END PointE3Array
+
+class PointS2Array(GeometryArray):
+
+    scalarType = PointS2
+    fields = ("x", "y", "z")
+
+    x = _column(0, "The x-coordinates of the points.")
+    y = _column(1, "The y-coordinates of the points.")
+    z = _column(2, "The z-coordinates of the points.")
+
+    @classmethod
+    def sgProjectFromPointE2(cls, points):
+        """Vectorized PointS2.sgProjectFromPointE2 for a PointE2Array."""
+        return points.sgProjectToPointS2()
+
+    def sgProjectToPointE2(self):
+        """Vectorized PointS2.sgProjectToPointE2."""
+        x, y, z = self.x, self.y, self.z
+        fact = 1.0 / (z + np.sqrt(x * x + y * y + z * z))
+        return PointE2Array(np.column_stack((x * fact, y * fact)))
+
+    def toPointE3Array(self):
+        return PointE3Array(self.data)
+
+# END PointS2Array
+
+class CircleE2Array(GeometryArray):
+
+    scalarType = CircleE2
+    fields = ("centerX", "centerY", "radius")
+
+    centerX = _column(0, "The x-coordinates of the centers.")
+    centerY = _column(1, "The y-coordinates of the centers.")
+    radius  = _column(2, "The radii.")
+
+    @classmethod
+    def _toRow(cls, circle):
+        return (circle.center.x, circle.center.y, circle.radius)
+
+    @classmethod
+    def _fromRow(cls, row):
+        return CircleE2(PointE2(row[0], row[1]), row[2])
+
+    @classmethod
+    def _exactRow(cls, circle):
+        if type(circle.center) is not PointE2:
+            return None
+        return super()._exactRow(circle)
+
+    @property
+    def center(self):
+        return PointE2Array(self.data[:, 0:2])
+
+    @property
+    def area(self):
+        return math.pi * self.radius * self.radius
+
+    def inversiveDistTo(self, other):
+        """Vectorized CircleE2.inversiveDistTo against a CircleE2 or another
+        CircleE2Array."""
+        ox, oy, oRadius = self._cols(other)
+        dx = ox - self.centerX
+        dy = oy - self.centerY
+        return ((dx * dx + dy * dy - self.radius * self.radius - oRadius * oRadius)
+                / (2.0 * self.radius * oRadius))
+
+    def toDiskOP2(self):
+        """Vectorized CircleE2.toDiskOP2 (DiskOP2.fromCircleE2)."""
+        x, y, r = self.centerX, self.centerY, self.radius
+        return DiskOP2Array(np.column_stack((np.ones_like(x), -2.0 * x, -2.0 * y, x * x + y * y - r * r)))
+
+    def toDiskS2(self):
+        """Vectorized CircleE2.toDiskS2."""
+        return self.toDiskOP2().toDiskS2()
+
+# END CircleE2Array
+
+class DiskOP2Array(GeometryArray):
+    """Disks a(x^2 + y^2) + b x + c y + d = 0, see DiskOP2."""
+
+    scalarType = DiskOP2
+    fields = ("a", "b", "c", "d")
+
+    a = _column(0, "The a coefficients.")
+    b = _column(1, "The b coefficients.")
+    c = _column(2, "The c coefficients.")
+    d = _column(3, "The d coefficients.")
+
+    @staticmethod
+    def _funkyInnerProduct(a1, b1, c1, d1, a2, b2, c2, d2):
+        return b1 * b2 + c1 * c2 - 2 * a2 * d1 - 2 * a1 * d2
+
+    @property
+    def radius(self):
+        a, b, c, d = self.data.T
+        return np.sqrt((b * b + c * c - 4.0 * a * d) / (4.0 * a * a))
+
+    def toCircleE2(self):
+        """Vectorized DiskOP2.toCircleE2."""
+        fact = 1.0 / (2.0 * self.a)
+        return CircleE2Array(np.column_stack((-self.b * fact, -self.c * fact, self.radius)))
+
+    def toDiskS2(self):
+        """Vectorized DiskOP2.toDiskS2."""
+        a, b, c, d = self.data.T
+        return DiskS2Array(np.column_stack((a - d, c, b, -(a + d))))
+
+    def inversiveDistTo(self, other):
+        cols = self._cols(other)
+        ip12 = self._funkyInnerProduct(*self.data.T, *cols)
+        ip11 = self._funkyInnerProduct(*self.data.T, *self.data.T)
+        ip22 = self._funkyInnerProduct(*cols, *cols)
+        return -ip12 / (np.sqrt(ip11) * np.sqrt(ip22))
+
+    def invertThrough(self, disk):
+        """Vectorized DiskOP2.invertThrough, inverting every disk through a
+        DiskOP2 or through the matching disk of another DiskOP2Array."""
+        cols = self._cols(disk)
+        fact = (self._funkyInnerProduct(*self.data.T, *cols)
+                / self._funkyInnerProduct(*cols, *cols))
+        return DiskOP2Array(np.column_stack([col - 2 * fact * dcol for col, dcol in zip(self.data.T, cols)]))
+
+# END DiskOP2Array
+
+class DiskS2Array(GeometryArray):
+    """Disks on the sphere given by the planes a x + b y + c z + d = 0, see DiskS2."""
+
+    scalarType = DiskS2
+    fields = ("a", "b", "c", "d")
+
+    a = _column(0, "The a coefficients.")
+    b = _column(1, "The b coefficients.")
+    c = _column(2, "The c coefficients.")
+    d = _column(3, "The d coefficients.")
+
+    @staticmethod
+    def _lorentz(a1, b1, c1, d1, a2, b2, c2, d2):
+        return a1 * a2 + b1 * b2 + c1 * c2 - d1 * d2
+
+    def lorentzTo(self, other):
+        """Vectorized DiskS2.lorentzTo against a DiskS2 or another DiskS2Array."""
+        return self._lorentz(*self.data.T, *self._cols(other))
+
+    def inversiveDistTo(self, other):
+        cols = self._cols(other)
+        ip12 = self._lorentz(*self.data.T, *cols)
+        ip11 = self._lorentz(*self.data.T, *self.data.T)
+        ip22 = self._lorentz(*cols, *cols)
+        return -ip12 / (np.sqrt(ip11) * np.sqrt(ip22))
+
+    def invertThrough(self, disk):
+        """Vectorized DiskS2.invertThrough, inverting every disk through a
+        DiskS2 or through the matching disk of another DiskS2Array."""
+        cols = self._cols(disk)
+        n = self._lorentz(*self.data.T, *cols)
+        d = self._lorentz(*cols, *cols)
+        # DiskS2.invertThrough uses the unnormalized formula when disk is a point (d == 0)
+        isPoint = d == 0
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            scale = np.where(isPoint, d, 1.0)
+            fact = np.where(isPoint, n, n / np.where(isPoint, 1.0, d))
+        return DiskS2Array(np.column_stack([scale * col - 2 * fact * dcol for col, dcol in zip(self.data.T, cols)]))
+
+    def inversiveNormalize(self):
+        scale = 1.0 / np.sqrt(np.abs(self.lorentzTo(self)))
+        return DiskS2Array(self.data * scale[:, None])
+
+    def inversiveMidpointTo(self, other):
+        """Vectorized DiskS2.inversiveMidpointTo."""
+        cols = np.column_stack(self._cols(other)) if not isinstance(other, GeometryArray) else other.data
+        cols = np.broadcast_to(cols, self.data.shape)
+        D12 = self.data - cols
+        t = self._lorentz(*self.data.T, *D12.T) / self._lorentz(*D12.T, *D12.T)
+        return DiskS2Array((1 - t)[:, None] * self.data + t[:, None] * cols)
+
+    def tangentPointWith(self, other):
+        """Vectorized DiskS2.tangentPointWith, returning a PointE3Array."""
+        a, b, c, d = self.inversiveMidpointTo(other).data.T
+        fact = 1.0 / d
+        return PointE3Array(np.column_stack((-a * fact, -b * fact, -c * fact)))
+
+    @property
+    def centerE3(self):
+        """The centers of the disks' boundary circles as a PointE3Array."""
+        a, b, c, d = self.data.T
+        fact = -d / (a * a + b * b + c * c)
+        return PointE3Array(np.column_stack((a * fact, b * fact, c * fact)))
+
+    @property
+    def radiusE3(self):
+        """The Euclidean radii of the disks' boundary circles."""
+        return np.sqrt(1.0 - self.centerE3.distSqTo((0.0, 0.0, 0.0)))
+
+    @property
+    def radiusS2(self):
+        return np.arcsin(self.radiusE3)
+
+    def toDiskOP2(self):
+        """Vectorized DiskS2.toDiskOP2."""
+        a, b, c, d = self.data.T
+        return DiskOP2Array(np.column_stack((0.5 * (a - d), c, b, -(a + d) * 0.5)))
+
+# END DiskS2Array
+
+class CircleH2Array(GeometryArray):
+    """Circles in the Poincare disk with finite centers, see CircleH2."""
+
+    scalarType = CircleH2
+    fields = ("centerX", "centerY", "xRadius")
+
+    centerX = _column(0, "The real parts of the centers.")
+    centerY = _column(1, "The imaginary parts of the centers.")
+    xRadius = _column(2, "The x-radii.")
+
+    @classmethod
+    def _toRow(cls, circle):
+        z = circle.center.coord.toComplex()
+        return (z.real, z.imag, circle.xRadius)
+
+    @classmethod
+    def _fromRow(cls, row):
+        return CircleH2(PointH2(complex(row[0], row[1])), row[2])
+
+    @classmethod
+    def _exactRow(cls, circle):
+        # The row keeps only the normalized center, not its coordinates
+        return None
+
+    @property
+    def sRadius(self):
+        xRadius = self.xRadius
+        with np.errstate(invalid = "ignore"):
+            return np.where(xRadius <= 0.0, xRadius, np.sqrt(1.0 - xRadius))
+
+    def toPoincareCircleE2(self):
+        """Vectorized CircleH2.toPoincareCircleE2."""
+        sRad = self.sRadius
+        xRad = self.xRadius
+        x, y = self.centerX, self.centerY
+        ahcSq = x * x + y * y
+        n1 = (1.0 + sRad) * (1.0 + sRad)
+        n2 = n1 - ahcSq * xRad * xRad / n1
+        horocycle = sRad <= 0.0
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            fact = np.where(horocycle, 1.0 + sRad, 4 * sRad / n2)
+            eRad = np.where(horocycle, -sRad, np.abs(xRad * (1.0 - ahcSq) / n2))
+        return CircleE2Array(np.column_stack((fact * x, fact * y, eRad)))
+
+# END CircleH2Array
+
+_ARRAY_TYPES = {arrayType.scalarType: arrayType
+                for arrayType in (PointE2Array, PointE3Array, PointS2Array, CircleE2Array,
+                                  DiskOP2Array, DiskS2Array, CircleH2Array)}
+
+def packObjects(objs):
+    """Packs a list of geometry objects for pickling.
+
+    If every object has the same type, that type has an array type here, and
+    the objects convert to float rows exactly, returns them as a
+    GeometryArray. Otherwise returns objs unchanged. Either way
+    unpackObjects returns a list equal to objs.
+    """
+    if len(objs) == 0:
+        return objs
+    scalarType = type(objs[0])
+    arrayType = _ARRAY_TYPES.get(scalarType)
+    if arrayType is None:
+        return objs
+    rows = []
+    for obj in objs:
+        row = arrayType._exactRow(obj) if type(obj) is scalarType else None
+        if row is None:
+            return objs
+        rows.append(row)
+    return arrayType(rows)
+
+def unpackObjects(packed):
+    """Inverts packObjects, returning a list of scalar objects."""
+    return list(packed)
@@ -0,0 +1,113 @@
+import unittest
+
+import pickle
+
+import numpy as np
+
+from .euclidean2 import PointE2, CircleE2
+from .spherical2 import PointS2
+from .hyperbolic2 import PointH2, CircleH2
+from .geometryArrays import PointE2Array, CircleE2Array, DiskS2Array, CircleH2Array, packObjects, unpackObjects
+from koebe.datastructures.dcel import DCEL
+
+class TestGeometryArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.circles = [CircleE2(PointE2(0.5 * i - 1.0, 0.25 * i * i - 0.5), 0.2 + 0.1 * i) for i in range(6)]
+        self.disks = [c.toDiskS2() for c in self.circles]
+
+    def assertRowsClose(self, array, objs):
+        self.assertTrue(np.allclose(array.data, [tuple(obj) for obj in objs]))
+
+    def test_iteration(self):
+        circles = CircleE2Array.fromObjects(self.circles)
+        self.assertEqual(len(circles), 6)
+        self.assertEqual(list(circles), self.circles)
+        self.assertEqual(circles[2], self.circles[2])
+        self.assertIsInstance(circles[1:3], CircleE2Array)
+
+    def test_toDiskS2(self):
+        self.assertRowsClose(CircleE2Array.fromObjects(self.circles).toDiskS2(), self.disks)
+
+    def test_invertThrough(self):
+        disks = DiskS2Array.fromObjects(self.disks)
+        self.assertRowsClose(disks.invertThrough(self.disks[1]),
+                             [d.invertThrough(self.disks[1]) for d in self.disks])
+
+    def test_inversiveDistTo(self):
+        disks = DiskS2Array.fromObjects(self.disks)
+        others = disks[::-1]
+        self.assertTrue(np.allclose(disks.inversiveDistTo(others),
+                                    [d.inversiveDistTo(o) for d, o in zip(self.disks, reversed(self.disks))]))
+
+    def test_tangentPointWith(self):
+        disks = DiskS2Array.fromObjects(self.disks)
+        self.assertRowsClose(disks[:-1].tangentPointWith(disks[1:]),
+                             [d.tangentPointWith(o) for d, o in zip(self.disks, self.disks[1:])])
+
+    def test_centerAndRadiusE3(self):
+        disks = DiskS2Array.fromObjects(self.disks)
+        self.assertRowsClose(disks.centerE3, [d.centerE3 for d in self.disks])
+        self.assertTrue(np.allclose(disks.radiusE3, [d.radiusE3 for d in self.disks]))
+
+    def test_sgProject(self):
+        points = PointE2Array.fromObjects([PointE2(0.5 * i, 1.0 - i) for i in range(5)])
+        self.assertRowsClose(points.sgProjectToPointS2(), [PointS2.sgProjectFromPointE2(p) for p in points])
+        self.assertTrue(np.allclose(points.sgProjectToPointS2().sgProjectToPointE2().data, points.data))
+
+    def test_toPoincareCircleE2(self):
+        hcircles = [CircleH2(PointH2(complex(0.1 * i, -0.05 * i)), 0.15 * i - 0.2) for i in range(6)]
+        expected = [h.toPoincareCircleE2() for h in hcircles]
+        self.assertTrue(np.allclose(CircleH2Array.fromObjects(hcircles).toPoincareCircleE2().data,
+                                    [(c.center.x, c.center.y, c.radius) for c in expected]))
+
+    def test_vertexColumn(self):
+        dcel = DCEL.generateCycle(vdata = self.disks[:4])
+        disks = DiskS2Array.fromVertices(dcel)
+        disks.attachToVertices(dcel, "disk")
+        disks.data[2, 3] = 5.0
+        self.assertEqual(dcel.verts[2].column("disk").d, 5.0)
+        restored = pickle.loads(pickle.dumps(dcel))
+        self.assertEqual(restored.verts[2].column("disk").d, 5.0)
+
+class TestPacking(unittest.TestCase):
+
+    def setUp(self):
+        self.circles = [CircleE2(PointE2(0.5 * i - 1.0, 0.25 * i), 0.2 + 0.1 * i) for i in range(6)]
+
+    def test_packObjects(self):
+        packed = packObjects(self.circles)
+        self.assertIsInstance(packed, CircleE2Array)
+        self.assertEqual(unpackObjects(pickle.loads(pickle.dumps(packed))), self.circles)
+
+    def test_unpackable(self):
+        # Mixed types, int coordinates and normalized rows are left as lists
+        for objs in ([self.circles[0], PointE2(1.0, 2.0)],
+                     [CircleE2(PointE2(1, 2), 3)],
+                     [CircleH2(PointH2(0.5j), 0.25)],
+                     [None, None]):
+            self.assertIs(packObjects(objs), objs)
+            self.assertEqual(unpackObjects(packObjects(objs)), objs)
+
+    def test_dcelPickle(self):
+        dcel = DCEL()
+        verts = [dcel.Vertex(dcel, data = circle) for circle in self.circles[:3]]
+        face = dcel.Face(dcel, data = "inner")
+        darts = [dcel.Dart(dcel, origin = v, face = face) for v in verts]
+        for i in range(3):
+            darts[i].makeNext(darts[(i + 1) % 3])
+            verts[i].aDart = darts[i]
+        face.aDart = darts[0]
+        state = dcel.__reduce__()[1][0]
+        self.assertIsInstance(state['vert_values'], CircleE2Array)
+        restored = pickle.loads(pickle.dumps(dcel))
+        self.assertEqual([v.data for v in restored.verts], self.circles[:3])
+        self.assertEqual(restored.faces[0].data, "inner")
+        for d in restored.darts:
+            self.assertIs(d.next.prev, d)
+            self.assertIs(d.face, restored.faces[0])
+            self.assertIsNone(d.twin)
+        self.assertIsNone(restored.outerFace)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,10 @@ class PointH2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.coord,))
+
 #     def toPoincarePointE2(self) -> PointE2:
 #         """Computes euclidean point representing this point in the 
 #         poincare disk model of the hyperbolic plane. 
@@ -78,6 +82,9 @@ class LineH2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target))
         
     def toPoincareCircleArcOP2(self):
         z = self.source.coord
@@ -131,6 +138,9 @@ class SegmentH2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target))
         
     def toPoincareCircleArcOP2(self):
         z = self.source.coord
@@ -180,6 +190,9 @@ class CircleH2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.center, self.xRadius))
         
     @classmethod
     def withCenterAndHRadius(cls, center, hRadius):
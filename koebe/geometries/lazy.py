@@ -1,14 +1,32 @@
-# From here: http://code.activestate.com/recipes/576720-lazy-property/
+# Per-instance memoization of derived properties
+#
+# The geometry classes are frozen dataclasses with __slots__, so there is no
+# instance __dict__ to cache into. A class opts in by adding a "_memo" slot;
+# its lazy properties then keep their values in a small dict stored in that
+# slot, which lives and dies with the instance. The _memo slot has no type
+# annotation, so it is not a dataclass field and takes no part in __init__,
+# __eq__, __hash__ or __repr__ (and __getstate__ should skip it).
+#
+# Objects with a __dict__ get their memo there. Objects with neither are not
+# cached at all; the property is simply computed on every access.
 
 def lazyproperty(func):
-    """A decorator for lazy evaluation of properties
+    """A decorator for lazy evaluation of properties, evaluating func at
+    most once per instance.
     """
-    cache = {}
+    name = func.__name__
     def _get(self):
         try:
-            return cache[self]
+            return self._memo[name]
+        except AttributeError:
+            memo = {}
+            try:
+                object.__setattr__(self, "_memo", memo)
+            except AttributeError: # Nowhere to keep it
+                return func(self)
         except KeyError:
-            cache[self] = value = func(self)
-            return value
-        
-    return property(_get)
\ No newline at end of file
+            memo = self._memo
+        memo[name] = value = func(self)
+        return value
+
+    return property(_get, doc = func.__doc__)
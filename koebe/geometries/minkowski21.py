@@ -39,6 +39,9 @@ class VectorM21:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y, self.t))
         
     @classmethod
     def fromPointE2(cls, p):
@@ -170,6 +173,9 @@ class SpanM21:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c))
     
     def dualVectorM21(self):
         return VectorM21(-self.a, -self.b, self.c)
@@ -37,6 +37,9 @@ class VectorM31:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y, self.z, self.t))
         
     @classmethod
     def fromPointE3(cls, p):
@@ -128,6 +131,9 @@ class SpanM31:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c, self.d))
     
     def dualVectorM31(self):
         return VectorM31(-self.a, -self.b, -self.c, self.d)
@@ -0,0 +1,239 @@
+#
+# Vectorized Mobius transformations
+#
+# A MobiusArray stores a stack of Mobius transformations as complex128 2x2
+# matrices [[a, b], [c, d]] (an array of shape (..., 2, 2)), and applies,
+# composes and inverts them with NumPy instead of ExtendedComplex arithmetic.
+#
+# Points of the extended complex plane are given as homogeneous (z, w) pairs
+# of complex arrays, w = 0 being the point at infinity. Circles and disks are
+# mapped through their Hermitian matrices: the disk
+#
+#     A |z|^2 + conj(B) z + B conj(z) + D < 0,    H = [[A, B], [conj(B), D]]
+#
+# is mapped by M to the disk with matrix inv(M)^* H inv(M). Orientation is
+# preserved, so a disk whose interior contains the pole of M is mapped to the
+# exterior of a circle (A < 0).
+#
+
+import numpy as np
+
+from .extendedComplex import ExtendedComplex, Mobius, _to_complex
+from .geometryArrays import PointS2Array, CircleE2Array, DiskOP2Array, DiskS2Array
+
+class MobiusArray:
+    """A stack of Mobius transformations.
+
+    Attributes:
+        mats: A complex128 array of shape (..., 2, 2). The leading dimensions
+            are the batch shape; batches broadcast against each other and
+            against the point arrays passed to apply.
+    """
+
+    def __init__(self, mats):
+        mats = np.asarray(mats, dtype = np.complex128)
+        if mats.ndim < 2 or mats.shape[-2:] != (2, 2):
+            raise ValueError("MobiusArray matrices must have shape (..., 2, 2), got %s" % (mats.shape,))
+        self.mats = mats
+
+    @classmethod
+    def fromMobius(cls, *mobs):
+        """Builds a MobiusArray from Mobius objects."""
+        return cls([[[_to_complex(m.a), _to_complex(m.b)],
+                     [_to_complex(m.c), _to_complex(m.d)]] for m in mobs])
+
+    @classmethod
+    def fromCoefficients(cls, a, b, c, d):
+        """Builds a MobiusArray from (broadcastable) arrays of coefficients."""
+        a, b, c, d = np.broadcast_arrays(*[np.asarray(x, dtype = np.complex128) for x in (a, b, c, d)])
+        return cls(np.stack((np.stack((a, b), axis = -1), np.stack((c, d), axis = -1)), axis = -2))
+
+    @classmethod
+    def identity(cls, n = 1):
+        return cls(np.broadcast_to(np.eye(2, dtype = np.complex128), (n, 2, 2)).copy())
+
+    @property
+    def shape(self):
+        """The batch shape."""
+        return self.mats.shape[:-2]
+
+    def __len__(self):
+        return self.mats.shape[0]
+
+    def __getitem__(self, idx):
+        mats = self.mats[idx]
+        if mats.ndim == 2:
+            return Mobius(*[ExtendedComplex(complex(x)) for x in mats.ravel()])
+        return MobiusArray(mats)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "MobiusArray(%s)" % (self.shape,)
+
+    @property
+    def a(self):
+        return self.mats[..., 0, 0]
+
+    @property
+    def b(self):
+        return self.mats[..., 0, 1]
+
+    @property
+    def c(self):
+        return self.mats[..., 1, 0]
+
+    @property
+    def d(self):
+        return self.mats[..., 1, 1]
+
+    @property
+    def det(self):
+        return self.a * self.d - self.b * self.c
+
+    def normalize(self):
+        """Scales every transformation to determinant 1 (see Mobius.normalize)."""
+        return MobiusArray(self.mats / np.sqrt(self.det)[..., None, None])
+
+    @property
+    def inverse(self):
+        det = self.det
+        inv = np.empty_like(self.mats)
+        inv[..., 0, 0] = self.d / det
+        inv[..., 0, 1] = -self.b / det
+        inv[..., 1, 0] = -self.c / det
+        inv[..., 1, 1] = self.a / det
+        return MobiusArray(inv)
+
+    def conjugate(self):
+        return MobiusArray(self.mats.conj())
+
+    def transpose(self):
+        return MobiusArray(np.swapaxes(self.mats, -1, -2))
+
+    def __mul__(self, other):
+        """Composition: (self * other) applies other first, as for Mobius."""
+        return MobiusArray(np.matmul(self.mats, other.mats))
+
+    __matmul__ = __mul__
+
+    @classmethod
+    def words(cls, generators, length):
+        """Returns all reduced words of the given length in the generators and
+        their inverses, i.e. products g1 * g2 * ... with no generator next to
+        its own inverse. This is the orbit used to draw limit sets of Kleinian
+        groups.
+
+        Args:
+            generators: A MobiusArray of k generators.
+            length: The word length (at least 1).
+
+        Returns:
+            A MobiusArray of 2k (2k - 1)^(length - 1) transformations.
+        """
+        gens = np.concatenate((generators.mats, generators.inverse.mats))
+        k = len(generators)
+        inverseOf = np.concatenate((np.arange(k, 2 * k), np.arange(k)))
+        mats = gens
+        last = np.arange(2 * k)
+        for _ in range(length - 1):
+            words, nexts = np.nonzero(inverseOf[last][:, None] != np.arange(2 * k)[None, :])
+            mats = np.matmul(mats[words], gens[nexts])
+            last = nexts
+        return cls(mats)
+
+    def apply(self, z, w = 1.0):
+        """Applies the transformations to homogeneous points (z, w).
+
+        Batch dimensions broadcast against the shape of z and w, so to apply
+        every transformation of an (m,) stack to every one of n points use
+        M[:, None] or pass z[None, :] with M.mats[:, None].
+
+        Returns:
+            The pair of complex arrays (z', w').
+        """
+        a, b, c, d = self.a, self.b, self.c, self.d
+        z = np.asarray(z, dtype = np.complex128)
+        w = np.asarray(w, dtype = np.complex128)
+        return a * z + b * w, c * z + d * w
+
+    def applyToComplex(self, z):
+        """Applies the transformations to finite complex numbers, returning
+        complex numbers (infinity where a point is sent to the point at
+        infinity)."""
+        zz, ww = self.apply(z)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            return np.where(ww == 0, complex(np.inf, 0), zz / np.where(ww == 0, 1, ww))
+
+    def applyToPointS2(self, points):
+        """Vectorized Mobius.applyToPointS2 for a PointS2Array."""
+        x, y, zc = points.x, points.y, points.z
+        norm = np.sqrt(x * x + y * y + zc * zc)
+        z = x + 1j * y
+        w = (zc + norm).astype(np.complex128)
+        # The south pole is the point at infinity
+        south = (x == 0) & (y == 0) & (zc < 0)
+        z = np.where(south, 1.0, z)
+        w = np.where(south, 0.0, w)
+        z, w = self.apply(z, w)
+        # PointS2.sgProjectFromExtendedComplex
+        zwc = z * w.conj()
+        zwczcw = (zwc * zwc.conj()).real
+        wmsq = (w * w.conj()).real
+        wm4 = wmsq * wmsq
+        fact = 1.0 / (wm4 + zwczcw)
+        return PointS2Array(np.stack(np.broadcast_arrays(2.0 * wmsq * zwc.real * fact,
+                                                         2.0 * wmsq * zwc.imag * fact,
+                                                         (wm4 - zwczcw) * fact), axis = -1).reshape(-1, 3))
+
+    def _applyToHermitian(self, A, B, D):
+        """Maps the Hermitian matrices [[A, B], [conj(B), D]] to
+        inv(M)^* H inv(M), returning the new (A, B, D)."""
+        inv = self.inverse
+        p, q, r, s = inv.a, inv.b, inv.c, inv.d
+        # H inv(M) columns, then conj(inv(M))^T on the left
+        h00 = A * p + B * r
+        h01 = A * q + B * s
+        h10 = B.conj() * p + D * r
+        h11 = B.conj() * q + D * s
+        A2 = (p.conj() * h00 + r.conj() * h10).real
+        B2 = p.conj() * h01 + r.conj() * h11
+        D2 = (q.conj() * h01 + s.conj() * h11).real
+        return A2, B2, D2
+
+    def applyToDiskOP2(self, disks):
+        """Maps a DiskOP2Array (a (x^2 + y^2) + b x + c y + d < 0)."""
+        A = disks.a
+        B = 0.5 * (disks.b + 1j * disks.c)
+        D = disks.d
+        A2, B2, D2 = self._applyToHermitian(A, B, D)
+        return DiskOP2Array(np.stack(np.broadcast_arrays(A2, 2.0 * B2.real, 2.0 * B2.imag, D2),
+                                     axis = -1).reshape(-1, 4))
+
+    def applyToCircleE2(self, circles):
+        """Maps a CircleE2Array. Circles sent through the point at infinity
+        become lines, for which the result has infinite center and radius."""
+        disks = self.applyToDiskOP2(circles.toDiskOP2())
+        a, b, c, d = disks.data.T
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            cx = -b / (2.0 * a)
+            cy = -c / (2.0 * a)
+            radius = np.sqrt(np.abs(cx * cx + cy * cy - d / a))
+        return CircleE2Array(np.column_stack((cx, cy, radius)))
+
+    def applyToDiskS2(self, disks):
+        """Maps a DiskS2Array (a x + b y + c z + d = 0).
+
+        The disks are stereographically projected in the same way as points
+        in Mobius.applyToPointS2 (PointS2.sgProjectToExtendedComplex), which
+        gives the disk (d - c)(x^2 + y^2) + 2a x + 2b y + (c + d) in the plane.
+        """
+        a, b, c, d = disks.data.T
+        A2, B2, D2 = self._applyToHermitian(d - c, a + 1j * b, c + d)
+        A2, B2, D2 = np.broadcast_arrays(A2, B2, D2)
+        return DiskS2Array(np.column_stack((B2.real.ravel(), B2.imag.ravel(),
+                                            0.5 * (D2 - A2).ravel(), 0.5 * (D2 + A2).ravel())))
+
+# END MobiusArray
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from .extendedComplex import ExtendedComplex, Mobius
+from .euclidean2 import PointE2, CircleE2
+from .spherical2 import PointS2, DiskS2
+from .geometryArrays import PointS2Array, CircleE2Array, DiskS2Array
+from .mobiusArrays import MobiusArray
+
+class TestMobiusArray(unittest.TestCase):
+
+    def setUp(self):
+        self.mobs = [Mobius(ExtendedComplex(1 + 0.5j * i), ExtendedComplex(0.25 - 1j),
+                            ExtendedComplex(0.3 * i + 0.1j), ExtendedComplex(2 - 0.2j * i)) for i in range(3)]
+        self.M = MobiusArray.fromMobius(*self.mobs)
+
+    def assertComplexClose(self, z, w):
+        self.assertTrue(abs(complex(z) - complex(w)) < 1e-9)
+
+    def test_apply(self):
+        zs = np.array([0.5 + 0.5j, -1.0 + 0.25j, 2j])
+        images = MobiusArray(self.M.mats[:, None]).applyToComplex(zs[None, :])
+        for i, mob in enumerate(self.mobs):
+            for j, z in enumerate(zs):
+                self.assertComplexClose(images[i, j], mob.apply(ExtendedComplex(complex(z))).toComplex())
+
+    def test_composeAndInverse(self):
+        prod = self.M[0:1] * self.M[1:2]
+        expected = self.mobs[0] * self.mobs[1]
+        self.assertComplexClose(prod.a[0], expected.a.toComplex())
+        self.assertComplexClose(prod.c[0], expected.c.toComplex())
+        ident = (self.M * self.M.inverse).mats
+        self.assertTrue(np.allclose(ident, np.eye(2)))
+        self.assertTrue(np.allclose(self.M.normalize().det, 1.0))
+
+    def test_words(self):
+        words = MobiusArray.words(self.M[:2], 3)
+        self.assertEqual(len(words), 4 * 3 * 3)
+
+    def test_applyToCircleE2(self):
+        circle = CircleE2(PointE2(0.25, -0.5), 0.75)
+        image = self.M[0:1].applyToCircleE2(CircleE2Array.fromObjects([circle]))[0]
+        for t in np.linspace(0, 2 * np.pi, 7):
+            z = complex(0.25 + 0.75 * np.cos(t), -0.5 + 0.75 * np.sin(t))
+            w = self.mobs[0].apply(ExtendedComplex(z)).toComplex()
+            self.assertAlmostEqual(abs(w - complex(image.center.x, image.center.y)), image.radius)
+
+    def test_applyToPointS2(self):
+        p = PointS2(0.6, 0.0, 0.8)
+        image = self.M[0:1].applyToPointS2(PointS2Array.fromObjects([p]))[0]
+        expected = self.mobs[0].applyToPointS2(p)
+        self.assertTrue(np.allclose(tuple(image), tuple(expected)))
+
+    def test_applyToDiskS2(self):
+        pts = [PointS2(1.0, 0.0, 0.0), PointS2(0.0, 1.0, 0.0), PointS2(0.0, 0.6, 0.8)]
+        disk = DiskS2.throughThreePointS2(*pts)
+        image = self.M[1:2].applyToDiskS2(DiskS2Array.fromObjects([disk]))[0]
+        for p in pts:
+            q = self.mobs[1].applyToPointS2(p)
+            self.assertAlmostEqual(image.a * q.x + image.b * q.y + image.c * q.z + image.d, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 
 from .orientation import Orientation
 from .commonOps import determinant2, determinant3, inner_product4, isZero
+from .lazy import lazyproperty
 from .euclidean3 import VectorE3
 from .euclidean2 import PointE2, CircleE2
 
@@ -38,6 +39,9 @@ class PointOP2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.hx, self.hy, self.hw))
     
     def distSqTo(self, p):
         dx = p.hx / p.hw - self.hx / self.hw
@@ -74,7 +78,8 @@ class DiskOP2:
     a(x^2 + y^2) + b x + c y + d = 0. If a = 0 this is a line.
     """
         
-    __slots__ = ['a', 'b', 'c', 'd']
+    # _memo holds the lazily computed derived quantities (see lazy.py)
+    __slots__ = ['a', 'b', 'c', 'd', '_memo']
     
     a: Any
     b: Any
@@ -88,11 +93,14 @@ class DiskOP2:
         yield self.d
     
     def __getstate__(self):
-        return {slot: getattr(self, slot) for slot in self.__slots__}
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_memo'}
     
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c, self.d))
     
     def translate(self, tx, ty):
         T = np.array([[1,               0,   0, 0], 
@@ -190,17 +198,17 @@ class DiskOP2:
     def isLine(self):
         return isZero(self.a)
     
-    @property
+    @lazyproperty
     def center(self):
         return PointOP2(-self.b, -self.c, 2.0*self.a)
     
-    @property
+    @lazyproperty
     def radiusSq(self):
         #center = self.center.toPointE2()
         return (self.b*self.b + self.c*self.c - 4.0*self.a*self.d) / (4.0*self.a*self.a)
         #return center.x * center.x + center.y * center.y - (self.d/self.a)
     
-    @property
+    @lazyproperty
     def radius(self):
         return math.sqrt(self.radiusSq)
     
@@ -331,6 +339,9 @@ class CircleArcOP2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target, self.disk))
     
     @classmethod
     def fromPointOP2(cls, p1, p2, p3):
@@ -391,6 +402,9 @@ class LineOP2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c))
     
     def intersectWithLineOP2(self, line2): 
         detx =  determinant2(self.b, self.c, line2.b, line2.c)
@@ -430,6 +444,9 @@ class VectorOP2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.hx, self.hy, self.hw))
         
     @classmethod
     def fromVectorOP2(cls, v):
@@ -488,6 +505,9 @@ class SegmentOP2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target))
     
     @property
     def lengthSq(self):
@@ -35,6 +35,9 @@ class LineOP3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.p01, self.p02, self.p03, self.p12, self.p13, self.p23))
     
     @classmethod
     def fromPointOP3(cls, p1, p2):
@@ -154,6 +157,9 @@ class PointOP3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.hx, self.hy, self.hz, self.hw))
     
     @classmethod
     def fromPointOP3(cls, p):
@@ -250,6 +256,9 @@ class PlaneOP3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.X, self.Y, self.Z, self.W))
     
     @classmethod
     def fromPointOP3(cls, p1, p2, p3):
@@ -305,6 +314,9 @@ class VectorOP3:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.hx, self.hy, self.hz, self.hw))
     
     @classmethod
     def fromVectorOP3(self, v):
@@ -0,0 +1,202 @@
+#
+# Filtered exact geometric predicates
+#
+# Each predicate returns the sign (-1, 0 or 1) of a determinant. It first
+# evaluates the determinant in floating point together with a bound on the
+# rounding error (following Shewchuk, "Adaptive Precision Floating-Point
+# Arithmetic and Fast Robust Geometric Predicates", 1997). Only when the
+# float value is within the error bound of zero is the determinant
+# recomputed exactly with fractions.Fraction, which represents every float
+# exactly. For inputs in general position the cost is a few extra float
+# operations; degenerate inputs get the correct sign, including 0.
+#
+# The *Array variants take NumPy arrays (broadcast against each other) and
+# return an int8 array of signs, re-evaluating exactly only the entries
+# whose sign is uncertain.
+#
+
+from fractions import Fraction
+
+import numpy as np
+
+_EPS = np.finfo(np.float64).eps / 2.0 # Unit roundoff, 2^-53
+
+# Error bound coefficients (Shewchuk's ccwerrboundA, o3derrboundA, iccerrboundA)
+_ORIENT2D_BOUND = (3.0 + 16.0 * _EPS) * _EPS
+_ORIENT3D_BOUND = (7.0 + 56.0 * _EPS) * _EPS
+_INCIRCLE_BOUND = (10.0 + 96.0 * _EPS) * _EPS
+# A direct cofactor expansion of a 4x4 determinant rounds each of its 24
+# terms at most 9 times, so this is a conservative bound.
+_DET4_BOUND = (12.0 + 128.0 * _EPS) * _EPS
+
+def _sign(x):
+    return 1 if x > 0 else -1 if x < 0 else 0
+
+def _det2(a, b, c, d):
+    return a * d - b * c
+
+def _det3(a, b, c, d, e, f, g, h, i):
+    return a * _det2(e, f, h, i) - b * _det2(d, f, g, i) + c * _det2(d, e, g, h)
+
+def _det4(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p):
+    return (a * _det3(f, g, h, j, k, l, n, o, p)
+            - b * _det3(e, g, h, i, k, l, m, o, p)
+            + c * _det3(e, f, h, i, j, l, m, n, p)
+            - d * _det3(e, f, g, i, j, k, m, n, o))
+
+def _perm2(a, b, c, d):
+    return abs(a * d) + abs(b * c)
+
+def _perm3(a, b, c, d, e, f, g, h, i):
+    return (abs(a) * _perm2(e, f, h, i) + abs(b) * _perm2(d, f, g, i) + abs(c) * _perm2(d, e, g, h))
+
+def _perm4(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p):
+    return (abs(a) * _perm3(f, g, h, j, k, l, n, o, p)
+            + abs(b) * _perm3(e, g, h, i, k, l, m, o, p)
+            + abs(c) * _perm3(e, f, h, i, j, l, m, n, p)
+            + abs(d) * _perm3(e, f, g, i, j, k, m, n, o))
+
+def _fractions(*xs):
+    return [Fraction(x) for x in xs]
+
+#### Exact evaluation
+
+def _orient2dExact(ax, ay, bx, by, cx, cy):
+    ax, ay, bx, by, cx, cy = _fractions(ax, ay, bx, by, cx, cy)
+    return _sign(_det2(ax - cx, ay - cy, bx - cx, by - cy))
+
+def _orient3dExact(ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz):
+    ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz = _fractions(ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz)
+    return _sign(_det3(ax - dx, ay - dy, az - dz,
+                       bx - dx, by - dy, bz - dz,
+                       cx - dx, cy - dy, cz - dz))
+
+def _inCircleExact(ax, ay, bx, by, cx, cy, dx, dy):
+    ax, ay, bx, by, cx, cy, dx, dy = _fractions(ax, ay, bx, by, cx, cy, dx, dy)
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    return _sign(_det3(adx, ady, adx * adx + ady * ady,
+                       bdx, bdy, bdx * bdx + bdy * bdy,
+                       cdx, cdy, cdx * cdx + cdy * cdy))
+
+def _det4Exact(*entries):
+    return _sign(_det4(*_fractions(*entries)))
+
+#### Scalar predicates
+
+def orient2d(ax, ay, bx, by, cx, cy):
+    """Returns 1 if a, b, c make a left (counterclockwise) turn, -1 if they
+    make a right turn and 0 if they are collinear, exactly.
+    """
+    acx, acy = ax - cx, ay - cy
+    bcx, bcy = bx - cx, by - cy
+    detLeft = acx * bcy
+    detRight = acy * bcx
+    det = detLeft - detRight
+    if abs(det) > _ORIENT2D_BOUND * (abs(detLeft) + abs(detRight)):
+        return _sign(det)
+    return _orient2dExact(ax, ay, bx, by, cx, cy)
+
+def orient3d(ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz):
+    """Returns the exact sign of the determinant
+
+        | ax ay az 1 |
+        | bx by bz 1 |
+        | cx cy cz 1 |
+        | dx dy dz 1 |
+
+    (the orientation of the tetrahedron abcd).
+    """
+    adx, ady, adz = ax - dx, ay - dy, az - dz
+    bdx, bdy, bdz = bx - dx, by - dy, bz - dz
+    cdx, cdy, cdz = cx - dx, cy - dy, cz - dz
+    det = _det3(adx, ady, adz, bdx, bdy, bdz, cdx, cdy, cdz)
+    perm = _perm3(adx, ady, adz, bdx, bdy, bdz, cdx, cdy, cdz)
+    if abs(det) > _ORIENT3D_BOUND * perm:
+        return _sign(det)
+    return _orient3dExact(ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz)
+
+def inCircle(ax, ay, bx, by, cx, cy, dx, dy):
+    """Returns 1 if d lies inside the circle through a, b, c (given in
+    counterclockwise order), -1 if outside and 0 if the four points are
+    cocircular, exactly.
+    """
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+    det = _det3(adx, ady, alift, bdx, bdy, blift, cdx, cdy, clift)
+    perm = _perm3(adx, ady, alift, bdx, bdy, blift, cdx, cdy, clift)
+    if abs(det) > _INCIRCLE_BOUND * perm:
+        return _sign(det)
+    return _inCircleExact(ax, ay, bx, by, cx, cy, dx, dy)
+
+def det4Sign(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p):
+    """Returns the exact sign of a general 4x4 determinant given in row major
+    order, e.g. the orientation of four homogeneous points of OP3.
+    """
+    det = _det4(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p)
+    perm = _perm4(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p)
+    if abs(det) > _DET4_BOUND * perm:
+        return _sign(det)
+    return _det4Exact(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p)
+
+#### Vectorized predicates
+
+def _filtered(det, perm, bound, exact, args, knownZero = None):
+    """Returns the signs of det, recomputing with exact(*args at idx) where
+    the float sign is uncertain and the determinant is not knownZero."""
+    signs = np.sign(det).astype(np.int8)
+    uncertain = np.abs(det) <= bound * perm
+    if knownZero is not None:
+        signs[knownZero] = 0
+        uncertain &= ~knownZero
+    uncertain = np.nonzero(uncertain)
+    if len(uncertain[0]) > 0:
+        args = np.broadcast_arrays(*args)
+        for idx in zip(*uncertain):
+            signs[idx] = exact(*[float(arg[idx]) for arg in args])
+    return signs
+
+def _asArrays(*args):
+    return [np.asarray(arg, dtype = np.float64) for arg in args]
+
+def orient2dArray(ax, ay, bx, by, cx, cy):
+    """Vectorized orient2d. The arguments broadcast against each other."""
+    args = _asArrays(ax, ay, bx, by, cx, cy)
+    ax, ay, bx, by, cx, cy = args
+    detLeft = (ax - cx) * (by - cy)
+    detRight = (ay - cy) * (bx - cx)
+    det = np.atleast_1d(detLeft - detRight)
+    perm = np.atleast_1d(np.abs(detLeft) + np.abs(detRight))
+    # Segments sharing an endpoint are common (polygon boundaries, meshes),
+    # and a repeated point makes the determinant exactly zero.
+    repeated = np.atleast_1d(((ax == cx) & (ay == cy)) | ((bx == cx) & (by == cy)) | ((ax == bx) & (ay == by)))
+    return _filtered(det, perm, _ORIENT2D_BOUND, _orient2dExact, [np.atleast_1d(arg) for arg in args], repeated)
+
+def orient3dArray(ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz):
+    """Vectorized orient3d. The arguments broadcast against each other."""
+    args = [np.atleast_1d(arg) for arg in _asArrays(ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz)]
+    ax, ay, az, bx, by, bz, cx, cy, cz, dx, dy, dz = args
+    diffs = (ax - dx, ay - dy, az - dz, bx - dx, by - dy, bz - dz, cx - dx, cy - dy, cz - dz)
+    return _filtered(_det3(*diffs), _perm3(*diffs), _ORIENT3D_BOUND, _orient3dExact, args)
+
+def inCircleArray(ax, ay, bx, by, cx, cy, dx, dy):
+    """Vectorized inCircle. The arguments broadcast against each other."""
+    args = [np.atleast_1d(arg) for arg in _asArrays(ax, ay, bx, by, cx, cy, dx, dy)]
+    ax, ay, bx, by, cx, cy, dx, dy = args
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    rows = (adx, ady, adx * adx + ady * ady,
+            bdx, bdy, bdx * bdx + bdy * bdy,
+            cdx, cdy, cdx * cdx + cdy * cdy)
+    return _filtered(_det3(*rows), _perm3(*rows), _INCIRCLE_BOUND, _inCircleExact, args)
+
+def det4SignArray(*entries):
+    """Vectorized det4Sign, taking the 16 entries in row major order."""
+    args = [np.atleast_1d(arg) for arg in _asArrays(*entries)]
+    return _filtered(_det4(*args), _perm4(*args), _DET4_BOUND, _det4Exact, args)
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from .predicates import orient2d, orient3d, inCircle, det4Sign, orient2dArray, orient3dArray, inCircleArray
+from .euclidean3 import PointE3
+from ..algorithms.incrementalConvexHull import initialTetrahedronFirst, orientationPointE3
+
+class TestPredicates(unittest.TestCase):
+
+    def test_orient2d(self):
+        self.assertEqual(orient2d(0, 0, 1, 0, 0, 1), 1)
+        self.assertEqual(orient2d(0, 0, 0, 1, 1, 0), -1)
+        self.assertEqual(orient2d(0, 0, 1, 1, 2, 2), 0)
+
+    def test_orient2dNearlyCollinear(self):
+        # Points within a few ulps of the line y = x (Shewchuk's example)
+        for i in range(8):
+            for j in range(8):
+                x, y = 0.5 + i * 2**-53, 0.5 + j * 2**-53
+                expected = 1 if j > i else -1 if j < i else 0
+                self.assertEqual(orient2d(x, y, 12.0, 12.0, 24.0, 24.0), expected)
+
+    def test_orient3d(self):
+        self.assertEqual(orient3d(0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1), -1)
+        self.assertEqual(orient3d(0, 0, 0, 1, 0, 0, 0, 1, 0, 0.1, 0.7, 0), 0)
+        # A fourth point in the plane of three others, up to rounding
+        a, b, c = np.array([0.1, 0.2, 0.3]), np.array([1.7, -0.3, 0.9]), np.array([-0.4, 2.2, 0.05])
+        d = a + 0.3 * (b - a) + 0.7 * (c - a)
+        self.assertEqual(orient3d(*a, *b, *c, *d), det4Sign(*a, 1.0, *b, 1.0, *c, 1.0, *d, 1.0))
+
+    def test_inCircle(self):
+        self.assertEqual(inCircle(1, 0, 0, 1, -1, 0, 0, 0), 1)
+        self.assertEqual(inCircle(1, 0, 0, 1, -1, 0, 0, 2), -1)
+        self.assertEqual(inCircle(1, 0, 0, 1, -1, 0, 0, -1), 0)
+
+    def test_arrays(self):
+        xs = 0.5 + np.arange(8) * 2**-53
+        signs = orient2dArray(xs, 0.5, 12.0, 12.0, 24.0, 24.0)
+        self.assertEqual(list(signs), [orient2d(x, 0.5, 12.0, 12.0, 24.0, 24.0) for x in xs])
+        self.assertEqual(list(orient3dArray(0, 0, 0, 1, 0, 0, 0, 1, 0, [0, 0], [0, 0], [1, 0])), [-1, 0])
+        self.assertEqual(list(inCircleArray(1, 0, 0, 1, -1, 0, 0, [0, 2, -1])), [1, -1, 0])
+
+    def test_initialTetrahedronFirst(self):
+        # Many copies of one point, then points on a line, then on a plane
+        points = ([PointE3(0, 0, 0)] * 50 + [PointE3(0.1 * k, 0, 0) for k in range(50)]
+                  + [PointE3(0, 0.3 * k, 0) for k in range(50)] + [PointE3(0.2, 0.1, 1)])
+        first = initialTetrahedronFirst(points, orientationPointE3)
+        self.assertNotEqual(orientationPointE3(*first[:4]), 0)
+        self.assertEqual(sorted(map(id, first)), sorted(map(id, points)))
+        with self.assertRaises(ValueError):
+            initialTetrahedronFirst(points[:-1], orientationPointE3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ from .euclidean3 import DirectionE3, VectorE3, least_dominant_VectorE3, PointE3
 from .orientedProjective3 import PointOP3, LineOP3, PlaneOP3
 from . import extendedComplex as ec
 from .commonOps import determinant2, determinant3, inner_product31, isZero, are_dependent4
+from .lazy import lazyproperty
 
 import math
 from enum import Enum
@@ -37,6 +38,9 @@ class PointS2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y, self.z))
     
     @classmethod
     def fromVector(cls, v):
@@ -126,7 +130,8 @@ class PointS2:
 @dataclass(frozen=True)
 class DiskS2:
     
-    __slots__ = ['a', 'b', 'c', 'd']
+    # _memo holds the lazily computed derived quantities (see lazy.py)
+    __slots__ = ['a', 'b', 'c', 'd', '_memo']
     
     a: Any
     b: Any
@@ -140,11 +145,14 @@ class DiskS2:
         yield self.d
     
     def __getstate__(self):
-        return {slot: getattr(self, slot) for slot in self.__slots__}
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_memo'}
     
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c, self.d))
         
     @classmethod
     def fromDiskS2(cls, disk):
@@ -198,31 +206,31 @@ class DiskS2:
                     d = 0.0
                   )
 
-    @property
+    @lazyproperty
     def basis1(self):
         return least_dominant_VectorE3(VectorE3(self.a, self.b, self.c)).value.cross(VectorE3(self.a, self.b, self.c))
     
-    @property 
+    @lazyproperty
     def basis2(self):
         return self.basis1.cross(VectorE3(self.a, self.b, self.c))
     
-    @property
+    @lazyproperty
     def basis3(self):
         return VectorE3(self.a, self.b, self.c)
     
-    @property
+    @lazyproperty
     def normedBasis1(self):
         return DirectionE3(self.basis1)
     
-    @property
+    @lazyproperty
     def normedBasis2(self):
         return DirectionE3(self.basis2)
     
-    @property
+    @lazyproperty
     def normedBasis3(self):
         return DirectionE3(self.basis3)
     
-    @property
+    @lazyproperty
     def directionE3(self):
         return DirectionE3(VectorE3(self.a, self.b, self.c))
     
@@ -238,19 +246,19 @@ class DiskS2:
     def dualCPlaneS2(self):
         return CPlaneS2(-self.a, -self.b, -self.c, self.d)
     
-    @property
+    @lazyproperty
     def centerE3(self):
         return PointOP3(-self.a * self.d, -self.b * self.d, -self.c * self.d, self.a * self.a + self.b * self.b + self.c * self.c).toPointE3()
     
-    @property
+    @lazyproperty
     def radiusE3(self):
         return (1.0 - (self.centerE3 - PointE3.O).normSq())**(0.5)
     
-    @property
+    @lazyproperty
     def centerS2(self):
         return PointS2.fromVector(self.directionE3.v * self.d)
 
-    @property
+    @lazyproperty
     def radiusS2(self):
         return math.asin(self.radiusE3)
     
@@ -404,6 +412,9 @@ class CoaxialFamilyS2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target))
     
     def type(self):
         isectCount = len(LineOP3.fromPlaneOP3(self.source.dualPlaneOP3, self.target.dualPlaneOP3).getIntersectionWithUnit2Sphere())
@@ -494,6 +505,9 @@ class CPlaneS2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.a, self.b, self.c, self.d))
         
     @classmethod
     def throughThreeDiskS2(cls, disk1, disk2, disk3):
@@ -552,6 +566,9 @@ class CircleArcS2:
     def __setstate__(self, state):
         for slot, value in state.items():
             object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.source, self.target, self.disk))
     
     @property
     def basis1(self):
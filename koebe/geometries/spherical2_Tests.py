@@ -1,9 +1,36 @@
+import unittest
 
-import unittest 
+import pickle
+
+from .spherical2 import PointS2, DiskS2
 
 class Test(unittest.TestCase):
     def test(self):
         None
-        
+
+class TestDiskS2LazyProperties(unittest.TestCase):
+
+    def setUp(self):
+        self.disk = DiskS2.withCenterAndRadiusS2(PointS2(0.6, 0.0, 0.8), 0.4)
+
+    def test_memoized(self):
+        center = self.disk.centerE3
+        self.assertIs(self.disk.centerE3, center)
+        self.assertIs(self.disk.normedBasis1, self.disk.normedBasis1)
+        self.assertAlmostEqual(self.disk.radiusS2, 0.4)
+        # Matches a fresh disk with the same coefficients
+        fresh = DiskS2(*self.disk)
+        self.assertEqual(tuple(fresh.centerE3), tuple(center))
+        self.assertEqual(tuple(fresh.normedBasis2.v), tuple(self.disk.normedBasis2.v))
+
+    def test_memoNotPickled(self):
+        radius = self.disk.radiusE3
+        copy = pickle.loads(pickle.dumps(self.disk))
+        self.assertEqual(tuple(copy), tuple(self.disk))
+        self.assertFalse(hasattr(copy, "_memo"))
+        self.assertEqual(copy.radiusE3, radius)
+        self.assertEqual(hash(copy), hash(self.disk))
+        self.assertEqual(repr(copy), repr(DiskS2(*self.disk)))
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
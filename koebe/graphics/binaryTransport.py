@@ -0,0 +1,203 @@
+#
+# Binary transport of scenes to the browser widgets
+# @author John C. Bowers
+#
+# Instead of sending a whole scene as one JSON string every time it is shown,
+# the widget viewers send "packets". A packet is a small JSON header plus one
+# binary blob of typed arrays, which the widget comm delivers as a binary
+# buffer (no base64, no JSON parsing of coordinates):
+#
+#   types    Uint8Array    the type code of each object
+#   styles   Int32Array    the index of each object's style in the style table, or -1
+#   offsets  Uint32Array   where each object's numbers start in coords (length n + 1)
+#   coords   Float64Array  the numbers of all objects back to back
+#
+# Styles are sent as a lookup table that only ever grows, so each distinct
+# style crosses the wire once. The first packet is a full snapshot. Later
+# packets are deltas: for every animation frame that changed, the run of
+# objects between the unchanged prefix and unchanged suffix is replaced
+# (a "splice"). Adding objects to a scene and calling show() again therefore
+# only sends the added objects.
+#
+# The JavaScript half is js/binaryTransport.js, which rebuilds the same
+# object dictionaries that the JSON transport produced.
+#
+
+import json
+import struct
+
+import numpy as np
+
+# Type codes of objects with a binary layout, by position in this list.
+TYPE_NAMES = ["PointE2", "CircleE2", "SegmentE2", "CircleArcE2", "PolygonE2",
+              "Polygon", "Polygons", "PointE3", "DiskS2", "SegmentE3"]
+
+# Objects of any other type are sent as JSON in the packet header.
+EXTRA_TYPE = 255
+
+_TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+def _flatPoints(points, dim):
+    """Flattens a list of points, writing NaNs for missing (empty) points."""
+    coords = []
+    for p in points:
+        if len(p) == 0:
+            coords.extend([float("nan")] * dim)
+        elif len(p) == dim:
+            coords.extend(p)
+        else:
+            raise ValueError("Point has the wrong dimension")
+    return coords
+
+def _coords(d, dim):
+    """Returns the list of numbers encoding an object dictionary."""
+    kind = d["type"]
+    if kind == "PointE2" or kind == "PointE3":
+        return list(d["point"])
+    elif kind == "CircleE2":
+        return list(d["center"]) + [d["radius"]]
+    elif kind == "SegmentE2" or kind == "SegmentE3":
+        return _flatPoints(d["endpoints"], 2 if kind == "SegmentE2" else 3)
+    elif kind == "CircleArcE2":
+        return list(d["center"]) + [d["radius"], d["srcAngle"], d["targetAngle"]]
+    elif kind == "PolygonE2":
+        return _flatPoints(d["vertices"], 2)
+    elif kind == "Polygon":
+        return _flatPoints(d["vertices"], dim)
+    elif kind == "Polygons":
+        polygons = d["polygons"]
+        coords = [len(polygons)] + [len(polygon) for polygon in polygons]
+        for polygon in polygons:
+            coords.extend(_flatPoints(polygon, dim))
+        return coords
+    elif kind == "DiskS2":
+        return (list(d["disk"]) + list(d["b1"]) + list(d["b2"]) + list(d["b3"])
+                + [d["centerDist"], d["diameter"]])
+
+class SceneEncoder:
+    """Encodes the animation frames of a viewer as binary packets.
+
+    The encoder remembers what it last sent, so encode() returns a delta
+    packet against the previous one unless a full packet is asked for.
+
+    Attributes:
+        dim: The dimension of Polygon(s) vertices, 2 for the Euclidean viewers
+            and 3 for the spherical ones.
+    """
+
+    def __init__(self, dim = 2):
+        self.dim = dim
+        self.reset()
+
+    def reset(self):
+        """Forgets everything sent, so that the next packet is a full one."""
+        self._styleIndex = {}
+        self._styles = []
+        self._sentStyles = 0
+        self._frames = None
+        self._seq = 0
+
+    def _styleIdx(self, style):
+        if style == None:
+            return -1
+        key = json.dumps(style, sort_keys = True)
+        idx = self._styleIndex.get(key)
+        if idx == None:
+            idx = self._styleIndex[key] = len(self._styles)
+            self._styles.append(style)
+        return idx
+
+    def _encodeObj(self, d):
+        """Returns the comparison key of an object dictionary, which is also
+        everything needed to pack it: (type code, style index, coords packed
+        as little endian doubles) or (EXTRA_TYPE, -1, json string). Packing
+        the coords also makes NaNs (missing points) compare equal."""
+        code = _TYPE_CODES.get(d["type"])
+        if code != None:
+            try:
+                coords = _coords(d, self.dim)
+                packed = struct.pack("<%dd" % len(coords), *coords)
+                return (code, self._styleIdx(d.get("style")), packed)
+            except (KeyError, TypeError, ValueError):
+                pass
+        return (EXTRA_TYPE, -1, json.dumps(d))
+
+    def encode(self, frames, full = False):
+        """Encodes frames (a list of lists of object dictionaries, as produced
+        by the viewers' _p5_dict functions).
+
+        Returns:
+            A pair (header, blob) where header is a JSON-serializable dict and
+            blob is a bytes object, or None if nothing changed since the last
+            packet.
+        """
+        keys = [[self._encodeObj(d) for d in frame if d != None] for frame in frames]
+
+        splices = []
+        if full or self._frames == None:
+            full = True
+            self._sentStyles = 0
+            for f, frame in enumerate(keys):
+                splices.append((f, 0, 0, frame))
+        else:
+            for f, frame in enumerate(keys):
+                old = self._frames[f] if f < len(self._frames) else []
+                n, m = len(old), len(frame)
+                start = 0
+                while start < n and start < m and old[start] == frame[start]:
+                    start += 1
+                end = 0
+                while end < n - start and end < m - start and old[n - 1 - end] == frame[m - 1 - end]:
+                    end += 1
+                if start != n - end or start != m - end:
+                    splices.append((f, start, n - end - start, frame[start:m - end]))
+
+        if (not full and len(splices) == 0 and len(keys) == len(self._frames)
+            and self._sentStyles == len(self._styles)):
+            return None
+
+        header, blob = self._pack(splices)
+        header["kind"] = "full" if full else "delta"
+        header["base"] = None if full else self._seq
+        self._seq += 1
+        header["seq"] = self._seq
+        header["dim"] = self.dim
+        header["frameCount"] = len(keys)
+        header["styleBase"] = self._sentStyles
+        header["newStyles"] = self._styles[self._sentStyles:]
+        self._sentStyles = len(self._styles)
+        self._frames = keys
+        return header, blob
+
+    def _pack(self, splices):
+        objs = [key for _, _, _, inserted in splices for key in inserted]
+        n = len(objs)
+        types = np.fromiter((key[0] for key in objs), dtype = np.uint8, count = n)
+        styles = np.fromiter((key[1] for key in objs), dtype = np.int32, count = n)
+        lengths = np.fromiter((0 if key[0] == EXTRA_TYPE else len(key[2]) // 8 for key in objs),
+                              dtype = np.uint32, count = n)
+        offsets = np.zeros(n + 1, dtype = np.uint32)
+        np.cumsum(lengths, out = offsets[1:])
+        coords = np.frombuffer(b"".join(key[2] for key in objs if key[0] != EXTRA_TYPE), 
+                               dtype = "<f8")
+        extras = {str(i): json.loads(key[2]) for i, key in enumerate(objs) if key[0] == EXTRA_TYPE}
+
+        # Every array starts on an 8 byte boundary so the browser can view it in place
+        layout = {}
+        parts = []
+        pos = 0
+        for name, arr in (("coords", coords), ("offsets", offsets), ("styles", styles), ("types", types)):
+            layout[name] = [pos, len(arr)]
+            data = arr.astype(arr.dtype.newbyteorder("<"), copy = False).tobytes()
+            parts.append(data)
+            pad = (-len(data)) % 8
+            parts.append(b"\0" * pad)
+            pos += len(data) + pad
+
+        header = {"typeNames": TYPE_NAMES,
+                  "splices": [[f, start, deleteCount, len(inserted)] for f, start, deleteCount, inserted in splices],
+                  "layout": layout,
+                  "extras": extras}
+        return header, b"".join(parts)
+
+# END SceneEncoder
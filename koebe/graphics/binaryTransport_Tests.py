@@ -0,0 +1,134 @@
+import unittest
+
+import copy
+
+import numpy as np
+
+from .binaryTransport import EXTRA_TYPE, SceneEncoder
+
+def points(c, start, count, dim):
+    result = [c[start + i * dim:start + (i + 1) * dim] for i in range(count)]
+    return [[] if np.isnan(p[0]) else p for p in result]
+
+def decodeObject(kind, c, dim):
+    """The object dictionary of type kind with the numbers c, as decodeObject of
+    js/binaryTransport.js builds it."""
+    c = c.tolist()
+    if kind in ("PointE2", "PointE3"):
+        return {"type": kind, "point": c}
+    elif kind == "CircleE2":
+        return {"type": kind, "center": c[0:2], "radius": c[2]}
+    elif kind in ("SegmentE2", "SegmentE3"):
+        return {"type": kind, "endpoints": points(c, 0, 2, 2 if kind == "SegmentE2" else 3)}
+    elif kind == "CircleArcE2":
+        return {"type": kind, "center": c[0:2], "radius": c[2], "srcAngle": c[3], "targetAngle": c[4]}
+    elif kind == "PolygonE2":
+        return {"type": kind, "vertices": points(c, 0, len(c) // 2, 2)}
+    elif kind == "Polygon":
+        return {"type": kind, "vertices": points(c, 0, len(c) // dim, dim)}
+    elif kind == "Polygons":
+        count, pos, polygons = int(c[0]), 1 + int(c[0]), []
+        for i in range(count):
+            polygons.append(points(c, pos, int(c[1 + i]), dim))
+            pos += int(c[1 + i]) * dim
+        return {"type": kind, "polygons": polygons}
+    elif kind == "DiskS2":
+        return {"type": kind, "disk": c[0:4], "b1": c[4:7], "b2": c[7:10], "b3": c[10:13],
+                "centerDist": c[13], "diameter": c[14]}
+
+def applyPacket(state, header, blob):
+    """Applies a packet to a decoder state {"seq", "styles", "frames"}, as
+    applyPacket of js/binaryTransport.js does."""
+    if header["kind"] == "delta":
+        assert header["base"] == state["seq"]
+    else:
+        state["styles"], state["frames"] = [], []
+    del state["styles"][header["styleBase"]:]
+    state["styles"].extend(header["newStyles"])
+    
+    def view(dtype, entry):
+        return np.frombuffer(blob, dtype = dtype, count = entry[1], offset = entry[0])
+    layout = header["layout"]
+    coords, offsets = view("<f8", layout["coords"]), view("<u4", layout["offsets"])
+    styles, types = view("<i4", layout["styles"]), view("u1", layout["types"])
+    
+    objIdx = 0
+    for f, start, deleteCount, insertCount in header["splices"]:
+        while len(state["frames"]) <= f:
+            state["frames"].append([])
+        inserted = []
+        for _ in range(insertCount):
+            if types[objIdx] == EXTRA_TYPE:
+                obj = header["extras"][str(objIdx)]
+            else:
+                obj = decodeObject(header["typeNames"][types[objIdx]], 
+                                   coords[offsets[objIdx]:offsets[objIdx + 1]], header["dim"])
+                if styles[objIdx] >= 0:
+                    obj["style"] = state["styles"][styles[objIdx]]
+            inserted.append(obj)
+            objIdx += 1
+        state["frames"][f][start:start + deleteCount] = inserted
+    del state["frames"][header["frameCount"]:]
+    state["seq"] = header["seq"]
+
+def decode(*packets):
+    state = {"seq": 0, "styles": [], "frames": [[]]}
+    for header, blob in packets:
+        applyPacket(state, header, blob)
+    return state["frames"]
+
+red = {"stroke": "#ff0000", "strokeWeight": 1}
+blue = {"stroke": "#0000ff", "fill": "#00ff00"}
+
+class TestSceneEncoder(unittest.TestCase):
+    
+    def setUp(self):
+        frame = [{"type": "PointE2", "point": [1.0, 2.0], "style": red},
+                 {"type": "CircleE2", "center": [0.5, -0.5], "radius": 2.0},
+                 {"type": "SegmentE2", "endpoints": [[0.0, 0.0], [1.0, 1.0]], "style": blue},
+                 {"type": "CircleArcE2", "center": [0.0, 1.0], "radius": 1.5, "srcAngle": 0.25, 
+                  "targetAngle": 1.5, "style": red},
+                 {"type": "PolygonE2", "vertices": [[0.0, 0.0], [2.0, 0.0], [], [0.0, 2.0]]},
+                 {"type": "Polygons", "polygons": [[[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]], [[5.0, 5.0], [6.0, 5.0]]]},
+                 {"type": "TextE2", "text": "label", "at": [3, 4]}]
+        self.frames = [frame, frame[:3]]
+    
+    def test_fullRoundTrip(self):
+        self.assertEqual(decode(SceneEncoder().encode(self.frames)), self.frames)
+    
+    def test_deltaRoundTrip(self):
+        encoder = SceneEncoder()
+        first = encoder.encode(self.frames)
+        changed = copy.deepcopy(self.frames)
+        changed[0][1]["radius"] = 3.0                                  # Edit in the middle
+        changed[0].append({"type": "PointE2", "point": [7.0, 8.0], "style": {"fill": "#123456"}})
+        changed[1].insert(0, {"type": "TextE2", "text": "new"})        # Extras in a delta
+        changed[1][2]["style"] = red                                   # Restyle with a sent style
+        changed.append([{"type": "PointE2", "point": [0.0, 0.0]}])     # A new frame
+        delta = encoder.encode(changed)
+        self.assertEqual(delta[0]["kind"], "delta")
+        self.assertEqual(delta[0]["base"], first[0]["seq"])
+        self.assertEqual(delta[0]["newStyles"], [{"fill": "#123456"}])
+        self.assertLess(len(delta[1]), len(first[1]))
+        self.assertEqual(decode(first, delta), decode(SceneEncoder().encode(changed)))
+        self.assertEqual(decode(first, delta), changed)
+        
+        # Frames removed, and nothing to send when nothing changed
+        fewer = encoder.encode(changed[:1])
+        self.assertEqual(decode(first, delta, fewer), changed[:1])
+        self.assertIsNone(encoder.encode(changed[:1]))
+    
+    def test_sphericalRoundTrip(self):
+        frames = [[{"type": "PointE3", "point": [0.0, 0.0, 1.0]},
+                   {"type": "SegmentE3", "endpoints": [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], "style": red},
+                   {"type": "Polygon", "vertices": [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]},
+                   {"type": "DiskS2", "disk": [0.0, 0.0, 1.0, -0.5], "b1": [1.0, 0.0, 0.0], 
+                    "b2": [0.0, 1.0, 0.0], "b3": [0.0, 0.0, 1.0], "centerDist": 0.5, "diameter": 1.7}]]
+        encoder = SceneEncoder(3)
+        first = encoder.encode(frames)
+        moved = copy.deepcopy(frames)
+        moved[0][0]["point"] = [0.0, 1.0, 0.0]
+        self.assertEqual(decode(first, encoder.encode(moved)), moved)
+
+if __name__ == '__main__':
+    unittest.main()
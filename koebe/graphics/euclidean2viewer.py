@@ -11,7 +11,7 @@ from IPython.core.magics.display import Javascript
 
 # Packages for dealing with widgets: 
 import ipywidgets as widgets
-from traitlets import Unicode, Int, Bool, Float
+from traitlets import Unicode, Int, Bool, Bytes, Float
 
 # For sending data to the JavaScript part
 import json #json.dumps(obj)
@@ -199,27 +199,31 @@ def _p5_dict(obj, style):
 ### THE ACTUAL VIEWER CLASSES
     
 class E2Viewer(Viewer):
-    def __init__(self, width=500, height=500, scale=1.0):
+    def __init__(self, width=500, height=500, scale=1.0, binary=True):
         super().__init__(width = width, 
                          height = height, 
                          scale = scale, 
                          jsSketchFile = "euclidean2viewer.js", 
                          SketchClass = E2Sketch,
-                         obj_json_convert_func = _p5_dict)
+                         obj_json_convert_func = _p5_dict, 
+                         binary = binary, 
+                         dim = 2)
     
 class PoincareDiskViewer(E2Viewer):
-    def __init__(self, width=500, height=500):
+    def __init__(self, width=500, height=500, binary=True):
         super().__init__(width  = width, 
                          height = height, 
-                         scale  = 1.0 / (min(width, height)*0.5-10))
+                         scale  = 1.0 / (min(width, height)*0.5-10), 
+                         binary = binary)
         self.unitDisk = CircleE2(PointE2(0,0), 1.0)
         self.add(self.unitDisk)
         
 class UnitScaleE2Sketch(E2Viewer):
-    def __init__(self, width=500, height=500):
+    def __init__(self, width=500, height=500, binary=True):
         super().__init__(width  = width, 
                          height = height, 
-                         scale  = 1.0 / (min(width, height)*0.5-10))
+                         scale  = 1.0 / (min(width, height)*0.5-10), 
+                         binary = binary)
 
 class E2Sketch(widgets.DOMWidget):
     # TODO Got this from the example I'm working off of, so I'm not sure if they are 
@@ -238,4 +242,10 @@ class E2Sketch(widgets.DOMWidget):
     # in order to flag the applet that it needs to decode the JSON again
     objects      = Unicode('[]').tag(sync=True)
     objectsDirty = Bool(True).tag(sync=True)
+    
+    # packet and packetHeader hold the latest binary scene packet (see 
+    # binaryTransport.py). They are used instead of objects when the viewer
+    # was created with binary = True. 
+    packet       = Bytes(b'').tag(sync=True)
+    packetHeader = Unicode('{}').tag(sync=True)
     
\ No newline at end of file
@@ -0,0 +1,758 @@
+#
+# Headless rendering of scenes to SVG, PNG and video
+# @author John C. Bowers
+#
+# Renders the contents of an E2Scene or S2Scene (koebe.graphics.scenes), a Qt
+# Scene (koebe.graphics.qt) or a DCEL directly to files, without a browser, a
+# Qt window, or a display. Every animation frame of a scene can be exported.
+#
+# Use should be:
+#
+#   from koebe.graphics.export import saveSVG, savePNG, saveVideo, exportAll
+#
+#   saveSVG(scene, "packing.svg")
+#   savePNG(scene, "packing.png")
+#   saveVideo(scene, "flow.mp4", fps = 30)
+#   exportAll([(scene1, "a.png"), (scene2, "b.svg")], processes = 8)
+#
+# Scenes are first flattened to the same drawable dictionaries the browser
+# viewers receive. Paths are then generated in batches: consecutive objects
+# with the same style become one compound path, and all circles or disks of a
+# batch are tessellated with one NumPy operation. SVG output needs only NumPy.
+# PNG and video output rasterize through matplotlib's Agg backend, and video
+# additionally pipes frames to an ffmpeg executable.
+#
+
+import math
+import os
+import shutil
+import subprocess
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from koebe.datastructures.dcel import DCEL
+
+# Path codes. These match matplotlib.path.Path (MOVETO = 1, LINETO = 2,
+# CURVE4 = 4, CLOSEPOLY = 79) except that _CURVE4_CONT marks the second and
+# third control points of a cubic segment, so that SVG output knows where
+# each "C" command starts.
+_MOVETO      = 1
+_LINETO      = 2
+_CURVE4      = 4
+_CURVE4_CONT = 5
+_CLOSEPOLY   = 79
+
+# Cubic Bezier control point offset for a quarter circle
+_KAPPA = 0.5522847498307936
+
+# Number of samples along a circle on the sphere
+_S2_CIRCLE_SAMPLES = 96
+
+# Default pixel diameter of points (matching the flask viewers)
+_POINT_DIAMETER = 7.5
+
+_DEFAULT_POINT_STYLE = {"stroke": None, "strokeWeight": 1, "fill": (100, 125, 255)}
+
+# The default of sceneData's background argument, which keeps the background of
+# already prepared data (and is white otherwise)
+_KEEP_BACKGROUND = object()
+
+class ExportDependencyError(ImportError):
+    """Raised when an optional dependency needed for an export format is unavailable."""
+
+### SCENE DATA
+
+def sceneData(scene, width = None, height = None, scale = None, center = None, fit = None,
+              background = _KEEP_BACKGROUND, rotation = None):
+    """Flattens a scene to a picklable dictionary of drawable frames.
+
+    This is what gets shipped to worker processes, since scenes themselves
+    hold event handler lambdas and cannot be pickled.
+
+    Args:
+        scene: An E2Scene, S2Scene, Qt Scene, DCEL, or the result of a
+            previous call to sceneData.
+        width, height: The output size in pixels. Defaults to the scene's size,
+            or 500 x 500.
+        scale: Pixels per unit. Defaults to the scene's scale for E2Scenes.
+        center: The (x, y) point to put at the center of the image.
+        fit: If True, the scale and center are chosen so that every frame fits
+            the image. Defaults to True for Qt Scenes and DCELs and False otherwise.
+        background: The background color, or None for a transparent background.
+            Defaults to white, or to the background of data from sceneData.
+        rotation: For spherical scenes, a 3x3 rotation applied before the
+            orthographic projection onto the xy-plane (looking down the z-axis).
+
+    Returns:
+        A dictionary with the keys kind ("E2" or "S2"), width, height, scale,
+        center, fit, background, rotation, show_sphere and frames, where frames is
+        a list of lists of drawable dictionaries.
+    """
+    if isinstance(scene, dict) and "frames" in scene:
+        data = dict(scene)
+    elif isinstance(scene, DCEL):
+        data = _dcelData(scene)
+    elif hasattr(scene, "style_of") and hasattr(scene, "items"):
+        data = _qtSceneData(scene)
+    else:
+        data = _p5SceneData(scene)
+
+    if width != None:      data["width"] = width
+    if height != None:     data["height"] = height
+    if scale != None:      data["scale"] = scale
+    if center != None:     data["center"] = tuple(center)
+    if fit != None:        data["fit"] = fit
+    if rotation != None:   data["rotation"] = np.asarray(rotation, dtype=float).tolist()
+    if background is not _KEEP_BACKGROUND:
+        data["background"] = background
+    elif "background" not in data:
+        data["background"] = "#fff"
+
+    if data.get("scale") == None:
+        data["scale"] = 0.4 * min(data["width"], data["height"]) if data["kind"] == "S2" else 1.0
+    return data
+
+def _isSpherical(scene):
+    return hasattr(scene, "showSphere")
+
+def _p5SceneData(scene):
+    frames = scene.get_json_objects_list()
+    background = scene.get_json_background_objects_list()
+    if len(background) > 0:
+        frames = [background + frame for frame in frames]
+    spherical = _isSpherical(scene)
+    return {"kind":        "S2" if spherical else "E2",
+            "width":       scene.getWidth(),
+            "height":      scene.getHeight(),
+            "scale":       None if spherical else scene.getScale(),
+            "center":      (0.0, 0.0),
+            "fit":         False,
+            "rotation":    None,
+            "show_sphere": scene.showSphere() if spherical else False,
+            "frames":      frames}
+
+_S2_TYPE_NAMES = {"PointS2", "DiskS2", "CPlaneS2", "PointE3", "SegmentE3", "PointOP3",
+                  "CircleArcS2", "PolygonE3"}
+
+def _converterFor(geometries):
+    """Returns (kind, obj_json_convert_func) for a collection of geometry objects."""
+    if any(type(g).__name__ in _S2_TYPE_NAMES for g in geometries):
+        from koebe.graphics.scenes.spherical2scene import _p5_dict
+        return "S2", _p5_dict
+    else:
+        from koebe.graphics.scenes.euclidean2scene import _p5_dict
+        return "E2", _p5_dict
+
+def _dcelData(dcel):
+    data = [v.data for v in dcel.verts if v.data != None]
+    kind, convert = _converterFor(data)
+    frame = []
+    # Edges are drawn as segments between the vertex data whenever the vertex
+    # data can be read as points
+    for edge in dcel.edges:
+        d = convert(edge, None)
+        if d != None and all(len(p) > 0 for p in d["endpoints"]):
+            frame.append(d)
+    frame.extend(d for d in (convert(obj, None) for obj in data) if d != None)
+    return {"kind":        kind,
+            "width":       500,
+            "height":      500,
+            "scale":       None,
+            "center":      (0.0, 0.0),
+            "fit":         kind == "E2",
+            "rotation":    None,
+            "show_sphere": False,
+            "frames":      [frame]}
+
+def _qtColor(color, alpha):
+    if color == None:
+        return None
+    if alpha == None or alpha >= 1.0:
+        return color
+    return _rgba(color)[:3] + (int(round(alpha * 255)),)
+
+def _qtStyle(style):
+    """Converts a koebe.graphics.qt Style to a makeStyle dictionary."""
+    if style == None:
+        return None
+    result = {"stroke": None, "strokeWeight": 1, "fill": None}
+    if style.stroke != None:
+        result["stroke"] = _qtColor(style.stroke.color, style.stroke.alpha)
+        result["strokeWeight"] = style.stroke.width
+    if style.fill != None:
+        result["fill"] = _qtColor(style.fill.color, style.fill.alpha)
+    if style.marker != None:
+        result["fill"] = _qtColor(style.marker.color, style.marker.alpha)
+        result["pointSize"] = style.marker.size
+    if style.stroke == None and style.fill == None and style.marker == None:
+        return None
+    return result
+
+def _qtSceneData(scene):
+    from koebe.geometries.euclidean2 import LineE2, SegmentE2
+    items = list(scene.items())
+    kind, convert = _converterFor([g for g, _ in items])
+    frame = []
+    for geometry, style in items:
+        if isinstance(geometry, LineE2):
+            geometry = SegmentE2(geometry.p1, geometry.p2)
+        d = convert(geometry, _qtStyle(style))
+        if d != None:
+            frame.append(d)
+    return {"kind":        kind,
+            "width":       500,
+            "height":      500,
+            "scale":       None,
+            "center":      (0.0, 0.0),
+            "fit":         kind == "E2",
+            "rotation":    None,
+            "show_sphere": kind == "S2",
+            "frames":      [frame]}
+
+### COLORS
+
+_NAMED_COLORS = {"black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+                 "green": (0, 128, 0), "blue": (0, 0, 255), "gray": (128, 128, 128),
+                 "grey": (128, 128, 128), "yellow": (255, 255, 0), "orange": (255, 165, 0),
+                 "purple": (128, 0, 128), "cyan": (0, 255, 255), "magenta": (255, 0, 255)}
+
+def _rgba(color):
+    """Converts a p5-style color (hex string, color name, gray level, or an
+    (r, g, b) or (r, g, b, a) tuple with 0-255 components) to an (r, g, b, a)
+    tuple of ints."""
+    if isinstance(color, str):
+        c = color.strip()
+        if c.startswith("#"):
+            h = c[1:]
+            if len(h) in (3, 4):
+                h = "".join(ch * 2 for ch in h)
+            comps = tuple(int(h[i:i+2], 16) for i in range(0, len(h), 2))
+            return comps + (255,) if len(comps) == 3 else comps
+        if c.lower() in _NAMED_COLORS:
+            return _NAMED_COLORS[c.lower()] + (255,)
+        raise ValueError(f"Unrecognized color: {color}")
+    if isinstance(color, (int, float)):
+        g = int(color)
+        return (g, g, g, 255)
+    comps = tuple(int(round(x)) for x in color)
+    if len(comps) == 3:
+        return comps + (255,)
+    return comps
+
+def _svgColor(color):
+    if color == None:
+        return "none", None
+    r, g, b, a = _rgba(color)
+    return f"rgb({r},{g},{b})", (None if a == 255 else a / 255.0)
+
+def _mplColor(color):
+    if color == None:
+        return "none"
+    return tuple(c / 255.0 for c in _rgba(color))
+
+### PATH GENERATION
+
+class _PathBatch:
+    """Accumulates the subpaths of consecutive objects that share one style."""
+
+    def __init__(self, style):
+        self.style = style
+        self.vertices = []
+        self.codes = []
+        self.markers = []      # arrays of point centers drawn at a fixed pixel size
+
+    def addPolylines(self, points, closed):
+        """Adds k polylines given as an (k, n, 2) array. NaN vertices break
+        a polyline into separate pieces."""
+        k, n = points.shape[0], points.shape[1]
+        if k == 0 or n == 0:
+            return
+        codes = np.full((k, n), _LINETO, dtype=np.uint8)
+        codes[:, 0] = _MOVETO
+        hidden = np.isnan(points[:, :, 0])
+        if hidden.any():
+            if closed:
+                # Draw closed polylines as open ones that return to their start
+                points = np.concatenate([points, points[:, :1, :]], axis=1)
+                hidden = np.concatenate([hidden, hidden[:, :1]], axis=1)
+                codes = np.concatenate([codes, np.full((k, 1), _LINETO, dtype=np.uint8)], axis=1)
+            # Restart the path after each run of hidden vertices
+            prevHidden = np.concatenate([np.ones((k, 1), dtype=bool), hidden[:, :-1]], axis=1)
+            codes[prevHidden] = _MOVETO
+            closed = False
+        if closed:
+            points = np.concatenate([points, points[:, :1, :]], axis=1)
+            codes = np.concatenate([codes, np.full((k, 1), _CLOSEPOLY, dtype=np.uint8)], axis=1)
+        verts = points.reshape(-1, 2)
+        codes = codes.reshape(-1)
+        keep = ~np.isnan(verts[:, 0])
+        self.vertices.append(verts[keep])
+        self.codes.append(codes[keep])
+
+    def addPolyline(self, points, closed):
+        if len(points) > 0:
+            self.addPolylines(np.asarray(points, dtype=float)[None, :, :2], closed)
+
+    def addCircles(self, centers, radii):
+        """Adds circles given as an (k, 2) array of centers and a length k
+        array of radii as four cubic Bezier segments each."""
+        k = len(radii)
+        if k == 0:
+            return
+        # Unit circle: start at (1, 0) and go counterclockwise
+        unit = np.array([
+            [1, 0],
+            [1, _KAPPA], [_KAPPA, 1], [0, 1],
+            [-_KAPPA, 1], [-1, _KAPPA], [-1, 0],
+            [-1, -_KAPPA], [-_KAPPA, -1], [0, -1],
+            [_KAPPA, -1], [1, -_KAPPA], [1, 0],
+            [1, 0]
+        ], dtype=float)
+        unitCodes = np.array([_MOVETO] + [_CURVE4, _CURVE4_CONT, _CURVE4_CONT] * 4 + [_CLOSEPOLY],
+                             dtype=np.uint8)
+        verts = centers[:, None, :] + radii[:, None, None] * unit[None, :, :]
+        self.vertices.append(verts.reshape(-1, 2))
+        self.codes.append(np.tile(unitCodes, k))
+
+    def addMarkers(self, centers):
+        if len(centers) > 0:
+            self.markers.append(np.asarray(centers, dtype=float).reshape(-1, 2))
+
+    def arrays(self):
+        if len(self.vertices) == 0:
+            return np.zeros((0, 2)), np.zeros(0, dtype=np.uint8)
+        return np.concatenate(self.vertices), np.concatenate(self.codes)
+
+    def markerArray(self):
+        if len(self.markers) == 0:
+            return np.zeros((0, 2))
+        return np.concatenate(self.markers)
+
+def _styleKey(style):
+    if style == None:
+        return None
+    return tuple(sorted((k, repr(v)) for k, v in style.items()))
+
+def _objStyle(obj):
+    style = obj.get("style")
+    if style == None and obj["type"] in ("PointE2", "PointE3"):
+        return _DEFAULT_POINT_STYLE
+    return style
+
+def _batches(frame):
+    """Splits a frame into runs of consecutive objects of the same style and
+    type, preserving draw order."""
+    runs = []
+    for obj in frame:
+        style = _objStyle(obj)
+        key = (_styleKey(style), obj["type"])
+        if len(runs) > 0 and runs[-1][0] == key:
+            runs[-1][2].append(obj)
+        else:
+            runs.append((key, style, [obj]))
+    return [(style, objs) for _, style, objs in runs]
+
+def _arcPoints(obj):
+    cx, cy = obj["center"]
+    r = obj["radius"]
+    src, trg = obj["srcAngle"], obj["targetAngle"]
+    n = max(2, int(math.ceil(abs(trg - src) / (2.0 * math.pi) * 64)) + 1)
+    t = np.linspace(src, trg, n)
+    return np.stack([cx + r * np.cos(t), cy + r * np.sin(t)], axis=1)
+
+def _e2Batch(style, objs):
+    batch = _PathBatch(style)
+    kind = objs[0]["type"]
+    if kind == "CircleE2":
+        centers = np.array([o["center"] for o in objs], dtype=float).reshape(-1, 2)
+        radii = np.array([o["radius"] for o in objs], dtype=float)
+        batch.addCircles(centers, radii)
+    elif kind == "PointE2":
+        batch.addMarkers([o["point"] for o in objs])
+    elif kind == "SegmentE2":
+        batch.addPolylines(np.array([o["endpoints"] for o in objs], dtype=float).reshape(-1, 2, 2), False)
+    elif kind == "CircleArcE2":
+        for o in objs:
+            batch.addPolyline(_arcPoints(o), False)
+    elif kind in ("PolygonE2", "Polygon"):
+        for o in objs:
+            batch.addPolyline([v for v in o["vertices"] if len(v) >= 2], True)
+    elif kind == "Polygons":
+        for o in objs:
+            for polygon in o["polygons"]:
+                batch.addPolyline([v for v in polygon if len(v) >= 2], True)
+    return batch
+
+def _rotate(points, rotation):
+    if rotation == None:
+        return points
+    return points @ np.asarray(rotation, dtype=float).T
+
+def _hide(points3, showSphere):
+    """Projects (..., 3) points orthographically to the xy-plane, replacing
+    points on the far side of the sphere by NaN if the sphere is drawn."""
+    points2 = points3[..., :2].copy()
+    if showSphere:
+        hidden = (points3[..., 2] < 0) & ((points3 * points3).sum(axis=-1) <= 1.0 + 1e-9)
+        points2[hidden] = np.nan
+    return points2
+
+def _s2Batches(style, objs, rotation, showSphere):
+    """The batches of a run of spherical objects. Each vertex colored triangle
+    gets a batch of its own, filled with its first color."""
+    kind = objs[0]["type"]
+    if kind == "VertexColoredTriangle":
+        batches = []
+        for o in objs:
+            tri = _PathBatch({"stroke": None, "strokeWeight": 1, "fill": o["color1"]})
+            tri.addPolyline(_rotate(np.array([o["p1"], o["p2"], o["p3"]], dtype=float), rotation), True)
+            batches.append(tri)
+        return batches
+    batch = _PathBatch(style)
+    if kind == "DiskS2":
+        disks = np.array([o["disk"] for o in objs], dtype=float).reshape(-1, 4)
+        b1 = np.array([o["b1"] for o in objs], dtype=float).reshape(-1, 3)
+        b2 = np.array([o["b2"] for o in objs], dtype=float).reshape(-1, 3)
+        b3 = np.array([o["b3"] for o in objs], dtype=float).reshape(-1, 3)
+        centerDist = np.array([o["centerDist"] for o in objs], dtype=float)
+        radius = 0.5 * np.array([o["diameter"] for o in objs], dtype=float)
+        centers = b3 * np.where(disks[:, 3] < 0, centerDist, -centerDist)[:, None]
+        t = np.linspace(0.0, 2.0 * math.pi, _S2_CIRCLE_SAMPLES, endpoint=False)
+        points = (centers[:, None, :]
+                  + radius[:, None, None] * (np.cos(t)[None, :, None] * b1[:, None, :]
+                                             + np.sin(t)[None, :, None] * b2[:, None, :]))
+        batch.addPolylines(_hide(_rotate(points, rotation), showSphere), True)
+    elif kind == "PointE3":
+        points = _rotate(np.array([o["point"] for o in objs], dtype=float).reshape(-1, 3), rotation)
+        points = _hide(points, showSphere)
+        batch.addMarkers(points[~np.isnan(points[:, 0])])
+    elif kind == "SegmentE3":
+        segs = _rotate(np.array([o["endpoints"] for o in objs], dtype=float).reshape(-1, 2, 3), rotation)
+        batch.addPolylines(segs[:, :, :2], False)
+    elif kind == "Polygon":
+        for o in objs:
+            verts = [v for v in o["vertices"] if len(v) == 3]
+            if len(verts) > 0:
+                batch.addPolyline(_rotate(np.array(verts, dtype=float), rotation), True)
+    elif kind == "Polygons":
+        for o in objs:
+            for polygon in o["polygons"]:
+                verts = [v for v in polygon if len(v) == 3]
+                if len(verts) > 0:
+                    batch.addPolyline(_rotate(np.array(verts, dtype=float), rotation), True)
+    return [batch]
+
+def framePaths(data, frameIdx = -1):
+    """Generates the batched paths of one frame of a sceneData dictionary.
+
+    Returns:
+        A list of (style, vertices, codes, markers) tuples in pixel coordinates,
+        where vertices is an (n, 2) array, codes a length n array of path codes
+        and markers an (m, 2) array of point positions.
+    """
+    frame = data["frames"][frameIdx]
+    spherical = data["kind"] == "S2"
+    batches = []
+    if spherical and data.get("show_sphere"):
+        sphere = _PathBatch({"stroke": None, "strokeWeight": 1, "fill": (220, 220, 220)})
+        sphere.addCircles(np.zeros((1, 2)), np.ones(1))
+        batches.append(sphere)
+    for style, objs in _batches(frame):
+        if spherical:
+            batches.extend(_s2Batches(style, objs, data.get("rotation"), data.get("show_sphere")))
+        else:
+            batches.append(_e2Batch(style, objs))
+
+    scale, cx, cy = _viewTransform(data)
+    w, h = data["width"], data["height"]
+
+    result = []
+    for batch in batches:
+        verts, codes = batch.arrays()
+        markers = batch.markerArray()
+        verts = np.stack([w * 0.5 + (verts[:, 0] - cx) * scale,
+                          h * 0.5 - (verts[:, 1] - cy) * scale], axis=1)
+        markers = np.stack([w * 0.5 + (markers[:, 0] - cx) * scale,
+                            h * 0.5 - (markers[:, 1] - cy) * scale], axis=1)
+        result.append((batch.style, verts, codes, markers))
+    return result
+
+def _viewTransform(data):
+    """Returns (scale, cx, cy) mapping world coordinates to pixels."""
+    if not data.get("fit"):
+        cx, cy = data.get("center", (0.0, 0.0))
+        return data["scale"], cx, cy
+    if "_fit" in data:
+        return data["_fit"]
+
+    lo = np.array([np.inf, np.inf])
+    hi = -lo
+    fitData = dict(data, fit = False, scale = 1.0, center = (0.0, 0.0), width = 0, height = 0)
+    for idx in range(len(data["frames"])):
+        for _, verts, _, markers in framePaths(fitData, idx):
+            for arr in (verts, markers):
+                if len(arr) > 0:
+                    lo = np.minimum(lo, np.nanmin(arr, axis=0))
+                    hi = np.maximum(hi, np.nanmax(arr, axis=0))
+    if not np.all(np.isfinite(lo)):
+        data["_fit"] = (data["scale"], 0.0, 0.0)
+        return data["_fit"]
+    # framePaths flips y, so flip it back
+    lo[1], hi[1] = -hi[1], -lo[1]
+    extent = np.maximum(hi - lo, 1e-12)
+    margin = 0.95
+    scale = margin * min(data["width"] / extent[0], data["height"] / extent[1])
+    data["_fit"] = (scale, 0.5 * (lo[0] + hi[0]), 0.5 * (lo[1] + hi[1]))
+    return data["_fit"]
+
+### SVG
+
+def _fmt(x):
+    return f"{x:.2f}"
+
+def _svgPathData(verts, codes):
+    parts = []
+    for (x, y), code in zip(verts.tolist(), codes.tolist()):
+        if code == _MOVETO:
+            parts.append(f"M{x:.2f} {y:.2f}")
+        elif code == _LINETO:
+            parts.append(f"L{x:.2f} {y:.2f}")
+        elif code == _CURVE4:
+            parts.append(f"C{x:.2f} {y:.2f}")
+        elif code == _CURVE4_CONT:
+            parts.append(f" {x:.2f} {y:.2f}")
+        else:
+            parts.append("Z")
+    return "".join(parts)
+
+def _svgMarkerData(markers, radius):
+    r = _fmt(radius)
+    return "".join(f"M{x - radius:.2f} {y:.2f}a{r} {r} 0 1 0 {2*radius:.2f} 0a{r} {r} 0 1 0 {-2*radius:.2f} 0Z"
+                   for x, y in markers.tolist())
+
+def _svgStyleAttrs(style, isMarker = False):
+    style = style if style != None else {}
+    fill, fillOpacity = _svgColor(style.get("fill"))
+    stroke, strokeOpacity = _svgColor(style.get("stroke", "#000"))
+    attrs = [f'fill="{fill}"', f'stroke="{stroke}"']
+    if fillOpacity != None:
+        attrs.append(f'fill-opacity="{fillOpacity:.3f}"')
+    if strokeOpacity != None:
+        attrs.append(f'stroke-opacity="{strokeOpacity:.3f}"')
+    if stroke != "none":
+        weight = style.get("strokeWeight")
+        attrs.append(f'stroke-width="{_fmt(1.0 if weight == None else weight)}"')
+    return " ".join(attrs)
+
+def renderSVG(scene, frame = -1, **kwargs):
+    """Renders one frame of a scene to an SVG document string.
+
+    Args:
+        scene: Anything accepted by sceneData.
+        frame: The index of the animation frame to render. Defaults to the
+            current (last) frame.
+        kwargs: Passed on to sceneData.
+
+    Returns:
+        The SVG document as a string.
+    """
+    data = sceneData(scene, **kwargs)
+    w, h = data["width"], data["height"]
+    lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}">']
+    if data["background"] != None:
+        fill, opacity = _svgColor(data["background"])
+        opacityAttr = "" if opacity == None else f' fill-opacity="{opacity:.3f}"'
+        lines.append(f'<rect width="{w}" height="{h}" fill="{fill}"{opacityAttr}/>')
+    for style, verts, codes, markers in framePaths(data, frame):
+        if len(codes) > 0:
+            lines.append(f'<path d="{_svgPathData(verts, codes)}" {_svgStyleAttrs(style)} '
+                         'fill-rule="evenodd" stroke-linejoin="round"/>')
+        if len(markers) > 0:
+            size = (style or {}).get("pointSize", _POINT_DIAMETER)
+            lines.append(f'<path d="{_svgMarkerData(markers, 0.5 * size)}" {_svgStyleAttrs(style)}/>')
+    lines.append("</svg>")
+    return "\n".join(lines)
+
+def saveSVG(scene, path, frame = -1, **kwargs):
+    """Writes one frame of a scene to an SVG file. See renderSVG."""
+    with open(path, "w") as f:
+        f.write(renderSVG(scene, frame = frame, **kwargs))
+    return path
+
+### RASTER (PNG AND VIDEO)
+
+def _requireMatplotlib():
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.path import Path
+        from matplotlib.patches import PathPatch
+    except ImportError as exc:
+        raise ExportDependencyError(
+            "matplotlib is required for PNG and video export. "
+            "Install it with `pip install matplotlib`."
+        ) from exc
+    return Figure, FigureCanvasAgg, Path, PathPatch
+
+def renderRGBA(scene, frame = -1, **kwargs):
+    """Rasterizes one frame of a scene with matplotlib's Agg backend.
+
+    Returns:
+        A (height, width, 4) uint8 NumPy array.
+    """
+    data = sceneData(scene, **kwargs)
+    return _rasterize(data, frame)
+
+def _rasterize(data, frameIdx):
+    Figure, FigureCanvasAgg, Path, PathPatch = _requireMatplotlib()
+    w, h = data["width"], data["height"]
+    dpi = 100.0
+    pointsPerPixel = 72.0 / dpi
+
+    fig = Figure(figsize = (w / dpi, h / dpi), dpi = dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, w)
+    ax.set_ylim(h, 0)
+    ax.set_axis_off()
+    background = data["background"]
+    fig.patch.set_facecolor(_mplColor(background) if background != None else (0, 0, 0, 0))
+
+    def addPath(style, verts, codes):
+        style = style if style != None else {}
+        stroke = style.get("stroke", "#000")
+        weight = style.get("strokeWeight")
+        ax.add_patch(PathPatch(
+            Path(verts, np.where(codes == _CURVE4_CONT, _CURVE4, codes)),
+            facecolor = _mplColor(style.get("fill")),
+            edgecolor = _mplColor(stroke),
+            linewidth = 0.0 if stroke == None else (1.0 if weight == None else weight) * pointsPerPixel,
+            joinstyle = "round",
+            antialiased = True
+        ))
+
+    for style, verts, codes, markers in framePaths(data, frameIdx):
+        if len(codes) > 0:
+            addPath(style, verts, codes)
+        if len(markers) > 0:
+            radius = 0.5 * (style or {}).get("pointSize", _POINT_DIAMETER)
+            dots = _PathBatch(style)
+            dots.addCircles(markers, np.full(len(markers), radius))
+            addPath(style, *dots.arrays())
+
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+def savePNG(scene, path, frame = -1, **kwargs):
+    """Writes one frame of a scene to a PNG file. See renderSVG for the arguments."""
+    data = sceneData(scene, **kwargs)
+    _writePNG(_rasterize(data, frame), path)
+    return path
+
+def _writePNG(rgba, path):
+    try:
+        from PIL import Image
+        Image.fromarray(rgba, "RGBA").save(path)
+    except ImportError:
+        import matplotlib.image
+        matplotlib.image.imsave(path, rgba)
+
+def _frameIndices(data, frames):
+    count = len(data["frames"])
+    return list(range(count)) if frames == None else [f % count for f in frames]
+
+def saveFrames(scene, pattern, frames = None, processes = 1, **kwargs):
+    """Writes animation frames of a scene to numbered image files.
+
+    Args:
+        scene: Anything accepted by sceneData.
+        pattern: A format string for the file names, e.g. "out/frame{:04d}.png".
+            The extension (.png or .svg) selects the output format.
+        frames: The frame indices to write, defaults to all of them.
+        processes: The number of worker processes to fan out over.
+        kwargs: Passed on to sceneData.
+
+    Returns:
+        The list of file paths written.
+    """
+    data = sceneData(scene, **kwargs)
+    if data.get("fit"):
+        data["_fit"] = _viewTransform(data)
+    jobs = [(data, pattern.format(idx), {"frame": idx}) for idx in _frameIndices(data, frames)]
+    return exportAll(jobs, processes = processes)
+
+def saveVideo(scene, path, fps = 30, frames = None, ffmpeg = None, **kwargs):
+    """Encodes the animation frames of a scene to a video file (e.g. .mp4) by
+    piping raw frames to ffmpeg.
+
+    Args:
+        scene: Anything accepted by sceneData.
+        path: The output video file.
+        fps: Frames per second.
+        frames: The frame indices to encode, defaults to all of them.
+        ffmpeg: Path to the ffmpeg executable. Defaults to the one on the PATH.
+        kwargs: Passed on to sceneData.
+    """
+    ffmpeg = ffmpeg if ffmpeg != None else shutil.which("ffmpeg")
+    if ffmpeg == None:
+        raise ExportDependencyError("ffmpeg is required for video export and was not found on the PATH.")
+    data = sceneData(scene, **kwargs)
+    if data.get("fit"):
+        data["_fit"] = _viewTransform(data)
+    w, h = data["width"], data["height"]
+    # yuv420p needs even dimensions
+    cmd = [ffmpeg, "-y", "-loglevel", "error",
+           "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{w}x{h}", "-r", str(fps), "-i", "-",
+           "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", path]
+    proc = subprocess.Popen(cmd, stdin = subprocess.PIPE)
+    try:
+        for idx in _frameIndices(data, frames):
+            proc.stdin.write(_rasterize(data, idx).tobytes())
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+    return path
+
+### BATCH EXPORT
+
+def _exportJob(job):
+    data, path, options = job
+    frame = options.get("frame", -1)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".svg":
+        return saveSVG(data, path, frame = frame)
+    elif ext == ".png":
+        return savePNG(data, path, frame = frame)
+    else:
+        return saveVideo(data, path, **{k: v for k, v in options.items() if k != "frame"})
+
+def exportAll(jobs, processes = None):
+    """Exports many scenes, fanning the work out over worker processes.
+
+    Args:
+        jobs: A list of (scene, path) or (scene, path, options) tuples. The
+            extension of path selects the format (.svg, .png, or anything
+            else for video). options is a dictionary of keyword arguments for
+            sceneData, plus frame (for images) or fps (for video).
+        processes: The number of worker processes. None uses one per CPU, and
+            1 exports in this process.
+
+    Returns:
+        The list of paths written, in the order of jobs.
+    """
+    prepared = []
+    for job in jobs:
+        scene, path = job[0], job[1]
+        options = dict(job[2]) if len(job) > 2 else {}
+        exportOptions = {k: options.pop(k) for k in ("frame", "fps", "frames", "ffmpeg") if k in options}
+        # Flatten in this process: scenes hold lambdas and can't be pickled
+        prepared.append((sceneData(scene, **options), path, exportOptions))
+
+    if processes == 1 or len(prepared) <= 1:
+        return [_exportJob(job) for job in prepared]
+    with ProcessPoolExecutor(max_workers = processes) as pool:
+        return list(pool.map(_exportJob, prepared))
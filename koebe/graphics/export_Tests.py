@@ -0,0 +1,94 @@
+import unittest
+
+import importlib.util
+import os
+import stat
+import sys
+import tempfile
+
+from koebe.geometries.euclidean2 import PointE2, CircleE2
+from koebe.geometries.euclidean3 import PointE3
+from koebe.graphics.scenes.euclidean2scene import E2Scene
+from koebe.graphics.scenes.spherical2scene import S2Scene
+from koebe.graphics.scenes.scene import VertexColoredTriangle
+from koebe.graphics.export import sceneData, saveFrames, exportAll, framePaths
+
+def _scene():
+    scene = E2Scene(width = 40, height = 30)
+    scene.add(CircleE2(PointE2(0, 0), 5))
+    scene.pushAnimFrame()
+    scene.add(PointE2(3, 4))
+    return scene
+
+class TestExportBackground(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_preparedDataKeepsBackground(self):
+        data = sceneData(_scene(), background = None)
+        self.assertIsNone(sceneData(data)["background"])
+        self.assertEqual(sceneData(_scene())["background"], "#fff")
+        self.assertEqual(sceneData(data, background = "#000")["background"], "#000")
+
+    def test_transparentSVG(self):
+        exportAll([(_scene(), self.path("a.svg"), {"background": None})], processes = 1)
+        saveFrames(_scene(), self.path("f{}.svg"), background = None)
+        for name in ("a.svg", "f0.svg", "f1.svg"):
+            with open(self.path(name)) as f:
+                self.assertNotIn("<rect", f.read())
+        exportAll([(_scene(), self.path("b.svg"))], processes = 1)
+        with open(self.path("b.svg")) as f:
+            self.assertIn("<rect", f.read())
+
+    @unittest.skipUnless(importlib.util.find_spec("matplotlib"), "PNG export needs matplotlib")
+    def test_transparentPNG(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("Reading the PNGs back needs PIL")
+        exportAll([(_scene(), self.path("a.png"), {"background": None})], processes = 1)
+        saveFrames(_scene(), self.path("f{}.png"), background = None)
+        for name in ("a.png", "f0.png", "f1.png"):
+            self.assertEqual(Image.open(self.path(name)).convert("RGBA").getpixel((0, 0))[3], 0)
+        exportAll([(_scene(), self.path("b.png"))], processes = 1)
+        self.assertEqual(Image.open(self.path("b.png")).convert("RGBA").getpixel((0, 0)), (255, 255, 255, 255))
+
+class TestFramePaths(unittest.TestCase):
+
+    def test_vertexColoredTriangles(self):
+        # Each triangle is drawn, filled with its first color
+        scene = S2Scene(show_sphere = False)
+        red, blue = (255, 0, 0), (0, 0, 255)
+        scene.add(VertexColoredTriangle(PointE3(0, 0, 1), PointE3(1, 0, 0), PointE3(0, 1, 0), red, blue, blue))
+        scene.add(VertexColoredTriangle(PointE3(0, 0, 1), PointE3(-1, 0, 0), PointE3(0, -1, 0), blue, red, red))
+        paths = framePaths(sceneData(scene))
+        self.assertEqual([style["fill"] for style, _, _, _ in paths], [red, blue])
+        self.assertEqual([len(verts) for _, verts, _, _ in paths], [4, 4])
+
+class TestExportVideoJob(unittest.TestCase):
+
+    @unittest.skipUnless(importlib.util.find_spec("matplotlib"), "Video export needs matplotlib")
+    def test_videoJob(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Stands in for ffmpeg: copies the raw frames to the output file
+            encoder = os.path.join(tmp, "encoder")
+            with open(encoder, "w") as f:
+                f.write(f"#!{sys.executable}\n"
+                        "import sys, shutil\n"
+                        "shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[-1], 'wb'))\n")
+            os.chmod(encoder, os.stat(encoder).st_mode | stat.S_IXUSR)
+            out = os.path.join(tmp, "out.mp4")
+            result = exportAll([(_scene(), out, {"frame": 0, "fps": 10, "ffmpeg": encoder})], processes = 1)
+            self.assertEqual(result, [out])
+            # Two frames of 40 x 30 RGBA pixels
+            self.assertEqual(os.path.getsize(out), 2 * 40 * 30 * 4)
+
+if __name__ == '__main__':
+    unittest.main()
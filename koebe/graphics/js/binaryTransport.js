@@ -0,0 +1,143 @@
+/*
+ * Decoder for the binary scene packets sent by koebe/graphics/binaryTransport.py
+ *
+ * This file is prepended to the viewer sketches. KoebeBinary.applyPacket
+ * applies a packet (a JSON header plus a DataView over the binary buffer) to
+ * a decoder state and rebuilds the same object dictionaries that the JSON
+ * transport produced, so the drawing code does not need to know which
+ * transport was used.
+ * @author John C. Bowers
+ */
+
+var KoebeBinary = (function () {
+
+    function newState() {
+        return {seq: 0, styles: [], frames: [[]]};
+    }
+
+    function points(coords, start, count, dim) {
+        let result = [];
+        for (let i = 0; i < count; i++) {
+            let p = Array.from(coords.subarray(start + i * dim, start + (i + 1) * dim));
+            // Missing points were sent as NaNs
+            result.push(isNaN(p[0]) ? [] : p);
+        }
+        return result;
+    }
+
+    function decodeObject(type, c, dim) {
+        switch (type) {
+            case "PointE2":
+            case "PointE3":
+                return {type: type, point: Array.from(c)};
+            case "CircleE2":
+                return {type: type, center: [c[0], c[1]], radius: c[2]};
+            case "SegmentE2":
+                return {type: type, endpoints: points(c, 0, 2, 2)};
+            case "SegmentE3":
+                return {type: type, endpoints: points(c, 0, 2, 3)};
+            case "CircleArcE2":
+                return {type: type, center: [c[0], c[1]], radius: c[2],
+                        srcAngle: c[3], targetAngle: c[4]};
+            case "PolygonE2":
+                return {type: type, vertices: points(c, 0, c.length / 2, 2)};
+            case "Polygon":
+                return {type: type, vertices: points(c, 0, c.length / dim, dim)};
+            case "Polygons": {
+                let count = c[0];
+                let polygons = [];
+                let pos = 1 + count;
+                for (let i = 0; i < count; i++) {
+                    polygons.push(points(c, pos, c[1 + i], dim));
+                    pos += c[1 + i] * dim;
+                }
+                return {type: type, polygons: polygons};
+            }
+            case "DiskS2":
+                return {type: type, disk: Array.from(c.subarray(0, 4)),
+                        b1: Array.from(c.subarray(4, 7)),
+                        b2: Array.from(c.subarray(7, 10)),
+                        b3: Array.from(c.subarray(10, 13)),
+                        centerDist: c[13], diameter: c[14]};
+        }
+        return null;
+    }
+
+    function view(dataView, Type, entry) {
+        return new Type(dataView.buffer, dataView.byteOffset + entry[0], entry[1]);
+    }
+
+    // Returns false if the packet is a delta against a packet this state has
+    // not seen, in which case the caller should ask for a full resync.
+    function applyPacket(state, header, dataView) {
+        if (header.kind == "delta" && header.base != state.seq) {
+            return false;
+        }
+        if (header.kind == "full") {
+            state.styles = [];
+            state.frames = [];
+        }
+        state.styles.length = header.styleBase;
+        header.newStyles.forEach(style => state.styles.push(style));
+
+        // Typed array views need aligned offsets, so copy a misaligned buffer
+        if (dataView.byteOffset % 8 != 0) {
+            dataView = new DataView(dataView.buffer.slice(dataView.byteOffset,
+                                                          dataView.byteOffset + dataView.byteLength));
+        }
+
+        let layout = header.layout;
+        let coords = view(dataView, Float64Array, layout.coords);
+        let offsets = view(dataView, Uint32Array, layout.offsets);
+        let styles = view(dataView, Int32Array, layout.styles);
+        let types = view(dataView, Uint8Array, layout.types);
+
+        let objIdx = 0;
+        header.splices.forEach(splice => {
+            let [f, start, deleteCount, insertCount] = splice;
+            while (state.frames.length <= f) state.frames.push([]);
+            let inserted = [];
+            for (let i = 0; i < insertCount; i++, objIdx++) {
+                let obj;
+                if (types[objIdx] == 255) {
+                    obj = header.extras[String(objIdx)];
+                } else {
+                    let c = coords.subarray(offsets[objIdx], offsets[objIdx + 1]);
+                    obj = decodeObject(header.typeNames[types[objIdx]], c, header.dim);
+                    if (styles[objIdx] >= 0) {
+                        obj["style"] = state.styles[styles[objIdx]];
+                    }
+                }
+                inserted.push(obj);
+            }
+            state.frames[f].splice(start, deleteCount, ...inserted);
+        });
+        state.frames.length = header.frameCount;
+        if (state.frames.length == 0) state.frames.push([]);
+        state.seq = header.seq;
+        return true;
+    }
+
+    // Applies the packet currently held by a widget model. If the view missed
+    // the packet a delta is based on, asks the Python side for a full one.
+    function applyModelPacket(state, model) {
+        let headerStr = model.get("packetHeader");
+        if (headerStr == null || headerStr == "" || headerStr == "{}") {
+            return false;
+        }
+        let header = JSON.parse(headerStr);
+        if (header.seq == state.seq) {
+            return false;
+        }
+        let packet = model.get("packet");
+        let dataView = packet instanceof DataView ? packet
+                     : new DataView(packet.buffer || packet, packet.byteOffset || 0, packet.byteLength);
+        if (!applyPacket(state, header, dataView)) {
+            model.send({type: "resync"});
+            return false;
+        }
+        return true;
+    }
+
+    return {newState: newState, applyPacket: applyPacket, applyModelPacket: applyModelPacket};
+})();
@@ -89,6 +89,22 @@ createSketchView('E2Sketch', ['euclidean2Module'], (Settings, model) => {
             p.zoom = 1.0;
             p.canvasScale = s;
             p.frame = 0;
+            p.objs = [[]];
+            p.needsDraw = true;
+            
+            // Binary packets (see binaryTransport.js) replace the objects JSON 
+            // string when the viewer was created with binary = True.
+            p.binaryState = KoebeBinary.newState();
+            p.applyPacket = function () {
+                if (KoebeBinary.applyModelPacket(p.binaryState, model)) {
+                    p.objs = p.binaryState.frames;
+                    p.frame = p.frame % p.objs.length;
+                    p.needsDraw = true;
+                    p.loop();
+                }
+            }
+            model.on('change:packetHeader', p.applyPacket);
+            p.applyPacket();
         }
         
         p.setStyle = function(style) {
@@ -178,10 +194,14 @@ createSketchView('E2Sketch', ['euclidean2Module'], (Settings, model) => {
                       */
         p.draw = function () {
             
-            if (model.get('objectsDirty') || p.objs.length > 1) {
+            if (model.get('objectsDirty') && model.get('objects') != '[]') {
                 model.set('objectsDirty', false);
                 p.objs = JSON.parse(model.get('objects'));
-                
+                p.needsDraw = true;
+            }
+            
+            if (p.needsDraw || p.objs.length > 1) {
+                p.needsDraw = false;
                 
                 p.scale(1 / p.canvasScale, -1 / p.canvasScale);
                 p.translate(p.canvasScale * p.width * 0.5, -p.canvasScale * p.height * 0.5);
@@ -87,6 +87,19 @@ createSketchView('S2Sketch', ['testModule'], (Settings, model) => {
             p.createCanvas(w, h, p.WEBGL);
             p.zoom = 1.0;
             p.frame = 0;
+            p.objs = [[]];
+            
+            // Binary packets (see binaryTransport.js) replace the objects JSON 
+            // string when the viewer was created with binary = True.
+            p.binaryState = KoebeBinary.newState();
+            p.applyPacket = function () {
+                if (KoebeBinary.applyModelPacket(p.binaryState, model)) {
+                    p.objs = p.binaryState.frames;
+                    p.frame = p.frame % p.objs.length;
+                }
+            }
+            model.on('change:packetHeader', p.applyPacket);
+            p.applyPacket();
         }
         
         p.setStyle = function(style) {
@@ -250,7 +263,7 @@ createSketchView('S2Sketch', ['testModule'], (Settings, model) => {
 
         p.draw = function () {
             
-            if (model.get('objectsDirty')) {
+            if (model.get('objectsDirty') && model.get('objects') != '[]') {
                 model.set('objectsDirty', false);
                 p.objs = JSON.parse(model.get('objects'));
             }
@@ -7,6 +7,20 @@ window.createSketchView = (model, attributes) => function (p) {
         p.createCanvas(w, h, p.WEBGL);
         p.zoom = 1;
         p.frame = 0;
+        p.objs = [[]];
+        p.objectsJson = null;
+
+        // Binary packets (see binaryTransport.js) are decoded once when they
+        // arrive rather than on every frame.
+        p.binaryState = KoebeBinary.newState();
+        p.applyPacket = function () {
+            if (KoebeBinary.applyModelPacket(p.binaryState, model)) {
+                p.objs = p.binaryState.frames;
+                p.frame = p.frame % p.objs.length;
+            }
+        }
+        model.on("change:packetHeader", p.applyPacket);
+        p.applyPacket();
     }
     
     p.setStyle = function(style) {
@@ -137,11 +151,13 @@ window.createSketchView = (model, attributes) => function (p) {
 
         let show_sphere = model.get("show_sphere")
 
-        // if (model.get('objectsDirty')) {
-        //     model.set('objectsDirty', false);
-            p.objs = JSON.parse(model.get('objects'));
-            console.log(p.objs);
-        // }
+        // Scenes sent as JSON are only parsed again when the string changes
+        let objectsJson = model.get('objects');
+        if (objectsJson != p.objectsJson && objectsJson != "[[]]") {
+            p.objectsJson = objectsJson;
+            p.objs = JSON.parse(objectsJson);
+            p.frame = p.frame % p.objs.length;
+        }
         
         p.background(255, 254, 235);
         
@@ -7,6 +7,7 @@ import marimo as mo
 
 # For sending data to the JavaScript part
 import json #json.dumps(obj)
+from koebe.graphics.binaryTransport import SceneEncoder
 
 ### STYLE HANDLING
 
@@ -45,11 +46,15 @@ class VertexColoredTriangle:
     
 class Scene:
     
-    def __init__(self, width, height, scale, obj_json_convert_func):
+    def __init__(self, width, height, scale, obj_json_convert_func, dim = 2):
         self._objs   = []
         self._anim   = []
         self._styles = {}
         self.obj_json_convert_func = obj_json_convert_func
+        # One SceneEncoder per widget the scene has been shown in, since each
+        # widget has its own record of what it was sent (see binaryTransport.py)
+        self._dim = dim
+        self._encoders = {}
         #self._sketch_class = SketchClass
         #self._sketch = mo.ui.anywidget(SketchClass())
     
@@ -74,9 +79,27 @@ class Scene:
             return None
     
     def show(self, sketch_viewer):
-        self._updateJson()
-        sketch_viewer.objects = self._toJson()
-        sketch_viewer.objectsDirty = True
+        if hasattr(sketch_viewer, "packet"):
+            self._sendPacket(sketch_viewer)
+        else:
+            self._updateJson()
+            sketch_viewer.objects = self._toJson()
+            sketch_viewer.objectsDirty = True
+    
+    def _sendPacket(self, sketch_viewer, full = False):
+        encoder = self._encoders.get(id(sketch_viewer))
+        if encoder == None:
+            encoder = self._encoders[id(sketch_viewer)] = SceneEncoder(self._dim)
+            sketch_viewer.on_msg(lambda widget, content, buffers: 
+                                 self._sendPacket(sketch_viewer, full = True) 
+                                 if content.get("type") == "resync" else None)
+        packet = encoder.encode(self._frameDicts(), full = full)
+        if packet == None:
+            return
+        header, blob = packet
+        with sketch_viewer.hold_sync():
+            sketch_viewer.packet = blob
+            sketch_viewer.packetHeader = json.dumps(header)
     
     def add(self, obj, style = None):
         self._objs.append(obj)
@@ -95,12 +118,13 @@ class Scene:
         self._anim.append(self._objs)
         self._objs = []
         
-    def _toJson(self):
+    def _frameDicts(self):
         frames = self._anim + [self._objs]
-        return json.dumps(
-            [[d for d in [self.obj_json_convert_func(o, self.getStyle(o)) for o in frame] if not d == None] 
-             for frame in frames]
-        )
+        return [[d for d in [self.obj_json_convert_func(o, self.getStyle(o)) for o in frame] if not d == None] 
+                for frame in frames]
+    
+    def _toJson(self):
+        return json.dumps(self._frameDicts())
     
     def jsonify(self):
         return self._toJson()
\ No newline at end of file
@@ -154,7 +154,8 @@ class S2Scene(Scene):
         super().__init__(width = width, 
                          height = height, 
                          scale = 1.0, 
-                         obj_json_convert_func = _p5_dict)
+                         obj_json_convert_func = _p5_dict, 
+                         dim = 3)
 
     def toggleSphere(self):
         self._sketch.showSphere = not self._sketch.showSphere
@@ -164,11 +165,15 @@ import traitlets
 
 class S2Widget(anywidget.AnyWidget):
     
-    _esm = pkgutil.get_data("koebe.graphics.marimo.js.js", "spherical2viewer.js").decode("utf8")
+    _esm = (pkgutil.get_data("koebe.graphics.js.js", "binaryTransport.js").decode("utf8") 
+            + pkgutil.get_data("koebe.graphics.marimo.js.js", "spherical2viewer.js").decode("utf8"))
     
     # Stateful property that can be accessed by JavaScript & Python
     show_sphere = traitlets.Bool(True).tag(sync=True)
     objects = traitlets.Unicode("[[]]").tag(sync=True)
     objectsDirty = traitlets.Bool(True).tag(sync=True)
+    # The latest binary scene packet, sent by Scene.show (see binaryTransport.py)
+    packet = traitlets.Bytes(b"").tag(sync=True)
+    packetHeader = traitlets.Unicode("{}").tag(sync=True)
     width = traitlets.Int(500).tag(sync=True)
     height = traitlets.Int(500).tag(sync=True)
\ No newline at end of file
@@ -0,0 +1,448 @@
+#
+# Spatial index for hit-testing and picking in 2D scenes
+# @author John C. Bowers
+#
+# A SpatialIndex stores the axis-aligned bounding boxes of the drawable
+# objects of a scene in a uniform grid of square cells, so that picking the
+# object under the mouse or collecting the objects in a rectangle only looks
+# at the few cells near the query instead of at every object.
+#
+# Use should be:
+#
+#   index = SpatialIndex()
+#   index.insertAll(circles)
+#   circle = index.nearest(x, y, tolerance = 0.1)
+#   inRect = index.inRect(-1, -1, 1, 1)
+#   index.remove(circle)
+#
+# E2Scene (koebe.graphics.scenes.euclidean2scene) and the Qt Scene
+# (koebe.graphics.qt.scene) each maintain one of these incrementally and
+# expose it through their pick and rectangle query methods.
+#
+# A DCEL is indexed as its faces, edges and vertices (see partsOf), so that
+# picking it returns the part under the mouse. 
+#
+# Objects are indexed with the shape they have when inserted. After one is
+# modified in place, e.g. a vertex whose data was moved, pass it to update()
+# (E2Scene.markChanged and the Qt Scene's geometry_changed do this). Updating
+# a vertex also re-indexes the indexed edges and faces around it, and 
+# updating a DCEL re-indexes all of its parts, including ones added since. 
+#
+
+import math
+
+import numpy as np
+
+from koebe.geometries.euclidean2 import PointE2, SegmentE2, LineE2, CircleE2, PolygonE2
+from koebe.geometries.orientedProjective2 import PointOP2, DiskOP2, SegmentOP2
+from koebe.geometries.hyperbolic2 import PointH2, CircleH2
+from koebe.datastructures.dcel import DCEL, Vertex, Edge, Face
+
+# Shape kinds. A shape is a tuple whose first entry is the kind.
+#   (_POINT, x, y)
+#   (_CIRCLE, cx, cy, r)
+#   (_POLYLINE, ((x0, y0), (x1, y1), ...), closed)
+# The index keeps long polylines as (_POLYLINE, points, closed, segments),
+# where segments is the numpy array from _segmentArray.
+_POINT    = 0
+_CIRCLE   = 1
+_POLYLINE = 2
+
+def _xy(p):
+    """Returns the (x, y) coordinates of a point-like object, or None."""
+    if isinstance(p, PointE2):
+        return (p.x, p.y)
+    elif isinstance(p, (PointOP2, PointH2)):
+        q = p.toPointE2()
+        return (q.x, q.y)
+    elif isinstance(p, Vertex):
+        return _xy(p.data)
+    else:
+        return None
+
+def shapeOf(obj):
+    """Returns the shape tuple of a drawable 2D object (the point, circle or
+    polyline that gets drawn), or None if obj is not something that can be
+    picked.
+
+    Points, CircleE2, DiskOP2, CircleH2 (in the Poincare disk), SegmentE2,
+    SegmentOP2, PolygonE2, and DCEL vertices, edges and faces with point data
+    are understood. A LineE2 is treated as the segment between its two 
+    defining points, which is how the viewers draw it. A whole DCEL has no
+    shape of its own; it is indexed through partsOf.
+    """
+    if isinstance(obj, Vertex):
+        return shapeOf(obj.data)
+    xy = _xy(obj)
+    if xy != None:
+        return (_POINT, xy[0], xy[1])
+    if isinstance(obj, CircleE2):
+        return (_CIRCLE, obj.center.x, obj.center.y, obj.radius)
+    if isinstance(obj, DiskOP2):
+        if obj.a == 0:
+            return None
+        c = obj.toCircleE2()
+        return (_CIRCLE, c.center.x, c.center.y, c.radius)
+    if isinstance(obj, CircleH2):
+        c = obj.toPoincareCircleE2()
+        return (_CIRCLE, c.center.x, c.center.y, c.radius)
+    if isinstance(obj, (SegmentE2, SegmentOP2)):
+        src, trg = _xy(obj.source), _xy(obj.target)
+        return (_POLYLINE, (src, trg), False)
+    if isinstance(obj, LineE2):
+        return (_POLYLINE, ((obj.p1.x, obj.p1.y), (obj.p2.x, obj.p2.y)), False)
+    if isinstance(obj, PolygonE2):
+        return (_POLYLINE, tuple((v.x, v.y) for v in obj.vertices), True)
+    if isinstance(obj, (Edge, Face)) and obj.aDart == None:
+        return None
+    if isinstance(obj, Edge):
+        src, trg = _xy(obj.aDart.origin), _xy(obj.aDart.dest)
+        if src == None or trg == None:
+            return None
+        return (_POLYLINE, (src, trg), False)
+    if isinstance(obj, Face):
+        points = tuple(_xy(dart.origin) for dart in obj.darts())
+        if any(p == None for p in points):
+            return None
+        return (_POLYLINE, points, True)
+    return None
+
+def partsOf(obj):
+    """Returns the objects a DCEL is indexed as, or None if obj is not a DCEL.
+    These are its faces, edges and vertices in that order, so that where they
+    touch the vertices are picked first, then the edges."""
+    if isinstance(obj, DCEL):
+        return list(obj.faces) + list(obj.edges) + list(obj.verts)
+    return None
+
+def boundsOf(shape):
+    """Returns the bounding box (xmin, ymin, xmax, ymax) of a shape."""
+    kind = shape[0]
+    if kind == _POINT:
+        return (shape[1], shape[2], shape[1], shape[2])
+    elif kind == _CIRCLE:
+        _, cx, cy, r = shape
+        r = abs(r)
+        return (cx - r, cy - r, cx + r, cy + r)
+    else:
+        xs = [p[0] for p in shape[1]]
+        ys = [p[1] for p in shape[1]]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+def _distToSegment(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    lenSq = dx * dx + dy * dy
+    if lenSq == 0:
+        return math.hypot(x - x1, y - y1)
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / lenSq))
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+def distanceTo(shape, x, y):
+    """Returns the distance from (x, y) to the drawn curve of a shape: the
+    point itself, the boundary of a circle, or the edges of a polyline."""
+    kind = shape[0]
+    if kind == _POINT:
+        return math.hypot(x - shape[1], y - shape[2])
+    elif kind == _CIRCLE:
+        _, cx, cy, r = shape
+        return abs(math.hypot(x - cx, y - cy) - abs(r))
+    else:
+        points, closed = shape[1], shape[2]
+        if len(points) == 1:
+            return math.hypot(x - points[0][0], y - points[0][1])
+        if len(shape) > 3:
+            return _distToSegments(x, y, shape[3])
+        best = math.inf
+        n = len(points)
+        for i in range(n if closed else n - 1):
+            (x1, y1), (x2, y2) = points[i], points[(i + 1) % n]
+            best = min(best, _distToSegment(x, y, x1, y1, x2, y2))
+        return best
+
+# Polylines with more points than this are measured with numpy.
+_VECTORIZE_POINTS = 32
+
+def _segmentArray(points, closed):
+    """Returns the segments of a polyline as an array of rows (x1, y1, x2, y2)."""
+    p = np.asarray(points, dtype = float)
+    q = np.roll(p, -1, axis = 0)
+    segs = np.hstack((p, q))
+    return segs if closed else segs[:-1]
+
+def _distToSegments(x, y, segs):
+    """The vectorized _distToSegment to the nearest of the rows of segs."""
+    x1, y1 = segs[:, 0], segs[:, 1]
+    dx, dy = segs[:, 2] - x1, segs[:, 3] - y1
+    lenSq = dx * dx + dy * dy
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        t = np.where(lenSq > 0, ((x - x1) * dx + (y - y1) * dy) / lenSq, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return float(np.hypot(x - (x1 + t * dx), y - (y1 + t * dy)).min())
+
+# Objects whose bounding box would cover more cells than this go into a
+# coarser grid, whose cells are _LEVEL_FACTOR times larger (and so on).
+_MAX_CELLS_PER_OBJECT = 64
+_LEVEL_FACTOR = 8
+
+class SpatialIndex:
+    """A uniform grid over the bounding boxes of 2D drawable objects.
+
+    Objects are tracked by identity. Each object is inserted into every grid
+    cell its bounding box overlaps, so queries only need to examine the cells
+    around the query point or rectangle. Objects much larger than a cell
+    (e.g. the long faces of a triangulation) go into coarser grids instead,
+    so that they neither fill many cells nor get checked by every query.
+    The cell size is chosen from the
+    objects themselves (about the typical object size, or the average spacing
+    for points) and re-chosen whenever the number of objects has grown by a
+    factor of four since the last choice.
+
+    Queries return objects in insertion order, so that among equally near
+    objects the one drawn last (on top) is picked.
+
+    Attributes:
+        shapeFunc: The function mapping objects to shapes (see shapeOf).
+    """
+
+    def __init__(self, objs = None, cellSize = None, shapeFunc = shapeOf):
+        self.shapeFunc = shapeFunc
+        self._fixedCellSize = cellSize
+        self._cellSize = cellSize
+        self._sizedAt = 0
+        self._grids = []     # level -> {(i, j): {id(obj): entry}}
+        self._entries = {}   # id(obj) -> [obj, shape, bounds, seq, cells]
+        self._groups = {}    # id(dcel) -> (dcel, parts), see partsOf
+        self._seq = 0
+        if objs != None:
+            self.insertAll(objs)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, obj):
+        return id(obj) in self._entries or id(obj) in self._groups
+
+    def cellSize(self):
+        return self._cellSize
+
+    def _cellRange(self, level, xmin, ymin, xmax, ymax):
+        s = self._cellSize * _LEVEL_FACTOR ** level
+        return (math.floor(xmin / s), math.floor(ymin / s),
+                math.floor(xmax / s), math.floor(ymax / s))
+
+    def _place(self, key, entry):
+        level = 0
+        i0, j0, i1, j1 = self._cellRange(level, *entry[2])
+        while (i1 - i0 + 1) * (j1 - j0 + 1) > _MAX_CELLS_PER_OBJECT:
+            level += 1
+            i0, j0, i1, j1 = self._cellRange(level, *entry[2])
+        while len(self._grids) <= level:
+            self._grids.append({})
+        grid = self._grids[level]
+        cells = []
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = grid.get((i, j))
+                if cell == None:
+                    cell = grid[(i, j)] = {}
+                cell[key] = entry
+                cells.append((i, j))
+        entry[4] = (level, cells)
+
+    def _unplace(self, key, entry):
+        if entry[4] == None:
+            return
+        level, cells = entry[4]
+        grid = self._grids[level]
+        for ij in cells:
+            cell = grid[ij]
+            del cell[key]
+            if len(cell) == 0:
+                del grid[ij]
+
+    def _chooseCellSize(self):
+        """Picks a cell size of about the median object extent, but no
+        smaller than the average spacing of the objects."""
+        bounds = [e[2] for e in self._entries.values()]
+        if len(bounds) == 0:
+            return 1.0
+        extents = sorted(max(b[2] - b[0], b[3] - b[1]) for b in bounds)
+        median = extents[len(extents) // 2]
+        xmin = min(b[0] for b in bounds)
+        ymin = min(b[1] for b in bounds)
+        xmax = max(b[2] for b in bounds)
+        ymax = max(b[3] for b in bounds)
+        spacing = max(xmax - xmin, ymax - ymin) / math.sqrt(len(bounds))
+        size = max(median, spacing)
+        return size if size > 0 and math.isfinite(size) else 1.0
+
+    def _resizeIfNeeded(self):
+        if self._fixedCellSize != None:
+            return
+        n = len(self._entries)
+        if self._cellSize == None or n > 4 * max(self._sizedAt, 16):
+            self._cellSize = self._chooseCellSize()
+            self._sizedAt = n
+            self._grids = []
+            for key, entry in self._entries.items():
+                self._place(key, entry)
+
+    def _insert(self, obj):
+        parts = partsOf(obj)
+        if parts == None:
+            return self._insertOne(obj)
+        old = self._groups.get(id(obj))
+        if old != None:
+            keep = set(id(part) for part in parts)
+            for part in old[1]:
+                if not id(part) in keep:
+                    self._remove(part)
+        self._groups[id(obj)] = (obj, parts)
+        indexed = False
+        for part in parts:
+            indexed = self._insertOne(part) or indexed
+        return indexed
+
+    def _insertOne(self, obj):
+        shape = self.shapeFunc(obj)
+        if shape == None:
+            return False
+        bounds = boundsOf(shape)
+        if not all(math.isfinite(v) for v in bounds):
+            return False
+        if shape[0] == _POLYLINE and len(shape[1]) > _VECTORIZE_POINTS:
+            shape = shape + (_segmentArray(shape[1], shape[2]),)
+        key = id(obj)
+        old = self._entries.get(key)
+        if old != None:
+            self._unplace(key, old)
+            seq = old[3]
+        else:
+            seq = self._seq
+            self._seq += 1
+        entry = [obj, shape, bounds, seq, None]
+        self._entries[key] = entry
+        if self._cellSize != None:
+            self._place(key, entry)
+        return True
+
+    def insert(self, obj):
+        """Adds obj to the index, or re-indexes it if it is already present
+        (e.g. after it was modified in place). Objects that can't be picked
+        are ignored.
+
+        Returns:
+            True if obj was indexed.
+        """
+        result = self._insert(obj)
+        self._resizeIfNeeded()
+        return result
+
+    def _remove(self, obj):
+        group = self._groups.pop(id(obj), None)
+        if group != None:
+            for part in group[1]:
+                self._remove(part)
+            return True
+        entry = self._entries.pop(id(obj), None)
+        if entry == None:
+            return False
+        if self._cellSize != None:
+            self._unplace(id(obj), entry)
+        return True
+
+    def insertAll(self, objs):
+        for obj in objs:
+            self._insert(obj)
+        self._resizeIfNeeded()
+
+    def update(self, obj):
+        """Re-indexes obj after it was modified in place. For a vertex the 
+        indexed edges and faces around it are re-indexed as well, since their
+        shapes follow it, and for a DCEL all of its parts."""
+        if not self._insert(obj):
+            self._remove(obj)
+        if isinstance(obj, Vertex) and obj.aDart != None:
+            for other in obj.edges() + obj.faces():
+                if id(other) in self._entries and not self._insertOne(other):
+                    self._remove(other)
+        self._resizeIfNeeded()
+
+    def remove(self, obj):
+        """Removes obj (or all parts of a DCEL) from the index.
+
+        Returns:
+            True if obj was indexed.
+        """
+        return self._remove(obj)
+
+    def clear(self):
+        self._entries.clear()
+        self._groups.clear()
+        self._grids = []
+        self._seq = 0
+        if self._fixedCellSize == None:
+            self._cellSize = None
+            self._sizedAt = 0
+
+    def bounds(self, obj):
+        """Returns the indexed bounding box (xmin, ymin, xmax, ymax) of obj,
+        or None if obj isn't in the index."""
+        entry = self._entries.get(id(obj))
+        return None if entry == None else entry[2]
+
+    def _candidates(self, xmin, ymin, xmax, ymax):
+        """Yields the entries of every object whose cells touch the given
+        rectangle (possibly with duplicates)."""
+        if self._cellSize == None:
+            return
+        for level, grid in enumerate(self._grids):
+            i0, j0, i1, j1 = self._cellRange(level, xmin, ymin, xmax, ymax)
+            if (i1 - i0 + 1) * (j1 - j0 + 1) > len(grid):
+                # The rectangle covers more cells than are occupied, so walk 
+                # the occupied cells instead.
+                for (i, j), cell in grid.items():
+                    if i0 <= i <= i1 and j0 <= j <= j1:
+                        yield from cell.values()
+            else:
+                for i in range(i0, i1 + 1):
+                    for j in range(j0, j1 + 1):
+                        cell = grid.get((i, j))
+                        if cell != None:
+                            yield from cell.values()
+
+    def nearest(self, x, y, tolerance = 0.0):
+        """Returns the object whose drawn curve is nearest to (x, y), or None
+        if no object is within tolerance. Ties go to the object inserted
+        last, which is the one drawn on top."""
+        best, bestDist, bestSeq = None, math.inf, -1
+        seen = set()
+        for entry in self._candidates(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            key = id(entry[0])
+            if key in seen:
+                continue
+            seen.add(key)
+            b = entry[2]
+            if (x < b[0] - tolerance or x > b[2] + tolerance
+                or y < b[1] - tolerance or y > b[3] + tolerance):
+                continue
+            d = distanceTo(entry[1], x, y)
+            if d <= tolerance and (d < bestDist or (d == bestDist and entry[3] > bestSeq)):
+                best, bestDist, bestSeq = entry[0], d, entry[3]
+        return best
+
+    def inRect(self, xmin, ymin, xmax, ymax, contained = False):
+        """Returns the objects whose bounding boxes intersect the rectangle
+        (or lie entirely inside it if contained is True), in insertion order."""
+        found = {}
+        for entry in self._candidates(xmin, ymin, xmax, ymax):
+            b = entry[2]
+            if contained:
+                hit = xmin <= b[0] and b[2] <= xmax and ymin <= b[1] and b[3] <= ymax
+            else:
+                hit = b[0] <= xmax and xmin <= b[2] and b[1] <= ymax and ymin <= b[3]
+            if hit:
+                found[id(entry[0])] = entry
+        return [entry[0] for entry in sorted(found.values(), key = lambda e: e[3])]
+
+# END SpatialIndex
@@ -0,0 +1,77 @@
+import importlib.util
+import math
+import unittest
+
+from koebe.geometries.euclidean2 import PointE2, CircleE2, PolygonE2
+from koebe.graphics.picking import SpatialIndex
+from koebe.graphics.scenes.euclidean2scene import E2Scene
+
+def _square():
+    return PolygonE2([PointE2(0, 0), PointE2(2, 0), PointE2(2, 2), PointE2(0, 2)]).toDCEL()
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def test_nearest(self):
+        circles = [CircleE2(PointE2(3 * i, 0), 1) for i in range(10)]
+        index = SpatialIndex(circles)
+        self.assertIs(index.nearest(6, 1.05, tolerance = 0.1), circles[2])
+        self.assertIsNone(index.nearest(6, 0, tolerance = 0.1))
+        self.assertEqual(index.inRect(2.5, -0.5, 7.5, 0.5), circles[1:3])
+
+    def test_longPolygon(self):
+        # Measured with numpy rather than segment by segment
+        n = 200
+        circle = PolygonE2([PointE2(math.cos(2 * math.pi * k / n), math.sin(2 * math.pi * k / n)) for k in range(n)])
+        index = SpatialIndex([circle])
+        self.assertIs(index.nearest(0, 0.99, tolerance = 0.02), circle)
+        self.assertIs(index.nearest(1.0, -0.005, tolerance = 0.02), circle)
+        self.assertIsNone(index.nearest(0, 0.9, tolerance = 0.02))
+
+    def test_dcelParts(self):
+        dcel = _square()
+        index = SpatialIndex([dcel])
+        self.assertIn(dcel, index)
+        # Vertices win over the edges and faces through them, edges over faces
+        self.assertIs(index.nearest(2, 2, tolerance = 0.1), dcel.verts[2])
+        edge = index.nearest(1, 0.05, tolerance = 0.1)
+        self.assertEqual(set(v.data for v in edge.endPoints()), {PointE2(0, 0), PointE2(2, 0)})
+        self.assertTrue(index.remove(dcel))
+        self.assertEqual(len(index), 0)
+
+    def test_movedVertex(self):
+        dcel = _square()
+        scene = E2Scene()
+        scene.add(dcel)
+        vertex = dcel.verts[2]
+        self.assertIs(scene.pick(2, 2, tolerance = 0.1), vertex)
+        vertex.data = PointE2(5, 5)
+        scene.markChanged(vertex)
+        self.assertIs(scene.pick(5, 5, tolerance = 0.1), vertex)
+        self.assertIsNone(scene.pick(2, 2, tolerance = 0.1))
+        # The edges into the moved vertex were re-indexed with it
+        edge = scene.pick(3.5, 2.5, tolerance = 0.1)
+        self.assertIn(vertex, edge.endPoints())
+
+    @unittest.skipUnless(importlib.util.find_spec("PySide6"), "The Qt scene needs PySide6")
+    def test_movedVertexQt(self):
+        from koebe.graphics.qt.scene import Scene
+        dcel = _square()
+        scene = Scene()
+        scene.add(dcel)
+        events = []
+        scene.subscribe(events.append)
+        vertex = dcel.verts[2]
+        self.assertIs(scene.pick(2, 2, tolerance = 0.1), vertex)
+        vertex.data = PointE2(5, 5)
+        scene.geometry_changed(vertex)
+        self.assertIs(scene.pick(5, 5, tolerance = 0.1), vertex)
+        self.assertIsNone(scene.pick(2, 2, tolerance = 0.1))
+        edge = scene.pick(3.5, 2.5, tolerance = 0.1)
+        self.assertIn(vertex, edge.endPoints())
+        # Listeners redraw the whole DCEL
+        self.assertEqual([(event.kind, event.geometries) for event in events], [("updated", (dcel,))])
+        with self.assertRaises(KeyError):
+            scene.geometry_changed(_square().verts[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,9 +13,25 @@ from .vispy_base import VispyRendererBase
 
 
 class VispyEuclidean2Renderer(VispyRendererBase):
-    """GPU-backed renderer for ``Euclidean2View`` using VisPy."""
+    """GPU-backed renderer for ``Euclidean2View`` using VisPy.
 
-    def __init__(self, scene=None, background_color="#f8f9fa"):
+    Only geometry near the visible region is turned into visuals. The
+    visible geometry is looked up in the scene's spatial index, with a
+    margin around the viewport so that small pans do not require a
+    rebuild. Circles and polygons smaller than ``lod_pixel_size`` pixels
+    are collapsed into single-pixel points, drawn together in one marker
+    visual with at most one point per pixel. The visible set is recomputed
+    when panning or zooming leaves the culled region or changes the zoom
+    level noticeably.
+    """
+
+    # Fraction of the viewport size added on each side when culling
+    CULL_MARGIN = 0.5
+
+    # Zoom change (as a ratio of pixel sizes) that triggers recomputing detail
+    LOD_ZOOM_RATIO = 1.5
+
+    def __init__(self, scene=None, background_color="#f8f9fa", lod_pixel_size=0.5):
         VispyRendererBase.__init__(self, scene=scene)
 
         vispy = self.require_vispy()
@@ -35,47 +51,63 @@ class VispyEuclidean2Renderer(VispyRendererBase):
         self._visuals = []
         self._bounds = None
         self._auto_fit_pending = True
+        self._lod_pixel_size = lod_pixel_size
+        self._culled_rect = None
+        self._culled_pixel_size = None
+        self._syncing = False
+        self._camera.transform.changed.connect(self._handle_view_change)
+        self._canvas.events.resize.connect(self._handle_view_change)
 
     @property
     def native_widget(self):
         return self._canvas.native
 
+    @property
+    def lod_pixel_size(self):
+        return self._lod_pixel_size
+
+    def set_lod_pixel_size(self, pixels):
+        """Set the on-screen size below which circles and polygons collapse to points."""
+
+        self._lod_pixel_size = float(pixels)
+        self._rebuild_visuals()
+        self.request_draw()
+        return self
+
     def sync(self, scene=None):
         VispyRendererBase.sync(self, scene=scene)
-        self._clear_visuals()
         self._bounds = None
 
         if self._scene is None:
+            self._clear_visuals()
             self.request_draw()
             return self
 
         bounds = _Bounds2D()
-        draw_order = 0
 
-        for geometry, style in self._scene.items():
+        for geometry, _style in self._scene.items():
             if isinstance(geometry, PointE2):
-                self._add_point(geometry, style, draw_order)
                 bounds.include_point(geometry)
             elif isinstance(geometry, SegmentE2):
-                self._add_segment(geometry, style, draw_order)
                 bounds.include_point(geometry.source)
                 bounds.include_point(geometry.target)
             elif isinstance(geometry, CircleE2):
-                self._add_circle(geometry, style, draw_order)
                 bounds.include_circle(geometry)
             elif isinstance(geometry, PolygonE2):
-                self._add_polygon(geometry, style, draw_order)
                 bounds.include_polygon(geometry)
             elif isinstance(geometry, LineE2):
-                self._add_line_segment(geometry, style, draw_order)
                 bounds.include_point(geometry.p1)
                 bounds.include_point(geometry.p2)
-            draw_order += 1
 
         self._bounds = bounds.as_tuple()
-        if self._auto_fit_pending:
-            self.fit()
-            self._auto_fit_pending = False
+        self._syncing = True
+        try:
+            if self._auto_fit_pending:
+                self.fit()
+                self._auto_fit_pending = False
+        finally:
+            self._syncing = False
+        self._rebuild_visuals()
         self.request_draw()
         return self
 
@@ -100,6 +132,137 @@ class VispyEuclidean2Renderer(VispyRendererBase):
 
         self._camera.set_range(x=(xmin, xmax), y=(ymin, ymax), margin=0.05)
 
+    def _view_rect(self):
+        """Return ``((xmin, ymin, xmax, ymax), pixel_size)`` for the visible region.
+
+        The camera keeps a 1:1 aspect ratio, so the visible region is the
+        camera rectangle grown along one axis to the shape of the canvas.
+        """
+
+        width_px, height_px = self._canvas.size
+        if width_px <= 0 or height_px <= 0:
+            return None, None
+        rect = self._camera.rect
+        pixel_size = max(abs(rect.width) / width_px, abs(rect.height) / height_px)
+        if not pixel_size > 0:
+            return None, None
+        cx, cy = rect.center
+        half_w = 0.5 * width_px * pixel_size
+        half_h = 0.5 * height_px * pixel_size
+        return (cx - half_w, cy - half_h, cx + half_w, cy + half_h), pixel_size
+
+    def _visible_entries(self, rect):
+        """Return the ``(geometry, style)`` pairs whose bounds meet ``rect`` in draw order."""
+
+        spatial_index = getattr(self._scene, "spatial_index", None)
+        if rect is None or spatial_index is None:
+            return list(self._scene.items())
+        style_of = self._scene.style_of
+        return [(geometry, style_of(geometry)) for geometry in spatial_index().inRect(*rect)]
+
+    def _rebuild_visuals(self):
+        self._clear_visuals()
+        if self._scene is None:
+            return
+
+        view, pixel_size = self._view_rect()
+        rect = None
+        if view is not None:
+            xmin, ymin, xmax, ymax = view
+            margin_x = self.CULL_MARGIN * (xmax - xmin)
+            margin_y = self.CULL_MARGIN * (ymax - ymin)
+            rect = (xmin - margin_x, ymin - margin_y, xmax + margin_x, ymax + margin_y)
+
+        lod_size = None if pixel_size is None else self._lod_pixel_size * pixel_size
+        dot_positions = []
+        dot_colors = []
+        dot_pixels = set()
+        draw_order = 0
+
+        for geometry, style in self._visible_entries(rect):
+            if lod_size is not None and isinstance(geometry, (CircleE2, PolygonE2)):
+                dot = self._lod_dot(geometry, style, lod_size)
+                if dot is not None:
+                    x, y, rgba = dot
+                    pixel = (math.floor(x / pixel_size), math.floor(y / pixel_size))
+                    if rgba is not None and pixel not in dot_pixels:
+                        dot_pixels.add(pixel)
+                        dot_positions.append((x, y))
+                        dot_colors.append(rgba)
+                    draw_order += 1
+                    continue
+
+            if isinstance(geometry, PointE2):
+                self._add_point(geometry, style, draw_order)
+            elif isinstance(geometry, SegmentE2):
+                self._add_segment(geometry, style, draw_order)
+            elif isinstance(geometry, CircleE2):
+                self._add_circle(geometry, style, draw_order)
+            elif isinstance(geometry, PolygonE2):
+                self._add_polygon(geometry, style, draw_order)
+            elif isinstance(geometry, LineE2):
+                self._add_line_segment(geometry, style, draw_order)
+            draw_order += 1
+
+        if dot_positions:
+            self._add_dots(dot_positions, dot_colors, draw_order)
+
+        self._culled_rect = rect
+        self._culled_pixel_size = pixel_size
+
+    def _lod_dot(self, geometry, style, lod_size):
+        """Return ``(x, y, rgba)`` if ``geometry`` is too small to draw in full, else ``None``.
+
+        ``rgba`` is ``None`` if the geometry would be invisible.
+        """
+
+        if isinstance(geometry, CircleE2):
+            if 2.0 * abs(float(geometry.radius)) >= lod_size:
+                return None
+            x, y = float(geometry.center.x), float(geometry.center.y)
+        else:
+            xs = [float(v.x) for v in geometry.vertices]
+            ys = [float(v.y) for v in geometry.vertices]
+            if not xs or max(max(xs) - min(xs), max(ys) - min(ys)) >= lod_size:
+                return None
+            x, y = 0.5 * (min(xs) + max(xs)), 0.5 * (min(ys) + max(ys))
+
+        stroke = style.stroke if style is not None and style.stroke is not None else Stroke()
+        fill = style.fill if style is not None else None
+        if fill is not None and fill.alpha > 0.0:
+            return x, y, self._rgba(fill.color, fill.alpha)
+        if stroke.alpha > 0.0 and stroke.width > 0.0:
+            return x, y, self._rgba(stroke.color, stroke.alpha)
+        return x, y, None
+
+    def _add_dots(self, positions, colors, draw_order):
+        visual = self._scene_module.visuals.Markers(parent=self._viewbox.scene)
+        visual.set_data(
+            pos=np.array(positions, dtype=np.float32),
+            face_color=np.array(colors, dtype=np.float32),
+            edge_width=0.0,
+            size=1.0,
+            symbol="square",
+        )
+        self._configure_visual(visual, draw_order)
+        self._visuals.append(visual)
+
+    def _handle_view_change(self, _event=None):
+        if self._syncing or self._scene is None:
+            return
+        view, pixel_size = self._view_rect()
+        if view is None:
+            return
+        if self._culled_rect is not None and self._culled_pixel_size is not None:
+            xmin, ymin, xmax, ymax = view
+            cxmin, cymin, cxmax, cymax = self._culled_rect
+            inside = cxmin <= xmin and xmax <= cxmax and cymin <= ymin and ymax <= cymax
+            ratio = pixel_size / self._culled_pixel_size
+            if inside and 1.0 / self.LOD_ZOOM_RATIO <= ratio <= self.LOD_ZOOM_RATIO:
+                return
+        self._rebuild_visuals()
+        self.request_draw()
+
     def _clear_visuals(self):
         for visual in self._visuals:
             visual.parent = None
@@ -4,6 +4,8 @@ from __future__ import absolute_import
 
 from collections import OrderedDict
 
+from ...datastructures.dcel import Edge, Face, Vertex
+from ..picking import SpatialIndex
 from .style import Style
 
 
@@ -22,6 +24,7 @@ class Scene(object):
         self._entries = OrderedDict()
         self._listeners = []
         self._dirty = False
+        self._spatial_index = None
 
     def __len__(self):
         return len(self._entries)
@@ -38,6 +41,8 @@ class Scene(object):
 
         event_kind = "updated" if geometry in self else "added"
         self._entries[id(geometry)] = (geometry, style if style is not None else Style())
+        if self._spatial_index is not None:
+            self._spatial_index.insert(geometry)
         self._mark_dirty()
         self._notify(SceneChangeEvent(event_kind, [geometry]))
         return geometry
@@ -62,6 +67,8 @@ class Scene(object):
             for geometry in items:
                 inserted.append(self._add_without_notify(geometry, style))
 
+        if self._spatial_index is not None:
+            self._spatial_index.insertAll(inserted)
         self._mark_dirty()
         self._notify(SceneChangeEvent("bulk-added", inserted))
         return inserted
@@ -86,6 +93,8 @@ class Scene(object):
         if entry is None:
             return False
 
+        if self._spatial_index is not None:
+            self._spatial_index.remove(geometry)
         self._mark_dirty()
         self._notify(SceneChangeEvent("removed", [geometry]))
         return True
@@ -98,6 +107,7 @@ class Scene(object):
 
         removed = [geometry for geometry, _style in self._entries.values()]
         self._entries.clear()
+        self._spatial_index = None
         self._mark_dirty()
         self._notify(SceneChangeEvent("cleared", removed))
 
@@ -121,6 +131,58 @@ class Scene(object):
         for _geometry, style in self._entries.values():
             yield style
 
+    def spatial_index(self):
+        """Return the spatial index over the scene's 2D geometry.
+
+        The index is built on first use and kept current by ``add``,
+        ``addAll``, ``remove`` and ``clear``. Geometry without a 2D shape
+        (spherical geometry, for example) is not indexed.
+        """
+
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.geometries())
+        return self._spatial_index
+
+    def pick(self, x, y, tolerance=0.0):
+        """Return the geometry drawn nearest to ``(x, y)`` within ``tolerance``.
+
+        Distances are measured to points, circle boundaries and polygon or
+        segment edges, in scene coordinates. Returns ``None`` if nothing is
+        within ``tolerance``. A DCEL is picked as the vertex, edge or face
+        under ``(x, y)``. Geometry edited in place must be passed to
+        ``geometry_changed`` to be found where it now is.
+        """
+
+        return self.spatial_index().nearest(x, y, tolerance)
+
+    def objects_in_rect(self, xmin, ymin, xmax, ymax, contained=False):
+        """Return the geometry whose bounds meet a rectangle, in insertion order.
+
+        With ``contained=True`` only geometry lying entirely inside the
+        rectangle is returned.
+        """
+
+        return self.spatial_index().inRect(xmin, ymin, xmax, ymax, contained)
+
+    def geometry_changed(self, geometry):
+        """Re-index a geometry object that was modified in place and redraw.
+
+        ``geometry`` may also be a vertex, edge or face of a DCEL in the
+        scene, such as a picked vertex that was moved. Only that part (and,
+        for a vertex, the edges and faces around it) is re-indexed, and
+        listeners are told that the DCEL changed.
+        """
+
+        owner = self._owner(geometry)
+        if owner is None:
+            raise KeyError("Geometry object is not present in this scene")
+
+        if self._spatial_index is not None:
+            self._spatial_index.update(geometry)
+        self._mark_dirty()
+        self._notify(SceneChangeEvent("updated", [owner]))
+        return geometry
+
     def subscribe(self, callback):
         """Register a listener for scene changes."""
 
@@ -141,6 +203,16 @@ class Scene(object):
         self._entries[id(geometry)] = (geometry, style if style is not None else Style())
         return geometry
 
+    def _owner(self, geometry):
+        """Return the scene object that geometry is or is a part of (see
+        ``picking.partsOf``), or ``None``."""
+
+        if geometry in self:
+            return geometry
+        if isinstance(geometry, (Vertex, Edge, Face)) and geometry.dcel in self:
+            return geometry.dcel
+        return None
+
     @staticmethod
     def _is_pair_sequence(items):
         first = items[0]
@@ -7,6 +7,8 @@ from koebe.datastructures.dcel import DCEL, Face, Edge, Vertex
 import math
 
 from .scene import Scene
+from .serializer import Serializer
+from ..picking import SpatialIndex
 from .scene import makeStyle as _makeStyle
 
 makeStyle = _makeStyle
@@ -128,48 +130,38 @@ def _p5_polygonE2(polygon, style):
         result["style"] = makeStyle(stroke = "#000", strokeWeight = 1)
     return result
 
+def _p5_vertex(vertex, style):
+    return _p5_dict(vertex.data, style)
+
+def _p5_segmentOP2(seg, style):
+    return _p5_segmentE2(SegmentE2(seg.source.toPointE2(), 
+                                   seg.target.toPointE2()), style)
+
+# Converters from drawable types to dictionaries, looked up by type(obj). 
+# Register additional types with _p5_serializer.register(cls, func).
+_P5_CONVERTERS = {
+    Vertex:       _p5_vertex,
+    PointE2:      lambda obj, style: _p5_pointE2(obj),
+    PointH2:      lambda obj, style: _p5_pointE2(obj.toPointE2()),
+    PointOP2:     lambda obj, style: _p5_pointE2(obj.toPointE2()),
+    CircleE2:     _p5_circleE2,
+    CircleH2:     lambda obj, style: _p5_circleE2(obj.toPoincareCircleE2(), style),
+    DiskOP2:      lambda obj, style: _p5_circleE2(obj.toCircleE2(), style),
+    DCEL:         _p5_dcel,
+    Edge:         _p5_edge,
+    Face:         _p5_face,
+    CircleArcOP2: _p5_circleArcOP2,
+    SegmentE2:    _p5_segmentE2,
+    SegmentOP2:   _p5_segmentOP2,
+    SegmentH2:    lambda obj, style: _p5_circleArcOP2(obj.toPoincareCircleArcOP2(), style),
+    LineH2:       lambda obj, style: _p5_circleArcOP2(obj.toPoincareCircleArcOP2(), style),
+    PolygonE2:    _p5_polygonE2
+}
+
+_p5_serializer = Serializer(_P5_CONVERTERS)
+
 def _p5_dict(obj, style):
-    
-    if type(obj) is Vertex:
-        obj = obj.data    
-    if type(obj) is PointE2:
-        result = _p5_pointE2(obj)
-    elif type(obj) is PointH2:
-        result = _p5_pointE2(obj.toPointE2())
-    elif type(obj) is PointOP2:
-        result = _p5_pointE2(obj.toPointE2())
-    elif type(obj) is CircleE2:
-        result = _p5_circleE2(obj, style)
-    elif type(obj) is CircleH2:
-        result = _p5_circleE2(obj.toPoincareCircleE2(), style)
-    elif type(obj) is DiskOP2:
-        result = _p5_circleE2(obj.toCircleE2(), style)
-    elif type(obj) is DCEL:
-        result = _p5_dcel(obj, style)
-    elif type(obj) is Edge:
-        result = _p5_edge(obj, style)
-    elif type(obj) is Face:
-        result = _p5_face(obj, style)
-    elif type(obj) is CircleArcOP2:
-        result = _p5_circleArcOP2(obj, style)
-    elif type(obj) is SegmentE2:
-        result = _p5_segmentE2(obj, style)
-    elif type(obj) is SegmentOP2:
-        result = _p5_segmentE2(SegmentE2(obj.source.toPointE2(), 
-                                         obj.target.toPointE2()), style)
-    elif type(obj) is SegmentH2:
-        result = _p5_circleArcOP2(obj.toPoincareCircleArcOP2(), style)
-    elif type(obj) is LineH2:
-        result = _p5_circleArcOP2(obj.toPoincareCircleArcOP2(), style)
-    elif type(obj) is PolygonE2:
-        result = _p5_polygonE2(obj, style)
-    else:
-        result = None
-        
-    if result != None and style != None:
-        result["style"] = style
-        
-    return result
+    return _p5_serializer.toDict(obj, style)
 
 
 ### THE ACTUAL VIEWER CLASSES
@@ -180,8 +172,60 @@ class E2Scene(Scene):
                          height = height, 
                          scale = scale, 
                          title = title,
-                         obj_json_convert_func = _p5_dict, 
+                         obj_json_convert_func = _p5_serializer, 
                          pan_and_zoom = pan_and_zoom)
+        # Spatial index over the objects of the current frame. It is built on
+        # the first pick or rectangle query and kept up to date afterwards.
+        self._spatialIndex = None
+    
+    def spatialIndex(self):
+        """Returns the SpatialIndex over the objects of the current frame."""
+        if self._spatialIndex == None:
+            self._spatialIndex = SpatialIndex(self._objs)
+        return self._spatialIndex
+    
+    def pick(self, x, y, tolerance = 0.0):
+        """Returns the object of the current frame whose drawn point or curve 
+        is nearest to (x, y), or None if there is none within tolerance. 
+        Coordinates and tolerance are in scene units, so for a tolerance of 
+        10 pixels pass 10 / scale. For a DCEL this is the vertex, edge or face
+        under (x, y). Objects edited in place, such as a vertex whose data was
+        moved, must be passed to markChanged to be found where they now are."""
+        return self.spatialIndex().nearest(x, y, tolerance)
+    
+    def objectsInRect(self, xmin, ymin, xmax, ymax, contained = False):
+        """Returns the objects of the current frame whose bounding boxes meet
+        the rectangle (or lie inside it if contained is True), in draw order."""
+        return self.spatialIndex().inRect(xmin, ymin, xmax, ymax, contained)
+    
+    def add(self, obj, style = None):
+        super().add(obj, style)
+        if self._spatialIndex != None:
+            self._spatialIndex.insert(obj)
+    
+    def addAll(self, objs):
+        objs = list(objs)
+        super().addAll(objs)
+        if self._spatialIndex != None:
+            self._spatialIndex.insertAll(obj[0] if isinstance(obj, tuple) else obj for obj in objs)
+    
+    def markChanged(self, obj):
+        """Also re-indexes obj for picking, see SpatialIndex.update."""
+        super().markChanged(obj)
+        if self._spatialIndex != None and obj in self._spatialIndex:
+            self._spatialIndex.update(obj)
+    
+    def pushAnimFrame(self):
+        super().pushAnimFrame()
+        self._spatialIndex = None
+    
+    def clearAnimFrames(self):
+        super().clearAnimFrames()
+        self._spatialIndex = None
+    
+    def clear(self):
+        super().clear()
+        self._spatialIndex = None
     
 class PoincareDiskScene(Scene):
     def __init__(self, width=500, height=500, title=None, pan_and_zoom=False):
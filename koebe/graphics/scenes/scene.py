@@ -1,5 +1,6 @@
-# For sending data to the JavaScript part
-import json #json.dumps(obj)
+import copy
+
+from .serializer import FragmentCache, styleKey
 
 ### STYLE HANDLING
 
@@ -46,6 +47,15 @@ class Scene:
         self._background_styles = {}
         self._title = title
         self.obj_json_convert_func = obj_json_convert_func
+        # Encoded fragments are cached per object (see serializer.py). Animation
+        # frames are cached whole once pushed, and are invalidated whenever 
+        # _generation changes (restyling or markChanged) or one of their styles
+        # is edited in place.
+        convert = lambda obj, style: self.obj_json_convert_func(obj, style)
+        self._fragments = FragmentCache(convert)
+        self._background_fragments = FragmentCache(convert)
+        self._anim_json = {}
+        self._generation = 0
         #self._sketch_class = SketchClass
         #self._sketch = mo.ui.anywidget(SketchClass())
         self._key_pressed           = lambda evt: None
@@ -95,12 +105,26 @@ class Scene:
         self._updateJson()
     
     def setStyle(self, obj, style):
+        if self._styles.get(id(obj)) is not style:
+            self._generation += 1
         self._styles[id(obj)] = style
         self._needs_redraw = True
     
     def setBackgroundStyle(self, obj, style):
         self._background_styles[id(obj)] = style
         self._needs_background_redraw = True
+    
+    def markChanged(self, obj):
+        """Flags that obj was modified in place, so that its cached JSON
+        fragment (and those of any animation frames containing it) are 
+        re-encoded on the next jsonify(). Mutable objects such as DCELs are
+        never cached and immutable geometry objects never change, so this 
+        is for things like a PolygonE2 whose vertex list was edited."""
+        self._fragments.invalidate(obj)
+        self._background_fragments.invalidate(obj)
+        self._generation += 1
+        self._needs_redraw = True
+        self._needs_background_redraw = True
         
     def setStyles(self, objs, style):
         for obj in objs:
@@ -167,25 +191,73 @@ class Scene:
     def clearAnimFrames(self):
         self._objs.clear()
         self._anim.clear()
+        self._anim_json.clear()
         #self._needs_redraw = True
     
     def _toJson(self):
-        return json.dumps(
-            self.get_json_objects_list()
-        )
+        return "[" + ", ".join(s for _, s in self._encodeFrames()) + "]"
     
     def _toJsonBackground(self):
-        return json.dumps(
-            self.get_json_background_objects_list()
-        )
+        return self._encodeBackground()[1]
 
     def get_json_objects_list(self):
-        frames = self._anim + [self._objs]
-        return [[d for d in [self.obj_json_convert_func(o, self.getStyle(o)) for o in frame] if not d == None] 
-                for frame in frames]
+        # The dicts are shared with the fragment cache, so callers get copies
+        return copy.deepcopy([dicts for dicts, _ in self._encodeFrames()])
 
     def get_json_background_objects_list(self):
-        return [d for d in [self.obj_json_convert_func(o, self.getBackgroundStyle(o)) for o in self._background_objs] if not d == None]
+        return copy.deepcopy(self._encodeBackground()[0])
+    
+    def _encodeFrame(self, frame, getStyle, fragments):
+        """Returns (dicts, json string, styles) for a list of objects, where
+        styles pairs each distinct style of the objects with its styleKey, or
+        is None unless every object's fragment was cacheable."""
+        dicts = []
+        strings = []
+        styles = {}
+        cacheable = True
+        for obj in frame:
+            style = getStyle(obj)
+            d, s, cached = fragments.fragment(obj, style)
+            cacheable = cacheable and cached
+            if style != None:
+                styles[id(style)] = style
+            if d != None:
+                dicts.append(d)
+                strings.append(s)
+        styles = tuple((style, styleKey(style)) for style in styles.values()) if cacheable else None
+        return dicts, "[" + ", ".join(strings) + "]", styles
+    
+    def _encodeFrames(self):
+        """Returns a list of (dicts, json string) pairs, one per animation frame
+        with the current frame last. Pushed animation frames whose objects are all
+        cacheable are only re-encoded when _generation changes or one of their 
+        styles was edited in place."""
+        encoded = []
+        for idx, frame in enumerate(self._anim):
+            entry = self._anim_json.get(idx)
+            if (entry != None and entry[0] is frame and entry[1] == self._generation
+                and all(styleKey(style) == key for style, key in entry[2])):
+                encoded.append((entry[3], entry[4]))
+            else:
+                dicts, s, styles = self._encodeFrame(frame, self.getStyle, self._fragments)
+                if styles != None:
+                    self._anim_json[idx] = (frame, self._generation, styles, dicts, s)
+                encoded.append((dicts, s))
+        dicts, s, _ = self._encodeFrame(self._objs, self.getStyle, self._fragments)
+        encoded.append((dicts, s))
+        
+        # Drop fragments of objects that have left the scene once they dominate the cache
+        if len(self._fragments) > 2 * sum(len(frame) for frame in self._anim + [self._objs]) + 1024:
+            self._fragments.prune(o for frame in self._anim + [self._objs] for o in frame)
+        return encoded
+    
+    def _encodeBackground(self):
+        dicts, s, _ = self._encodeFrame(self._background_objs, 
+                                        self.getBackgroundStyle, 
+                                        self._background_fragments)
+        if len(self._background_fragments) > 2 * len(self._background_objs) + 1024:
+            self._background_fragments.prune(self._background_objs)
+        return dicts, s
     
     def jsonify(self):
         return self._toJson()
@@ -206,4 +278,5 @@ class Scene:
     def clear(self):
         self._objs = []
         self._styles = {}
+        self._generation += 1
         self._needs_redraw = True
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+
+import json
+
+from koebe.geometries.euclidean2 import PointE2, PolygonE2
+from koebe.graphics.scenes.scene import makeStyle
+from koebe.graphics.scenes.euclidean2scene import E2Scene
+
+class TestSceneAnimationCache(unittest.TestCase):
+
+    def test_firstSetStyleInvalidatesFrames(self):
+        scene = E2Scene()
+        p = PointE2(1, 2)
+        scene.add(p)
+        scene.pushAnimFrame()
+        before = json.loads(scene.jsonify())
+        style = makeStyle(stroke = "#ff0000")
+        scene.setStyle(p, style)
+        frames = json.loads(scene.jsonify())
+        self.assertNotEqual(frames, before)
+        self.assertEqual(frames[0][0]["style"], style)
+
+    def test_restyleInvalidatesFrames(self):
+        scene = E2Scene()
+        p = PointE2(1, 2)
+        scene.add(p, makeStyle(stroke = "#ff0000"))
+        scene.pushAnimFrame()
+        scene.jsonify()
+        scene.setStyle(p, makeStyle(stroke = "#0000ff"))
+        self.assertEqual(json.loads(scene.jsonify())[0][0]["style"]["stroke"], "#0000ff")
+
+    def test_styleEditedInPlace(self):
+        scene = E2Scene()
+        style = makeStyle(stroke = "#ff0000")
+        scene.add(PointE2(1, 2), style)
+        scene.pushAnimFrame()
+        scene.add(PointE2(3, 4), style)
+        scene.jsonify()
+        style["stroke"] = "#0000ff"
+        frames = json.loads(scene.jsonify())
+        self.assertEqual([frame[0]["style"]["stroke"] for frame in frames], ["#0000ff", "#0000ff"])
+
+    def test_markChanged(self):
+        scene = E2Scene()
+        polygon = PolygonE2([PointE2(0, 0), PointE2(1, 0), PointE2(0, 1)])
+        scene.add(polygon)
+        scene.pushAnimFrame()
+        scene.jsonify()
+        polygon.vertices.append(PointE2(-1, 0))
+        scene.markChanged(polygon)
+        self.assertEqual(len(json.loads(scene.jsonify())[0][0]["vertices"]), 4)
+
+    def test_objectsListIsACopy(self):
+        scene = E2Scene()
+        scene.add(PointE2(1, 2), makeStyle(stroke = "#ff0000"))
+        scene.pushAnimFrame()
+        scene.addToBackground(PointE2(3, 4))
+        before = scene.jsonify()
+        frames = scene.get_json_objects_list()
+        frames[0][0]["style"]["stroke"] = "#0000ff"
+        frames[0][0]["point"] = (5, 6)
+        scene.get_json_background_objects_list()[0]["point"] = (7, 8)
+        self.assertEqual(scene.jsonify(), before)
+        self.assertEqual(scene.get_json_objects_list()[0][0]["style"]["stroke"], "#ff0000")
+        self.assertEqual(tuple(scene.get_json_background_objects_list()[0]["point"]), (3, 4))
+
+if __name__ == '__main__':
+    unittest.main()
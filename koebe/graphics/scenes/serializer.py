@@ -0,0 +1,141 @@
+#
+# Type-dispatched serialization of scene objects with a per-object fragment
+# cache, so that re-sending a scene only re-encodes what actually changed.
+#
+
+# For sending data to the JavaScript part
+import json #json.dumps(obj)
+
+from dataclasses import is_dataclass
+
+class Serializer:
+    """Converts scene objects to drawable dictionaries by looking up a
+    converter for the object's type in a registry dict.
+
+    A converter is a function ``(obj, style) -> dict`` (or ``None`` if the
+    object cannot be drawn). Lookups on subclasses fall back along the MRO
+    and the result is remembered, so each type is resolved at most once.
+
+    A Serializer is callable with the same signature as the old
+    ``obj_json_convert_func`` functions so that it can be handed to a Scene
+    directly.
+
+    Attributes:
+        converters: The dictionary from types to converter functions.
+    """
+
+    def __init__(self, converters = None):
+        self.converters = dict(converters) if converters != None else {}
+        self._resolved = {}
+
+    def register(self, cls, converter):
+        self.converters[cls] = converter
+        self._resolved.clear()
+
+    def converterFor(self, obj):
+        cls = type(obj)
+        try:
+            return self._resolved[cls]
+        except KeyError:
+            converter = None
+            for base in cls.__mro__:
+                if base in self.converters:
+                    converter = self.converters[base]
+                    break
+            self._resolved[cls] = converter
+            return converter
+
+    def toDict(self, obj, style):
+        converter = self.converterFor(obj)
+        if converter == None:
+            return None
+        result = converter(obj, style)
+        if result != None and style != None:
+            result["style"] = style
+        return result
+
+    def __call__(self, obj, style):
+        return self.toDict(obj, style)
+
+# END Serializer
+
+_immutable_types = {}
+
+def _isImmutable(obj):
+    """Returns True if obj is an instance of a frozen dataclass. Only such
+    objects can be safely cached on identity alone; everything else (DCELs,
+    vertices, faces, VertexColoredTriangles, ...) can change underneath us."""
+    cls = type(obj)
+    try:
+        return _immutable_types[cls]
+    except KeyError:
+        result = is_dataclass(cls) and cls.__dataclass_params__.frozen
+        _immutable_types[cls] = result
+        return result
+
+def styleKey(style):
+    """A snapshot of the contents of a style dictionary, so that a style
+    edited in place no longer matches the fragments encoded with it."""
+    return None if style == None else tuple(style.items())
+
+class FragmentCache:
+    """Caches the serialized fragment (both the dictionary and its JSON
+    encoding) of each object keyed by the object's identity and the 
+    contents of its style (see styleKey).
+
+    Only objects of frozen dataclass types (the geometry classes) are cached.
+    Mutable objects such as DCELs and their vertices, edges and faces are 
+    re-encoded on every request, so edits to them always show. A frozen 
+    object can still hold mutable data (the vertex list of a PolygonE2); 
+    after editing that in place the owner must invalidate() the object.
+
+    Entries hold a reference to their object, so an id() can never be
+    reused by a different object while its entry is alive.
+    """
+
+    def __init__(self, convert):
+        self.convert = convert
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fragment(self, obj, style):
+        """Returns the serialized fragment of obj.
+
+        Returns:
+            A triple (dict, json string, cached) where dict and json string
+            are None if obj is not drawable, and cached is True if the
+            fragment came from, or was stored in, the cache. A cached dict
+            is shared by every later call for obj, so it must not be
+            modified.
+        """
+        key = id(obj)
+        entry = self._entries.get(key)
+        if (entry != None
+            and entry[0] is obj
+            and entry[1] == styleKey(style)):
+            return entry[2], entry[3], True
+
+        d = self.convert(obj, style)
+        s = None if d == None else json.dumps(d)
+
+        if _isImmutable(obj):
+            self._entries[key] = (obj, styleKey(style), d, s)
+            return d, s, True
+        else:
+            return d, s, False
+
+    def invalidate(self, obj):
+        self._entries.pop(id(obj), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def prune(self, objs):
+        """Drops every entry whose object is not in objs."""
+        keep = set(id(o) for o in objs)
+        for key in [k for k in self._entries if not k in keep]:
+            del self._entries[key]
+
+# END FragmentCache
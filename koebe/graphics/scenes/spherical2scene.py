@@ -9,13 +9,16 @@ import pkgutil
 # For sending data to the JavaScript part
 import json #json.dumps(obj)
 
+import math
+
 # Packages for drawable objects
-from koebe.geometries.euclidean3 import PointE3, SegmentE3
+from koebe.geometries.euclidean3 import PointE3, SegmentE3, VectorE3, DirectionE3, least_dominant_VectorE3
 from koebe.geometries.spherical2 import DiskS2, PointS2, CPlaneS2
 from koebe.geometries.orientedProjective3 import PointOP3
 from koebe.datastructures.dcel import DCEL, Face, Edge, Vertex
 
 from .scene import Scene, VertexColoredTriangle
+from .serializer import Serializer
 from .scene import makeStyle as _makeStyle
 
 makeStyle = _makeStyle
@@ -34,13 +37,19 @@ def _p5_pointE3(point):
             "point": tuple(point)}
     
 def _p5_diskS2(disk):
+    # Same values as disk.normedBasis1/2/3, centerE3 and radiusE3, but each
+    # basis vector and the center are computed only once.
+    n = VectorE3(disk.a, disk.b, disk.c)
+    basis1 = least_dominant_VectorE3(n).value.cross(n)
+    basis2 = basis1.cross(n)
+    centerDistSq = (disk.centerE3 - PointE3.O).normSq()
     return {"type":       "DiskS2",
             "disk":       tuple(disk),
-            "b1":         tuple(disk.normedBasis1.v),
-            "b2":         tuple(disk.normedBasis2.v),
-            "b3":         tuple(disk.normedBasis3.v),
-            "centerDist": disk.centerE3.distTo(PointE3.O),
-            "diameter":   disk.radiusE3.real * 2.0}
+            "b1":         tuple(DirectionE3(basis1).v),
+            "b2":         tuple(DirectionE3(basis2).v),
+            "b3":         tuple(DirectionE3(n).v),
+            "centerDist": math.sqrt(centerDistSq),
+            "diameter":   ((1.0 - centerDistSq)**(0.5)).real * 2.0}
 
 def _p5_cPlaneS2(cplane, style):
     result = _p5_diskS2(cplane.dualDiskS2)
@@ -95,36 +104,30 @@ def _p5_segmentE3(seg, style):
         result["style"] = makeStyle(stroke = "#000", strokeWeight = 2)
     return result
 
+def _p5_vertex(vertex, style):
+    return _p5_dict(vertex.data, style)
+
+# Converters from drawable types to dictionaries, looked up by type(obj) 
+# (falling back along the MRO, so VertexColoredTriangle subclasses work). 
+# Register additional types with _p5_serializer.register(cls, func).
+_P5_CONVERTERS = {
+    Vertex:                _p5_vertex,
+    DiskS2:                lambda obj, style: _p5_diskS2(obj),
+    PointE3:               lambda obj, style: _p5_pointE3(obj),
+    PointS2:               lambda obj, style: _p5_pointE3(obj.directionE3.endPoint),
+    PointOP3:              lambda obj, style: _p5_pointE3(obj.toPointE3()),
+    CPlaneS2:              _p5_cPlaneS2,
+    DCEL:                  _p5_dcel,
+    Edge:                  _p5_edge,
+    Face:                  _p5_face,
+    SegmentE3:             _p5_segmentE3,
+    VertexColoredTriangle: lambda obj, style: obj.to_dict()
+}
+
+_p5_serializer = Serializer(_P5_CONVERTERS)
+
 def _p5_dict(obj, style):
-    
-    if type(obj) is Vertex:
-        obj = obj.data
-    
-    if type(obj) is DiskS2:
-        result = _p5_diskS2(obj)
-    elif type(obj) is PointE3:
-        result = _p5_pointE3(obj)
-    elif type(obj) is PointS2:
-        result = _p5_pointE3(obj.directionE3.endPoint)
-    elif type(obj) is PointOP3:
-        result = _p5_pointE3(obj.toPointE3())
-    elif type(obj) is CPlaneS2:
-        result = _p5_cPlaneS2(obj, style)
-    elif type(obj) is DCEL:
-        result = _p5_dcel(obj, style)
-    elif type(obj) is Edge:
-        result = _p5_edge(obj, style)
-    elif type(obj) is Face:
-        result = _p5_face(obj, style)
-    elif type(obj) is SegmentE3:
-        result = _p5_segmentE3(obj, style)
-    elif isinstance(obj, VertexColoredTriangle):
-        result = obj.to_dict()
-    else:
-        result = None
-    if result != None and style != None:
-        result["style"] = style
-    return result
+    return _p5_serializer.toDict(obj, style)
 
 ### STYLE HANDLING
 
@@ -151,7 +154,7 @@ class S2Scene(Scene):
                          height = height, 
                          scale = 1.0, 
                          title = title, 
-                         obj_json_convert_func = _p5_dict)
+                         obj_json_convert_func = _p5_serializer)
         self._show_sphere = show_sphere
         self._show_light_cone = show_light_cone
 
@@ -11,7 +11,7 @@ from IPython.core.magics.display import Javascript
 
 # Packages for dealing with widgets: 
 import ipywidgets as widgets
-from traitlets import Unicode, Int, Bool
+from traitlets import Unicode, Int, Bool, Bytes
 
 # For sending data to the JavaScript part
 import json #json.dumps(obj)
@@ -155,13 +155,15 @@ class DefaultStyles:
 ### THE ACTUAL VIEWER CLASSES
     
 class S2Viewer(Viewer):
-    def __init__(self, width=500, height=500):
+    def __init__(self, width=500, height=500, binary=True):
         super().__init__(width = width, 
                          height = height, 
                          scale = 1.0, 
                          jsSketchFile = "spherical2viewer.js", 
                          SketchClass = S2Sketch,
-                         obj_json_convert_func = _p5_dict)
+                         obj_json_convert_func = _p5_dict, 
+                         binary = binary, 
+                         dim = 3)
 
     def toggleSphere(self):
         self._sketch.showSphere = not self._sketch.showSphere
@@ -234,5 +236,11 @@ class S2Sketch(widgets.DOMWidget):
     objects      = Unicode('[]').tag(sync=True)
     objectsDirty = Bool(True).tag(sync=True)
     
+    # packet and packetHeader hold the latest binary scene packet (see 
+    # binaryTransport.py). They are used instead of objects when the viewer
+    # was created with binary = True. 
+    packet       = Bytes(b'').tag(sync=True)
+    packetHeader = Unicode('{}').tag(sync=True)
+    
     showSphere   = Bool(True).tag(sync=True)
     
\ No newline at end of file
@@ -6,6 +6,7 @@ from IPython.core.magics.display import Javascript
 
 # For sending data to the JavaScript part
 import json #json.dumps(obj)
+from .binaryTransport import SceneEncoder
 
 ### STYLE HANDLING
 
@@ -44,18 +45,45 @@ class VertexColoredTriangle:
     
 class Viewer:
     
-    def __init__(self, width, height, scale, jsSketchFile, SketchClass, obj_json_convert_func):
+    def __init__(self, width, height, scale, jsSketchFile, SketchClass, obj_json_convert_func, 
+                 binary = True, dim = 2):
+        # The binary transport decoder is shared by every sketch, so it is 
+        # prepended to the sketch code. 
+        transport_code = pkgutil.get_data("koebe.graphics.js.js", "binaryTransport.js").decode("utf8")
         viewer_code = pkgutil.get_data("koebe.graphics.js.js", jsSketchFile).decode("utf8")
-        display(Javascript(viewer_code))
+        display(Javascript(transport_code + viewer_code))
         self._sketch = SketchClass(width=width, height=height, scale=scale)
         self._objs   = []
         self._anim   = []
         self._styles = {}
         self.obj_json_convert_func = obj_json_convert_func
+        # If binary is True, scenes are sent as typed-array packets and repeated
+        # updates only send what changed (see binaryTransport.py). Otherwise the
+        # whole scene is sent as a JSON string each time. 
+        self._binary = binary
+        self._encoder = SceneEncoder(dim)
+        self._sketch.on_msg(self._handleSketchMsg)
     
     def _updateJson(self):
-        self._sketch.objects = self._toJson()
-        self._sketch.objectsDirty = True
+        if self._binary:
+            self._sendPacket()
+        else:
+            self._sketch.objects = self._toJson()
+            self._sketch.objectsDirty = True
+    
+    def _sendPacket(self, full = False):
+        packet = self._encoder.encode(self._frameDicts(), full = full)
+        if packet == None:
+            return
+        header, blob = packet
+        with self._sketch.hold_sync():
+            self._sketch.packet = blob
+            self._sketch.packetHeader = json.dumps(header)
+    
+    def _handleSketchMsg(self, widget, content, buffers):
+        # A view that missed a packet asks for the whole scene again
+        if content.get("type") == "resync":
+            self._sendPacket(full = True)
     
     def update(self):
         self._updateJson()
@@ -94,9 +122,10 @@ class Viewer:
         self._anim.append(self._objs)
         self._objs = []
         
-    def _toJson(self):
+    def _frameDicts(self):
         frames = self._anim + [self._objs]
-        return json.dumps(
-            [[d for d in [self.obj_json_convert_func(o, self.getStyle(o)) for o in frame] if not d == None] 
-             for frame in frames]
-        )
\ No newline at end of file
+        return [[d for d in [self.obj_json_convert_func(o, self.getStyle(o)) for o in frame] if not d == None] 
+                for frame in frames]
+        
+    def _toJson(self):
+        return json.dumps(self._frameDicts())
\ No newline at end of file